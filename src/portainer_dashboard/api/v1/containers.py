@@ -2,17 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import math
 import time
+from collections.abc import AsyncIterator
 from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from portainer_dashboard.auth.dependencies import CurrentUserDep
-from portainer_dashboard.config import get_settings
+from portainer_dashboard.config import PortainerEnvironmentSettings, get_settings
 from portainer_dashboard.models.portainer import Container, ContainerDetails, ContainerLogsResponse
 from portainer_dashboard.services.cache_service import get_cache_service
+from portainer_dashboard.services.docker_logs import LogLine
+from portainer_dashboard.services.log_streams import LogStreamOpener, get_log_stream_hub
 from portainer_dashboard.services.portainer_client import (
     AsyncPortainerClient,
     PortainerAPIError,
@@ -22,6 +28,9 @@ from portainer_dashboard.services.portainer_client import (
 
 LOGGER = logging.getLogger(__name__)
 
+# Idle interval after which a comment is sent to detect closed log streams
+_SSE_KEEPALIVE_SECONDS = 15.0
+
 
 def _sanitize_record(record: dict[str, Any]) -> dict[str, Any]:
     """Replace NaN/inf values with None for Pydantic compatibility."""
@@ -183,14 +192,75 @@ async def get_container_details(
     raise HTTPException(status_code=404, detail="Container not found")
 
 
+def _open_log_stream(
+    env: PortainerEnvironmentSettings,
+    endpoint_id: int,
+    container_id: str,
+    timestamps: bool,
+) -> LogStreamOpener:
+    """Return an opener for a container's followed Docker log stream."""
+
+    async def open_stream(tail: int) -> AsyncIterator[LogLine]:
+        async with create_portainer_client(env) as client:
+            async for line in client.stream_container_logs(
+                endpoint_id,
+                container_id,
+                tail=tail,
+                timestamps=timestamps,
+                follow=True,
+            ):
+                yield line
+
+    return open_stream
+
+
+def _sse_event(data: dict[str, Any], event: str | None = None) -> str:
+    """Format a server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _follow_log_events(
+    request: Request,
+    key: tuple[str, int, str, bool],
+    open_stream: LogStreamOpener,
+    tail: int,
+) -> AsyncIterator[str]:
+    """Yield a container's live log lines as server-sent events.
+
+    Lines come from the stream shared by all viewers of the container. When
+    this viewer cannot keep up, a ``dropped`` event reports the lines it
+    missed.
+    """
+    async with get_log_stream_hub().subscribe(key, open_stream, tail) as subscriber:
+        while True:
+            try:
+                line = await asyncio.wait_for(subscriber.get(), _SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            dropped = subscriber.take_dropped()
+            if dropped:
+                yield _sse_event({"count": dropped}, "dropped")
+            if line is None:
+                yield _sse_event({}, "end")
+                return
+            yield _sse_event({"stream": line.stream, "text": line.text})
+
+
 @router.get(
     "/{endpoint_id}/{container_id}/logs",
     response_model=ContainerLogsResponse,
     summary="Get container logs",
     description="Retrieve container logs directly from Docker via Portainer API. "
-    "Supports tail (last N lines), timestamps, and time-based filtering (since N minutes ago).",
+    "Supports tail (last N lines), timestamps, and time-based filtering (since N minutes ago). "
+    "With follow=true, new lines are streamed as server-sent events; all viewers of a "
+    "container share one upstream log stream.",
 )
 async def get_container_logs(
+    request: Request,
     endpoint_id: int,
     container_id: str,
     user: CurrentUserDep,
@@ -198,7 +268,8 @@ async def get_container_logs(
     timestamps: Annotated[bool, Query(description="Include timestamps")] = True,
     since_minutes: Annotated[int | None, Query(ge=1, le=1440, description="Return logs since N minutes ago")] = None,
     environment: Annotated[str | None, Query(description="Environment name")] = None,
-) -> ContainerLogsResponse:
+    follow: Annotated[bool, Query(description="Stream new lines as server-sent events")] = False,
+) -> ContainerLogsResponse | StreamingResponse:
     """Get container logs directly from Docker API via Portainer."""
     settings = get_settings()
     environments = settings.portainer.get_configured_environments()
@@ -219,8 +290,23 @@ async def get_container_logs(
                     inspect_data = await client.inspect_container(endpoint_id, container_id)
                     container_name = inspect_data.get("Name", "").lstrip("/")
                 except PortainerAPIError:
+                    if follow:
+                        continue
                     container_name = None
 
+                if follow:
+                    key = (env.name, endpoint_id, container_id, timestamps)
+                    return StreamingResponse(
+                        _follow_log_events(
+                            request,
+                            key,
+                            _open_log_stream(env, endpoint_id, container_id, timestamps),
+                            tail,
+                        ),
+                        media_type="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                    )
+
                 logs = await client.get_container_logs(
                     endpoint_id,
                     container_id,
@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, HTTPException, Query
 
 from portainer_dashboard.config import get_settings
+from portainer_dashboard.core.sqlite_pool import get_pool_stats
+from portainer_dashboard.core.store_executor import run_read
 from portainer_dashboard.models.metrics import (
     AnomalyDetection,
     ContainerMetric,
+    FleetAggregate,
+    FleetGroupBy,
     MetricsDashboard,
+    MetricsRangeQuery,
+    MetricsRangeResult,
     MetricsSummary,
     MetricType,
 )
@@ -35,6 +42,12 @@ async def get_metrics_status() -> dict:
     }
 
 
+@router.get("/storage/pools")
+async def get_storage_pool_stats() -> dict[str, dict[str, int]]:
+    """Get connection pool metrics for every open SQLite database."""
+    return {path: asdict(stats) for path, stats in get_pool_stats().items()}
+
+
 @router.get("/dashboard", response_model=MetricsDashboard)
 async def get_metrics_dashboard() -> MetricsDashboard:
     """Get overview data for the metrics dashboard."""
@@ -44,7 +57,7 @@ async def get_metrics_dashboard() -> MetricsDashboard:
         raise HTTPException(status_code=503, detail="Metrics collection is disabled")
 
     store = await get_metrics_store()
-    return store.get_dashboard_data()
+    return await run_read(store.get_dashboard_data)
 
 
 @router.get("/containers/{container_id}", response_model=list[ContainerMetric])
@@ -71,7 +84,8 @@ async def get_container_metrics(
 
     start_time = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-    return store.get_metrics(
+    return await run_read(
+        store.get_metrics,
         container_id,
         metric_type=metric_type,
         start_time=start_time,
@@ -79,6 +93,35 @@ async def get_container_metrics(
     )
 
 
+@router.post("/query", response_model=MetricsRangeResult)
+async def query_metrics(query: MetricsRangeQuery) -> MetricsRangeResult:
+    """Get several metric series over a time range, downsampled for charts.
+
+    Each series is reduced to at most ``max_points`` samples on the server
+    and returned as columnar timestamp/value arrays.
+    """
+    settings = get_settings()
+
+    if not settings.metrics.enabled:
+        raise HTTPException(status_code=503, detail="Metrics collection is disabled")
+
+    end = query.end or datetime.now(timezone.utc)
+    start = query.start or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+
+    store = await get_metrics_store()
+    series = await run_read(
+        store.query_series,
+        query.series,
+        start,
+        end,
+        max_points=query.max_points,
+        method=query.method,
+    )
+    return MetricsRangeResult(start=start, end=end, series=series)
+
+
 @router.get("/containers/{container_id}/summary", response_model=MetricsSummary | None)
 async def get_container_metrics_summary(
     container_id: str,
@@ -98,7 +141,62 @@ async def get_container_metrics_summary(
         raise HTTPException(status_code=503, detail="Metrics collection is disabled")
 
     store = await get_metrics_store()
-    return store.get_metrics_summary(container_id, metric_type, hours=hours)
+    return await run_read(store.get_metrics_summary, container_id, metric_type, hours=hours)
+
+
+@router.get("/summaries", response_model=list[MetricsSummary])
+async def get_metrics_summaries(
+    container_id: list[str] | None = Query(default=None, max_length=500),
+    metric_type: MetricType = MetricType.CPU_PERCENT,
+    hours: int = Query(default=24, ge=1, le=168),
+) -> list[MetricsSummary]:
+    """Get statistical summaries for many containers in one call.
+
+    Args:
+        container_id: Container IDs to summarise (repeatable). When omitted,
+            every container with samples in the window is summarised.
+        metric_type: The metric type to summarize.
+        hours: Number of hours to analyze.
+    """
+    settings = get_settings()
+
+    if not settings.metrics.enabled:
+        raise HTTPException(status_code=503, detail="Metrics collection is disabled")
+
+    store = await get_metrics_store()
+    summaries = await run_read(
+        store.get_metrics_summaries, container_id, metric_type, hours=hours
+    )
+    return list(summaries.values())
+
+
+@router.get("/fleet/{group_by}", response_model=list[FleetAggregate])
+async def get_fleet_aggregates(
+    group_by: FleetGroupBy,
+    metric_type: MetricType = MetricType.CPU_PERCENT,
+    hours: int = Query(default=1, ge=1, le=168),
+    limit: int = Query(default=20, ge=1, le=1000),
+) -> list[FleetAggregate]:
+    """Get a metric aggregated across containers, endpoints, stacks or images.
+
+    Groups are ordered by the summed per-container average, so
+    ``/fleet/container?limit=20`` returns the top 20 consumers.
+
+    Args:
+        group_by: Dimension to group by.
+        metric_type: The metric type to aggregate.
+        hours: Number of hours to aggregate over.
+        limit: Maximum number of groups to return.
+    """
+    settings = get_settings()
+
+    if not settings.metrics.enabled:
+        raise HTTPException(status_code=503, detail="Metrics collection is disabled")
+
+    store = await get_metrics_store()
+    return await run_read(
+        store.get_fleet_aggregates, metric_type, group_by, hours=hours, limit=limit
+    )
 
 
 @router.get("/anomalies", response_model=list[AnomalyDetection])
@@ -123,7 +221,9 @@ async def get_anomalies(
         raise HTTPException(status_code=503, detail="Anomaly detection is disabled")
 
     store = await get_metrics_store()
-    return store.get_anomalies(hours=hours, limit=limit, only_anomalies=only_anomalies)
+    return await run_read(
+        store.get_anomalies, hours=hours, limit=limit, only_anomalies=only_anomalies
+    )
 
 
 @router.get("/containers/{container_id}/anomalies", response_model=list[AnomalyDetection])
@@ -143,7 +243,9 @@ async def get_container_anomalies(
         raise HTTPException(status_code=503, detail="Metrics collection is disabled")
 
     store = await get_metrics_store()
-    all_anomalies = store.get_anomalies(hours=hours, limit=1000, only_anomalies=True)
+    all_anomalies = await run_read(
+        store.get_anomalies, hours=hours, limit=1000, only_anomalies=True
+    )
 
     return [a for a in all_anomalies if a.container_id == container_id]
 
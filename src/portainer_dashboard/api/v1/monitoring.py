@@ -86,8 +86,11 @@ async def get_latest_report(store: StoreDep) -> MonitoringReport | None:
 async def trigger_analysis() -> dict:
     """Manually trigger a monitoring analysis.
 
-    This is useful for testing or getting immediate results.
+    This is useful for testing or getting immediate results. The scheduler's
+    monitoring service is reused when it runs, so the analysis sees its image
+    status cache and log cursors.
     """
+    from portainer_dashboard.scheduler import get_monitoring_service
     from portainer_dashboard.services.monitoring_service import create_monitoring_service
     from portainer_dashboard.websocket.monitoring_insights import broadcast_report
 
@@ -103,7 +106,9 @@ async def trigger_analysis() -> dict:
         await broadcast_report(report)
 
     try:
-        service = await create_monitoring_service(broadcast_callback=broadcast_wrapper)
+        service = get_monitoring_service() or await create_monitoring_service(
+            broadcast_callback=broadcast_wrapper
+        )
         report = await service.run_analysis()
 
         return {
@@ -11,6 +11,7 @@ from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Query
 
 from portainer_dashboard.config import get_settings
+from portainer_dashboard.core.store_executor import run_read
 from portainer_dashboard.models.remediation import (
     ActionApprovalRequest,
     ActionExecutionResult,
@@ -30,7 +31,7 @@ async def get_remediation_status() -> dict:
     """Get remediation service status and configuration."""
     settings = get_settings()
     store = await get_actions_store()
-    summary = store.get_history_summary()
+    summary = await run_read(store.get_history_summary)
 
     return {
         "enabled": settings.remediation.enabled,
@@ -58,7 +59,7 @@ async def get_pending_actions(
         raise HTTPException(status_code=503, detail="Remediation is disabled")
 
     service = await get_remediation_service()
-    return service.get_pending_actions(limit)
+    return await service.get_pending_actions(limit)
 
 
 @router.get("/actions/approved", response_model=list[RemediationAction])
@@ -75,7 +76,7 @@ async def get_approved_actions(
         raise HTTPException(status_code=503, detail="Remediation is disabled")
 
     service = await get_remediation_service()
-    return service.get_approved_actions(limit)
+    return await service.get_approved_actions(limit)
 
 
 @router.get("/actions/history", response_model=list[RemediationAction])
@@ -91,7 +92,7 @@ async def get_actions_history(
         raise HTTPException(status_code=503, detail="Remediation is disabled")
 
     service = await get_remediation_service()
-    return service.get_history(status=status, limit=limit, offset=offset)
+    return await service.get_history(status=status, limit=limit, offset=offset)
 
 
 @router.get("/actions/summary", response_model=ActionHistory)
@@ -103,7 +104,7 @@ async def get_actions_summary() -> ActionHistory:
         raise HTTPException(status_code=503, detail="Remediation is disabled")
 
     store = await get_actions_store()
-    return store.get_history_summary()
+    return await run_read(store.get_history_summary)
 
 
 @router.get("/actions/{action_id}", response_model=RemediationAction)
@@ -115,7 +116,7 @@ async def get_action(action_id: str) -> RemediationAction:
         raise HTTPException(status_code=503, detail="Remediation is disabled")
 
     service = await get_remediation_service()
-    action = service.get_action(action_id)
+    action = await service.get_action(action_id)
 
     if action is None:
         raise HTTPException(status_code=404, detail="Action not found")
@@ -139,7 +140,7 @@ async def approve_action(
         raise HTTPException(status_code=503, detail="Remediation is disabled")
 
     service = await get_remediation_service()
-    success = service.approve_action(action_id, request.approved_by)
+    success = await service.approve_action(action_id, request.approved_by)
 
     if not success:
         raise HTTPException(
@@ -167,7 +168,7 @@ async def reject_action(
         raise HTTPException(status_code=503, detail="Remediation is disabled")
 
     service = await get_remediation_service()
-    success = service.reject_action(action_id, request.rejected_by, request.reason)
+    success = await service.reject_action(action_id, request.rejected_by, request.reason)
 
     if not success:
         raise HTTPException(
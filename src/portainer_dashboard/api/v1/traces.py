@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, HTTPException, Query
 
 from portainer_dashboard.config import get_settings
+from portainer_dashboard.core.store_executor import run_read
+from portainer_dashboard.core.telemetry import get_export_stats
 from portainer_dashboard.models.tracing import (
+    RouteStats,
     ServiceMap,
     Trace,
     TraceFilter,
@@ -20,14 +24,16 @@ router = APIRouter(prefix="/traces", tags=["Traces"])
 
 @router.get("/status")
 async def get_tracing_status() -> dict:
-    """Get tracing status and configuration."""
+    """Get tracing status, configuration and span export counters."""
     settings = get_settings()
+    export_stats = get_export_stats()
 
     return {
         "enabled": settings.tracing.enabled,
         "service_name": settings.tracing.service_name,
         "retention_hours": settings.tracing.retention_hours,
         "sample_rate": settings.tracing.sample_rate,
+        "export": asdict(export_stats) if export_stats is not None else None,
     }
 
 
@@ -40,7 +46,7 @@ async def get_traces_summary() -> TracesSummary:
         raise HTTPException(status_code=503, detail="Tracing is disabled")
 
     store = await get_trace_store()
-    return store.get_summary()
+    return await run_read(store.get_summary)
 
 
 @router.get("/", response_model=list[Trace])
@@ -87,7 +93,7 @@ async def list_traces(
         offset=offset,
     )
 
-    return store.list_traces(filter)
+    return await run_read(store.list_traces, filter)
 
 
 @router.get("/service-map", response_model=ServiceMap)
@@ -105,7 +111,7 @@ async def get_service_map(
         raise HTTPException(status_code=503, detail="Tracing is disabled")
 
     store = await get_trace_store()
-    return store.get_service_map(hours=hours)
+    return await run_read(store.get_service_map, hours=hours)
 
 
 @router.get("/{trace_id}", response_model=Trace)
@@ -121,7 +127,7 @@ async def get_trace(trace_id: str) -> Trace:
         raise HTTPException(status_code=503, detail="Tracing is disabled")
 
     store = await get_trace_store()
-    trace = store.get_trace(trace_id)
+    trace = await run_read(store.get_trace, trace_id)
 
     if trace is None:
         raise HTTPException(status_code=404, detail="Trace not found")
@@ -129,15 +135,16 @@ async def get_trace(trace_id: str) -> Trace:
     return trace
 
 
-@router.get("/routes/stats")
+@router.get("/routes/stats", response_model=list[RouteStats])
 async def get_route_stats(
     hours: int = Query(default=1, ge=1, le=24),
     limit: int = Query(default=50, ge=1, le=200),
-) -> list[dict]:
+) -> list[RouteStats]:
     """Get statistics for routes/endpoints.
 
     Returns aggregated stats per route including request count,
-    error rate, and latency percentiles.
+    error rate, and latency percentiles, merged from the per-route
+    latency sketches maintained as traces are stored.
     """
     settings = get_settings()
 
@@ -145,63 +152,7 @@ async def get_route_stats(
         raise HTTPException(status_code=503, detail="Tracing is disabled")
 
     store = await get_trace_store()
-
-    # Get all traces for the period
-    filter = TraceFilter(
-        start_time=datetime.now(timezone.utc) - timedelta(hours=hours),
-        limit=10000,  # Get enough data for aggregation
-    )
-    traces = store.list_traces(filter)
-
-    # Aggregate by route
-    route_stats: dict[str, dict] = {}
-
-    for trace in traces:
-        route = trace.http_route or "unknown"
-        method = trace.http_method or "?"
-
-        key = f"{method} {route}"
-
-        if key not in route_stats:
-            route_stats[key] = {
-                "route": route,
-                "method": method,
-                "request_count": 0,
-                "error_count": 0,
-                "durations": [],
-            }
-
-        route_stats[key]["request_count"] += 1
-        if trace.has_errors:
-            route_stats[key]["error_count"] += 1
-        if trace.total_duration_ms is not None:
-            route_stats[key]["durations"].append(trace.total_duration_ms)
-
-    # Calculate final stats
-    results = []
-    for key, stats in route_stats.items():
-        durations = sorted(stats["durations"])
-        n = len(durations)
-
-        result = {
-            "route": stats["route"],
-            "method": stats["method"],
-            "request_count": stats["request_count"],
-            "error_count": stats["error_count"],
-            "error_rate": (
-                stats["error_count"] / stats["request_count"] * 100
-                if stats["request_count"] > 0 else 0
-            ),
-            "avg_duration_ms": sum(durations) / n if n > 0 else 0,
-            "p50_duration_ms": durations[int(n * 0.5)] if n > 0 else 0,
-            "p95_duration_ms": durations[int(n * 0.95)] if n > 0 else 0,
-            "p99_duration_ms": durations[int(n * 0.99)] if n > 0 else 0,
-        }
-        results.append(result)
-
-    # Sort by request count descending
-    results.sort(key=lambda x: x["request_count"], reverse=True)
-
+    results = await run_read(store.get_route_stats, hours)
     return results[:limit]
 
 
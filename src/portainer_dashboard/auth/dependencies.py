@@ -9,6 +9,7 @@ from fastapi import Cookie, Depends, HTTPException, Request, status
 
 from portainer_dashboard.config import get_settings
 from portainer_dashboard.core.session import SessionStorage
+from portainer_dashboard.core.store_executor import run_read, run_write
 from portainer_dashboard.dependencies import get_session_storage
 from portainer_dashboard.models.auth import SessionData
 
@@ -30,7 +31,7 @@ async def get_optional_user(
     if not session_token:
         return None
 
-    record = storage.retrieve(session_token)
+    record = await run_read(storage.retrieve, session_token)
     if record is None:
         return None
 
@@ -47,11 +48,12 @@ async def get_optional_user(
     )
 
     if session_data.is_expired(now):
-        storage.delete(session_token)
+        await run_write(storage.delete, session_token)
         return None
 
     # Update last active time
-    storage.touch(
+    await run_write(
+        storage.touch,
         session_token,
         last_active=now,
         session_timeout=session_data.session_timeout,
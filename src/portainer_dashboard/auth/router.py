@@ -22,6 +22,7 @@ from portainer_dashboard.auth.static_auth import verify_credentials
 from portainer_dashboard.config import get_settings
 from portainer_dashboard.core.security import generate_token
 from portainer_dashboard.core.session import SessionRecord, SessionStorage
+from portainer_dashboard.core.store_executor import run_write
 from portainer_dashboard.dependencies import JinjaEnvDep, SessionStorageDep
 
 LOGGER = logging.getLogger(__name__)
@@ -74,7 +75,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 _oidc_state_store: dict[str, dict] = {}
 
 
-def _create_session(
+async def _create_session(
     storage: SessionStorage,
     username: str,
     auth_method: str,
@@ -92,7 +93,7 @@ def _create_session(
         session_timeout=session_timeout,
         auth_method=auth_method,
     )
-    storage.create(record)
+    await run_write(storage.create, record)
     return token
 
 
@@ -193,7 +194,7 @@ async def login(
     else:
         session_timeout = settings.auth.session_timeout
 
-    token = _create_session(
+    token = await _create_session(
         storage=storage,
         username=username,
         auth_method="static",
@@ -212,7 +213,7 @@ async def logout(
 ) -> RedirectResponse:
     """Log out the current user."""
     if session_token:
-        storage.delete(session_token)
+        await run_write(storage.delete, session_token)
 
     response = RedirectResponse(url="/auth/login", status_code=303)
     response.delete_cookie(SESSION_COOKIE_NAME)
@@ -336,7 +337,7 @@ async def oidc_callback(
         LOGGER.error("OIDC verification failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
-    token = _create_session(
+    token = await _create_session(
         storage=storage,
         username=user_info.username,
         auth_method="oidc",
@@ -351,6 +351,14 @@ class MonitoringSettings(BaseSettings):
     log_tail_lines: int = 100
     max_containers_for_logs: int = 10
     log_fetch_timeout: float = 10.0
+    # Stack image status checks in flight at once per environment
+    image_check_concurrency: int = 8
+    # Registry comparisons run in their own job; results are reused until
+    # the TTL expires or the stack's images change
+    image_check_interval_minutes: int = 30
+    image_status_ttl_minutes: int = 360
+    # Containers whose security-relevant inspect fields are remembered
+    security_cache_size: int = 5000
     elevated_capabilities: list[str] = Field(
         default_factory=lambda: [
             "NET_ADMIN",
@@ -401,6 +409,26 @@ class MonitoringSettings(BaseSettings):
     def handle_empty_max_containers(cls, v: str | int | None) -> int:
         return _empty_str_to_default_int(v, default=10)
 
+    @field_validator("image_check_concurrency", mode="before")
+    @classmethod
+    def handle_empty_image_check_concurrency(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=8)
+
+    @field_validator("image_check_interval_minutes", mode="before")
+    @classmethod
+    def handle_empty_image_check_interval(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=30)
+
+    @field_validator("image_status_ttl_minutes", mode="before")
+    @classmethod
+    def handle_empty_image_status_ttl(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=360)
+
+    @field_validator("security_cache_size", mode="before")
+    @classmethod
+    def handle_empty_security_cache_size(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=5000)
+
     @field_validator("log_fetch_timeout", mode="before")
     @classmethod
     def handle_empty_timeout(cls, v: str | float | None) -> float:
@@ -426,6 +454,25 @@ class MetricsSettings(BaseSettings):
     zscore_threshold: float = 3.0
     moving_average_window: int = 30
     min_samples_for_detection: int = 10
+    ewma_alpha: float = 0.1
+    seasonal_history_samples: int = 2016  # one week at 5-minute cadence
+    detectors_raw: str = Field(
+        default=(
+            "cpu_percent=zscore,memory_percent=zscore,"
+            "network_rx_bytes_per_sec=ewma,block_read_bytes_per_sec=ewma"
+        ),
+        validation_alias="MONITORING_METRICS_DETECTORS",
+    )
+
+    @property
+    def detector_map(self) -> dict[str, str]:
+        """Parse detector assignments into a metric type -> detector name mapping."""
+        mapping: dict[str, str] = {}
+        for item in self.detectors_raw.split(","):
+            metric_type, _, detector = item.partition("=")
+            if metric_type.strip() and detector.strip():
+                mapping[metric_type.strip().lower()] = detector.strip().lower()
+        return mapping
 
     @field_validator("enabled", "anomaly_detection_enabled", mode="before")
     @classmethod
@@ -461,6 +508,28 @@ class MetricsSettings(BaseSettings):
             return v
         return float(v)
 
+    @field_validator("ewma_alpha", mode="before")
+    @classmethod
+    def handle_empty_alpha(cls, v: str | float | None) -> float:
+        if v == "" or v is None:
+            return 0.1
+        return float(v)
+
+    @field_validator("seasonal_history_samples", mode="before")
+    @classmethod
+    def handle_empty_seasonal_history(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=2016)
+
+    @field_validator("detectors_raw", mode="before")
+    @classmethod
+    def handle_empty_detectors(cls, v: str | None) -> str:
+        if v is None or v == "":
+            return (
+                "cpu_percent=zscore,memory_percent=zscore,"
+                "network_rx_bytes_per_sec=ewma,block_read_bytes_per_sec=ewma"
+            )
+        return v
+
     @field_validator("sqlite_path", mode="before")
     @classmethod
     def expand_metrics_path(cls, v: str | Path | None) -> Path:
@@ -519,6 +588,14 @@ class TracingSettings(BaseSettings):
     sqlite_path: Path = Field(default_factory=lambda: PROJECT_ROOT / ".data" / "traces.db")
     retention_hours: int = 24
     sample_rate: float = 1.0
+    # Tail sampling keeps every trace with errors or slower than its route's
+    # p95; this is the slow threshold for routes without enough history
+    slow_trace_ms: int = 1000
+    # Spans buffered between the span processor and the SQLite writer;
+    # further spans are dropped while the buffer is full
+    export_queue_size: int = 20000
+    # Spans of traces still waiting for their root span held in memory
+    trace_buffer_size: int = 10000
 
     @field_validator("enabled", mode="before")
     @classmethod
@@ -530,6 +607,21 @@ class TracingSettings(BaseSettings):
     def handle_empty_retention(cls, v: str | int | None) -> int:
         return _empty_str_to_default_int(v, default=24)
 
+    @field_validator("export_queue_size", mode="before")
+    @classmethod
+    def handle_empty_export_queue_size(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=20000)
+
+    @field_validator("trace_buffer_size", mode="before")
+    @classmethod
+    def handle_empty_trace_buffer_size(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=10000)
+
+    @field_validator("slow_trace_ms", mode="before")
+    @classmethod
+    def handle_empty_slow_trace_ms(cls, v: str | int | None) -> int:
+        return _empty_str_to_default_int(v, default=1000)
+
     @field_validator("sample_rate", mode="before")
     @classmethod
     def handle_empty_sample_rate(cls, v: str | float | None) -> float:
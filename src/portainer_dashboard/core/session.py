@@ -15,6 +15,7 @@ import redis
 from redis.exceptions import ConnectionError as RedisConnectionError
 
 from portainer_dashboard.config import get_settings
+from portainer_dashboard.core.sqlite_pool import get_pool
 
 logger = logging.getLogger(__name__)
 
@@ -144,36 +145,25 @@ class SQLiteSessionStorage:
 
     def __init__(self, database_path: Path) -> None:
         self._database_path = database_path
-        self._lock = RLock()
+        self._pool = get_pool(database_path)
         self._initialise()
 
-    def _connect(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(
-            self._database_path,
-            detect_types=sqlite3.PARSE_DECLTYPES,
-            check_same_thread=False,
-        )
-        connection.row_factory = sqlite3.Row
-        return connection
-
     def _initialise(self) -> None:
-        with self._lock:
-            self._database_path.parent.mkdir(parents=True, exist_ok=True)
-            with self._connect() as connection:
-                connection.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        token TEXT PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        authenticated_at TEXT NOT NULL,
-                        last_active TEXT NOT NULL,
-                        session_timeout_seconds INTEGER,
-                        auth_method TEXT NOT NULL,
-                        expiry_at TEXT
-                    )
-                    """
+        with self._pool.connection() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    token TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    authenticated_at TEXT NOT NULL,
+                    last_active TEXT NOT NULL,
+                    session_timeout_seconds INTEGER,
+                    auth_method TEXT NOT NULL,
+                    expiry_at TEXT
                 )
-                connection.commit()
+                """
+            )
+            connection.commit()
 
     @staticmethod
     def _encode_datetime(value: datetime) -> str:
@@ -204,7 +194,7 @@ class SQLiteSessionStorage:
         return self._encode_datetime(expiry)
 
     def create(self, record: SessionRecord) -> None:
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             connection.execute(
                 """
                 INSERT OR REPLACE INTO sessions (
@@ -233,7 +223,7 @@ class SQLiteSessionStorage:
             connection.commit()
 
     def retrieve(self, token: str) -> SessionRecord | None:
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(
                 "SELECT * FROM sessions WHERE token = ?",
                 (token,),
@@ -257,7 +247,7 @@ class SQLiteSessionStorage:
         last_active: datetime,
         session_timeout: timedelta | None,
     ) -> None:
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             connection.execute(
                 """
                 UPDATE sessions
@@ -278,7 +268,7 @@ class SQLiteSessionStorage:
             connection.commit()
 
     def delete(self, token: str) -> None:
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             connection.execute("DELETE FROM sessions WHERE token = ?", (token,))
             connection.commit()
 
@@ -292,11 +282,11 @@ class SQLiteSessionStorage:
         connection.commit()
 
     def purge_expired(self, now: datetime) -> None:
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             self._delete_expired_sessions(connection, now)
 
     def count(self, now: datetime) -> int:
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             self._delete_expired_sessions(connection, now)
             cursor = connection.execute("SELECT COUNT(*) FROM sessions")
             (count,) = cursor.fetchone()
@@ -2,6 +2,17 @@
 
 Provides thread-safe connection pooling for SQLite databases,
 with WAL (Write-Ahead Logging) mode for better concurrent access.
+
+Each pool keeps two bounded sets of connections:
+
+- Readers: up to ``pool_size`` read-only (``mode=ro``) connections used for
+  queries. Under WAL they never block, and are never blocked by, the writer.
+- Writer: a single read-write connection. SQLite only allows one writer at
+  a time, so a larger writer pool would only add lock contention.
+
+Connections are checked out for the duration of a ``with`` block and
+returned afterwards. Connections idle for longer than ``max_idle_seconds``
+are closed.
 """
 
 from __future__ import annotations
@@ -9,25 +20,151 @@ from __future__ import annotations
 import logging
 import sqlite3
 import threading
+import time
+from collections import deque
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import Callable, Iterator
 
 LOGGER = logging.getLogger(__name__)
 
 # Default pool settings
 _DEFAULT_POOL_SIZE = 5
 _DEFAULT_TIMEOUT = 30.0
+_DEFAULT_MAX_IDLE_SECONDS = 300.0
+_DEFAULT_STATEMENT_CACHE_SIZE = 256
+_DEFAULT_VACUUM_PAGES = 2000
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Point-in-time metrics for a connection pool."""
+
+    readers_open: int
+    readers_idle: int
+    writers_open: int
+    writers_idle: int
+    checkouts: int
+    waits: int
+    timeouts: int
+    created: int
+    reaped: int
+
+
+class _ConnectionSlots:
+    """Bounded set of interchangeable connections with checkout/return."""
+
+    def __init__(
+        self,
+        factory: Callable[[], sqlite3.Connection],
+        max_size: int,
+        kind: str,
+    ) -> None:
+        self._factory = factory
+        self._max_size = max_size
+        self._kind = kind
+        # Idle connections with the monotonic time they were returned. New
+        # checkouts take the most recently used one, so surplus connections
+        # age out from the left and get reaped.
+        self._idle: deque[tuple[sqlite3.Connection, float]] = deque()
+        self._open = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.created = 0
+        self.reaped = 0
+
+    @property
+    def open_count(self) -> int:
+        return self._open
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, timeout: float) -> sqlite3.Connection:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self.checkouts += 1
+            waited = False
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                if self._idle:
+                    connection, _ = self._idle.pop()
+                    return connection
+                if self._open < self._max_size:
+                    self._open += 1
+                    break
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Timed out waiting for a {self._kind} connection"
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            connection = self._factory()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.created += 1
+        return connection
+
+    def release(self, connection: sqlite3.Connection) -> None:
+        with self._condition:
+            if not self._closed:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+                return
+            self._open -= 1
+        connection.close()
+
+    def reap(self, max_idle_seconds: float) -> int:
+        cutoff = time.monotonic() - max_idle_seconds
+        stale: list[sqlite3.Connection] = []
+        with self._condition:
+            while self._idle and self._idle[0][1] <= cutoff:
+                stale.append(self._idle.popleft()[0])
+            self._open -= len(stale)
+            self.reaped += len(stale)
+        for connection in stale:
+            connection.close()
+        return len(stale)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for connection in idle:
+            try:
+                connection.close()
+            except Exception as exc:
+                LOGGER.warning("Error closing %s connection: %s", self._kind, exc)
 
 
 class SQLiteConnectionPool:
-    """Thread-safe SQLite connection pool with WAL mode.
+    """Thread-safe, bounded SQLite connection pool with WAL mode.
 
     Features:
-    - Thread-local connections for safe concurrent access
+    - Bounded pool of read-only connections for queries
+    - A single writer connection, checked out per transaction
     - WAL mode for better read/write concurrency
-    - Automatic connection cleanup on thread exit
-    - Connection reuse to avoid repeated open/close overhead
+    - Idle connection reaping and per-connection statement caches
+    - Checkout/wait/timeout counters via :meth:`stats`
     """
 
     def __init__(
@@ -37,26 +174,48 @@ class SQLiteConnectionPool:
         pool_size: int = _DEFAULT_POOL_SIZE,
         timeout: float = _DEFAULT_TIMEOUT,
         check_same_thread: bool = False,
+        on_connect: Callable[[sqlite3.Connection], None] | None = None,
+        max_idle_seconds: float = _DEFAULT_MAX_IDLE_SECONDS,
+        statement_cache_size: int = _DEFAULT_STATEMENT_CACHE_SIZE,
     ) -> None:
         """Initialize the connection pool.
 
         Args:
             database_path: Path to the SQLite database file.
-            pool_size: Maximum number of connections (not enforced, for documentation).
-            timeout: Default timeout for acquiring locks.
+            pool_size: Maximum number of read-only connections.
+            timeout: Seconds to wait for a free connection and for SQLite locks.
             check_same_thread: If False, allows connections to be used across threads.
+            on_connect: Optional hook run on every new connection, e.g. to
+                register custom SQL functions.
+            max_idle_seconds: Idle connections older than this are closed.
+            statement_cache_size: Prepared statements cached per connection.
         """
         self._database_path = Path(database_path)
         self._pool_size = pool_size
         self._timeout = timeout
         self._check_same_thread = check_same_thread
-        self._local = threading.local()
+        self._connect_hooks: list[Callable[[sqlite3.Connection], None]] = []
+        if on_connect is not None:
+            self._connect_hooks.append(on_connect)
+        self._max_idle_seconds = max_idle_seconds
+        self._statement_cache_size = statement_cache_size
         self._init_lock = threading.Lock()
         self._initialized = False
+        self._last_reap = time.monotonic()
+
+        self._readers = _ConnectionSlots(
+            lambda: self._create_connection(read_only=True), pool_size, "reader"
+        )
+        self._writers = _ConnectionSlots(self._create_connection, 1, "writer")
 
         # Initialize database on first use
         self._ensure_initialized()
 
+    @property
+    def database_path(self) -> Path:
+        """Path of the pooled database."""
+        return self._database_path
+
     def _ensure_initialized(self) -> None:
         """Initialize the database with WAL mode if not already done."""
         if self._initialized:
@@ -76,6 +235,9 @@ class SQLiteConnectionPool:
                 check_same_thread=self._check_same_thread,
             )
             try:
+                # Let purges return free pages in steps; only takes effect
+                # for databases that do not have any tables yet
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 # Enable WAL mode for better concurrent access
                 conn.execute("PRAGMA journal_mode=WAL")
                 # Use NORMAL synchronous mode (faster than FULL, still safe with WAL)
@@ -94,13 +256,18 @@ class SQLiteConnectionPool:
 
             self._initialized = True
 
-    def _create_connection(self) -> sqlite3.Connection:
+    def _create_connection(self, *, read_only: bool = False) -> sqlite3.Connection:
         """Create a new database connection with optimal settings."""
+        database: Path | str = self._database_path
+        if read_only:
+            database = f"{self._database_path.resolve().as_uri()}?mode=ro"
         conn = sqlite3.connect(
-            self._database_path,
+            database,
             timeout=self._timeout,
             check_same_thread=self._check_same_thread,
             detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=self._statement_cache_size,
+            uri=read_only,
         )
         conn.row_factory = sqlite3.Row
 
@@ -108,41 +275,64 @@ class SQLiteConnectionPool:
         conn.execute("PRAGMA synchronous=NORMAL")
         conn.execute("PRAGMA cache_size=-8000")
 
+        for hook in self._connect_hooks:
+            hook(conn)
+
+        LOGGER.debug(
+            "Created %s SQLite connection for %s",
+            "read-only" if read_only else "writer",
+            self._database_path,
+        )
         return conn
 
-    def get_connection(self) -> sqlite3.Connection:
-        """Get a connection for the current thread.
+    def add_connect_hook(self, hook: Callable[[sqlite3.Connection], None]) -> None:
+        """Register an additional hook for new connections.
 
-        Returns a thread-local connection, creating one if necessary.
-        This connection should NOT be closed manually - it will be
-        reused for subsequent calls from the same thread.
+        Idle connections are closed so that every connection handed out
+        afterwards has run the hook.
         """
-        if not hasattr(self._local, "connection") or self._local.connection is None:
-            self._local.connection = self._create_connection()
-            LOGGER.debug(
-                "Created new SQLite connection for thread %s",
-                threading.current_thread().name,
-            )
-        return self._local.connection
+        if hook in self._connect_hooks:
+            return
+        self._connect_hooks.append(hook)
+        self._readers.reap(0)
+        self._writers.reap(0)
+
+    @contextmanager
+    def _checkout(self, slots: _ConnectionSlots) -> Iterator[sqlite3.Connection]:
+        if time.monotonic() - self._last_reap >= self._max_idle_seconds / 2:
+            self.reap_idle()
+        conn = slots.acquire(self._timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            slots.release(conn)
 
     @contextmanager
     def connection(self) -> Iterator[sqlite3.Connection]:
-        """Context manager for getting a pooled connection.
+        """Context manager for checking out the writer connection.
 
         Usage:
             with pool.connection() as conn:
-                conn.execute("SELECT ...")
+                conn.execute("INSERT ...")
+                conn.commit()
 
-        The connection is NOT closed after the context - it's returned
-        to the thread-local pool for reuse.
+        Changes that are not committed inside the block are rolled back when
+        the connection is returned to the pool.
         """
-        conn = self.get_connection()
-        try:
+        with self._checkout(self._writers) as conn:
+            yield conn
+
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Context manager for checking out a read-only connection.
+
+        Read-only connections are opened with ``mode=ro`` and can never
+        block writers. Under WAL they see the last committed state.
+        """
+        with self._checkout(self._readers) as conn:
             yield conn
-        except Exception:
-            # Rollback on error
-            conn.rollback()
-            raise
 
     @contextmanager
     def transaction(self) -> Iterator[sqlite3.Connection]:
@@ -154,35 +344,76 @@ class SQLiteConnectionPool:
                 conn.execute("UPDATE ...")
             # Automatically commits on success, rolls back on exception
         """
-        conn = self.get_connection()
-        try:
+        with self._checkout(self._writers) as conn:
             yield conn
             conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
 
-    def close_thread_connection(self) -> None:
-        """Close the connection for the current thread.
+    def compact(self, max_pages: int = _DEFAULT_VACUUM_PAGES) -> int:
+        """Release free pages and truncate the WAL file.
 
-        Call this when a thread is done with database operations.
+        Runs ``PRAGMA incremental_vacuum`` (a no-op unless the database was
+        created with ``auto_vacuum=INCREMENTAL``) followed by
+        ``PRAGMA wal_checkpoint(TRUNCATE)``. Both run outside a transaction
+        on the writer connection, so they are serialised with other writes.
+
+        Args:
+            max_pages: Maximum number of free pages to release.
+
+        Returns:
+            Number of free pages released.
         """
-        if hasattr(self._local, "connection") and self._local.connection is not None:
-            try:
-                self._local.connection.close()
-            except Exception as exc:
-                LOGGER.warning("Error closing thread connection: %s", exc)
-            finally:
-                self._local.connection = None
+        with self._checkout(self._writers) as conn:
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                conn.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            busy, wal_pages, checkpointed = conn.execute(
+                "PRAGMA wal_checkpoint(TRUNCATE)"
+            ).fetchone()
+        if busy:
+            LOGGER.debug(
+                "WAL checkpoint of %s incomplete: %d of %d pages checkpointed",
+                self._database_path,
+                checkpointed,
+                wal_pages,
+            )
+        return free_before - free_after
+
+    def reap_idle(self) -> int:
+        """Close connections that have been idle for too long.
+
+        Returns:
+            Number of connections closed.
+        """
+        self._last_reap = time.monotonic()
+        reaped = self._readers.reap(self._max_idle_seconds)
+        reaped += self._writers.reap(self._max_idle_seconds)
+        if reaped:
+            LOGGER.debug("Reaped %d idle connections for %s", reaped, self._database_path)
+        return reaped
+
+    def stats(self) -> PoolStats:
+        """Return current pool metrics."""
+        return PoolStats(
+            readers_open=self._readers.open_count,
+            readers_idle=self._readers.idle_count,
+            writers_open=self._writers.open_count,
+            writers_idle=self._writers.idle_count,
+            checkouts=self._readers.checkouts + self._writers.checkouts,
+            waits=self._readers.waits + self._writers.waits,
+            timeouts=self._readers.timeouts + self._writers.timeouts,
+            created=self._readers.created + self._writers.created,
+            reaped=self._readers.reaped + self._writers.reaped,
+        )
 
     def close_all(self) -> None:
-        """Close the current thread's connection.
+        """Close all pooled connections.
 
-        Note: Due to thread-local storage, this only closes the
-        calling thread's connection. Other threads must call
-        close_thread_connection() themselves.
+        Idle connections are closed immediately; connections that are
+        checked out are closed when they are returned.
         """
-        self.close_thread_connection()
+        self._readers.close()
+        self._writers.close()
 
 
 # Global pool registry for shared access
@@ -190,17 +421,35 @@ _pools: dict[str, SQLiteConnectionPool] = {}
 _pools_lock = threading.Lock()
 
 
-def get_pool(database_path: Path | str) -> SQLiteConnectionPool:
+def get_pool(
+    database_path: Path | str,
+    *,
+    on_connect: Callable[[sqlite3.Connection], None] | None = None,
+) -> SQLiteConnectionPool:
     """Get or create a connection pool for the given database path.
 
     This allows multiple modules to share the same pool for a database.
+
+    Args:
+        database_path: Path to the SQLite database file.
+        on_connect: Optional hook to run on the pool's connections.
     """
     path_str = str(Path(database_path).resolve())
 
     with _pools_lock:
-        if path_str not in _pools:
-            _pools[path_str] = SQLiteConnectionPool(database_path)
-        return _pools[path_str]
+        pool = _pools.get(path_str)
+        if pool is None:
+            pool = SQLiteConnectionPool(database_path, on_connect=on_connect)
+            _pools[path_str] = pool
+        elif on_connect is not None:
+            pool.add_connect_hook(on_connect)
+        return pool
+
+
+def get_pool_stats() -> dict[str, PoolStats]:
+    """Return metrics for every registered pool, keyed by database path."""
+    with _pools_lock:
+        return {path: pool.stats() for path, pool in _pools.items()}
 
 
 def close_all_pools() -> None:
@@ -216,7 +465,9 @@ def close_all_pools() -> None:
 
 
 __all__ = [
+    "PoolStats",
     "SQLiteConnectionPool",
     "close_all_pools",
     "get_pool",
+    "get_pool_stats",
 ]
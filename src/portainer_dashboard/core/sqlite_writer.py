@@ -0,0 +1,323 @@
+"""Single-writer batching queue for SQLite databases.
+
+SQLite allows one writer at a time, so having every producer open its own
+small transaction mostly buys lock contention and one fsync per insert.
+:class:`SQLiteWriteQueue` funnels all writes for a database through one
+background thread that commits queued operations in grouped transactions:
+
+- Background producers (metrics collection, span export) enqueue without
+  waiting; their writes are grouped until ``max_batch_size`` rows are
+  pending or ``max_delay`` seconds have passed.
+- Callers that need read-your-writes semantics wait on the returned future;
+  their operation is committed together with whatever else is already
+  queued, without the linger delay.
+
+Each operation runs inside its own savepoint, so a failing operation only
+fails its own future and does not roll back the rest of the batch.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+from portainer_dashboard.core.sqlite_pool import SQLiteConnectionPool
+
+LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Default grouping thresholds
+_DEFAULT_MAX_BATCH_SIZE = 1000
+_DEFAULT_MAX_DELAY = 0.05
+
+
+@dataclass(slots=True)
+class _WriteOperation(Generic[_T]):
+    """Queued write with the future resolved once it has been committed."""
+
+    operation: Callable[[sqlite3.Connection], _T]
+    weight: int
+    urgent: bool
+    future: Future[_T] = field(default_factory=Future)
+
+
+@dataclass(slots=True)
+class WriteQueueStats:
+    """Counters describing the work done by a write queue."""
+
+    batches_committed: int = 0
+    operations_committed: int = 0
+    rows_committed: int = 0
+    operations_failed: int = 0
+
+
+_STOP = object()
+
+# Live queues, so application shutdown can drain all of them
+_write_queues: weakref.WeakSet[SQLiteWriteQueue] = weakref.WeakSet()
+
+
+class SQLiteWriteQueue:
+    """Commits queued write operations from a single background thread."""
+
+    def __init__(
+        self,
+        pool: SQLiteConnectionPool,
+        *,
+        max_batch_size: int = _DEFAULT_MAX_BATCH_SIZE,
+        max_delay: float = _DEFAULT_MAX_DELAY,
+        name: str = "sqlite-writer",
+    ) -> None:
+        """Initialize the write queue.
+
+        Args:
+            pool: Connection pool of the database to write to.
+            max_batch_size: Number of queued rows that triggers a commit.
+            max_delay: Seconds a non-urgent write may wait for more writes
+                to group with.
+            name: Name of the writer thread.
+        """
+        self._pool = pool
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._name = name
+        self._queue: queue.Queue[_WriteOperation[Any] | object] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._pre_commit_hooks: list[Callable[[sqlite3.Connection], None]] = []
+        self._rollback_hooks: list[Callable[[], None]] = []
+        self.stats = WriteQueueStats()
+        _write_queues.add(self)
+
+    def add_pre_commit_hook(self, hook: Callable[[sqlite3.Connection], None]) -> None:
+        """Run ``hook`` in every batch transaction after its operations.
+
+        Lets a store fold state accumulated by the batch's operations, such
+        as aggregates, into the database once per commit instead of once per
+        operation. A failing hook fails the whole batch.
+        """
+        self._pre_commit_hooks.append(hook)
+
+    def add_rollback_hook(self, hook: Callable[[], None]) -> None:
+        """Run ``hook`` on the writer thread when a whole batch is rolled back.
+
+        Lets a store drop state accumulated by the batch's operations that a
+        pre-commit hook has not written yet.
+        """
+        self._rollback_hooks.append(hook)
+
+    def submit(
+        self,
+        operation: Callable[[sqlite3.Connection], _T],
+        *,
+        weight: int = 1,
+        urgent: bool = False,
+    ) -> Future[_T]:
+        """Queue an operation to run inside the next write transaction.
+
+        Args:
+            operation: Callable receiving the writer connection. It must not
+                commit or roll back itself.
+            weight: Number of rows the operation writes, used for batching.
+            urgent: Commit as soon as possible instead of lingering for
+                more writes. Set this when the caller waits on the result.
+
+        Returns:
+            Future resolved with the operation's result after commit.
+        """
+        item = _WriteOperation(operation, weight, urgent)
+        # Checked and enqueued under the lock close() takes, so no operation
+        # can be queued behind the stop marker and never run
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            self._ensure_started()
+            self._queue.put(item)
+        return item.future
+
+    def execute(
+        self,
+        sql: str,
+        parameters: Sequence[Any] = (),
+        *,
+        urgent: bool = False,
+    ) -> Future[int]:
+        """Queue a single statement. The future resolves to its rowcount."""
+        return self.submit(
+            lambda connection: connection.execute(sql, parameters).rowcount,
+            urgent=urgent,
+        )
+
+    def executemany(
+        self,
+        sql: str,
+        rows: Iterable[Sequence[Any]],
+        *,
+        urgent: bool = False,
+    ) -> Future[int]:
+        """Queue a statement for many parameter rows."""
+        rows = list(rows)
+        return self.submit(
+            lambda connection: connection.executemany(sql, rows).rowcount,
+            weight=max(len(rows), 1),
+            urgent=urgent,
+        )
+
+    def run_chunked(
+        self,
+        operation: Callable[[sqlite3.Connection], int],
+        *,
+        chunk_size: int,
+        time_budget: float,
+    ) -> tuple[int, bool]:
+        """Repeat a bounded operation in separate transactions.
+
+        Used for large deletes: every chunk is committed on its own, so
+        queued writes run between chunks instead of waiting behind one huge
+        transaction, and the WAL does not grow with the size of the backlog.
+
+        Args:
+            operation: Callable processing at most ``chunk_size`` rows and
+                returning how many it processed.
+            chunk_size: Row limit the operation applies per call.
+            time_budget: Seconds after which no further chunk is started.
+
+        Returns:
+            Tuple of (rows processed, whether the work ran to completion).
+        """
+        deadline = time.monotonic() + time_budget
+        total = 0
+        while True:
+            processed = self.submit(operation, weight=chunk_size, urgent=True).result()
+            total += processed
+            if processed < chunk_size:
+                return total, True
+            if time.monotonic() >= deadline:
+                return total, False
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every write queued so far has been committed."""
+        if self._thread is None:
+            return
+        self.submit(lambda connection: None, weight=0, urgent=True).result(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Commit pending writes and stop the writer thread."""
+        with self._start_lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread. The caller holds ``_start_lock``."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name=self._name,
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            assert isinstance(first, _WriteOperation)
+            batch: list[_WriteOperation[Any]] = [first]
+            pending = first.weight
+            urgent = first.urgent
+            deadline = time.monotonic() + self._max_delay
+
+            while pending < self._max_batch_size:
+                remaining = 0.0 if urgent else deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                assert isinstance(item, _WriteOperation)
+                batch.append(item)
+                pending += item.weight
+                urgent = urgent or item.urgent
+
+            self._commit(batch)
+
+    def _commit(self, batch: list[_WriteOperation[Any]]) -> None:
+        outcomes: list[tuple[bool, Any]] = []
+        try:
+            with self._pool.connection() as connection:
+                connection.execute("BEGIN IMMEDIATE")
+                for item in batch:
+                    connection.execute("SAVEPOINT write_operation")
+                    try:
+                        result = item.operation(connection)
+                    except Exception as exc:
+                        connection.execute("ROLLBACK TO write_operation")
+                        connection.execute("RELEASE write_operation")
+                        outcomes.append((False, exc))
+                    else:
+                        connection.execute("RELEASE write_operation")
+                        outcomes.append((True, result))
+                for hook in self._pre_commit_hooks:
+                    hook(connection)
+                connection.commit()
+        except Exception as exc:
+            # The pool rolls back the open transaction on checkin
+            LOGGER.warning("SQLite write batch of %d operations failed: %s", len(batch), exc)
+            for rollback_hook in self._rollback_hooks:
+                try:
+                    rollback_hook()
+                except Exception as hook_exc:
+                    LOGGER.warning("SQLite rollback hook failed: %s", hook_exc)
+            for item in batch:
+                item.future.set_exception(exc)
+            self.stats.operations_failed += len(batch)
+            return
+
+        self.stats.batches_committed += 1
+        for item, (succeeded, value) in zip(batch, outcomes):
+            if succeeded:
+                self.stats.operations_committed += 1
+                self.stats.rows_committed += item.weight
+                item.future.set_result(value)
+            else:
+                self.stats.operations_failed += 1
+                if not item.urgent:
+                    # Nobody is waiting on this future to report the error
+                    LOGGER.warning("Queued SQLite write failed: %s", value)
+                item.future.set_exception(value)
+
+
+def close_all_write_queues(timeout: float | None = None) -> None:
+    """Commit pending writes of every live queue and stop their threads."""
+    for write_queue in list(_write_queues):
+        write_queue.close(timeout)
+
+
+__all__ = [
+    "SQLiteWriteQueue",
+    "WriteQueueStats",
+    "close_all_write_queues",
+]
@@ -0,0 +1,153 @@
+"""Async facade for the blocking SQLite stores.
+
+The stores (metrics, traces, actions, sessions) use the synchronous
+``sqlite3`` module. Calling them directly from a coroutine blocks the event
+loop for the duration of the query, stalling every HTTP request and
+WebSocket. :class:`StoreExecutor` runs store calls on dedicated threads
+instead:
+
+- Reads are spread over a small thread pool.
+- Writes are queued to one writer thread per store, so writes to a
+  database are applied in submission order and never contend with each
+  other for SQLite's write lock, while a slow write to one database does
+  not hold up writes to the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+LOGGER = logging.getLogger(__name__)
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+# Default number of threads serving read queries
+_DEFAULT_MAX_READERS = 4
+
+
+class StoreExecutor:
+    """Runs blocking store calls off the event loop.
+
+    Usage:
+        executor = get_store_executor()
+        metrics = await executor.read(store.get_metrics, container_id)
+        await executor.write(store.store_metrics_batch, metrics)
+    """
+
+    def __init__(self, *, max_readers: int = _DEFAULT_MAX_READERS) -> None:
+        """Initialize the executor.
+
+        Args:
+            max_readers: Number of threads serving read queries.
+        """
+        self._readers = ThreadPoolExecutor(
+            max_workers=max_readers,
+            thread_name_prefix="store-read",
+        )
+        # Keyed by the id of the store owning the write method; the store
+        # is kept alongside so its id cannot be reused by another object
+        self._writers: dict[int, tuple[object, ThreadPoolExecutor]] = {}
+        self._writers_lock = threading.Lock()
+
+    def _writer_for(self, func: Callable[..., object]) -> ThreadPoolExecutor:
+        """Return the writer thread of the store that ``func`` is bound to.
+
+        Functions not bound to a store share one writer thread.
+        """
+        store = getattr(func, "__self__", None)
+        with self._writers_lock:
+            entry = self._writers.get(id(store))
+            if entry is None:
+                name = type(store).__name__ if store is not None else "default"
+                entry = (
+                    store,
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"store-write-{name}"),
+                )
+                self._writers[id(store)] = entry
+            return entry[1]
+
+    async def read(
+        self,
+        func: Callable[_P, _T],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> _T:
+        """Run a read-only store call on the reader pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._readers, functools.partial(func, *args, **kwargs)
+        )
+
+    async def write(
+        self,
+        func: Callable[_P, _T],
+        *args: _P.args,
+        **kwargs: _P.kwargs,
+    ) -> _T:
+        """Queue a mutating store call on the writer thread of its store."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._writer_for(func), functools.partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        """Stop the executor threads.
+
+        Args:
+            wait: If True, block until queued writes have been applied.
+        """
+        with self._writers_lock:
+            writers = [writer for _, writer in self._writers.values()]
+            self._writers.clear()
+        for writer in writers:
+            writer.shutdown(wait=wait)
+        self._readers.shutdown(wait=wait, cancel_futures=True)
+
+
+_store_executor: StoreExecutor | None = None
+_store_executor_lock = threading.Lock()
+
+
+def get_store_executor() -> StoreExecutor:
+    """Get or create the shared store executor."""
+    global _store_executor
+    with _store_executor_lock:
+        if _store_executor is None:
+            _store_executor = StoreExecutor()
+        return _store_executor
+
+
+def shutdown_store_executor() -> None:
+    """Drain pending writes and stop the shared store executor."""
+    global _store_executor
+    with _store_executor_lock:
+        if _store_executor is not None:
+            _store_executor.shutdown(wait=True)
+            _store_executor = None
+            LOGGER.debug("Store executor shut down")
+
+
+async def run_read(func: Callable[_P, _T], *args: _P.args, **kwargs: _P.kwargs) -> _T:
+    """Run a read-only store call on the shared store executor."""
+    return await get_store_executor().read(func, *args, **kwargs)
+
+
+async def run_write(func: Callable[_P, _T], *args: _P.args, **kwargs: _P.kwargs) -> _T:
+    """Run a mutating store call on the shared store executor."""
+    return await get_store_executor().write(func, *args, **kwargs)
+
+
+__all__ = [
+    "StoreExecutor",
+    "get_store_executor",
+    "run_read",
+    "run_write",
+    "shutdown_store_executor",
+]
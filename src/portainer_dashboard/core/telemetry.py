@@ -7,12 +7,18 @@ OpenTelemetry with a custom SQLite exporter for local trace storage.
 from __future__ import annotations
 
 import logging
+import queue
 import random
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
 from portainer_dashboard.config import TracingSettings, get_settings
 from portainer_dashboard.models.tracing import Span, SpanKind, SpanStatus, Trace
+from portainer_dashboard.services.latency_sketch import LatencySketch
 from portainer_dashboard.services.trace_store import SQLiteTraceStore, get_trace_store
 
 if TYPE_CHECKING:
@@ -20,6 +26,19 @@ if TYPE_CHECKING:
 
 LOGGER = logging.getLogger(__name__)
 
+# Export pipeline limits
+_DEFAULT_MAX_QUEUE_SIZE = 20000
+_DEFAULT_MAX_BUFFERED_SPANS = 10000
+_DEFAULT_PENDING_TRACE_TTL = 30.0
+_MAX_EXPORT_BATCH_SIZE = 2048
+_SHUTDOWN_TIMEOUT_SECONDS = 30.0
+
+# Tail sampling: traces slower than this quantile of their route are kept
+_DEFAULT_SLOW_TRACE_MS = 1000
+_SLOW_TRACE_QUANTILE = 0.95
+_LATENCY_WINDOW_SECONDS = 300.0
+_MIN_ROUTE_SAMPLES = 20
+
 # OpenTelemetry imports - optional, gracefully handle if not installed
 _OTEL_AVAILABLE = False
 try:
@@ -70,158 +89,393 @@ def _ns_to_datetime(ns: int) -> datetime:
     return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc)
 
 
+def _to_model_span(otel_span: "ReadableSpan", service_name: str) -> Span:
+    """Convert a finished OpenTelemetry span to our model."""
+    # Extract attributes
+    attributes = {}
+    for key, value in otel_span.attributes.items():
+        if isinstance(value, (str, int, float, bool)):
+            attributes[key] = value
+        else:
+            attributes[key] = str(value)
+
+    # Calculate duration
+    duration_ms = None
+    if otel_span.end_time and otel_span.start_time:
+        duration_ms = int((otel_span.end_time - otel_span.start_time) / 1e6)
+
+    return Span(
+        trace_id=format(otel_span.context.trace_id, "032x"),
+        span_id=format(otel_span.context.span_id, "016x"),
+        parent_span_id=(
+            format(otel_span.parent.span_id, "016x")
+            if otel_span.parent else None
+        ),
+        name=otel_span.name,
+        kind=_otel_span_kind_to_model(otel_span.kind),
+        status=_otel_status_to_model(otel_span.status.status_code),
+        status_message=otel_span.status.description,
+        start_time=_ns_to_datetime(otel_span.start_time),
+        end_time=_ns_to_datetime(otel_span.end_time) if otel_span.end_time else None,
+        duration_ms=duration_ms,
+        service_name=service_name,
+        attributes=attributes,
+    )
+
+
+@dataclass(slots=True)
+class SpanExportStats:
+    """Counters describing the work done by a span exporter."""
+
+    spans_queued: int = 0
+    spans_buffered: int = 0
+    spans_exported: int = 0
+    spans_dropped: int = 0
+    traces_exported: int = 0
+    traces_evicted: int = 0
+    traces_sampled_out: int = 0
+    pending_traces: int = 0
+
+
+@dataclass(slots=True)
+class _PendingTrace:
+    """Spans buffered for a trace whose root span has not been exported."""
+
+    first_seen: float
+    spans: list[Span] = field(default_factory=list)
+    has_errors: bool = False
+    end_time: datetime | None = None
+
+
+_STOP = object()
+
+
 class SQLiteSpanExporter(SpanExporter if _OTEL_AVAILABLE else object):
-    """Custom OpenTelemetry exporter that stores spans in SQLite."""
+    """Custom OpenTelemetry exporter that stores spans in SQLite.
+
+    ``export`` runs on the span processor's thread and only appends the
+    finished spans to a bounded queue; a worker thread converts them, builds
+    trace summaries and hands spans and summaries to the trace store as one
+    batch each. While the queue is full, further spans are dropped instead
+    of stalling the processor.
+
+    Child spans usually finish, and are exported, before their root span,
+    so spans are buffered per trace until the root arrives and the trace is
+    stored as a whole. Traces whose root does not arrive within
+    ``pending_trace_ttl`` seconds, or the oldest ones once more than
+    ``max_buffered_spans`` spans are buffered, are evicted and their spans
+    stored without a summary, also while no further spans are exported.
+    """
 
-    def __init__(self, trace_store: SQLiteTraceStore, service_name: str) -> None:
+    def __init__(
+        self,
+        trace_store: SQLiteTraceStore,
+        service_name: str,
+        *,
+        max_queue_size: int = _DEFAULT_MAX_QUEUE_SIZE,
+        max_buffered_spans: int = _DEFAULT_MAX_BUFFERED_SPANS,
+        pending_trace_ttl: float = _DEFAULT_PENDING_TRACE_TTL,
+    ) -> None:
         self._trace_store = trace_store
         self._service_name = service_name
-        self._pending_traces: dict[str, list[Span]] = {}
+        self._max_queue_size = max_queue_size
+        self._max_buffered_spans = max_buffered_spans
+        self._pending_trace_ttl = pending_trace_ttl
+        # Only touched by the worker thread
+        self._pending_traces: dict[str, _PendingTrace] = {}
+        self._buffered_spans = 0
+        self._queue: queue.Queue[Sequence[ReadableSpan] | threading.Event | object] = (
+            queue.Queue()
+        )
+        self._lock = threading.Lock()
+        self._closed = False
+        self._dropping = False
+        self.stats = SpanExportStats()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
 
     def export(self, spans) -> "SpanExportResult":
-        """Export spans to SQLite storage."""
+        """Queue spans for storage without waiting for the database."""
         if not _OTEL_AVAILABLE:
             return SpanExportResult.SUCCESS
 
-        try:
-            model_spans: list[Span] = []
-
-            for otel_span in spans:
-                # Extract attributes
-                attributes = {}
-                for key, value in otel_span.attributes.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        attributes[key] = value
-                    else:
-                        attributes[key] = str(value)
-
-                # Calculate duration
-                duration_ms = None
-                if otel_span.end_time and otel_span.start_time:
-                    duration_ms = int((otel_span.end_time - otel_span.start_time) / 1e6)
-
-                # Create model span
-                span = Span(
-                    trace_id=format(otel_span.context.trace_id, "032x"),
-                    span_id=format(otel_span.context.span_id, "016x"),
-                    parent_span_id=(
-                        format(otel_span.parent.span_id, "016x")
-                        if otel_span.parent else None
-                    ),
-                    name=otel_span.name,
-                    kind=_otel_span_kind_to_model(otel_span.kind),
-                    status=_otel_status_to_model(otel_span.status.status_code),
-                    status_message=otel_span.status.description,
-                    start_time=_ns_to_datetime(otel_span.start_time),
-                    end_time=_ns_to_datetime(otel_span.end_time) if otel_span.end_time else None,
-                    duration_ms=duration_ms,
-                    service_name=self._service_name,
-                    attributes=attributes,
-                )
-                model_spans.append(span)
-
-            # Store spans
-            if model_spans:
-                self._trace_store.store_spans_batch(model_spans)
-
-                # Build trace summaries from root spans
-                for span in model_spans:
-                    if span.parent_span_id is None:
-                        # This is a root span, create/update trace
-                        self._create_trace_summary(span, model_spans)
-
-            return SpanExportResult.SUCCESS
+        with self._lock:
+            if self._closed:
+                return SpanExportResult.FAILURE
+            if self.stats.spans_queued + len(spans) > self._max_queue_size:
+                self.stats.spans_dropped += len(spans)
+                if not self._dropping:
+                    self._dropping = True
+                    LOGGER.warning(
+                        "Span export queue is full (%d spans), dropping spans",
+                        self._max_queue_size,
+                    )
+                return SpanExportResult.FAILURE
+            self._dropping = False
+            self.stats.spans_queued += len(spans)
+            self._queue.put(spans)
+        return SpanExportResult.SUCCESS
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self._next_eviction_timeout())
+            except queue.Empty:
+                # Nothing was exported while the oldest trace expired
+                self._write_batch([])
+                continue
+            if item is _STOP:
+                break
+            if isinstance(item, threading.Event):
+                self._flush_store(item)
+                continue
+
+            # Coalesce everything already queued into one store batch
+            batch = list(item)
+            while len(batch) < _MAX_EXPORT_BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP or isinstance(item, threading.Event):
+                    self._write_batch(batch)
+                    batch = []
+                    if item is _STOP:
+                        self._write_batch([], evict_all=True)
+                        return
+                    self._flush_store(item)
+                    continue
+                batch.extend(item)
+            self._write_batch(batch)
+        self._write_batch([], evict_all=True)
+
+    def _next_eviction_timeout(self) -> float | None:
+        """Seconds until the oldest pending trace expires, or None if none is pending."""
+        oldest = next(iter(self._pending_traces.values()), None)
+        if oldest is None:
+            return None
+        return max(0.0, oldest.first_seen + self._pending_trace_ttl - time.monotonic())
+
+    def _write_batch(self, otel_spans: list[ReadableSpan], *, evict_all: bool = False) -> None:
+        with self._lock:
+            self.stats.spans_queued -= len(otel_spans)
 
+        try:
+            model_spans = [_to_model_span(s, self._service_name) for s in otel_spans]
+            completed = self._buffer_spans(model_spans)
+            evicted = self._evict_traces(evict_all=evict_all)
+
+            spans: list[Span] = []
+            traces: list[Trace] = []
+            sampled_out = 0
+            for trace, pending in completed:
+                if self._keep_trace(trace, pending):
+                    traces.append(trace)
+                    spans.extend(pending.spans)
+                else:
+                    sampled_out += 1
+            for pending in evicted:
+                if self._keep_trace(None, pending):
+                    spans.extend(pending.spans)
+                else:
+                    sampled_out += 1
+
+            # Waiting on the commit keeps the export queue the only buffer,
+            # so a slow database shows up as dropped spans, not memory growth
+            self._trace_store.store_spans_batch(spans, wait=True)
+            self._trace_store.store_traces_batch(traces, wait=True)
         except Exception as exc:
-            LOGGER.warning("Failed to export spans: %s", exc)
-            return SpanExportResult.FAILURE
-
-    def _create_trace_summary(self, root_span: Span, all_spans: list[Span]) -> None:
-        """Create a trace summary from the root span."""
-        trace_spans = [s for s in all_spans if s.trace_id == root_span.trace_id]
-
-        # Check for errors
-        has_errors = any(s.status == SpanStatus.ERROR for s in trace_spans)
+            LOGGER.warning("Failed to export %d spans: %s", len(otel_spans), exc)
+            with self._lock:
+                self.stats.spans_dropped += len(otel_spans)
+            return
+
+        with self._lock:
+            self.stats.spans_exported += len(spans)
+            self.stats.traces_exported += len(traces)
+            self.stats.traces_evicted += len(evicted)
+            self.stats.traces_sampled_out += sampled_out
+            self.stats.spans_buffered = self._buffered_spans
+            self.stats.pending_traces = len(self._pending_traces)
+
+    def _buffer_spans(self, spans: list[Span]) -> list[tuple[Trace, _PendingTrace]]:
+        """Buffer spans per trace and summarise the traces whose root arrived."""
+        now = time.monotonic()
+        roots: list[Span] = []
+        for span in spans:
+            pending = self._pending_traces.get(span.trace_id)
+            if pending is None:
+                pending = self._pending_traces[span.trace_id] = _PendingTrace(now)
+            pending.spans.append(span)
+            pending.has_errors = pending.has_errors or span.status == SpanStatus.ERROR
+            if span.end_time and (pending.end_time is None or span.end_time > pending.end_time):
+                pending.end_time = span.end_time
+            if span.parent_span_id is None:
+                roots.append(span)
+        self._buffered_spans += len(spans)
+
+        completed = []
+        for root in roots:
+            pending = self._pending_traces.pop(root.trace_id, None)
+            if pending is not None:
+                self._buffered_spans -= len(pending.spans)
+                completed.append((self._create_trace_summary(root, pending), pending))
+        return completed
+
+    def _evict_traces(self, *, evict_all: bool = False) -> list[_PendingTrace]:
+        """Remove traces past the TTL, and the oldest while the buffer is full."""
+        cutoff = time.monotonic() - self._pending_trace_ttl
+        # Insertion order is arrival order, so the oldest traces are at the front
+        expired = []
+        for trace_id, pending in self._pending_traces.items():
+            if (
+                not evict_all
+                and pending.first_seen > cutoff
+                and self._buffered_spans <= self._max_buffered_spans
+            ):
+                break
+            expired.append(trace_id)
+            self._buffered_spans -= len(pending.spans)
+
+        evicted = [self._pending_traces.pop(trace_id) for trace_id in expired]
+        if evicted:
+            LOGGER.debug("Evicted %d traces without a root span", len(evicted))
+        return evicted
+
+    def _keep_trace(self, trace: Trace | None, pending: _PendingTrace) -> bool:
+        """Decide whether a trace is stored.
+
+        Args:
+            trace: Summary of a completed trace, or None for an evicted trace
+                whose root span never arrived.
+            pending: The trace's buffered spans.
+        """
+        return True
 
+    def _create_trace_summary(self, root_span: Span, pending: _PendingTrace) -> Trace:
+        """Create a trace summary from the root span and the trace's spans."""
         # Extract HTTP metadata from attributes
         http_method = root_span.attributes.get("http.method")
         http_route = root_span.attributes.get("http.route")
         http_status = root_span.attributes.get("http.status_code")
 
-        # Find end time (latest span end)
-        end_times = [s.end_time for s in trace_spans if s.end_time]
-        end_time = max(end_times) if end_times else None
-
         # Calculate total duration
         total_duration = None
-        if end_time and root_span.start_time:
-            delta = end_time - root_span.start_time
+        if pending.end_time and root_span.start_time:
+            delta = pending.end_time - root_span.start_time
             total_duration = int(delta.total_seconds() * 1000)
 
-        trace = Trace(
+        return Trace(
             trace_id=root_span.trace_id,
             root_span_name=root_span.name,
             service_name=self._service_name,
             start_time=root_span.start_time,
-            end_time=end_time,
+            end_time=pending.end_time,
             total_duration_ms=total_duration,
-            span_count=len(trace_spans),
-            has_errors=has_errors,
+            span_count=len(pending.spans),
+            has_errors=pending.has_errors,
             http_method=str(http_method) if http_method else None,
             http_route=str(http_route) if http_route else None,
             http_status_code=int(http_status) if http_status else None,
         )
 
-        self._trace_store.store_trace(trace)
+    def _flush_store(self, done: threading.Event) -> None:
+        try:
+            self._trace_store.flush()
+        finally:
+            done.set()
 
     def shutdown(self) -> None:
-        """Shutdown the exporter."""
-        pass
+        """Store queued and buffered spans and stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(_SHUTDOWN_TIMEOUT_SECONDS)
 
     def force_flush(self, timeout_millis: int = 30000) -> bool:
-        """Force flush any pending spans."""
-        return True
+        """Block until spans queued so far have been committed.
+
+        Spans of traces still waiting for their root span stay buffered.
+        """
+        done = threading.Event()
+        with self._lock:
+            if self._closed:
+                return True
+            self._queue.put(done)
+        return done.wait(timeout_millis / 1000)
 
 
 class SamplingSQLiteExporter(SQLiteSpanExporter):
-    """SQLite exporter with sampling support."""
+    """SQLite exporter with tail-based sampling.
+
+    The decision is made once a trace is complete, so traces with errors
+    and traces slower than their route's usual latency are always kept and
+    only the remaining traces are sampled at ``sample_rate``.
+
+    A route's slow threshold is the 95th percentile of its durations over
+    the previous 5-minute window, measured over all traces, kept or not;
+    routes with fewer than 20 traces in that window use ``slow_trace_ms``.
+    Evicted traces without a root span are kept when they contain errors
+    and sampled otherwise.
+    """
 
     def __init__(
         self,
         trace_store: SQLiteTraceStore,
         service_name: str,
         sample_rate: float = 1.0,
+        *,
+        slow_trace_ms: int = _DEFAULT_SLOW_TRACE_MS,
+        max_queue_size: int = _DEFAULT_MAX_QUEUE_SIZE,
+        max_buffered_spans: int = _DEFAULT_MAX_BUFFERED_SPANS,
+        pending_trace_ttl: float = _DEFAULT_PENDING_TRACE_TTL,
     ) -> None:
-        super().__init__(trace_store, service_name)
+        super().__init__(
+            trace_store,
+            service_name,
+            max_queue_size=max_queue_size,
+            max_buffered_spans=max_buffered_spans,
+            pending_trace_ttl=pending_trace_ttl,
+        )
         self._sample_rate = max(0.0, min(1.0, sample_rate))
-
-    def export(self, spans) -> "SpanExportResult":
-        """Export spans with sampling."""
-        if self._sample_rate < 1.0:
-            # Sample at trace level - only export if trace is sampled
-            sampled_spans = []
-            sampled_traces: set[str] = set()
-
-            for span in spans:
-                trace_id = format(span.context.trace_id, "032x")
-
-                # Decide sampling based on trace_id if not already decided
-                if trace_id not in sampled_traces:
-                    if random.random() < self._sample_rate:
-                        sampled_traces.add(trace_id)
-
-                if trace_id in sampled_traces:
-                    sampled_spans.append(span)
-
-            if not sampled_spans:
-                return SpanExportResult.SUCCESS
-
-            return super().export(sampled_spans)
-
-        return super().export(spans)
+        self._slow_trace_ms = slow_trace_ms
+        # Only touched by the worker thread
+        self._route_latency: dict[tuple[str | None, str | None], LatencySketch] = {}
+        self._slow_thresholds: dict[tuple[str | None, str | None], float] = {}
+        self._window_ends_at = time.monotonic() + _LATENCY_WINDOW_SECONDS
+
+    def _record_latency(self, trace: Trace) -> float:
+        """Record a completed trace's duration and return its route's slow threshold."""
+        now = time.monotonic()
+        if now >= self._window_ends_at:
+            self._slow_thresholds = {
+                route: sketch.quantile(_SLOW_TRACE_QUANTILE)
+                for route, sketch in self._route_latency.items()
+                if sketch.count >= _MIN_ROUTE_SAMPLES
+            }
+            self._route_latency = {}
+            self._window_ends_at = now + _LATENCY_WINDOW_SECONDS
+
+        route = (trace.http_method, trace.http_route)
+        sketch = self._route_latency.get(route)
+        if sketch is None:
+            sketch = self._route_latency[route] = LatencySketch()
+        if trace.total_duration_ms is not None:
+            sketch.add(trace.total_duration_ms)
+        return self._slow_thresholds.get(route, self._slow_trace_ms)
+
+    def _keep_trace(self, trace: Trace | None, pending: _PendingTrace) -> bool:
+        slow = False
+        if trace is not None:
+            threshold = self._record_latency(trace)
+            slow = trace.total_duration_ms is not None and trace.total_duration_ms > threshold
+        return pending.has_errors or slow or random.random() < self._sample_rate
 
 
 _tracer_provider: "TracerProvider | None" = None
+_exporter: SQLiteSpanExporter | None = None
 
 
 async def setup_telemetry(app: "FastAPI", settings: TracingSettings | None = None) -> None:
@@ -231,7 +485,7 @@ async def setup_telemetry(app: "FastAPI", settings: TracingSettings | None = Non
         app: The FastAPI application to instrument.
         settings: Tracing settings. If None, uses global settings.
     """
-    global _tracer_provider
+    global _exporter, _tracer_provider
 
     if not _OTEL_AVAILABLE:
         LOGGER.info("OpenTelemetry not available, skipping telemetry setup")
@@ -258,11 +512,15 @@ async def setup_telemetry(app: "FastAPI", settings: TracingSettings | None = Non
         trace_store=trace_store,
         service_name=settings.service_name,
         sample_rate=settings.sample_rate,
+        slow_trace_ms=settings.slow_trace_ms,
+        max_queue_size=settings.export_queue_size,
+        max_buffered_spans=settings.trace_buffer_size,
     )
 
     # Create and set tracer provider
     from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
+    _exporter = exporter
     _tracer_provider = TracerProvider(resource=resource)
     _tracer_provider.add_span_processor(BatchSpanProcessor(exporter))
     otel_trace.set_tracer_provider(_tracer_provider)
@@ -274,22 +532,29 @@ async def setup_telemetry(app: "FastAPI", settings: TracingSettings | None = Non
     HTTPXClientInstrumentor().instrument()
 
     LOGGER.info(
-        "Telemetry enabled: service=%s, sample_rate=%.2f",
+        "Telemetry enabled: service=%s, sample_rate=%.2f, slow_trace_ms=%d",
         settings.service_name,
         settings.sample_rate,
+        settings.slow_trace_ms,
     )
 
 
 def shutdown_telemetry() -> None:
     """Shutdown telemetry and flush pending spans."""
-    global _tracer_provider
+    global _exporter, _tracer_provider
 
     if _tracer_provider:
         _tracer_provider.shutdown()
         _tracer_provider = None
+        _exporter = None
         LOGGER.info("Telemetry shutdown complete")
 
 
+def get_export_stats() -> SpanExportStats | None:
+    """Get the span exporter's counters, or None when tracing is not set up."""
+    return _exporter.stats if _exporter is not None else None
+
+
 def get_tracer(name: str = "portainer-dashboard"):
     """Get a tracer for manual instrumentation."""
     if not _OTEL_AVAILABLE:
@@ -300,6 +565,8 @@ def get_tracer(name: str = "portainer-dashboard"):
 __all__ = [
     "SamplingSQLiteExporter",
     "SQLiteSpanExporter",
+    "SpanExportStats",
+    "get_export_stats",
     "get_tracer",
     "setup_telemetry",
     "shutdown_telemetry",
@@ -102,13 +102,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown the monitoring scheduler
     shutdown_scheduler(wait=False)
 
-    # Shutdown HTTP client pools
+    # Close live log streams, then the HTTP client pools
     from portainer_dashboard.services.portainer_client import shutdown_client_pool
     from portainer_dashboard.services.llm_client import shutdown_llm_client_pool
+    from portainer_dashboard.services.log_streams import shutdown_log_stream_hub
 
+    await shutdown_log_stream_hub()
     await shutdown_client_pool()
     await shutdown_llm_client_pool()
 
+    # Drain queued store writes and close database connections
+    from portainer_dashboard.core.sqlite_pool import close_all_pools
+    from portainer_dashboard.core.sqlite_writer import close_all_write_queues
+    from portainer_dashboard.core.store_executor import shutdown_store_executor
+
+    shutdown_store_executor()
+    close_all_write_queues(timeout=10.0)
+    close_all_pools()
+
     LOGGER.info("Shutting down Portainer Dashboard")
 
 
@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from enum import Enum
 from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 def _utc_now() -> datetime:
@@ -24,6 +24,26 @@ class MetricType(str, Enum):
     NETWORK_TX_BYTES = "network_tx_bytes"
     BLOCK_READ_BYTES = "block_read_bytes"
     BLOCK_WRITE_BYTES = "block_write_bytes"
+    NETWORK_RX_RATE = "network_rx_bytes_per_sec"
+    NETWORK_TX_RATE = "network_tx_bytes_per_sec"
+    BLOCK_READ_RATE = "block_read_bytes_per_sec"
+    BLOCK_WRITE_RATE = "block_write_bytes_per_sec"
+
+
+class FleetGroupBy(str, Enum):
+    """Dimensions fleet-level metric aggregates can be grouped by."""
+
+    CONTAINER = "container"
+    ENDPOINT = "endpoint"
+    STACK = "stack"
+    IMAGE = "image"
+
+
+class DownsampleMethod(str, Enum):
+    """Algorithms for reducing a series to a chartable number of points."""
+
+    LTTB = "lttb"
+    MIN_MAX = "minmax"
 
 
 class ContainerMetric(BaseModel):
@@ -35,6 +55,8 @@ class ContainerMetric(BaseModel):
     endpoint_name: str | None = None
     container_id: str
     container_name: str
+    stack_name: str | None = None
+    image: str | None = None
     metric_type: MetricType
     value: float
 
@@ -69,6 +91,9 @@ class MetricsSummary(BaseModel):
     max_value: float = 0.0
     avg_value: float = 0.0
     std_dev: float = 0.0
+    p50_value: float = 0.0
+    p95_value: float = 0.0
+    p99_value: float = 0.0
     latest_value: float = 0.0
     latest_timestamp: datetime | None = None
 
@@ -85,10 +110,78 @@ class MetricsDashboard(BaseModel):
     storage_size_bytes: int = 0
 
 
+class SeriesSelector(BaseModel):
+    """Identifies one metric series of a container."""
+
+    container_id: str
+    metric_type: MetricType
+
+
+class MetricsRangeQuery(BaseModel):
+    """Range query for one or more metric series."""
+
+    series: list[SeriesSelector] = Field(min_length=1, max_length=100)
+    start: datetime | None = None  # Defaults to 24 hours before end
+    end: datetime | None = None  # Defaults to now
+    max_points: int = Field(default=500, ge=3, le=10000)
+    method: DownsampleMethod = DownsampleMethod.LTTB
+
+    @field_validator("start", "end")
+    @classmethod
+    def assume_utc(cls, value: datetime | None) -> datetime | None:
+        """Treat naive datetimes as UTC."""
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class MetricSeries(BaseModel):
+    """Downsampled samples of one series as columnar arrays."""
+
+    container_id: str
+    metric_type: MetricType
+    timestamps: list[int] = Field(default_factory=list)  # Unix epoch milliseconds
+    values: list[float] = Field(default_factory=list)
+    raw_count: int = 0  # Samples in the range before downsampling
+
+
+class MetricsRangeResult(BaseModel):
+    """Result of a metrics range query."""
+
+    start: datetime
+    end: datetime
+    series: list[MetricSeries] = Field(default_factory=list)
+
+
+class FleetAggregate(BaseModel):
+    """Aggregated metric values for one group of containers.
+
+    Each container contributes its average over the window, so
+    ``sum_value`` is e.g. the combined CPU of all containers in the group.
+    """
+
+    group_by: FleetGroupBy
+    key: str | None = None  # Group identifier; None for containers without a stack
+    label: str | None = None
+    metric_type: MetricType
+    container_count: int = 0
+    sum_value: float = 0.0
+    avg_value: float = 0.0
+    max_value: float = 0.0
+    sample_count: int = 0
+
+
 __all__ = [
     "AnomalyDetection",
     "ContainerMetric",
+    "DownsampleMethod",
+    "FleetAggregate",
+    "FleetGroupBy",
+    "MetricSeries",
     "MetricsDashboard",
+    "MetricsRangeQuery",
+    "MetricsRangeResult",
     "MetricsSummary",
     "MetricType",
+    "SeriesSelector",
 ]
@@ -62,6 +62,19 @@ class ImageStatus(BaseModel):
     error: str | None = None
 
 
+class LogTemplate(BaseModel):
+    """Log lines of a container collapsed into one template.
+
+    Variable parts of the lines, such as numbers and IDs, are replaced by
+    ``<*>`` in the template.
+    """
+
+    template: str
+    count: int = 0
+    first_seen: datetime | None = None
+    last_seen: datetime | None = None
+
+
 class ContainerLogs(BaseModel):
     """Container logs captured for analysis."""
 
@@ -74,6 +87,7 @@ class ContainerLogs(BaseModel):
     logs: str
     log_lines: int = 0
     truncated: bool = False
+    templates: list[LogTemplate] = Field(default_factory=list)
 
 
 class MonitoringInsight(BaseModel):
@@ -120,6 +134,60 @@ class InfrastructureSnapshot(BaseModel):
     resource_usage: dict = Field(default_factory=dict)
 
 
+class SnapshotDiff(BaseModel):
+    """Changes between two consecutive infrastructure snapshots."""
+
+    previous_timestamp: datetime
+    timestamp: datetime
+    containers_added: list[dict] = Field(default_factory=list)
+    containers_removed: list[dict] = Field(default_factory=list)
+    containers_changed: list[dict] = Field(default_factory=list)
+    endpoints_changed: list[dict] = Field(default_factory=list)
+    new_security_issues: list[ContainerCapabilities] = Field(default_factory=list)
+    resolved_security_issues: list[ContainerCapabilities] = Field(default_factory=list)
+    new_outdated_images: list[ImageStatus] = Field(default_factory=list)
+    resolved_outdated_images: list[ImageStatus] = Field(default_factory=list)
+    new_container_logs: list[ContainerLogs] = Field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """Return True when nothing changed between the snapshots."""
+        return not (
+            self.containers_added
+            or self.containers_removed
+            or self.containers_changed
+            or self.endpoints_changed
+            or self.new_security_issues
+            or self.resolved_security_issues
+            or self.new_outdated_images
+            or self.resolved_outdated_images
+            or self.new_container_logs
+        )
+
+    @property
+    def affected_resources(self) -> set[str]:
+        """Return the names of the containers, endpoints and stacks that changed."""
+        names: set[str] = set()
+        for details in (
+            *self.containers_added,
+            *self.containers_removed,
+            *self.containers_changed,
+        ):
+            names.add(str(details.get("container_name") or ""))
+        names.update(str(ep.get("endpoint_name") or "") for ep in self.endpoints_changed)
+        names.update(
+            issue.container_name
+            for issue in (*self.new_security_issues, *self.resolved_security_issues)
+        )
+        names.update(
+            image.stack_name or "unknown"
+            for image in (*self.new_outdated_images, *self.resolved_outdated_images)
+        )
+        names.update(entry.container_name for entry in self.new_container_logs)
+        names.discard("")
+        return names
+
+
 __all__ = [
     "ContainerCapabilities",
     "ContainerLogs",
@@ -127,6 +195,8 @@ __all__ = [
     "InfrastructureSnapshot",
     "InsightCategory",
     "InsightSeverity",
+    "LogTemplate",
     "MonitoringInsight",
     "MonitoringReport",
+    "SnapshotDiff",
 ]
@@ -85,6 +85,20 @@ class TracesSummary(BaseModel):
     storage_size_bytes: int = 0
 
 
+class RouteStats(BaseModel):
+    """Request and latency statistics for one HTTP route."""
+
+    route: str
+    method: str
+    request_count: int = 0
+    error_count: int = 0
+    error_rate: float = 0.0
+    avg_duration_ms: float = 0.0
+    p50_duration_ms: float = 0.0
+    p95_duration_ms: float = 0.0
+    p99_duration_ms: float = 0.0
+
+
 class ServiceNode(BaseModel):
     """Node in the service dependency map."""
 
@@ -128,6 +142,7 @@ class TraceFilter(BaseModel):
 
 
 __all__ = [
+    "RouteStats",
     "ServiceEdge",
     "ServiceMap",
     "ServiceNode",
@@ -2,6 +2,7 @@
 
 from portainer_dashboard.scheduler.setup import (
     create_scheduler,
+    get_monitoring_service,
     get_scheduler,
     shutdown_scheduler,
     start_scheduler,
@@ -9,6 +10,7 @@ from portainer_dashboard.scheduler.setup import (
 
 __all__ = [
     "create_scheduler",
+    "get_monitoring_service",
     "get_scheduler",
     "shutdown_scheduler",
     "start_scheduler",
@@ -10,6 +10,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from portainer_dashboard.config import get_settings
+from portainer_dashboard.core.store_executor import run_write
 from portainer_dashboard.services.monitoring_service import (
     MonitoringService,
     create_monitoring_service,
@@ -42,16 +43,25 @@ async def _refresh_cache_job() -> None:
 
 
 async def _purge_old_metrics() -> None:
-    """Purge old metrics and traces based on retention settings."""
+    """Purge old metrics and traces based on retention settings.
+
+    Metric and trace purges run on their own thread rather than a store's
+    writer thread: they delete in chunks committed through the store's
+    write queue, so other writes run between chunks, and the WAL checkpoint
+    of ``compact`` waits for readers.
+    """
     settings = get_settings()
 
     if settings.metrics.enabled:
         try:
             from portainer_dashboard.services.metrics_store import get_metrics_store
             store = await get_metrics_store()
-            deleted = store.purge_old_metrics(settings.metrics.retention_hours)
+            deleted = await asyncio.to_thread(
+                store.purge_old_metrics, settings.metrics.retention_hours
+            )
             if deleted > 0:
                 LOGGER.info("Purged %d old metrics", deleted)
+            await asyncio.to_thread(store.compact)
         except Exception as exc:
             LOGGER.warning("Failed to purge old metrics: %s", exc)
 
@@ -59,9 +69,12 @@ async def _purge_old_metrics() -> None:
         try:
             from portainer_dashboard.services.trace_store import get_trace_store
             store = await get_trace_store()
-            deleted = store.purge_old_traces(settings.tracing.retention_hours)
+            deleted = await asyncio.to_thread(
+                store.purge_old_traces, settings.tracing.retention_hours
+            )
             if deleted > 0:
                 LOGGER.info("Purged %d old traces", deleted)
+            await asyncio.to_thread(store.compact)
         except Exception as exc:
             LOGGER.warning("Failed to purge old traces: %s", exc)
 
@@ -69,7 +82,7 @@ async def _purge_old_metrics() -> None:
         try:
             from portainer_dashboard.services.actions_store import get_actions_store
             store = await get_actions_store()
-            deleted = store.purge_old_actions(days=30)
+            deleted = await run_write(store.purge_old_actions, days=30)
             if deleted > 0:
                 LOGGER.info("Purged %d old actions", deleted)
         except Exception as exc:
@@ -91,6 +104,17 @@ async def _run_monitoring_job() -> None:
         LOGGER.exception("Monitoring job failed: %s", exc)
 
 
+async def _refresh_image_status_job() -> None:
+    """Compare stack images against their registries for the next snapshots."""
+    if _monitoring_service is None:
+        return
+
+    try:
+        await _monitoring_service.data_collector.refresh_image_status()
+    except Exception as exc:
+        LOGGER.warning("Image status refresh failed: %s", exc)
+
+
 async def _broadcast_wrapper(report: "MonitoringReport") -> None:
     """Wrapper to broadcast reports via WebSocket."""
     try:
@@ -144,6 +168,21 @@ async def create_scheduler() -> AsyncIOScheduler | None:
             interval_minutes,
         )
 
+        if settings.monitoring.include_image_check:
+            image_check_minutes = max(settings.monitoring.image_check_interval_minutes, 1)
+            _scheduler.add_job(
+                _refresh_image_status_job,
+                trigger=IntervalTrigger(minutes=image_check_minutes),
+                id="image_status_refresh",
+                name="Stack Image Status Refresh",
+                replace_existing=True,
+            )
+
+            LOGGER.info(
+                "Scheduled image status refresh every %d minutes",
+                image_check_minutes,
+            )
+
     # Add cache refresh job if caching is enabled
     if settings.cache.enabled:
         # Refresh cache at half the TTL interval to ensure data is always fresh
@@ -165,16 +204,17 @@ async def create_scheduler() -> AsyncIOScheduler | None:
             cache_ttl,
         )
 
-    # Add purge job for metrics, traces, and actions (runs every hour)
+    # Add purge job for metrics, traces, and actions. Each run is
+    # time-bounded, so it runs often enough to work off a backlog quickly.
     _scheduler.add_job(
         _purge_old_metrics,
-        trigger=IntervalTrigger(hours=1),
+        trigger=IntervalTrigger(minutes=10),
         id="data_purge",
         name="Data Retention Purge",
         replace_existing=True,
     )
 
-    LOGGER.info("Scheduled data retention purge every hour")
+    LOGGER.info("Scheduled data retention purge every 10 minutes")
 
     return _scheduler
 
@@ -210,6 +250,9 @@ async def _run_initial_analysis() -> None:
         except Exception as exc:
             LOGGER.exception("Initial monitoring analysis failed: %s", exc)
 
+        # The first snapshot discovered the stacks; check the ones not cached
+        await _refresh_image_status_job()
+
 
 def shutdown_scheduler(wait: bool = False) -> None:
     """Shutdown the scheduler."""
@@ -228,8 +271,14 @@ def get_scheduler() -> AsyncIOScheduler | None:
     return _scheduler
 
 
+def get_monitoring_service() -> MonitoringService | None:
+    """Get the monitoring service used by the scheduled jobs, if any."""
+    return _monitoring_service
+
+
 __all__ = [
     "create_scheduler",
+    "get_monitoring_service",
     "get_scheduler",
     "shutdown_scheduler",
     "start_scheduler",
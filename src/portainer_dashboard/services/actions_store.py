@@ -6,9 +6,9 @@ import logging
 import sqlite3
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from threading import RLock
 
 from portainer_dashboard.config import get_settings
+from portainer_dashboard.core.sqlite_pool import get_pool
 from portainer_dashboard.models.remediation import (
     ActionHistory,
     ActionStatus,
@@ -24,63 +24,52 @@ class SQLiteActionsStore:
 
     def __init__(self, database_path: Path) -> None:
         self._database_path = database_path
-        self._lock = RLock()
+        self._pool = get_pool(database_path)
         self._initialise()
 
-    def _connect(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(
-            self._database_path,
-            detect_types=sqlite3.PARSE_DECLTYPES,
-            check_same_thread=False,
-        )
-        connection.row_factory = sqlite3.Row
-        return connection
-
     def _initialise(self) -> None:
-        with self._lock:
-            self._database_path.parent.mkdir(parents=True, exist_ok=True)
-            with self._connect() as connection:
-                connection.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS actions (
-                        id TEXT PRIMARY KEY,
-                        created_at TEXT NOT NULL,
-                        insight_id TEXT,
-                        insight_title TEXT,
-                        insight_severity TEXT,
-                        action_type TEXT NOT NULL,
-                        target_endpoint_id INTEGER NOT NULL,
-                        target_endpoint_name TEXT,
-                        target_container_id TEXT NOT NULL,
-                        target_container_name TEXT NOT NULL,
-                        status TEXT NOT NULL,
-                        approved_by TEXT,
-                        approved_at TEXT,
-                        rejected_by TEXT,
-                        rejected_at TEXT,
-                        rejection_reason TEXT,
-                        executed_at TEXT,
-                        execution_result TEXT,
-                        error_message TEXT,
-                        title TEXT NOT NULL,
-                        description TEXT NOT NULL,
-                        rationale TEXT NOT NULL
-                    )
-                    """
-                )
-                connection.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_actions_status
-                    ON actions (status)
-                    """
-                )
-                connection.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_actions_created
-                    ON actions (created_at DESC)
-                    """
+        with self._pool.connection() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS actions (
+                    id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    insight_id TEXT,
+                    insight_title TEXT,
+                    insight_severity TEXT,
+                    action_type TEXT NOT NULL,
+                    target_endpoint_id INTEGER NOT NULL,
+                    target_endpoint_name TEXT,
+                    target_container_id TEXT NOT NULL,
+                    target_container_name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    approved_by TEXT,
+                    approved_at TEXT,
+                    rejected_by TEXT,
+                    rejected_at TEXT,
+                    rejection_reason TEXT,
+                    executed_at TEXT,
+                    execution_result TEXT,
+                    error_message TEXT,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    rationale TEXT NOT NULL
                 )
-                connection.commit()
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_actions_status
+                ON actions (status)
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_actions_created
+                ON actions (created_at DESC)
+                """
+            )
+            connection.commit()
             LOGGER.info("Actions store initialized at %s", self._database_path)
 
     @staticmethod
@@ -124,7 +113,7 @@ class SQLiteActionsStore:
 
     def create_action(self, action: RemediationAction) -> None:
         """Create a new remediation action (status defaults to PENDING)."""
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             connection.execute(
                 """
                 INSERT INTO actions (
@@ -166,7 +155,7 @@ class SQLiteActionsStore:
 
     def get_action(self, action_id: str) -> RemediationAction | None:
         """Get a specific action by ID."""
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(
                 "SELECT * FROM actions WHERE id = ?",
                 (action_id,),
@@ -178,7 +167,7 @@ class SQLiteActionsStore:
 
     def get_pending_actions(self, limit: int = 100) -> list[RemediationAction]:
         """Get all pending actions awaiting user approval."""
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(
                 """
                 SELECT * FROM actions
@@ -192,7 +181,7 @@ class SQLiteActionsStore:
 
     def get_approved_actions(self, limit: int = 100) -> list[RemediationAction]:
         """Get approved actions ready to execute."""
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(
                 """
                 SELECT * FROM actions
@@ -222,7 +211,7 @@ class SQLiteActionsStore:
         query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(query, params)
             return [self._row_to_action(row) for row in cursor.fetchall()]
 
@@ -230,7 +219,7 @@ class SQLiteActionsStore:
         """Approve an action (does NOT execute it)."""
         now = datetime.now(timezone.utc)
 
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             cursor = connection.execute(
                 """
                 UPDATE actions
@@ -258,7 +247,7 @@ class SQLiteActionsStore:
         """Reject an action."""
         now = datetime.now(timezone.utc)
 
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             cursor = connection.execute(
                 """
                 UPDATE actions
@@ -283,7 +272,7 @@ class SQLiteActionsStore:
 
     def mark_executing(self, action_id: str) -> bool:
         """Mark an approved action as executing."""
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             cursor = connection.execute(
                 """
                 UPDATE actions
@@ -306,7 +295,7 @@ class SQLiteActionsStore:
         now = datetime.now(timezone.utc)
         status = ActionStatus.FAILED if error else ActionStatus.EXECUTED
 
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             cursor = connection.execute(
                 """
                 UPDATE actions
@@ -334,7 +323,7 @@ class SQLiteActionsStore:
         now = datetime.now(timezone.utc)
         cutoff_24h = now - timedelta(hours=24)
 
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute("SELECT COUNT(*) FROM actions")
             total = cursor.fetchone()[0]
 
@@ -395,7 +384,7 @@ class SQLiteActionsStore:
         action_type: ActionType,
     ) -> bool:
         """Check if a pending action already exists for this container and type."""
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(
                 """
                 SELECT COUNT(*) FROM actions
@@ -416,7 +405,7 @@ class SQLiteActionsStore:
         """Remove actions older than the specified days."""
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
-        with self._lock, self._connect() as connection:
+        with self._pool.connection() as connection:
             # Only delete completed actions (executed, failed, rejected)
             cursor = connection.execute(
                 """
@@ -1,16 +1,47 @@
-"""Z-score based anomaly detection for container metrics."""
+"""Streaming anomaly detection for container metrics.
+
+Each metric type is scored by a pluggable online detector that keeps
+constant-size state per series:
+
+- ``zscore``: z-score against a rolling window of the last N samples.
+- ``ewma``: exponentially weighted moving mean and variance (EWMA/EWMV).
+- ``seasonal``: EWMA baselines per hour-of-week bucket, for diurnal and
+  weekly workloads.
+- ``rate``: converts cumulative byte counters to per-second rates (with
+  counter reset detection) and scores the rate with EWMA.
+"""
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
-
-from portainer_dashboard.config import get_settings
+import math
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import ClassVar, Generic, NamedTuple, TypeVar
+
+import numpy as np
+
+from portainer_dashboard.config import MetricsSettings, get_settings
+from portainer_dashboard.core.store_executor import run_read
 from portainer_dashboard.models.metrics import AnomalyDetection, ContainerMetric, MetricType
 from portainer_dashboard.services.metrics_store import SQLiteMetricsStore, get_metrics_store
+from portainer_dashboard.services.rolling_window import RollingWindowRegistry
 
 LOGGER = logging.getLogger(__name__)
 
+SeriesKey = tuple[str, MetricType]
+
+_StateT = TypeVar("_StateT")
+
+# Upper bound on per-detector series state before LRU eviction
+_DEFAULT_MAX_SERIES = 100_000
+
+# Hour-of-week buckets used by the seasonal detector
+_HOURS_PER_WEEK = 7 * 24
+
 
 def _calculate_zscore(value: float, mean: float, std_dev: float) -> float:
     """Calculate the z-score for a value.
@@ -24,33 +55,413 @@ def _calculate_zscore(value: float, mean: float, std_dev: float) -> float:
     return (value - mean) / std_dev
 
 
-def _calculate_statistics(values: list[float]) -> tuple[float, float]:
-    """Calculate mean and standard deviation from a list of values.
+class DetectorScore(NamedTuple):
+    """Score for one sample produced by a streaming detector."""
+
+    observed: float
+    expected: float
+    zscore: float
+
+
+class _SeriesStates(Generic[_StateT]):
+    """LRU-bounded mapping of series key to detector state."""
+
+    def __init__(self, factory: Callable[[], _StateT], max_series: int) -> None:
+        self._factory = factory
+        self._max_series = max_series
+        self._states: OrderedDict[SeriesKey, _StateT] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, key: SeriesKey) -> _StateT:
+        state = self._states.get(key)
+        if state is None:
+            state = self._factory()
+            self._states[key] = state
+            if len(self._states) > self._max_series:
+                self._states.popitem(last=False)
+        else:
+            self._states.move_to_end(key)
+        return state
+
+
+class _EwmaState:
+    """Exponentially weighted mean and variance of a series."""
+
+    __slots__ = ("mean", "variance", "count")
+
+    def __init__(self) -> None:
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def score(self, value: float) -> float:
+        return _calculate_zscore(value, self.mean, math.sqrt(self.variance))
+
+    def update(self, value: float, alpha: float) -> None:
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = alpha * diff
+            self.mean += increment
+            self.variance = (1 - alpha) * (self.variance + diff * increment)
+        self.count += 1
+
+
+class _RateState:
+    """Last seen counter sample plus EWMA statistics of the derived rate."""
+
+    __slots__ = ("last_value", "last_timestamp", "ewma")
+
+    def __init__(self) -> None:
+        self.last_value: float | None = None
+        self.last_timestamp: datetime | None = None
+        self.ewma = _EwmaState()
+
+
+class StreamingDetector(ABC):
+    """Online anomaly detector keeping constant-size state per series.
+
+    Implementations score a sample against the series state *before*
+    absorbing it, so a spike is judged against the preceding history.
+    """
+
+    name: ClassVar[str]
+
+    def __init__(self, *, min_samples: int) -> None:
+        self.min_samples = min_samples
+
+    @property
+    @abstractmethod
+    def history_size(self) -> int:
+        """Number of trailing samples per series needed to warm up state."""
+
+    @property
+    @abstractmethod
+    def tracked_series(self) -> int:
+        """Number of series with detector state."""
+
+    @abstractmethod
+    def update(self, key: SeriesKey, value: float, timestamp: datetime) -> DetectorScore | None:
+        """Score a sample and absorb it into the series state.
+
+        Returns:
+            The score, or None while the series is still warming up.
+        """
+
+    def score_batch(
+        self,
+        keys: Sequence[SeriesKey],
+        values: np.ndarray,
+        timestamps: Sequence[datetime],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Score a batch of samples.
+
+        Returns:
+            Arrays of (observed, expected, zscore, scored) where ``scored``
+            marks samples that produced a score.
+        """
+        size = len(keys)
+        observed = values.astype(np.float64, copy=True)
+        expected = np.zeros(size)
+        zscores = np.zeros(size)
+        scored = np.zeros(size, dtype=bool)
+        for index, (key, timestamp) in enumerate(zip(keys, timestamps)):
+            result = self.update(key, float(values[index]), timestamp)
+            if result is not None:
+                observed[index], expected[index], zscores[index] = result
+                scored[index] = True
+        return observed, expected, zscores, scored
+
+    def hydrate(self, series: dict[SeriesKey, list[tuple[datetime, float]]]) -> None:
+        """Warm up state from historical samples in chronological order."""
+        for key, samples in series.items():
+            for timestamp, value in samples:
+                self.update(key, value, timestamp)
+
+
+class ZScoreDetector(StreamingDetector):
+    """Z-score against an in-memory rolling window of the last N samples."""
+
+    name = "zscore"
+
+    def __init__(
+        self,
+        *,
+        window: int,
+        min_samples: int,
+        max_series: int = _DEFAULT_MAX_SERIES,
+    ) -> None:
+        super().__init__(min_samples=min_samples)
+        self._windows = RollingWindowRegistry(window, max_series=max_series)
+
+    @property
+    def history_size(self) -> int:
+        return self._windows.capacity
+
+    @property
+    def tracked_series(self) -> int:
+        return len(self._windows)
+
+    def update(self, key: SeriesKey, value: float, timestamp: datetime) -> DetectorScore | None:
+        window = self._windows.get(key)
+        if window is None or window.count < self.min_samples:
+            self._windows.push(key, value)
+            return None
+        mean, std_dev = window.mean, window.std_dev
+        self._windows.push(key, value)
+        return DetectorScore(value, mean, _calculate_zscore(value, mean, std_dev))
+
+    def score_batch(
+        self,
+        keys: Sequence[SeriesKey],
+        values: np.ndarray,
+        timestamps: Sequence[datetime],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        size = len(keys)
+        means = np.zeros(size)
+        std_devs = np.zeros(size)
+        counts = np.zeros(size, dtype=np.int64)
+
+        for index, key in enumerate(keys):
+            window = self._windows.get(key)
+            if window is not None:
+                means[index] = window.mean
+                std_devs[index] = window.std_dev
+                counts[index] = window.count
+
+        for key, value in zip(keys, values.tolist()):
+            self._windows.push(key, value)
+
+        zscores = np.divide(
+            values - means,
+            std_devs,
+            out=np.zeros(size),
+            where=std_devs > 0,
+        )
+        return values, means, zscores, counts >= self.min_samples
+
+    def hydrate(self, series: dict[SeriesKey, list[tuple[datetime, float]]]) -> None:
+        self._windows.hydrate({key: [v for _, v in samples] for key, samples in series.items()})
+
+
+class EWMADetector(StreamingDetector):
+    """Z-score against an exponentially weighted moving mean and variance."""
+
+    name = "ewma"
+
+    def __init__(
+        self,
+        *,
+        alpha: float,
+        min_samples: int,
+        max_series: int = _DEFAULT_MAX_SERIES,
+    ) -> None:
+        super().__init__(min_samples=min_samples)
+        self.alpha = alpha
+        self._states: _SeriesStates[_EwmaState] = _SeriesStates(_EwmaState, max_series)
+
+    @property
+    def history_size(self) -> int:
+        # Enough samples for the initial value's weight to decay below ~1%
+        return max(self.min_samples, math.ceil(5 / self.alpha))
+
+    @property
+    def tracked_series(self) -> int:
+        return len(self._states)
+
+    def update(self, key: SeriesKey, value: float, timestamp: datetime) -> DetectorScore | None:
+        state = self._states.get(key)
+        result = None
+        if state.count >= self.min_samples:
+            result = DetectorScore(value, state.mean, state.score(value))
+        state.update(value, self.alpha)
+        return result
+
+
+class SeasonalDetector(StreamingDetector):
+    """EWMA baselines per hour-of-week bucket.
+
+    Each series keeps mean, variance and count for all 168 hour-of-week
+    buckets in one ``array('d')``, so a value at Monday 09:00 is compared to
+    previous Mondays at 09:00 rather than to the quiet night before.
+    """
+
+    name = "seasonal"
+
+    def __init__(
+        self,
+        *,
+        alpha: float,
+        min_samples: int,
+        history_size: int,
+        max_series: int = _DEFAULT_MAX_SERIES,
+    ) -> None:
+        super().__init__(min_samples=min_samples)
+        self.alpha = alpha
+        self._history_size = history_size
+        self._states: _SeriesStates[array[float]] = _SeriesStates(
+            lambda: array("d", bytes(8 * 3 * _HOURS_PER_WEEK)), max_series
+        )
+
+    @property
+    def history_size(self) -> int:
+        return self._history_size
+
+    @property
+    def tracked_series(self) -> int:
+        return len(self._states)
+
+    @staticmethod
+    def _bucket(timestamp: datetime) -> int:
+        utc = timestamp.astimezone(timezone.utc)
+        return utc.weekday() * 24 + utc.hour
+
+    def update(self, key: SeriesKey, value: float, timestamp: datetime) -> DetectorScore | None:
+        state = self._states.get(key)
+        offset = self._bucket(timestamp) * 3
+        mean, variance, count = state[offset], state[offset + 1], state[offset + 2]
+
+        result = None
+        if count >= self.min_samples:
+            result = DetectorScore(
+                value, mean, _calculate_zscore(value, mean, math.sqrt(variance))
+            )
+
+        if count == 0:
+            mean = value
+        else:
+            diff = value - mean
+            increment = self.alpha * diff
+            mean += increment
+            variance = (1 - self.alpha) * (variance + diff * increment)
+        state[offset], state[offset + 1], state[offset + 2] = mean, variance, count + 1
+        return result
+
+
+class RateOfChangeDetector(StreamingDetector):
+    """EWMA detector on the per-second rate of a cumulative counter.
 
-    Returns:
-        Tuple of (mean, std_dev)
+    A counter that goes backwards (e.g. after a container restart) is
+    treated as a reset: the series is re-baselined and not scored.
     """
-    if not values:
-        return 0.0, 0.0
 
-    n = len(values)
-    mean = sum(values) / n
+    name = "rate"
+
+    def __init__(
+        self,
+        *,
+        alpha: float,
+        min_samples: int,
+        max_series: int = _DEFAULT_MAX_SERIES,
+    ) -> None:
+        super().__init__(min_samples=min_samples)
+        self.alpha = alpha
+        self._states: _SeriesStates[_RateState] = _SeriesStates(_RateState, max_series)
+
+    @property
+    def history_size(self) -> int:
+        return max(self.min_samples, math.ceil(5 / self.alpha)) + 1
+
+    @property
+    def tracked_series(self) -> int:
+        return len(self._states)
+
+    def update(self, key: SeriesKey, value: float, timestamp: datetime) -> DetectorScore | None:
+        state = self._states.get(key)
+        last_value, last_timestamp = state.last_value, state.last_timestamp
+        state.last_value, state.last_timestamp = value, timestamp
+
+        if last_value is None or last_timestamp is None or value < last_value:
+            return None
+        elapsed = (timestamp - last_timestamp).total_seconds()
+        if elapsed <= 0:
+            return None
+
+        rate = (value - last_value) / elapsed
+        ewma = state.ewma
+        result = None
+        if ewma.count >= self.min_samples:
+            result = DetectorScore(rate, ewma.mean, ewma.score(rate))
+        ewma.update(rate, self.alpha)
+        return result
+
+
+DETECTOR_NAMES: tuple[str, ...] = (
+    ZScoreDetector.name,
+    EWMADetector.name,
+    SeasonalDetector.name,
+    RateOfChangeDetector.name,
+)
+
+
+def create_detector(name: str, settings: MetricsSettings) -> StreamingDetector:
+    """Create a streaming detector by name using the metrics settings."""
+    if name == ZScoreDetector.name:
+        return ZScoreDetector(
+            window=settings.moving_average_window,
+            min_samples=settings.min_samples_for_detection,
+        )
+    if name == EWMADetector.name:
+        return EWMADetector(
+            alpha=settings.ewma_alpha,
+            min_samples=settings.min_samples_for_detection,
+        )
+    if name == SeasonalDetector.name:
+        return SeasonalDetector(
+            alpha=settings.ewma_alpha,
+            min_samples=settings.min_samples_for_detection,
+            history_size=settings.seasonal_history_samples,
+        )
+    if name == RateOfChangeDetector.name:
+        return RateOfChangeDetector(
+            alpha=settings.ewma_alpha,
+            min_samples=settings.min_samples_for_detection,
+        )
+    raise ValueError(f"Unknown anomaly detector: {name}")
 
-    if n < 2:
-        return mean, 0.0
 
-    variance = sum((v - mean) ** 2 for v in values) / n
-    std_dev = variance**0.5
+def create_detectors(settings: MetricsSettings) -> dict[MetricType, StreamingDetector]:
+    """Create one detector per configured metric type.
 
-    return mean, std_dev
+    Invalid metric types or detector names are logged and skipped.
+    """
+    detectors: dict[MetricType, StreamingDetector] = {}
+    for metric_name, detector_name in settings.detector_map.items():
+        try:
+            metric_type = MetricType(metric_name)
+            detectors[metric_type] = create_detector(detector_name, settings)
+        except ValueError as exc:
+            LOGGER.warning(
+                "Ignoring anomaly detector mapping %s=%s: %s",
+                metric_name,
+                detector_name,
+                exc,
+            )
+    return detectors
 
 
 class AnomalyDetector:
-    """Z-score based anomaly detector for container metrics."""
+    """Anomaly detector for container metrics.
+
+    Dispatches each metric type to its configured streaming detector. All
+    detector state lives in memory, so scoring a metric needs no database
+    round trip. Call :meth:`hydrate` once at startup to warm the detectors
+    up from the metrics store.
+    """
 
-    def __init__(self, metrics_store: SQLiteMetricsStore) -> None:
+    def __init__(
+        self,
+        metrics_store: SQLiteMetricsStore,
+        detectors: dict[MetricType, StreamingDetector] | None = None,
+    ) -> None:
         self._metrics_store = metrics_store
         self._settings = get_settings()
+        if detectors is None:
+            detectors = create_detectors(self._settings.metrics)
+        self._detectors = detectors
 
     @property
     def zscore_threshold(self) -> float:
@@ -67,73 +478,115 @@ class AnomalyDetector:
         """Get the minimum number of samples required for detection."""
         return self._settings.metrics.min_samples_for_detection
 
-    def detect_anomaly(
-        self,
-        metric: ContainerMetric,
-    ) -> AnomalyDetection | None:
-        """Detect if a metric value is anomalous based on historical data.
+    @property
+    def analyzed_metric_types(self) -> tuple[MetricType, ...]:
+        """Get the metric types that have a detector configured."""
+        return tuple(self._detectors)
+
+    @property
+    def tracked_series(self) -> int:
+        """Get the number of series with in-memory detector state."""
+        return sum(d.tracked_series for d in self._detectors.values())
 
-        Uses z-score: if the current value deviates more than threshold
-        standard deviations from the historical mean, it's flagged as anomalous.
+    def hydrate(self) -> int:
+        """Warm up detector state with recent history from the metrics store.
 
         Returns:
-            AnomalyDetection if analysis was performed, None if insufficient data.
+            Number of series loaded.
         """
-        if not self._settings.metrics.anomaly_detection_enabled:
-            return None
-
-        # Get historical values for this container/metric
-        historical_values = self._metrics_store.get_recent_values(
-            metric.container_id,
-            metric.metric_type,
-            count=self.moving_average_window,
+        start_time = datetime.now(timezone.utc) - timedelta(
+            hours=self._settings.metrics.retention_hours
         )
 
-        # Need minimum samples for meaningful detection
-        if len(historical_values) < self.min_samples:
-            LOGGER.debug(
-                "Insufficient samples for %s/%s: %d < %d",
-                metric.container_name,
-                metric.metric_type.value,
-                len(historical_values),
-                self.min_samples,
+        # One query per distinct history size rather than per metric type
+        by_history: dict[int, list[MetricType]] = {}
+        for metric_type, detector in self._detectors.items():
+            by_history.setdefault(detector.history_size, []).append(metric_type)
+
+        loaded = 0
+        for history_size, metric_types in by_history.items():
+            series = self._metrics_store.get_recent_values_by_series(
+                metric_types,
+                count=history_size,
+                start_time=start_time,
             )
-            return None
+            for metric_type in metric_types:
+                self._detectors[metric_type].hydrate(
+                    {key: samples for key, samples in series.items() if key[1] == metric_type}
+                )
+            loaded += len(series)
 
-        mean, std_dev = _calculate_statistics(historical_values)
-        zscore = _calculate_zscore(metric.value, mean, std_dev)
-        is_anomaly = abs(zscore) > self.zscore_threshold
+        LOGGER.info("Hydrated anomaly detector with %d series", loaded)
+        return loaded
 
-        # Determine direction
-        if zscore > self.zscore_threshold:
+    def _build_detection(
+        self,
+        metric: ContainerMetric,
+        score: DetectorScore,
+    ) -> AnomalyDetection:
+        threshold = self.zscore_threshold
+        if score.zscore > threshold:
             direction = "high"
-        elif zscore < -self.zscore_threshold:
+        elif score.zscore < -threshold:
             direction = "low"
         else:
             direction = "normal"
 
-        anomaly = AnomalyDetection(
+        return AnomalyDetection(
             timestamp=metric.timestamp,
             endpoint_id=metric.endpoint_id,
             endpoint_name=metric.endpoint_name,
             container_id=metric.container_id,
             container_name=metric.container_name,
             metric_type=metric.metric_type,
-            current_value=metric.value,
-            expected_value=mean,
-            zscore=zscore,
-            is_anomaly=is_anomaly,
+            current_value=score.observed,
+            expected_value=score.expected,
+            zscore=score.zscore,
+            is_anomaly=abs(score.zscore) > threshold,
             direction=direction,
         )
 
-        if is_anomaly:
+    def detect_anomaly(
+        self,
+        metric: ContainerMetric,
+    ) -> AnomalyDetection | None:
+        """Detect if a metric value is anomalous based on historical data.
+
+        The metric type's detector scores the value as a z-score against
+        its baseline; deviations beyond the threshold are flagged.
+
+        Returns:
+            AnomalyDetection if analysis was performed, None if the metric
+            type has no detector or there is insufficient data.
+        """
+        if not self._settings.metrics.anomaly_detection_enabled:
+            return None
+
+        detector = self._detectors.get(metric.metric_type)
+        if detector is None:
+            return None
+
+        score = detector.update(
+            (metric.container_id, metric.metric_type), metric.value, metric.timestamp
+        )
+        if score is None:
+            LOGGER.debug(
+                "Insufficient samples for %s/%s",
+                metric.container_name,
+                metric.metric_type.value,
+            )
+            return None
+
+        anomaly = self._build_detection(metric, score)
+
+        if anomaly.is_anomaly:
             LOGGER.info(
                 "Anomaly detected: %s/%s value=%.2f expected=%.2f zscore=%.2f",
                 metric.container_name,
                 metric.metric_type.value,
-                metric.value,
-                mean,
-                zscore,
+                anomaly.current_value,
+                anomaly.expected_value,
+                anomaly.zscore,
             )
             self._metrics_store.store_anomaly(anomaly)
 
@@ -142,23 +595,80 @@ class AnomalyDetector:
     def analyze_metrics_batch(
         self,
         metrics: list[ContainerMetric],
+        *,
+        only_anomalies: bool = False,
     ) -> list[AnomalyDetection]:
         """Analyze a batch of metrics for anomalies.
 
+        Each detector scores its share of the batch in one call (the z-score
+        detector fully vectorised with NumPy), thresholds are applied to the
+        whole batch at once, and all anomalies are persisted with a single
+        batched insert.
+
+        Args:
+            metrics: Freshly collected metrics.
+            only_anomalies: If True, only build results for anomalous values.
+
         Returns:
-            List of anomaly detections (including non-anomalous results).
+            List of anomaly detections (including non-anomalous results
+            unless ``only_anomalies`` is set).
         """
+        if not self._settings.metrics.anomaly_detection_enabled:
+            return []
+
+        # Only analyze metric types that have a detector
+        candidates = [m for m in metrics if m.metric_type in self._detectors]
+        if not candidates:
+            return []
+
+        size = len(candidates)
+        observed = np.zeros(size)
+        expected = np.zeros(size)
+        zscores = np.zeros(size)
+        scored = np.zeros(size, dtype=bool)
+
+        groups: dict[MetricType, list[int]] = {}
+        for index, metric in enumerate(candidates):
+            groups.setdefault(metric.metric_type, []).append(index)
+
+        for metric_type, indices in groups.items():
+            group = [candidates[i] for i in indices]
+            positions = np.asarray(indices)
+            (
+                observed[positions],
+                expected[positions],
+                zscores[positions],
+                scored[positions],
+            ) = self._detectors[metric_type].score_batch(
+                [(m.container_id, m.metric_type) for m in group],
+                np.fromiter((m.value for m in group), dtype=np.float64, count=len(group)),
+                [m.timestamp for m in group],
+            )
+
+        threshold = self.zscore_threshold
+        flagged = scored & (np.abs(zscores) > threshold)
+        selected = np.flatnonzero(flagged if only_anomalies else scored)
+
         results: list[AnomalyDetection] = []
+        anomalies: list[AnomalyDetection] = []
+        for index in selected.tolist():
+            detection = self._build_detection(
+                candidates[index],
+                DetectorScore(
+                    float(observed[index]), float(expected[index]), float(zscores[index])
+                ),
+            )
+            results.append(detection)
+            if detection.is_anomaly:
+                anomalies.append(detection)
 
-        for metric in metrics:
-            # Only analyze certain metric types for anomalies
-            if metric.metric_type in (
-                MetricType.CPU_PERCENT,
-                MetricType.MEMORY_PERCENT,
-            ):
-                result = self.detect_anomaly(metric)
-                if result:
-                    results.append(result)
+        if anomalies:
+            self._metrics_store.store_anomalies_batch(anomalies)
+            LOGGER.info(
+                "Detected %d anomalies in batch of %d metrics",
+                len(anomalies),
+                size,
+            )
 
         return results
 
@@ -205,12 +715,27 @@ class AnomalyDetector:
 
 
 async def create_anomaly_detector() -> AnomalyDetector:
-    """Create an anomaly detector with the configured store."""
+    """Create an anomaly detector with the configured store.
+
+    The detector's rolling windows are hydrated from SQLite before it is
+    returned.
+    """
     store = await get_metrics_store()
-    return AnomalyDetector(store)
+    detector = AnomalyDetector(store)
+    await run_read(detector.hydrate)
+    return detector
 
 
 __all__ = [
     "AnomalyDetector",
+    "DETECTOR_NAMES",
+    "DetectorScore",
+    "EWMADetector",
+    "RateOfChangeDetector",
+    "SeasonalDetector",
+    "StreamingDetector",
+    "ZScoreDetector",
     "create_anomaly_detector",
+    "create_detector",
+    "create_detectors",
 ]
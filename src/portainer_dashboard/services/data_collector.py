@@ -3,23 +3,32 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
-from dataclasses import dataclass
+import os
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from pathlib import Path
 
-from portainer_dashboard.config import get_settings
+from portainer_dashboard.config import PortainerEnvironmentSettings, get_settings
+from portainer_dashboard.models.metrics import ContainerMetric
 from portainer_dashboard.models.monitoring import (
     ContainerCapabilities,
     ContainerLogs,
     ImageStatus,
     InfrastructureSnapshot,
 )
+from portainer_dashboard.services.log_cursors import LogCursorStore
+from portainer_dashboard.services.log_templates import LogTemplateStore
+from portainer_dashboard.services.metrics_collector import MetricsCollector, _container_stack
 from portainer_dashboard.services.portainer_client import (
     AsyncPortainerClient,
     PortainerAPIError,
     _determine_edge_agent_status,
     create_portainer_client,
-    normalise_endpoint_containers,
+    group_stacks_by_endpoint,
     normalise_endpoint_metadata,
 )
 from portainer_dashboard.services.security_scanner import (
@@ -78,6 +87,230 @@ def _is_problematic_container(container: dict) -> tuple[bool, str, int | None]:
     return False, "", None
 
 
+# Registry comparisons are slow and count against pull quotas, so they are
+# cached per stack and repeated only when the TTL expires or the images the
+# stack runs change.
+_IMAGE_STATUS_CACHE_FILE = "image_status_cache.json"
+_IMAGE_STATUS_CACHE_VERSION = 1
+_DEFAULT_IMAGE_STATUS_TTL_SECONDS = 6 * 3600
+
+# Stacks never checked before that a snapshot checks itself, per environment,
+# so a fresh cache does not report every stack as up to date
+_MAX_SNAPSHOT_IMAGE_CHECKS = 10
+
+
+@dataclass(frozen=True)
+class StackImageRef:
+    """A stack seen in the latest snapshot and the image digests it runs."""
+
+    environment: str
+    stack_id: int
+    stack_name: str | None
+    endpoint_id: int
+    endpoint_name: str | None
+    digests: tuple[str, ...]
+
+
+class ImageStatusCache:
+    """Image update status per stack, keyed by the image digests it runs.
+
+    Snapshots :meth:`observe` the stacks of each environment and read results
+    with :meth:`get`, which only answers from a comparison made for the
+    stack's current digests. A background job re-checks the stacks returned
+    by :meth:`due`. With a ``path``, results are persisted as JSON so a
+    restart does not query every registry again.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl_seconds: float = _DEFAULT_IMAGE_STATUS_TTL_SECONDS,
+    ):
+        self._path = path
+        self._ttl_seconds = ttl_seconds
+        self._entries: dict[tuple[str, int], tuple[tuple[str, ...], float, list[ImageStatus]]] = {}
+        self._observed: dict[str, dict[int, StackImageRef]] = {}
+        self._dirty = False
+        # Serialises writers of the cache file, which may run on worker threads
+        self._save_lock = threading.Lock()
+        if path is not None:
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def observe(self, environment: str, refs: list[StackImageRef]) -> None:
+        """Record the stacks of an environment, forgetting ones that are gone."""
+        observed = {ref.stack_id: ref for ref in refs}
+        self._observed[environment] = observed
+        for key in [k for k in self._entries if k[0] == environment and k[1] not in observed]:
+            del self._entries[key]
+            self._dirty = True
+
+    def was_checked(self, ref: StackImageRef) -> bool:
+        """Check whether the stack has a result, whatever digests it was made for."""
+        return (ref.environment, ref.stack_id) in self._entries
+
+    def get(self, ref: StackImageRef) -> list[ImageStatus] | None:
+        """Return the outdated images of a stack, or None when not checked yet."""
+        entry = self._entries.get((ref.environment, ref.stack_id))
+        if entry is None or entry[0] != ref.digests:
+            return None
+        return entry[2]
+
+    def put(
+        self,
+        ref: StackImageRef,
+        outdated_images: list[ImageStatus],
+        checked_at: float | None = None,
+    ) -> None:
+        """Store the result of a registry comparison made for ``ref``."""
+        checked_at = time.time() if checked_at is None else checked_at
+        self._entries[(ref.environment, ref.stack_id)] = (
+            ref.digests,
+            checked_at,
+            outdated_images,
+        )
+        self._dirty = True
+
+    def due(self, now: float | None = None) -> list[StackImageRef]:
+        """Return observed stacks never checked, checked too long ago, or changed since."""
+        now = time.time() if now is None else now
+        due: list[StackImageRef] = []
+        for refs in self._observed.values():
+            for ref in refs.values():
+                entry = self._entries.get((ref.environment, ref.stack_id))
+                if (
+                    entry is None
+                    or entry[0] != ref.digests
+                    or now - entry[1] >= self._ttl_seconds
+                ):
+                    due.append(ref)
+        return due
+
+    def save(self) -> None:
+        """Persist the cache if it changed since the last save."""
+        if self._path is None or not self._dirty:
+            return
+        self._dirty = False
+        if not self._write(self._path, list(self._entries.items())):
+            self._dirty = True
+
+    async def save_async(self) -> None:
+        """Persist the cache like :meth:`save`, writing the file on a worker thread.
+
+        The entries are copied on the calling thread, so the cache can be
+        used while the file is written.
+        """
+        if self._path is None or not self._dirty:
+            return
+        self._dirty = False
+        if not await asyncio.to_thread(self._write, self._path, list(self._entries.items())):
+            self._dirty = True
+
+    def _write(
+        self,
+        path: Path,
+        entries: list[tuple[tuple[str, int], tuple[tuple[str, ...], float, list[ImageStatus]]]],
+    ) -> bool:
+        payload = {
+            "version": _IMAGE_STATUS_CACHE_VERSION,
+            "entries": [
+                [
+                    environment,
+                    stack_id,
+                    list(digests),
+                    checked_at,
+                    [image.model_dump() for image in images],
+                ]
+                for (environment, stack_id), (digests, checked_at, images) in entries
+            ],
+        }
+        temporary = path.with_suffix(".tmp")
+        try:
+            with self._save_lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temporary.write_text(json.dumps(payload), "utf-8")
+                os.replace(temporary, path)
+        except OSError as exc:
+            LOGGER.warning("Unable to persist image status cache %s: %s", path, exc)
+            return False
+        return True
+
+    def _load(self, path: Path) -> None:
+        try:
+            data = json.loads(path.read_text("utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("Ignoring unreadable image status cache %s: %s", path, exc)
+            return
+        if not isinstance(data, dict) or data.get("version") != _IMAGE_STATUS_CACHE_VERSION:
+            return
+        for entry in data.get("entries") or []:
+            try:
+                environment, stack_id, digests, checked_at, images = entry
+                outdated_images = [ImageStatus.model_validate(image) for image in images]
+            except (TypeError, ValueError):
+                continue
+            self._entries[(str(environment), int(stack_id))] = (
+                tuple(digests),
+                float(checked_at),
+                outdated_images,
+            )
+
+
+def _outdated_images(
+    image_status: object,
+    stack_id: int,
+    stack_name: str | None,
+    endpoint_id: int,
+    endpoint_name: str | None,
+) -> list[ImageStatus]:
+    """Return the outdated images listed in a stack image status payload."""
+    if isinstance(image_status, dict):
+        status_items = image_status.get("Status") or image_status.get("status") or []
+    else:
+        status_items = image_status
+    if not isinstance(status_items, list):
+        return []
+
+    outdated_images: list[ImageStatus] = []
+    for item in status_items:
+        if not isinstance(item, dict):
+            continue
+        outdated = item.get("Outdated", False) or item.get("outdated", False)
+        if outdated:
+            outdated_images.append(
+                ImageStatus(
+                    stack_id=stack_id,
+                    stack_name=stack_name,
+                    endpoint_id=endpoint_id,
+                    endpoint_name=endpoint_name,
+                    image_name=item.get("Image") or item.get("image") or "unknown",
+                    current_digest=item.get("CurrentDigest") or item.get("currentDigest"),
+                    latest_digest=item.get("LatestDigest") or item.get("latestDigest"),
+                    outdated=True,
+                )
+            )
+    return outdated_images
+
+
+@dataclass
+class EnvironmentSnapshot:
+    """Data collected from a single Portainer environment."""
+
+    endpoints_online: int = 0
+    endpoints_offline: int = 0
+    containers: list[dict] = field(default_factory=list)
+    security_issues: list[ContainerCapabilities] = field(default_factory=list)
+    outdated_images: list[ImageStatus] = field(default_factory=list)
+    container_logs: list[ContainerLogs] = field(default_factory=list)
+    endpoints: list[dict] = field(default_factory=list)
+    metrics: list[ContainerMetric] = field(default_factory=list)
+    complete: bool = True
+
+
 @dataclass
 class DataCollector:
     """Collects infrastructure data from Portainer for monitoring analysis."""
@@ -91,6 +324,10 @@ class DataCollector:
     log_fetch_timeout: float = 10.0
     max_endpoints_per_env: int = 50
     container_fetch_timeout: float = 60.0  # Increased from 30s to handle slow API responses
+    image_check_concurrency: int = 8
+    image_status_cache: ImageStatusCache = field(default_factory=ImageStatusCache)
+    log_cursors: LogCursorStore = field(default_factory=LogCursorStore)
+    log_templates: LogTemplateStore = field(default_factory=LogTemplateStore)
     excluded_containers: frozenset[str] = frozenset()
 
     async def collect_endpoint_data(
@@ -99,6 +336,27 @@ class DataCollector:
         endpoint: dict,
     ) -> tuple[list[dict], list[ContainerCapabilities]]:
         """Collect container data and security issues for a single endpoint."""
+        containers, security_issues, _, _ = await self._collect_endpoint(client, endpoint)
+        return containers, security_issues
+
+    async def _collect_endpoint(
+        self,
+        client: AsyncPortainerClient,
+        endpoint: dict,
+        metrics_collector: MetricsCollector | None = None,
+        *,
+        scan: bool = True,
+    ) -> tuple[list[dict], list[ContainerCapabilities], list[ContainerMetric], bool]:
+        """List an endpoint's containers once and feed them to every consumer.
+
+        The security scan and, with a ``metrics_collector``, the container
+        stats collection run concurrently on the same container list.
+
+        Returns:
+            Tuple of (containers, security issues, metrics, complete).
+            ``complete`` is False when the container listing or the stats of
+            a container could not be fetched.
+        """
         endpoint_id = int(endpoint.get("Id") or endpoint.get("id") or 0)
         endpoint_name = endpoint.get("Name") or endpoint.get("name")
         # Use _determine_edge_agent_status for proper edge agent detection
@@ -111,7 +369,7 @@ class DataCollector:
                 endpoint_name,
                 endpoint_status,
             )
-            return [], []
+            return [], [], [], True
 
         try:
             containers = await asyncio.wait_for(
@@ -124,15 +382,26 @@ class DataCollector:
                 endpoint_name,
                 exc,
             )
-            return [], []
+            return [], [], [], False
 
-        security_issues: list[ContainerCapabilities] = []
-        if self.include_security_scan:
-            security_issues = await self.security_scanner.scan_endpoint_containers(
+        async def scan_security() -> list[ContainerCapabilities]:
+            if not (scan and self.include_security_scan):
+                return []
+            return await self.security_scanner.scan_endpoint_containers(
                 client, endpoint_id, endpoint_name, containers
             )
 
-        return containers, security_issues
+        async def collect_metrics() -> tuple[list[ContainerMetric], bool]:
+            if metrics_collector is None:
+                return [], True
+            return await metrics_collector.collect_metrics_for_containers(
+                client, endpoint_id, endpoint_name, containers
+            )
+
+        security_issues, (metrics, complete) = await asyncio.gather(
+            scan_security(), collect_metrics()
+        )
+        return containers, security_issues, metrics, complete
 
     async def collect_container_logs(
         self,
@@ -143,7 +412,12 @@ class DataCollector:
         state_category: str,
         exit_code: int | None,
     ) -> ContainerLogs | None:
-        """Fetch logs for a single problematic container."""
+        """Fetch logs for a single problematic container.
+
+        Only lines written since the previous fetch are transferred; the
+        returned logs are the container's rolling buffer of recent lines,
+        and the new lines are added to the container's log templates.
+        """
         container_id = container.get("Id") or container.get("id") or ""
         names = container.get("Names") or []
         if isinstance(names, list) and names:
@@ -152,12 +426,9 @@ class DataCollector:
             container_name = container.get("Name") or container_id[:12]
 
         try:
-            logs = await asyncio.wait_for(
-                client.get_container_logs(
-                    endpoint_id,
-                    container_id,
-                    tail=self.log_tail_lines,
-                    timestamps=True,
+            log_tail = await asyncio.wait_for(
+                self.log_cursors.fetch(
+                    client, endpoint_id, container_id, tail=self.log_tail_lines
                 ),
                 timeout=self.log_fetch_timeout,
             )
@@ -170,11 +441,11 @@ class DataCollector:
             )
             return None
 
-        if not logs or not logs.strip():
+        if not log_tail.lines:
             return None
 
-        log_lines = logs.count("\n") + 1
-        truncated = log_lines >= self.log_tail_lines
+        new_lines = log_tail.lines[max(len(log_tail.lines) - log_tail.new_lines, 0) :]
+        templates = self.log_templates.add(endpoint_id, container_id, new_lines)
 
         return ContainerLogs(
             endpoint_id=endpoint_id,
@@ -183,9 +454,10 @@ class DataCollector:
             container_name=container_name,
             state=state_category,
             exit_code=exit_code,
-            logs=logs,
-            log_lines=log_lines,
-            truncated=truncated,
+            logs=log_tail.text,
+            log_lines=len(log_tail.lines),
+            truncated=log_tail.truncated,
+            templates=templates,
         )
 
     async def collect_endpoint_logs(
@@ -218,6 +490,10 @@ class DataCollector:
             is_problem, state_category, exit_code = _is_problematic_container(container)
             if is_problem:
                 problematic.append((container, state_category, exit_code))
+            else:
+                container_id = container.get("Id") or container.get("id") or ""
+                self.log_cursors.forget(endpoint_id, container_id)
+                self.log_templates.forget(endpoint_id, container_id)
 
         # Limit the number of containers we fetch logs for
         problematic = problematic[: self.max_containers_for_logs]
@@ -250,187 +526,399 @@ class DataCollector:
 
         return collected_logs
 
+    async def check_stack_images(
+        self,
+        client: AsyncPortainerClient,
+        stacks: list[tuple[int, str | None, int, str | None]],
+    ) -> list[list[ImageStatus] | None]:
+        """Compare stack images against their registries.
+
+        ``stacks`` holds ``(stack_id, stack_name, endpoint_id, endpoint_name)``
+        tuples. Checks run concurrently, at most ``image_check_concurrency`` at
+        a time. Returns the outdated images of each stack, or None for stacks
+        whose check failed.
+        """
+        semaphore = asyncio.Semaphore(max(self.image_check_concurrency, 1))
+
+        async def check(
+            stack_id: int, stack_name: str | None, endpoint_id: int, endpoint_name: str | None
+        ) -> list[ImageStatus] | None:
+            async with semaphore:
+                try:
+                    image_status = await client.get_stack_image_status(stack_id)
+                except PortainerAPIError as exc:
+                    LOGGER.debug(
+                        "Failed to get image status for stack %s: %s",
+                        stack_name,
+                        exc,
+                    )
+                    return None
+            return _outdated_images(image_status, stack_id, stack_name, endpoint_id, endpoint_name)
+
+        results = await asyncio.gather(
+            *(check(*stack) for stack in stacks), return_exceptions=True
+        )
+        checked: list[list[ImageStatus] | None] = []
+        for result in results:
+            if isinstance(result, Exception):
+                LOGGER.debug("Image status check failed: %s", result)
+                checked.append(None)
+            else:
+                checked.append(result)
+        return checked
+
     async def collect_image_status(
         self,
         client: AsyncPortainerClient,
         endpoints: list[dict],
         stacks_by_endpoint: dict[int, list[dict]],
     ) -> list[ImageStatus]:
-        """Collect image update status for all stacks."""
+        """Check image update status for all stacks against the registries.
+
+        Each stack is checked once, attributed to the first endpoint listing
+        it. Snapshots do not call this; they read :attr:`image_status_cache`,
+        which :meth:`refresh_image_status` keeps current.
+        """
         if not self.include_image_check:
             return []
 
-        outdated_images: list[ImageStatus] = []
+        stacks: list[tuple[int, str | None, int, str | None]] = []
         seen_stacks: set[int] = set()
 
         for endpoint in endpoints:
             endpoint_id = int(endpoint.get("Id") or endpoint.get("id") or 0)
             endpoint_name = endpoint.get("Name") or endpoint.get("name")
-            stacks = stacks_by_endpoint.get(endpoint_id, [])
 
-            for stack in stacks:
+            for stack in stacks_by_endpoint.get(endpoint_id, []):
                 stack_id = stack.get("Id") or stack.get("id")
                 if not stack_id or stack_id in seen_stacks:
                     continue
                 seen_stacks.add(stack_id)
-
                 stack_name = stack.get("Name") or stack.get("name")
+                stacks.append((stack_id, stack_name, endpoint_id, endpoint_name))
 
-                try:
-                    image_status = await client.get_stack_image_status(stack_id)
-                except PortainerAPIError as exc:
-                    LOGGER.debug(
-                        "Failed to get image status for stack %s: %s",
-                        stack_name,
-                        exc,
-                    )
-                    continue
+        results = await self.check_stack_images(client, stacks)
+        return [image for images in results if images for image in images]
 
-                if isinstance(image_status, dict):
-                    status_items = image_status.get("Status") or image_status.get("status") or []
-                    if isinstance(status_items, list):
-                        for item in status_items:
-                            if not isinstance(item, dict):
-                                continue
-                            outdated = item.get("Outdated", False) or item.get("outdated", False)
-                            if outdated:
-                                outdated_images.append(
-                                    ImageStatus(
-                                        stack_id=stack_id,
-                                        stack_name=stack_name,
-                                        endpoint_id=endpoint_id,
-                                        endpoint_name=endpoint_name,
-                                        image_name=item.get("Image") or item.get("image") or "unknown",
-                                        current_digest=item.get("CurrentDigest") or item.get("currentDigest"),
-                                        latest_digest=item.get("LatestDigest") or item.get("latestDigest"),
-                                        outdated=True,
-                                    )
-                                )
-                elif isinstance(image_status, list):
-                    for item in image_status:
-                        if not isinstance(item, dict):
-                            continue
-                        outdated = item.get("Outdated", False) or item.get("outdated", False)
-                        if outdated:
-                            outdated_images.append(
-                                ImageStatus(
-                                    stack_id=stack_id,
-                                    stack_name=stack_name,
-                                    endpoint_id=endpoint_id,
-                                    endpoint_name=endpoint_name,
-                                    image_name=item.get("Image") or item.get("image") or "unknown",
-                                    current_digest=item.get("CurrentDigest") or item.get("currentDigest"),
-                                    latest_digest=item.get("LatestDigest") or item.get("latestDigest"),
-                                    outdated=True,
-                                )
-                            )
-
-        return outdated_images
+    def _stack_image_refs(
+        self,
+        environment: str,
+        endpoints: list[dict],
+        stacks_by_endpoint: dict[int, list[dict]],
+        containers_by_endpoint: dict[int, list[dict]],
+    ) -> list[StackImageRef]:
+        """Describe each stack of an environment by the image IDs its containers run.
+
+        Stack names are only unique per endpoint, so image IDs are collected
+        per endpoint and stack name.
+        """
+        digests_by_stack: dict[tuple[int, str], set[str]] = {}
+        for endpoint_id, containers in containers_by_endpoint.items():
+            for container in containers:
+                stack_name = _container_stack(container)
+                image_id = container.get("ImageID")
+                if stack_name and image_id:
+                    digests_by_stack.setdefault((endpoint_id, stack_name), set()).add(
+                        str(image_id)
+                    )
 
-    async def collect_snapshot(self) -> InfrastructureSnapshot:
-        """Collect a complete infrastructure snapshot from all configured environments."""
-        settings = get_settings()
-        environments = settings.portainer.get_configured_environments()
+        refs: list[StackImageRef] = []
+        seen_stacks: set[int] = set()
+        for endpoint in endpoints:
+            endpoint_id = int(endpoint.get("Id") or endpoint.get("id") or 0)
+            endpoint_name = endpoint.get("Name") or endpoint.get("name")
+            for stack in stacks_by_endpoint.get(endpoint_id, []):
+                stack_id = stack.get("Id") or stack.get("id")
+                if not stack_id or stack_id in seen_stacks:
+                    continue
+                seen_stacks.add(stack_id)
+                stack_name = stack.get("Name") or stack.get("name")
+                refs.append(
+                    StackImageRef(
+                        environment=environment,
+                        stack_id=int(stack_id),
+                        stack_name=stack_name,
+                        endpoint_id=endpoint_id,
+                        endpoint_name=endpoint_name,
+                        digests=tuple(
+                            sorted(digests_by_stack.get((endpoint_id, stack_name or ""), ()))
+                        ),
+                    )
+                )
+        return refs
+
+    async def _check_unchecked_stacks(
+        self, client: AsyncPortainerClient, refs: list[StackImageRef]
+    ) -> None:
+        """Check stacks the cache has no result for and store the results.
+
+        The cache is saved once the whole snapshot has been collected.
+        """
+        results = await self.check_stack_images(
+            client,
+            [(ref.stack_id, ref.stack_name, ref.endpoint_id, ref.endpoint_name) for ref in refs],
+        )
+        for ref, outdated_images in zip(refs, results):
+            if outdated_images is not None:
+                self.image_status_cache.put(ref, outdated_images)
 
-        snapshot = InfrastructureSnapshot(timestamp=datetime.now(timezone.utc))
+    async def refresh_image_status(self) -> int:
+        """Re-check the stacks whose cached image status is missing, expired or stale.
 
-        all_containers: list[dict] = []
-        all_security_issues: list[ContainerCapabilities] = []
-        all_outdated_images: list[ImageStatus] = []
-        all_container_logs: list[ContainerLogs] = []
-        all_endpoints: list[dict] = []
+        Runs as its own low-frequency job so snapshots never wait on
+        registries. Returns the number of stacks checked.
+        """
+        if not self.include_image_check:
+            return 0
+        due = self.image_status_cache.due()
+        if not due:
+            return 0
 
-        for env in environments:
+        settings = get_settings()
+        environments = {env.name: env for env in settings.portainer.get_configured_environments()}
+        due_by_environment: dict[str, list[StackImageRef]] = {}
+        for ref in due:
+            if ref.environment in environments:
+                due_by_environment.setdefault(ref.environment, []).append(ref)
+
+        async def refresh_environment(
+            env: PortainerEnvironmentSettings, refs: list[StackImageRef]
+        ) -> int:
             client = create_portainer_client(env)
             try:
                 async with client:
-                    endpoints = await client.list_all_endpoints()
-                    endpoints = endpoints[: self.max_endpoints_per_env]
-
-                    df_endpoints = normalise_endpoint_metadata(endpoints)
-                    online_count = len(df_endpoints[df_endpoints["endpoint_status"] == 1])
-                    offline_count = len(df_endpoints[df_endpoints["endpoint_status"] != 1])
-
-                    snapshot.endpoints_online += online_count
-                    snapshot.endpoints_offline += offline_count
-
-                    stacks_by_endpoint: dict[int, list[dict]] = {}
-                    containers_by_endpoint: dict[int, list[dict]] = {}
+                    results = await self.check_stack_images(
+                        client,
+                        [
+                            (ref.stack_id, ref.stack_name, ref.endpoint_id, ref.endpoint_name)
+                            for ref in refs
+                        ],
+                    )
+            except PortainerAPIError as exc:
+                LOGGER.warning(
+                    "Failed to check image status in environment %s: %s", env.name, exc
+                )
+                return 0
+            checked = 0
+            for ref, outdated_images in zip(refs, results):
+                if outdated_images is not None:
+                    self.image_status_cache.put(ref, outdated_images)
+                    checked += 1
+            return checked
+
+        started = time.perf_counter()
+        counts = await asyncio.gather(
+            *(
+                refresh_environment(environments[name], refs)
+                for name, refs in due_by_environment.items()
+            )
+        )
+        await self.image_status_cache.save_async()
+        LOGGER.info(
+            "Checked image status of %d of %d due stacks in %.2fs",
+            sum(counts),
+            len(due),
+            time.perf_counter() - started,
+        )
+        return sum(counts)
 
-                    tasks = []
-                    for ep in endpoints:
-                        tasks.append(self.collect_endpoint_data(client, ep))
+    async def collect_environment(
+        self,
+        env: PortainerEnvironmentSettings,
+        metrics_collector: MetricsCollector | None = None,
+    ) -> EnvironmentSnapshot:
+        """Collect endpoints, containers, stacks and logs of one environment.
+
+        The container pipeline (containers, security scan, metrics, logs) and
+        the image pipeline (stacks, image status) only share the endpoint
+        list, so they run concurrently. Image status is read from
+        :attr:`image_status_cache` rather than checked against registries;
+        only stacks the cache has never checked, such as on the first cycle
+        after startup, are checked here, at most ``_MAX_SNAPSHOT_IMAGE_CHECKS``
+        per environment.
+
+        With a ``metrics_collector``, container stats are collected from the
+        same container listings. Endpoints beyond ``max_endpoints_per_env``
+        are not part of the snapshot but still have their metrics collected.
+        """
+        result = EnvironmentSnapshot()
+        started = time.perf_counter()
+        client = create_portainer_client(env)
+        try:
+            async with client:
+                all_endpoints = await client.list_all_endpoints()
+                endpoints = all_endpoints[: self.max_endpoints_per_env]
+                metrics_only_endpoints = (
+                    all_endpoints[self.max_endpoints_per_env :] if metrics_collector else []
+                )
 
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
+                df_endpoints = normalise_endpoint_metadata(endpoints)
+                result.endpoints_online = len(df_endpoints[df_endpoints["endpoint_status"] == 1])
+                result.endpoints_offline = len(df_endpoints[df_endpoints["endpoint_status"] != 1])
+
+                containers_by_endpoint: dict[int, list[dict]] = {}
+                timings: dict[str, float] = {}
+
+                async def collect_containers() -> None:
+                    phase_started = time.perf_counter()
+                    results = await asyncio.gather(
+                        *(
+                            self._collect_endpoint(client, ep, metrics_collector)
+                            for ep in endpoints
+                        ),
+                        *(
+                            self._collect_endpoint(client, ep, metrics_collector, scan=False)
+                            for ep in metrics_only_endpoints
+                        ),
+                        return_exceptions=True,
+                    )
 
-                    for ep, result in zip(endpoints, results):
-                        ep_id = int(ep.get("Id") or ep.get("id") or 0)
-                        if isinstance(result, Exception):
-                            LOGGER.debug("Failed to collect endpoint data: %s", result)
-                            containers_by_endpoint[ep_id] = []
+                    for index, ep_result in enumerate(results):
+                        if isinstance(ep_result, Exception):
+                            LOGGER.debug("Failed to collect endpoint data: %s", ep_result)
+                            result.complete = False
                             continue
 
-                        containers, security_issues = result
+                        containers, security_issues, metrics, complete = ep_result
+                        result.metrics.extend(metrics)
+                        result.complete = result.complete and complete
+                        if index >= len(endpoints):
+                            continue
+                        ep_id = int(endpoints[index].get("Id") or endpoints[index].get("id") or 0)
                         containers_by_endpoint[ep_id] = containers
-                        all_containers.extend(containers)
-                        all_security_issues.extend(security_issues)
-
-                        try:
-                            stacks = await client.list_stacks_for_endpoint(ep_id)
-                            stacks_by_endpoint[ep_id] = stacks
-                        except PortainerAPIError:
-                            stacks_by_endpoint[ep_id] = []
-
-                    if self.include_image_check:
-                        outdated_images = await self.collect_image_status(
-                            client, endpoints, stacks_by_endpoint
-                        )
-                        all_outdated_images.extend(outdated_images)
+                        result.containers.extend(containers)
+                        result.security_issues.extend(security_issues)
+                    timings["containers"] = time.perf_counter() - phase_started
 
                     # Collect logs from problematic containers
                     if self.include_log_analysis:
+                        phase_started = time.perf_counter()
                         log_tasks = []
                         for ep in endpoints:
                             ep_id = int(ep.get("Id") or ep.get("id") or 0)
                             containers = containers_by_endpoint.get(ep_id, [])
-                            log_tasks.append(
-                                self.collect_endpoint_logs(client, ep, containers)
-                            )
+                            log_tasks.append(self.collect_endpoint_logs(client, ep, containers))
 
                         log_results = await asyncio.gather(*log_tasks, return_exceptions=True)
-                        for result in log_results:
-                            if isinstance(result, list):
-                                all_container_logs.extend(result)
-                            elif isinstance(result, Exception):
-                                LOGGER.debug("Log collection failed: %s", result)
-
-                    df_containers = normalise_endpoint_containers(
-                        endpoints, containers_by_endpoint
+                        for log_result in log_results:
+                            if isinstance(log_result, list):
+                                result.container_logs.extend(log_result)
+                            elif isinstance(log_result, Exception):
+                                LOGGER.debug("Log collection failed: %s", log_result)
+                        timings["logs"] = time.perf_counter() - phase_started
+
+                async def list_stacks() -> list[dict]:
+                    phase_started = time.perf_counter()
+                    # One listing per environment instead of two requests per endpoint
+                    stacks = await client.list_all_stacks()
+                    timings["stacks"] = time.perf_counter() - phase_started
+                    return stacks
+
+                if self.include_image_check:
+                    _, stacks = await asyncio.gather(collect_containers(), list_stacks())
+                    # Registry comparisons come from the cache kept by refresh_image_status
+                    refs = self._stack_image_refs(
+                        env.name,
+                        endpoints,
+                        group_stacks_by_endpoint(endpoints, stacks),
+                        containers_by_endpoint,
                     )
-
-                    for ep in endpoints:
-                        ep_id = int(ep.get("Id") or ep.get("id") or 0)
-                        ep_name = ep.get("Name") or ep.get("name")
-                        ep_data = {
+                    self.image_status_cache.observe(env.name, refs)
+                    unchecked = [
+                        ref for ref in refs if not self.image_status_cache.was_checked(ref)
+                    ]
+                    if unchecked:
+                        await self._check_unchecked_stacks(
+                            client, unchecked[:_MAX_SNAPSHOT_IMAGE_CHECKS]
+                        )
+                    for ref in refs:
+                        result.outdated_images.extend(self.image_status_cache.get(ref) or [])
+                else:
+                    await collect_containers()
+
+                for ep in endpoints:
+                    ep_id = int(ep.get("Id") or ep.get("id") or 0)
+                    ep_name = ep.get("Name") or ep.get("name")
+                    result.endpoints.append(
+                        {
                             "endpoint_id": ep_id,
                             "endpoint_name": ep_name,
                             "endpoint_status": ep.get("Status") or ep.get("status"),
                             "environment": env.name,
                         }
-                        all_endpoints.append(ep_data)
+                    )
 
-                        # Add endpoint info to containers for remediation lookup
-                        for c in containers_by_endpoint.get(ep_id, []):
-                            c["_endpoint_id"] = ep_id
-                            c["_endpoint_name"] = ep_name
+                    # Add endpoint info to containers for remediation lookup
+                    for c in containers_by_endpoint.get(ep_id, []):
+                        c["_endpoint_id"] = ep_id
+                        c["_endpoint_name"] = ep_name
 
-            except PortainerAPIError as exc:
-                LOGGER.error(
-                    "Failed to collect data from environment %s: %s",
-                    env.name,
-                    exc,
-                )
-                continue
+        except PortainerAPIError as exc:
+            LOGGER.error(
+                "Failed to collect data from environment %s: %s",
+                env.name,
+                exc,
+            )
+            return EnvironmentSnapshot(complete=False)
+
+        LOGGER.debug(
+            "Collected environment %s in %.2fs (%s)",
+            env.name,
+            time.perf_counter() - started,
+            ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()),
+        )
+        return result
+
+    async def collect_snapshot(self) -> InfrastructureSnapshot:
+        """Collect a complete infrastructure snapshot from all configured environments.
+
+        Environments are collected concurrently.
+        """
+        snapshot, _, _ = await self.collect_snapshot_and_metrics()
+        return snapshot
+
+    async def collect_snapshot_and_metrics(
+        self, metrics_collector: MetricsCollector | None = None
+    ) -> tuple[InfrastructureSnapshot, list[ContainerMetric], bool]:
+        """Collect a snapshot and, in the same endpoint walk, container metrics.
+
+        Returns:
+            Tuple of (snapshot, metrics, complete). ``complete`` is False when
+            an environment, an endpoint's containers or a container's stats
+            could not be collected; pass it on to
+            ``MetricsCollector.record_metrics``.
+        """
+        settings = get_settings()
+        environments = settings.portainer.get_configured_environments()
+        started = time.perf_counter()
+
+        snapshot = InfrastructureSnapshot(timestamp=datetime.now(timezone.utc))
+
+        all_containers: list[dict] = []
+        all_security_issues: list[ContainerCapabilities] = []
+        all_outdated_images: list[ImageStatus] = []
+        all_container_logs: list[ContainerLogs] = []
+        all_endpoints: list[dict] = []
+
+        all_metrics: list[ContainerMetric] = []
+
+        env_results = await asyncio.gather(
+            *(self.collect_environment(env, metrics_collector) for env in environments)
+        )
+        # Once per snapshot rather than per scanned endpoint or environment
+        if self.include_security_scan:
+            await self.security_scanner.save_cache()
+        if self.include_image_check:
+            await self.image_status_cache.save_async()
+        for env_result in env_results:
+            all_metrics.extend(env_result.metrics)
+            snapshot.endpoints_online += env_result.endpoints_online
+            snapshot.endpoints_offline += env_result.endpoints_offline
+            all_containers.extend(env_result.containers)
+            all_security_issues.extend(env_result.security_issues)
+            all_outdated_images.extend(env_result.outdated_images)
+            all_container_logs.extend(env_result.container_logs)
+            all_endpoints.extend(env_result.endpoints)
 
         running = sum(1 for c in all_containers if c.get("State") == "running")
         stopped = sum(1 for c in all_containers if c.get("State") != "running")
@@ -466,8 +954,9 @@ class DataCollector:
         ]
 
         LOGGER.info(
-            "Collected snapshot: %d endpoints (%d online), %d containers (%d running), "
-            "%d security issues, %d outdated images, %d container logs",
+            "Collected snapshot in %.2fs: %d endpoints (%d online), %d containers "
+            "(%d running), %d security issues, %d outdated images, %d container logs",
+            time.perf_counter() - started,
             len(all_endpoints),
             snapshot.endpoints_online,
             len(all_containers),
@@ -477,14 +966,21 @@ class DataCollector:
             len(all_container_logs),
         )
 
-        return snapshot
+        return snapshot, all_metrics, all(env_result.complete for env_result in env_results)
 
 
 def create_data_collector() -> DataCollector:
-    """Create a data collector with settings from configuration."""
+    """Create a data collector with settings from configuration.
+
+    Image status results are persisted in the cache directory unless the
+    persistent cache is disabled.
+    """
     settings = get_settings()
     scanner = create_security_scanner()
     excluded = frozenset(settings.monitoring.excluded_containers)
+    cache_path = (
+        settings.cache.directory / _IMAGE_STATUS_CACHE_FILE if settings.cache.enabled else None
+    )
     return DataCollector(
         security_scanner=scanner,
         include_security_scan=settings.monitoring.include_security_scan,
@@ -493,11 +989,18 @@ def create_data_collector() -> DataCollector:
         log_tail_lines=settings.monitoring.log_tail_lines,
         max_containers_for_logs=settings.monitoring.max_containers_for_logs,
         log_fetch_timeout=settings.monitoring.log_fetch_timeout,
+        image_check_concurrency=settings.monitoring.image_check_concurrency,
+        image_status_cache=ImageStatusCache(
+            cache_path, settings.monitoring.image_status_ttl_minutes * 60
+        ),
         excluded_containers=excluded,
     )
 
 
 __all__ = [
     "DataCollector",
+    "EnvironmentSnapshot",
+    "ImageStatusCache",
+    "StackImageRef",
     "create_data_collector",
 ]
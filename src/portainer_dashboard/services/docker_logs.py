@@ -0,0 +1,166 @@
+"""Streaming decoder for Docker container log output.
+
+Containers without a TTY return their logs multiplexed: each frame starts
+with an 8-byte header holding the stream type (0 stdin, 1 stdout, 2 stderr)
+and the big-endian payload length. :class:`DockerLogDecoder` parses frames
+from arbitrarily chunked bytes and yields complete lines tagged with their
+stream, so a response can be decoded while it is being received. Lines may
+span frames and frames may span chunks; each stream keeps its own partial
+line. Output of TTY containers is not multiplexed and is passed through as
+stdout.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from typing import NamedTuple
+
+# Stream type, three zero bytes and the big-endian payload length
+_HEADER = struct.Struct(">BxxxL")
+_HEADER_SIZE = _HEADER.size
+
+STDOUT = "stdout"
+STDERR = "stderr"
+
+# Stream type byte to stream name; stdin is written to stdout by Docker
+_STREAMS = {0: STDOUT, 1: STDOUT, 2: STDERR}
+
+
+class LogLine(NamedTuple):
+    """One log line and the stream it was written to."""
+
+    stream: str
+    text: str
+
+
+def _is_frame_header(data: bytes | bytearray) -> bool:
+    """Check whether data starts with a multiplexed frame header."""
+    return data[0] in _STREAMS and data[1:4] == b"\x00\x00\x00"
+
+
+class DockerLogDecoder:
+    """Incremental decoder for multiplexed or raw Docker log bytes.
+
+    Whether the output is multiplexed is decided from the first header. A
+    header with an unknown stream type later on means the data is not
+    multiplexed after all, and the remaining bytes are passed through as raw
+    stdout rather than dropped.
+    """
+
+    __slots__ = ("_buffer", "_multiplexed", "_partial")
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._multiplexed: bool | None = None
+        self._partial = {STDOUT: bytearray(), STDERR: bytearray()}
+
+    def feed(self, data: bytes) -> list[LogLine]:
+        """Decode a chunk of bytes and return the lines it completed."""
+        lines: list[LogLine] = []
+        if self._multiplexed is False:
+            self._append(STDOUT, data, lines)
+            return lines
+
+        buffer = self._buffer
+        buffer += data
+        if self._multiplexed is None:
+            if len(buffer) < _HEADER_SIZE:
+                return lines
+            self._multiplexed = _is_frame_header(buffer)
+
+        position = 0
+        size = len(buffer)
+        if self._multiplexed:
+            # Consecutive frames of one stream are joined before line splitting
+            run_stream: str | None = None
+            run: list[bytearray] = []
+            while size - position >= _HEADER_SIZE:
+                kind, length = _HEADER.unpack_from(buffer, position)
+                stream = _STREAMS.get(kind)
+                if stream is None:
+                    self._multiplexed = False
+                    break
+                end = position + _HEADER_SIZE + length
+                if end > size:
+                    break
+                if stream is not run_stream:
+                    if run:
+                        self._append(run_stream, b"".join(run), lines)
+                    run_stream, run = stream, []
+                run.append(buffer[position + _HEADER_SIZE : end])
+                position = end
+            if run:
+                self._append(run_stream, b"".join(run), lines)
+
+        if not self._multiplexed:
+            self._append(STDOUT, buffer[position:], lines)
+            position = size
+        del buffer[:position]
+        return lines
+
+    def flush(self) -> list[LogLine]:
+        """Return the partial lines left at the end of the data.
+
+        The payload of a truncated last frame is returned as well.
+        """
+        lines: list[LogLine] = []
+        if self._buffer:
+            remainder = bytes(self._buffer)
+            self._buffer.clear()
+            if self._multiplexed and len(remainder) >= _HEADER_SIZE:
+                stream = _STREAMS.get(remainder[0], STDOUT)
+                self._append(stream, remainder[_HEADER_SIZE:], lines)
+            else:
+                self._append(STDOUT, remainder, lines)
+        for stream, partial in self._partial.items():
+            if partial:
+                lines.append(LogLine(stream, partial.decode("utf-8", "replace")))
+                partial.clear()
+        return lines
+
+    def _append(self, stream: str, payload: bytes | bytearray, lines: list[LogLine]) -> None:
+        """Add payload bytes to a stream and collect the lines they complete."""
+        partial = self._partial[stream]
+        last_newline = payload.rfind(b"\n")
+        if last_newline < 0:
+            partial += payload
+            return
+        # Decode all complete lines at once; multi-byte characters cannot be
+        # split because the cut is made at a newline byte
+        partial += payload[:last_newline]
+        text = partial.decode("utf-8", "replace")
+        partial.clear()
+        partial += payload[last_newline + 1 :]
+        lines += [LogLine(stream, line) for line in text.split("\n")]
+
+
+def decode_docker_logs(data: bytes | Iterable[bytes]) -> list[LogLine]:
+    """Decode complete Docker log output, given as bytes or as chunks."""
+    decoder = DockerLogDecoder()
+    chunks = (data,) if isinstance(data, (bytes, bytearray)) else data
+    lines: list[LogLine] = []
+    for chunk in chunks:
+        lines.extend(decoder.feed(chunk))
+    lines.extend(decoder.flush())
+    return lines
+
+
+async def iter_docker_log_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[LogLine]:
+    """Decode Docker log output while it is received, yielding each line."""
+    decoder = DockerLogDecoder()
+    async for chunk in chunks:
+        for line in decoder.feed(chunk):
+            yield line
+    for line in decoder.flush():
+        yield line
+
+
+__all__ = [
+    "DockerLogDecoder",
+    "LogLine",
+    "STDERR",
+    "STDOUT",
+    "decode_docker_logs",
+    "iter_docker_log_lines",
+]
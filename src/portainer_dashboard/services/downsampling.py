@@ -0,0 +1,120 @@
+"""Downsampling of metric time series for charting.
+
+A chart only has a few hundred pixels horizontally, so shipping every raw
+sample to the browser wastes bandwidth and rendering time. Two reducers are
+provided, both returning the indices of the samples to keep, in order:
+
+- :func:`lttb_indices` (Largest-Triangle-Three-Buckets) keeps the points that
+  best preserve the visual shape of the line.
+- :func:`min_max_indices` keeps the minimum and maximum of every bucket, so
+  spikes are never lost.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import numpy as np
+
+from portainer_dashboard.models.metrics import DownsampleMethod
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Select ``threshold`` points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The remaining points are split
+    into ``threshold - 2`` equally sized buckets and from each bucket the
+    point forming the largest triangle with the previously selected point
+    and the average of the next bucket is kept.
+
+    Args:
+        x: Sample positions, sorted ascending.
+        y: Sample values.
+        threshold: Maximum number of points to return.
+
+    Returns:
+        Sorted indices of the selected samples.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket i covers [bounds[i], bounds[i + 1]); integer arithmetic keeps the
+    # last bucket ending exactly before the final point
+    bounds = 1 + (np.arange(threshold - 1) * (n - 2)) // (threshold - 2)
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = bounds[bucket], bounds[bucket + 1]
+        next_end = bounds[bucket + 2] if bucket + 2 < len(bounds) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def min_max_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Select the minimum and maximum sample of ``threshold // 2`` buckets.
+
+    Args:
+        x: Sample positions, sorted ascending.
+        y: Sample values.
+        threshold: Maximum number of points to return.
+
+    Returns:
+        Sorted indices of the selected samples.
+    """
+    n = len(x)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+
+    bucket_of = (np.arange(n) * buckets) // n
+    # Sorting by (bucket, value) puts each bucket's minimum first and maximum last
+    order = np.lexsort((y, bucket_of))
+    bucket_starts = np.flatnonzero(np.diff(bucket_of[order], prepend=-1))
+    bucket_ends = np.append(bucket_starts[1:], n) - 1
+    return np.unique(np.concatenate((order[bucket_starts], order[bucket_ends])))
+
+
+_DOWNSAMPLERS: dict[DownsampleMethod, Callable[[np.ndarray, np.ndarray, int], np.ndarray]] = {
+    DownsampleMethod.LTTB: lttb_indices,
+    DownsampleMethod.MIN_MAX: min_max_indices,
+}
+
+
+def downsample(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_points: int,
+    method: DownsampleMethod = DownsampleMethod.LTTB,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a series to at most ``max_points`` samples.
+
+    Args:
+        x: Sample positions, sorted ascending.
+        y: Sample values.
+        max_points: Maximum number of samples to return.
+        method: Reduction algorithm to use.
+
+    Returns:
+        Tuple of the kept positions and values.
+    """
+    if len(x) <= max_points:
+        return x, y
+    indices = _DOWNSAMPLERS[method](x, y, max_points)
+    return x[indices], y[indices]
+
+
+__all__ = [
+    "downsample",
+    "lttb_indices",
+    "min_max_indices",
+]
@@ -0,0 +1,140 @@
+"""Mergeable latency sketches.
+
+:class:`LatencySketch` is a DDSketch: values are counted in logarithmically
+sized bins, so every quantile is answered within a fixed relative error while
+the sketch size depends only on the range of the values, not on how many were
+recorded. Sketches merge by adding bin counts, which lets the trace store keep
+one small sketch per route and time bucket and answer percentiles for any
+window or route by merging them, instead of sorting raw durations.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+import zlib
+
+import numpy as np
+
+# Quantiles are accurate to within 1% of the true value
+_RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + _RELATIVE_ACCURACY) / (1 - _RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+# Values below this are counted in the zero bin
+_MIN_INDEXABLE_VALUE = 1e-9
+
+# Serialized form: header followed by the zlib-compressed dense bin counts
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<BQdi")  # version, zero count, sum, key of first bin
+
+
+class LatencySketch:
+    """DDSketch with a dense, growable bin store."""
+
+    __slots__ = ("_counts", "_offset", "_sum", "_zero_count")
+
+    def __init__(self) -> None:
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._offset = 0
+        self._zero_count = 0
+        self._sum = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of recorded values."""
+        return self._zero_count + int(self._counts.sum())
+
+    @property
+    def sum(self) -> float:
+        """Sum of recorded values."""
+        return self._sum
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Record ``value`` ``count`` times.
+
+        A negative ``count`` removes values recorded earlier, which keeps a
+        persisted sketch exact when its traces are replaced or purged.
+        """
+        self._sum += value * count
+        if value < _MIN_INDEXABLE_VALUE:
+            self._zero_count += count
+            return
+        key = math.ceil(math.log(value) / _LOG_GAMMA)
+        self._extend(key, key + 1)
+        self._counts[key - self._offset] += count
+
+    def merge(self, other: LatencySketch) -> None:
+        """Add the values recorded by ``other`` to this sketch."""
+        self._zero_count += other._zero_count
+        self._sum += other._sum
+        if not other._counts.size:
+            return
+        self._extend(other._offset, other._offset + other._counts.size)
+        start = other._offset - self._offset
+        self._counts[start : start + other._counts.size] += other._counts
+
+    def quantile(self, q: float) -> float:
+        """Return the value at quantile ``q`` (0 to 1), or 0.0 when empty."""
+        total = self.count
+        if total <= 0:
+            return 0.0
+        rank = min(int(q * total), total - 1)
+        if rank < self._zero_count:
+            return 0.0
+        cumulative = np.cumsum(self._counts)
+        index = int(np.searchsorted(cumulative, rank - self._zero_count, side="right"))
+        return 2 * _GAMMA ** (self._offset + index) / (_GAMMA + 1)
+
+    def _extend(self, low: int, high: int) -> None:
+        """Grow the bin store to cover keys ``low`` (inclusive) to ``high``."""
+        if not self._counts.size:
+            self._offset = low
+            self._counts = np.zeros(high - low, dtype=np.int64)
+            return
+        end = self._offset + self._counts.size
+        if low >= self._offset and high <= end:
+            return
+        new_offset = min(low, self._offset)
+        counts = np.zeros(max(high, end) - new_offset, dtype=np.int64)
+        start = self._offset - new_offset
+        counts[start : start + self._counts.size] = self._counts
+        self._counts = counts
+        self._offset = new_offset
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch, trimming empty bins at both ends."""
+        nonzero = np.flatnonzero(self._counts)
+        if nonzero.size:
+            first, last = int(nonzero[0]), int(nonzero[-1])
+            counts = self._counts[first : last + 1]
+            offset = self._offset + first
+        else:
+            counts = self._counts[:0]
+            offset = 0
+        header = _HEADER.pack(_FORMAT_VERSION, self._zero_count, self._sum, offset)
+        return header + zlib.compress(counts.astype("<u4").tobytes(), 1)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> LatencySketch:
+        """Deserialize a sketch produced by :meth:`to_bytes`.
+
+        Raises:
+            ValueError: If the data was written in an unknown format.
+        """
+        version, zero_count, total, offset = _HEADER.unpack_from(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported latency sketch format {version}")
+        sketch = cls()
+        sketch._zero_count = zero_count
+        sketch._sum = total
+        sketch._offset = offset
+        sketch._counts = np.frombuffer(
+            zlib.decompress(data[_HEADER.size :]), dtype="<u4"
+        ).astype(np.int64)
+        return sketch
+
+
+__all__ = [
+    "LatencySketch",
+]
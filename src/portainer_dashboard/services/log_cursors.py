@@ -0,0 +1,158 @@
+"""Incremental container log fetching with per-container cursors.
+
+Each cursor remembers the timestamp of the last log line seen for a container
+and a rolling buffer of its most recent lines. Later fetches pass the cursor
+as Docker's ``since`` parameter, so only lines written since the previous
+fetch are transferred, while the buffer still provides the surrounding
+context for analysis.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from portainer_dashboard.services.portainer_client import AsyncPortainerClient
+
+LOGGER = logging.getLogger(__name__)
+
+# Upper bound on tracked containers before the least recently fetched are evicted
+_DEFAULT_MAX_CURSORS = 1_024
+
+
+def _line_timestamp(line: str) -> tuple[int, int] | None:
+    """Return the (seconds, nanoseconds) Docker timestamp prefixing a log line.
+
+    Docker writes RFC 3339 timestamps with up to nine fractional digits and
+    trims trailing zeros, so the prefixes are parsed rather than compared as
+    strings. Returns ``None`` for lines without a timestamp.
+    """
+    stamp, _, _ = line.partition(" ")
+    if len(stamp) < 20 or stamp[10] != "T":
+        return None
+    rest = stamp[19:]
+    fraction = ""
+    if rest.startswith("."):
+        zone = rest[1:].lstrip("0123456789")
+        fraction, rest = rest[1 : len(rest) - len(zone)], zone
+    if rest == "Z":
+        rest = "+00:00"
+    try:
+        parsed = datetime.fromisoformat(stamp[:19] + rest)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return None
+    return int(parsed.timestamp()), int(fraction[:9].ljust(9, "0"))
+
+
+@dataclass
+class _LogCursor:
+    """Last seen timestamp and recent lines of one container."""
+
+    lines: deque[str]
+    last_seen: tuple[int, int] | None = None
+
+
+@dataclass
+class LogTail:
+    """Buffered recent log lines of a container after a fetch."""
+
+    lines: list[str] = field(default_factory=list)
+    new_lines: int = 0
+    truncated: bool = False
+
+    @property
+    def text(self) -> str:
+        """The buffered lines joined into a single log string."""
+        return "\n".join(self.lines)
+
+
+class LogCursorStore:
+    """Per-container log cursors keyed by endpoint and container ID.
+
+    The number of cursors is bounded; the least recently fetched containers
+    are forgotten first and simply start over with a full tail.
+    """
+
+    def __init__(self, max_cursors: int = _DEFAULT_MAX_CURSORS) -> None:
+        self._cursors: OrderedDict[tuple[int, str], _LogCursor] = OrderedDict()
+        self._max_cursors = max_cursors
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    async def fetch(
+        self,
+        client: AsyncPortainerClient,
+        endpoint_id: int,
+        container_id: str,
+        *,
+        tail: int,
+    ) -> LogTail:
+        """Fetch the lines written since the last fetch and update the buffer.
+
+        The first fetch of a container returns its last ``tail`` lines. Later
+        fetches request only lines since the cursor, dropping the lines of the
+        cursor's second that were already seen, and append them to a rolling
+        buffer of ``tail`` lines.
+
+        Raises:
+            PortainerAPIError: If the logs cannot be fetched. The cursor is
+                left unchanged so the next fetch retries the same range.
+        """
+        key = (endpoint_id, container_id)
+        cursor = self._cursors.get(key)
+        last_seen = cursor.last_seen if cursor is not None else None
+        text = await client.get_container_logs(
+            endpoint_id,
+            container_id,
+            tail=tail,
+            timestamps=True,
+            since=last_seen[0] if last_seen is not None else None,
+        )
+
+        new_lines: list[str] = []
+        newest = last_seen
+        keep = last_seen is None
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            timestamp = _line_timestamp(line)
+            if timestamp is not None:
+                # Untimestamped lines belong to the preceding timestamped one
+                keep = last_seen is None or timestamp > last_seen
+                if keep and (newest is None or timestamp > newest):
+                    newest = timestamp
+            if keep:
+                new_lines.append(line)
+
+        if cursor is None or last_seen is None:
+            # Without a cursor the fetch returned a full tail, which replaces the buffer
+            cursor = _LogCursor(lines=deque(maxlen=tail))
+        elif cursor.lines.maxlen != tail:
+            cursor.lines = deque(cursor.lines, maxlen=tail)
+        cursor.lines.extend(new_lines)
+        cursor.last_seen = newest
+        self._cursors[key] = cursor
+        self._cursors.move_to_end(key)
+        while len(self._cursors) > self._max_cursors:
+            self._cursors.popitem(last=False)
+
+        return LogTail(
+            lines=list(cursor.lines),
+            new_lines=len(new_lines),
+            truncated=len(new_lines) >= tail,
+        )
+
+    def forget(self, endpoint_id: int, container_id: str) -> None:
+        """Drop the cursor of a container so its next fetch starts over."""
+        self._cursors.pop((endpoint_id, container_id), None)
+
+
+__all__ = [
+    "LogCursorStore",
+    "LogTail",
+]
@@ -1,8 +1,19 @@
-"""Log sanitization utilities to remove secrets before sending to LLM."""
+"""Log sanitization utilities to remove secrets before sending to LLM.
+
+Every secret pattern starts with a literal such as ``password``, ``token`` or
+``-----BEGIN``. Substring searches for those literals find the few lines that
+can contain a secret, and only those lines are run through the patterns;
+everything else is copied unchanged. A pattern can only match across a line
+break in whitespace after a keyword or inside a private key block, so a line
+ending in such an open match is sanitized together with the lines that
+complete it. The result equals applying each pattern to the whole text in
+turn.
+"""
 
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable, Iterator
 
 # Secret patterns to sanitize from logs before sending to LLM
 _SECRET_PATTERNS: list[tuple[re.Pattern, str]] = [
@@ -18,7 +29,9 @@ _SECRET_PATTERNS: list[tuple[re.Pattern, str]] = [
     (re.compile(r'(?i)(secret|token)\s*[=:]\s*["\']?([^\s"\']+)["\']?'), r'\1=***REDACTED***'),
 
     # Connection strings (PostgreSQL, MySQL, MongoDB, Redis)
-    (re.compile(r'(?i)(postgres|postgresql|mysql|mongodb|redis)://[^:]+:([^@]+)@'), r'\1://***:***REDACTED***@'),
+    # (bounded to one line, so a URL without credentials cannot swallow the
+    # text up to the next "@" further down the log)
+    (re.compile(r'(?i)(postgres|postgresql|mysql|mongodb|redis)://[^:\n]+:([^@\n]+)@'), r'\1://***:***REDACTED***@'),
 
     # AWS credentials
     (re.compile(r'(?i)(aws_access_key_id|aws_secret_access_key)\s*[=:]\s*["\']?([a-zA-Z0-9/+=]+)["\']?'), r'\1=***REDACTED***'),
@@ -38,12 +51,127 @@ _SECRET_PATTERNS: list[tuple[re.Pattern, str]] = [
     (re.compile(r'ssh-ed25519\s+[A-Za-z0-9+/=]+'), 'ssh-ed25519 ***REDACTED***'),
 ]
 
+# Literals at the start of every secret pattern; a line containing none of
+# them cannot contain a secret. Searching for each literal with str.find is
+# far faster than a case-insensitive regex alternation, which re cannot
+# optimise into a substring search.
+_FOLDED_TRIGGERS = (
+    "apikey", "api_key", "api-key", "authorization", "bearer",
+    "passw", "pwd", "secret", "token", "aws_",
+)
+_EXACT_TRIGGERS = ("://", "AKIA", "-----BEGIN", "eyJ", "ssh-")
+
+# Non-ASCII characters that re's IGNORECASE matches with an ASCII letter;
+# mapping them first keeps the folded text as long as the original
+_ASCII_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+
+# A keyword whose value may follow on a later line, e.g. "password:" at the end
+_OPEN_VALUE = re.compile(
+    r"(?i)(?:api[_-]?key|apikey|x-api-key|authorization|bearer|passw(?:or)?d|pwd|secret|token"
+    r"|aws_access_key_id|aws_secret_access_key|ssh-rsa|ssh-ed25519)\s*(?:[=:]\s*)?\Z"
+)
+
+# A line that keeps an open value pending: blank or a lone separator
+_VALUE_GAP = re.compile(r"\s*(?:[=:]\s*)?")
+
+_PRIVATE_KEY_INDEX = 8
+_PRIVATE_KEY = _SECRET_PATTERNS[_PRIVATE_KEY_INDEX][0]
+_PRIVATE_KEY_HEADER = re.compile(r"-----BEGIN\s+(RSA\s+)?PRIVATE\s+KEY-----")
+# The start of a private key header that continues on the next line
+_PRIVATE_KEY_HEADER_START = re.compile(r"-----BEGIN(?:\s+RSA)?(?:\s+PRIVATE)?\s*\Z")
+
+
+class _SecretSpan:
+    """Lines that must be sanitized together because a match may span them."""
+
+    __slots__ = ("_key_header_open", "_key_pending", "_open_value", "lines")
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self._open_value = False
+        self._key_pending = False
+        self._key_header_open = False
+
+    def add(self, line: str) -> bool:
+        """Add the next line and return whether the span continues after it."""
+        self.lines.append(line)
+        self._open_value = _OPEN_VALUE.search(line) is not None or (
+            self._open_value and _VALUE_GAP.fullmatch(line) is not None
+        )
+        if self._key_pending:
+            if self._key_header_open or "KEY-----" in line:
+                self._check_private_key()
+        elif "-----BEGIN" in line:
+            self._check_private_key()
+        return self._open_value or self._key_pending
+
+    def _check_private_key(self) -> None:
+        """Check whether a private key block is still open at the end of the span.
+
+        The earlier patterns run first, as they do over the whole text, since
+        they can consume a key's header or end marker.
+        """
+        text = "\n".join(self.lines)
+        for pattern, replacement in _SECRET_PATTERNS[:_PRIVATE_KEY_INDEX]:
+            text = pattern.sub(replacement, text)
+        remainder = text[_last_match_end(_PRIVATE_KEY, text) :]
+        self._key_header_open = _PRIVATE_KEY_HEADER_START.search(remainder) is not None
+        self._key_pending = (
+            self._key_header_open or _PRIVATE_KEY_HEADER.search(remainder) is not None
+        )
+
+
+def _last_match_end(pattern: re.Pattern, text: str) -> int:
+    """Return where the last non-overlapping match of a pattern ends."""
+    end = 0
+    for match in pattern.finditer(text):
+        end = match.end()
+    return end
+
+
+def _sanitize_text(text: str) -> str:
+    """Apply every secret pattern in turn."""
+    for pattern, replacement in _SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _fold(text: str) -> str:
+    """Lowercase text the way the case-insensitive patterns compare it."""
+    if text.isascii():
+        return text.lower()
+    return text.translate(_ASCII_FOLD).lower()
+
+
+def _has_trigger(line: str) -> bool:
+    """Check whether a line contains the start of any secret pattern."""
+    folded = _fold(line)
+    return any(literal in folded for literal in _FOLDED_TRIGGERS) or any(
+        literal in line for literal in _EXACT_TRIGGERS
+    )
+
+
+def _trigger_line_starts(text: str) -> list[int]:
+    """Return the start offsets of the lines that contain a trigger literal."""
+    starts: set[int] = set()
+    for source, literals in ((_fold(text), _FOLDED_TRIGGERS), (text, _EXACT_TRIGGERS)):
+        for literal in literals:
+            index = source.find(literal)
+            while index >= 0:
+                starts.add(text.rfind("\n", 0, index) + 1)
+                line_end = text.find("\n", index)
+                if line_end < 0:
+                    break
+                index = source.find(literal, line_end)
+    return sorted(starts)
+
 
 def sanitize_logs(logs: str) -> str:
     """Sanitize logs by removing potential secrets and sensitive data.
 
     This function applies regex patterns to detect and redact common secret
-    patterns like API keys, passwords, tokens, and connection strings.
+    patterns like API keys, passwords, tokens, and connection strings. Lines
+    that contain none of the patterns' leading literals are skipped.
 
     Args:
         logs: The raw log string to sanitize
@@ -54,11 +182,47 @@ def sanitize_logs(logs: str) -> str:
     if not logs:
         return logs
 
-    sanitized = logs
-    for pattern, replacement in _SECRET_PATTERNS:
-        sanitized = pattern.sub(replacement, sanitized)
+    parts: list[str] = []
+    copied = 0
+    for start in _trigger_line_starts(logs):
+        if start < copied:
+            continue  # Already sanitized as part of the previous span
+        span = _SecretSpan()
+        end = start - 1
+        while True:
+            line_start = end + 1
+            end = logs.find("\n", line_start)
+            if end < 0:
+                end = len(logs)
+            if not span.add(logs[line_start:end]) or end == len(logs):
+                break
+        parts.append(logs[copied:start])
+        parts.append(_sanitize_text(logs[start:end]))
+        copied = end
+    if not parts:
+        return logs
+    parts.append(logs[copied:])
+    return "".join(parts)
 
-    return sanitized
 
+def sanitize_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Sanitize a stream of log lines, yielding each line once it is safe.
 
-__all__ = ["sanitize_logs"]
+    Lines are given without their line break. A line that may continue a
+    secret is held back until the lines completing it have been read.
+    """
+    span: _SecretSpan | None = None
+    for line in lines:
+        if span is None:
+            if not _has_trigger(line):
+                yield line
+                continue
+            span = _SecretSpan()
+        if not span.add(line):
+            yield from _sanitize_text("\n".join(span.lines)).split("\n")
+            span = None
+    if span is not None:
+        yield from _sanitize_text("\n".join(span.lines)).split("\n")
+
+
+__all__ = ["sanitize_lines", "sanitize_logs"]
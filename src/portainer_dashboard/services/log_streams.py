@@ -0,0 +1,192 @@
+"""Shared live log streams for containers.
+
+:class:`LogStreamHub` keeps at most one upstream log stream per container,
+however many viewers follow it. Lines read from the upstream are fanned out
+to a bounded queue per viewer; a viewer that falls behind loses its oldest
+queued lines instead of slowing down the upstream or the other viewers, and
+is told how many lines it missed. Viewers joining a running stream are
+replayed the most recent lines from a small shared history. The upstream is
+closed when its last viewer leaves.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Hashable
+from contextlib import asynccontextmanager
+
+from portainer_dashboard.services.docker_logs import LogLine
+from portainer_dashboard.services.portainer_client import PortainerAPIError
+
+LOGGER = logging.getLogger(__name__)
+
+# Recent lines kept per stream and replayed to viewers that join later
+_DEFAULT_HISTORY_LINES = 500
+
+# Lines queued per viewer before its oldest lines are dropped
+_DEFAULT_QUEUE_SIZE = 1_000
+
+# Opens the upstream stream of a container, given the number of lines to start with
+LogStreamOpener = Callable[[int], AsyncIterator[LogLine]]
+
+
+class LogSubscriber:
+    """One viewer's bounded queue of lines from a shared log stream."""
+
+    __slots__ = ("_queue", "dropped")
+
+    def __init__(self, queue_size: int) -> None:
+        self._queue: asyncio.Queue[LogLine | None] = asyncio.Queue(queue_size)
+        self.dropped = 0
+
+    def offer(self, line: LogLine) -> None:
+        """Queue a line, dropping the oldest queued line when full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(line)
+
+    def close(self) -> None:
+        """Mark the end of the stream after the queued lines."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(None)
+
+    async def get(self) -> LogLine | None:
+        """Wait for the next line, or ``None`` once the stream has ended."""
+        return await self._queue.get()
+
+    def take_dropped(self) -> int:
+        """Return and reset the number of lines dropped since the last call."""
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class _SharedLogStream:
+    """Upstream reader task, history and viewers of one container."""
+
+    __slots__ = ("history", "subscribers", "task")
+
+    def __init__(self, history_lines: int) -> None:
+        self.history: deque[LogLine] = deque(maxlen=history_lines)
+        self.subscribers: set[LogSubscriber] = set()
+        self.task: asyncio.Task[None] | None = None
+
+
+class LogStreamHub:
+    """Shares one upstream log stream per key among all its viewers."""
+
+    def __init__(
+        self,
+        *,
+        history_lines: int = _DEFAULT_HISTORY_LINES,
+        queue_size: int = _DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self._history_lines = history_lines
+        self._queue_size = queue_size
+        self._streams: dict[Hashable, _SharedLogStream] = {}
+
+    @property
+    def upstream_count(self) -> int:
+        """Number of open upstream streams."""
+        return len(self._streams)
+
+    def viewer_count(self, key: Hashable) -> int:
+        """Number of viewers following the stream for ``key``."""
+        stream = self._streams.get(key)
+        return len(stream.subscribers) if stream is not None else 0
+
+    @asynccontextmanager
+    async def subscribe(
+        self, key: Hashable, open_stream: LogStreamOpener, tail: int
+    ) -> AsyncIterator[LogSubscriber]:
+        """Follow the stream for ``key``, opening it if nobody follows it yet.
+
+        The first viewer opens the upstream with ``open_stream(tail)``; later
+        viewers are replayed up to ``tail`` lines of the shared history.
+        """
+        stream = self._streams.get(key)
+        subscriber = LogSubscriber(self._queue_size)
+        if stream is None:
+            stream = _SharedLogStream(self._history_lines)
+            self._streams[key] = stream
+            stream.task = asyncio.create_task(self._pump(key, stream, open_stream, tail))
+        elif tail > 0:
+            for line in list(stream.history)[-tail:]:
+                subscriber.offer(line)
+        stream.subscribers.add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            stream.subscribers.discard(subscriber)
+            if not stream.subscribers:
+                self._remove(key, stream)
+
+    async def _pump(
+        self,
+        key: Hashable,
+        stream: _SharedLogStream,
+        open_stream: LogStreamOpener,
+        tail: int,
+    ) -> None:
+        """Read the upstream and fan each line out to the viewers."""
+        try:
+            async for line in open_stream(min(tail, self._history_lines)):
+                stream.history.append(line)
+                for subscriber in stream.subscribers:
+                    subscriber.offer(line)
+        except PortainerAPIError as exc:
+            LOGGER.debug("Log stream %s failed: %s", key, exc)
+        except Exception as exc:
+            LOGGER.warning("Log stream %s failed unexpectedly: %s", key, exc)
+        finally:
+            if self._streams.get(key) is stream:
+                del self._streams[key]
+            for subscriber in stream.subscribers:
+                subscriber.close()
+
+    def _remove(self, key: Hashable, stream: _SharedLogStream) -> None:
+        """Forget a stream and stop its upstream reader."""
+        if self._streams.get(key) is stream:
+            del self._streams[key]
+        if stream.task is not None:
+            stream.task.cancel()
+
+    async def close(self) -> None:
+        """Stop every upstream stream and end all viewers' streams."""
+        tasks = [stream.task for stream in self._streams.values() if stream.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._streams.clear()
+
+
+# Global log stream hub singleton
+_log_stream_hub: LogStreamHub | None = None
+
+
+def get_log_stream_hub() -> LogStreamHub:
+    """Get or create the global log stream hub."""
+    global _log_stream_hub
+    if _log_stream_hub is None:
+        _log_stream_hub = LogStreamHub()
+    return _log_stream_hub
+
+
+async def shutdown_log_stream_hub() -> None:
+    """Close all live log streams. Call during application shutdown."""
+    global _log_stream_hub
+    if _log_stream_hub is not None:
+        await _log_stream_hub.close()
+        _log_stream_hub = None
+
+
+__all__ = [
+    "LogStreamHub",
+    "LogSubscriber",
+    "get_log_stream_hub",
+    "shutdown_log_stream_hub",
+]
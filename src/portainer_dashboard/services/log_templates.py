@@ -0,0 +1,245 @@
+"""Drain-style log template mining.
+
+Container logs are highly repetitive: the same messages and stack traces are
+written over and over with different numbers, IDs and timestamps in them.
+:class:`LogTemplateMiner` collapses such lines into templates, replacing the
+parts that vary with ``<*>`` and counting how often each template occurred
+and when it was first and last seen, so analysis prompts can list each kind
+of message once instead of every line.
+
+Lines are mined as in Drain: variable-looking substrings are masked, and each
+line is only compared with the templates that have the same number of tokens
+and the same first token. It joins the most similar of those templates if
+enough of their tokens agree, turning the differing tokens into wildcards, or
+starts a new template otherwise. Mining is incremental, so a container's
+templates can be updated with just the lines written since the last fetch.
+
+Lines are sanitized before they are mined: masking would otherwise rewrite
+secrets into forms the sanitizer no longer recognises, and secrets spanning
+several lines, such as private keys, cannot be recognised in a single
+template.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from portainer_dashboard.models.monitoring import LogTemplate
+from portainer_dashboard.services.log_cursors import _line_timestamp
+from portainer_dashboard.services.log_sanitizer import sanitize_lines
+
+LOGGER = logging.getLogger(__name__)
+
+WILDCARD = "<*>"
+
+# UUIDs, hex literals, long hex IDs and digests, and numbers with their
+# separators, which covers dates, times, durations, versions and IP addresses
+_VARIABLE = re.compile(
+    r"[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}"
+    r"|\b0x[0-9a-fA-F]+\b"
+    r"|\b[0-9a-fA-F]{12,}\b"
+    r"|(?<![A-Za-z_])\d+(?:[-.:,/T]\d+)*"
+)
+
+# Share of tokens that must agree for a line to join a template
+_DEFAULT_SIMILARITY = 0.5
+
+# Templates kept per container before the least recently seen are dropped
+_DEFAULT_MAX_TEMPLATES = 256
+
+# Upper bound on tracked containers before the least recently mined are evicted
+_DEFAULT_MAX_MINERS = 1_024
+
+
+def _to_datetime(timestamp: tuple[int, int]) -> datetime:
+    seconds, nanos = timestamp
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(microsecond=nanos // 1_000)
+
+
+class _Cluster:
+    """Tokens, count and time range of one template."""
+
+    __slots__ = ("count", "first_seen", "key", "last_seen", "tokens")
+
+    def __init__(self, key: tuple[int, str], tokens: list[str]) -> None:
+        self.key = key
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen: datetime | None = None
+        self.last_seen: datetime | None = None
+
+    def similarity(self, tokens: list[str]) -> float:
+        """Share of positions where the template equals or wildcards the token."""
+        matches = sum(1 for own, token in zip(self.tokens, tokens) if own in (token, WILDCARD))
+        return matches / len(tokens)
+
+    def merge(self, tokens: list[str]) -> None:
+        """Generalise the template to cover ``tokens``."""
+        self.tokens = [
+            own if own == token else WILDCARD for own, token in zip(self.tokens, tokens)
+        ]
+
+
+class LogTemplateMiner:
+    """Incrementally collapses the log lines of one container into templates.
+
+    Lines may start with a Docker timestamp, which is used for the first and
+    last seen times; lines without one are attributed to the time of the
+    preceding line, as are the continuation lines of a stack trace.
+    """
+
+    def __init__(
+        self,
+        *,
+        similarity: float = _DEFAULT_SIMILARITY,
+        max_templates: int = _DEFAULT_MAX_TEMPLATES,
+    ) -> None:
+        self._similarity = similarity
+        self._max_templates = max_templates
+        self._groups: dict[tuple[int, str], list[_Cluster]] = {}
+        # Clusters in order of last use, for eviction
+        self._clusters: OrderedDict[int, _Cluster] = OrderedDict()
+        self._last_seen: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def add(self, line: str) -> None:
+        """Add one log line to the templates."""
+        timestamp = _line_timestamp(line)
+        if timestamp is not None:
+            self._last_seen = _to_datetime(timestamp)
+            line = line.partition(" ")[2]
+        tokens = _VARIABLE.sub(WILDCARD, line).split()
+        if not tokens:
+            return
+
+        first = tokens[0] if WILDCARD not in tokens[0] else WILDCARD
+        key = (len(tokens), first)
+        group = self._groups.setdefault(key, [])
+        best: _Cluster | None = None
+        best_similarity = self._similarity
+        for cluster in group:
+            similarity = cluster.similarity(tokens)
+            if similarity >= best_similarity and (
+                best is None or similarity > best_similarity
+            ):
+                best, best_similarity = cluster, similarity
+
+        if best is None:
+            best = _Cluster(key, tokens)
+            group.append(best)
+            self._clusters[id(best)] = best
+            if len(self._clusters) > self._max_templates:
+                self._evict()
+        else:
+            best.merge(tokens)
+            self._clusters.move_to_end(id(best))
+
+        best.count += 1
+        if best.first_seen is None:
+            best.first_seen = self._last_seen
+        best.last_seen = self._last_seen
+
+    def add_lines(self, lines: Iterable[str]) -> None:
+        """Add log lines to the templates in the order they were written."""
+        for line in lines:
+            self.add(line)
+
+    def templates(self) -> list[LogTemplate]:
+        """Return the templates, most frequent first."""
+        clusters = sorted(self._clusters.values(), key=lambda cluster: -cluster.count)
+        return [
+            LogTemplate(
+                template=" ".join(cluster.tokens),
+                count=cluster.count,
+                first_seen=cluster.first_seen,
+                last_seen=cluster.last_seen,
+            )
+            for cluster in clusters
+        ]
+
+    def _evict(self) -> None:
+        """Drop the least recently seen template."""
+        _, cluster = self._clusters.popitem(last=False)
+        group = self._groups[cluster.key]
+        group.remove(cluster)
+        if not group:
+            del self._groups[cluster.key]
+
+
+def mine_log_templates(lines: Iterable[str]) -> list[LogTemplate]:
+    """Sanitize log lines and collapse them into templates, most frequent first."""
+    miner = LogTemplateMiner()
+    miner.add_lines(sanitize_lines(lines))
+    return miner.templates()
+
+
+class LogTemplateStore:
+    """Per-container template miners keyed by endpoint and container ID.
+
+    Miners are fed only the lines that are new since the previous fetch. The
+    number of miners is bounded like the log cursors; the least recently
+    mined containers are forgotten first.
+    """
+
+    def __init__(self, max_miners: int = _DEFAULT_MAX_MINERS) -> None:
+        self._miners: OrderedDict[tuple[int, str], LogTemplateMiner] = OrderedDict()
+        self._max_miners = max_miners
+
+    def __len__(self) -> int:
+        return len(self._miners)
+
+    def add(self, endpoint_id: int, container_id: str, lines: Iterable[str]) -> list[LogTemplate]:
+        """Sanitize and mine new log lines of a container and return all its templates."""
+        key = (endpoint_id, container_id)
+        miner = self._miners.get(key)
+        if miner is None:
+            miner = LogTemplateMiner()
+            self._miners[key] = miner
+        miner.add_lines(sanitize_lines(lines))
+        self._miners.move_to_end(key)
+        while len(self._miners) > self._max_miners:
+            self._miners.popitem(last=False)
+        return miner.templates()
+
+    def forget(self, endpoint_id: int, container_id: str) -> None:
+        """Drop the templates of a container so they start over."""
+        self._miners.pop((endpoint_id, container_id), None)
+
+
+def _format_time(value: datetime | None) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ") if value is not None else "unknown"
+
+
+def format_log_templates(templates: list[LogTemplate], *, limit: int) -> list[str]:
+    """Render the ``limit`` most frequent templates as lines for a prompt.
+
+    The templates must have been mined from sanitized lines.
+    """
+    rendered: list[str] = []
+    for template in templates[:limit]:
+        seen = _format_time(template.last_seen)
+        if template.first_seen != template.last_seen:
+            seen = f"{_format_time(template.first_seen)} to {seen}"
+        rendered.append(f"- {template.count}x [{seen}] {template.template}")
+    if len(templates) > limit:
+        hidden = templates[limit:]
+        rendered.append(
+            f"- ... {len(hidden)} less frequent templates "
+            f"({sum(template.count for template in hidden)} lines)"
+        )
+    return rendered
+
+
+__all__ = [
+    "LogTemplateMiner",
+    "LogTemplateStore",
+    "WILDCARD",
+    "format_log_templates",
+    "mine_log_templates",
+]
@@ -1,13 +1,16 @@
-"""Metrics collector for container CPU/memory metrics."""
+"""Metrics collector for container CPU/memory/I/O metrics."""
 
 from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import Collection
 from datetime import datetime, timezone
 
 from portainer_dashboard.config import PortainerEnvironmentSettings, get_settings
+from portainer_dashboard.core.store_executor import run_write
 from portainer_dashboard.models.metrics import ContainerMetric, MetricType
+from portainer_dashboard.services.anomaly_detector import AnomalyDetector
 from portainer_dashboard.services.metrics_store import SQLiteMetricsStore, get_metrics_store
 from portainer_dashboard.services.portainer_client import (
     AsyncPortainerClient,
@@ -131,11 +134,99 @@ def _calculate_block_stats(stats: dict) -> tuple[int | None, int | None]:
         return None, None
 
 
+# Labels Docker sets on containers started from compose projects / swarm stacks
+_COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+_SWARM_STACK_LABEL = "com.docker.stack.namespace"
+
+# Stats requests in flight at once per endpoint
+_MAX_CONCURRENT_STATS = 8
+
+# Cumulative counters and the per-second rate metric derived from each
+_COUNTER_RATE_TYPES: dict[MetricType, MetricType] = {
+    MetricType.NETWORK_RX_BYTES: MetricType.NETWORK_RX_RATE,
+    MetricType.NETWORK_TX_BYTES: MetricType.NETWORK_TX_RATE,
+    MetricType.BLOCK_READ_BYTES: MetricType.BLOCK_READ_RATE,
+    MetricType.BLOCK_WRITE_BYTES: MetricType.BLOCK_WRITE_RATE,
+}
+
+
+def _container_stack(container: dict) -> str | None:
+    """Return the compose project or swarm stack a container belongs to."""
+    labels = container.get("Labels")
+    if not isinstance(labels, dict):
+        return None
+    return labels.get(_COMPOSE_PROJECT_LABEL) or labels.get(_SWARM_STACK_LABEL) or None
+
+
+class CounterRateTracker:
+    """Derives per-second rates from cumulative byte counters.
+
+    Keeps the last seen value of each (container, counter) pair. A counter
+    that goes backwards, e.g. after a container restart, is treated as a
+    reset: no rate is produced and the sample becomes the new baseline.
+    """
+
+    def __init__(self) -> None:
+        self._last: dict[tuple[str, MetricType], tuple[float, datetime]] = {}
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def rate(
+        self,
+        container_id: str,
+        counter_type: MetricType,
+        value: float,
+        timestamp: datetime,
+    ) -> float | None:
+        """Record a counter sample and return the rate since the previous one.
+
+        Returns:
+            Bytes per second, or None for the first sample, after a counter
+            reset or when no time has elapsed.
+        """
+        key = (container_id, counter_type)
+        previous = self._last.get(key)
+        self._last[key] = (value, timestamp)
+
+        if previous is None:
+            return None
+        last_value, last_timestamp = previous
+        elapsed = (timestamp - last_timestamp).total_seconds()
+        if value < last_value:
+            LOGGER.debug("Counter reset for %s/%s", container_id, counter_type.value)
+            return None
+        if elapsed <= 0:
+            return None
+        return (value - last_value) / elapsed
+
+    def retain(self, container_ids: Collection[str]) -> None:
+        """Forget counters of containers that are no longer reported."""
+        self._last = {
+            key: sample for key, sample in self._last.items() if key[0] in container_ids
+        }
+
+
 class MetricsCollector:
-    """Collects container metrics from Portainer endpoints."""
+    """Collects container metrics from Portainer endpoints.
 
-    def __init__(self, metrics_store: SQLiteMetricsStore) -> None:
+    Network and block I/O counters are stored as reported by Docker and
+    additionally as per-second rates derived from the previous collection.
+    When an anomaly detector is attached, every collected batch is scored
+    for anomalies right after it has been stored.
+    """
+
+    def __init__(
+        self,
+        metrics_store: SQLiteMetricsStore,
+        anomaly_detector: AnomalyDetector | None = None,
+    ) -> None:
         self._metrics_store = metrics_store
+        self._anomaly_detector = anomaly_detector
+        self._counter_rates = CounterRateTracker()
+        # Scoring runs on a worker thread; one batch at a time, as it updates
+        # the detectors' rolling windows
+        self._scoring_lock = asyncio.Lock()
         self._settings = get_settings()
 
     async def collect_metrics_for_container(
@@ -145,24 +236,21 @@ class MetricsCollector:
         endpoint_name: str | None,
         container_id: str,
         container_name: str,
+        *,
+        stack_name: str | None = None,
+        image: str | None = None,
     ) -> list[ContainerMetric]:
-        """Collect all metrics for a single container."""
+        """Collect all metrics for a single container.
+
+        Raises:
+            PortainerAPIError: If the container's stats could not be fetched.
+        """
         metrics: list[ContainerMetric] = []
         now = datetime.now(timezone.utc)
 
-        try:
-            stats = await client.get_container_stats(endpoint_id, container_id)
-        except PortainerAPIError as exc:
-            LOGGER.debug(
-                "Failed to get stats for container %s: %s",
-                container_name,
-                exc,
-            )
-            return metrics
+        stats = await client.get_container_stats(endpoint_id, container_id)
 
-        # CPU
-        cpu_percent = _calculate_cpu_percent(stats)
-        if cpu_percent is not None:
+        def add(metric_type: MetricType, value: float) -> None:
             metrics.append(
                 ContainerMetric(
                     timestamp=now,
@@ -170,100 +258,128 @@ class MetricsCollector:
                     endpoint_name=endpoint_name,
                     container_id=container_id,
                     container_name=container_name,
-                    metric_type=MetricType.CPU_PERCENT,
-                    value=cpu_percent,
+                    stack_name=stack_name,
+                    image=image,
+                    metric_type=metric_type,
+                    value=value,
                 )
             )
 
+        # CPU
+        cpu_percent = _calculate_cpu_percent(stats)
+        if cpu_percent is not None:
+            add(MetricType.CPU_PERCENT, cpu_percent)
+
         # Memory
         mem_percent, mem_usage = _calculate_memory_stats(stats)
         if mem_percent is not None:
-            metrics.append(
-                ContainerMetric(
-                    timestamp=now,
-                    endpoint_id=endpoint_id,
-                    endpoint_name=endpoint_name,
-                    container_id=container_id,
-                    container_name=container_name,
-                    metric_type=MetricType.MEMORY_PERCENT,
-                    value=mem_percent,
-                )
-            )
+            add(MetricType.MEMORY_PERCENT, mem_percent)
         if mem_usage is not None:
-            metrics.append(
-                ContainerMetric(
-                    timestamp=now,
-                    endpoint_id=endpoint_id,
-                    endpoint_name=endpoint_name,
-                    container_id=container_id,
-                    container_name=container_name,
-                    metric_type=MetricType.MEMORY_USAGE,
-                    value=float(mem_usage),
-                )
-            )
+            add(MetricType.MEMORY_USAGE, float(mem_usage))
 
         # Network
         rx_bytes, tx_bytes = _calculate_network_stats(stats)
         if rx_bytes is not None:
-            metrics.append(
-                ContainerMetric(
-                    timestamp=now,
-                    endpoint_id=endpoint_id,
-                    endpoint_name=endpoint_name,
-                    container_id=container_id,
-                    container_name=container_name,
-                    metric_type=MetricType.NETWORK_RX_BYTES,
-                    value=float(rx_bytes),
-                )
-            )
+            add(MetricType.NETWORK_RX_BYTES, float(rx_bytes))
         if tx_bytes is not None:
-            metrics.append(
-                ContainerMetric(
-                    timestamp=now,
-                    endpoint_id=endpoint_id,
-                    endpoint_name=endpoint_name,
-                    container_id=container_id,
-                    container_name=container_name,
-                    metric_type=MetricType.NETWORK_TX_BYTES,
-                    value=float(tx_bytes),
-                )
-            )
+            add(MetricType.NETWORK_TX_BYTES, float(tx_bytes))
 
         # Block I/O
         read_bytes, write_bytes = _calculate_block_stats(stats)
         if read_bytes is not None:
-            metrics.append(
-                ContainerMetric(
-                    timestamp=now,
-                    endpoint_id=endpoint_id,
-                    endpoint_name=endpoint_name,
-                    container_id=container_id,
-                    container_name=container_name,
-                    metric_type=MetricType.BLOCK_READ_BYTES,
-                    value=float(read_bytes),
-                )
-            )
+            add(MetricType.BLOCK_READ_BYTES, float(read_bytes))
         if write_bytes is not None:
-            metrics.append(
-                ContainerMetric(
-                    timestamp=now,
-                    endpoint_id=endpoint_id,
-                    endpoint_name=endpoint_name,
-                    container_id=container_id,
-                    container_name=container_name,
-                    metric_type=MetricType.BLOCK_WRITE_BYTES,
-                    value=float(write_bytes),
-                )
-            )
+            add(MetricType.BLOCK_WRITE_BYTES, float(write_bytes))
+
+        # Per-second I/O rates derived from the cumulative counters
+        counters = {
+            MetricType.NETWORK_RX_BYTES: rx_bytes,
+            MetricType.NETWORK_TX_BYTES: tx_bytes,
+            MetricType.BLOCK_READ_BYTES: read_bytes,
+            MetricType.BLOCK_WRITE_BYTES: write_bytes,
+        }
+        for counter_type, counter in counters.items():
+            if counter is None:
+                continue
+            rate = self._counter_rates.rate(container_id, counter_type, float(counter), now)
+            if rate is not None:
+                add(_COUNTER_RATE_TYPES[counter_type], rate)
 
         return metrics
 
+    async def collect_metrics_for_containers(
+        self,
+        client: AsyncPortainerClient,
+        endpoint_id: int,
+        endpoint_name: str | None,
+        containers: list[dict],
+    ) -> tuple[list[ContainerMetric], bool]:
+        """Collect metrics for the running containers of an endpoint listing.
+
+        Stats requests run concurrently, at most ``_MAX_CONCURRENT_STATS`` per
+        endpoint at a time.
+
+        Returns:
+            Tuple of (metrics, complete). ``complete`` is False when the stats
+            of a container could not be fetched.
+        """
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_STATS)
+        complete = True
+
+        async def collect(container: dict) -> list[ContainerMetric]:
+            nonlocal complete
+            container_id = container.get("Id") or container.get("ID") or container.get("id")
+            if not container_id:
+                return []
+
+            names = container.get("Names", [])
+            if isinstance(names, list) and names:
+                container_name = str(names[0]).lstrip("/")
+            else:
+                container_name = container.get("Name") or container_id[:12]
+
+            # Only collect from running containers
+            state = container.get("State", "").lower()
+            if state != "running":
+                return []
+
+            image = container.get("Image")
+            async with semaphore:
+                try:
+                    return await self.collect_metrics_for_container(
+                        client,
+                        endpoint_id,
+                        endpoint_name,
+                        container_id,
+                        container_name,
+                        stack_name=_container_stack(container),
+                        image=str(image) if image else None,
+                    )
+                except PortainerAPIError as exc:
+                    LOGGER.debug(
+                        "Failed to get stats for container %s: %s",
+                        container_name,
+                        exc,
+                    )
+                    complete = False
+                    return []
+
+        results = await asyncio.gather(*(collect(container) for container in containers))
+        return [metric for metrics in results for metric in metrics], complete
+
     async def collect_metrics_for_endpoint(
         self,
         env: PortainerEnvironmentSettings,
-    ) -> list[ContainerMetric]:
-        """Collect metrics for all running containers on an endpoint."""
+    ) -> tuple[list[ContainerMetric], bool]:
+        """Collect metrics for all running containers on an endpoint.
+
+        Returns:
+            Tuple of (metrics, complete). ``complete`` is False when the
+            endpoints, a container listing or a container's stats could not
+            be fetched.
+        """
         all_metrics: list[ContainerMetric] = []
+        complete = True
 
         client = create_portainer_client(env)
 
@@ -296,44 +412,33 @@ class MetricsCollector:
                             endpoint_id, include_stopped=False
                         )
                     except PortainerAPIError:
+                        complete = False
                         continue
 
-                    for container in containers:
-                        container_id = (
-                            container.get("Id")
-                            or container.get("ID")
-                            or container.get("id")
-                        )
-                        if not container_id:
-                            continue
-
-                        names = container.get("Names", [])
-                        if isinstance(names, list) and names:
-                            container_name = str(names[0]).lstrip("/")
-                        else:
-                            container_name = container.get("Name") or container_id[:12]
-
-                        # Only collect from running containers
-                        state = container.get("State", "").lower()
-                        if state != "running":
-                            continue
-
-                        metrics = await self.collect_metrics_for_container(
-                            client,
-                            endpoint_id,
-                            endpoint_name,
-                            container_id,
-                            container_name,
-                        )
-                        all_metrics.extend(metrics)
+                    metrics, endpoint_complete = await self.collect_metrics_for_containers(
+                        client, endpoint_id, endpoint_name, containers
+                    )
+                    all_metrics.extend(metrics)
+                    complete = complete and endpoint_complete
 
         except PortainerAPIError as exc:
             LOGGER.warning("Failed to collect metrics from %s: %s", env.name, exc)
+            complete = False
+
+        return all_metrics, complete
 
-        return all_metrics
+    @property
+    def enabled(self) -> bool:
+        """Return True when metrics collection is enabled in the settings."""
+        return get_settings().metrics.enabled
 
     async def collect_all_metrics(self) -> int:
-        """Collect metrics from all configured Portainer environments."""
+        """Collect metrics from all configured Portainer environments.
+
+        Monitoring cycles collect metrics during the snapshot walk instead
+        (see ``DataCollector.collect_snapshot_and_metrics``); this walks the
+        environments on its own.
+        """
         settings = get_settings()
 
         if not settings.metrics.enabled:
@@ -353,27 +458,68 @@ class MetricsCollector:
         ]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
+        complete = True
         for result in results:
-            if isinstance(result, list):
-                all_metrics.extend(result)
-            elif isinstance(result, Exception):
+            if isinstance(result, Exception):
+                complete = False
                 LOGGER.warning("Metrics collection error: %s", result)
+                continue
+            metrics, env_complete = result
+            all_metrics.extend(metrics)
+            complete = complete and env_complete
+
+        return await self.record_metrics(all_metrics, complete=complete)
+
+    async def record_metrics(
+        self, all_metrics: list[ContainerMetric], *, complete: bool = True
+    ) -> int:
+        """Store one collection round of metrics and score it for anomalies.
+
+        Args:
+            all_metrics: Metrics collected from every environment.
+            complete: False when an environment, endpoint or container could
+                not be collected, so containers merely missing from this round
+                keep their counter baselines.
+
+        Returns:
+            The number of metrics stored.
+        """
+        # Drop counter baselines of removed containers, unless collection
+        # failed somewhere and containers are merely missing from this round
+        if complete:
+            self._counter_rates.retain({m.container_id for m in all_metrics})
 
         # Store all metrics
         if all_metrics:
-            self._metrics_store.store_metrics_batch(all_metrics)
+            await run_write(self._metrics_store.store_metrics_batch, all_metrics, wait=False)
             LOGGER.info("Collected and stored %d metrics", len(all_metrics))
 
+            # Score the batch for anomalies. This is CPU work, so it runs on
+            # its own thread rather than holding up the metrics store's writes
+            if self._anomaly_detector is not None:
+                try:
+                    async with self._scoring_lock:
+                        await asyncio.to_thread(
+                            self._anomaly_detector.analyze_metrics_batch,
+                            all_metrics,
+                            only_anomalies=True,
+                        )
+                except Exception as exc:
+                    LOGGER.warning("Anomaly scoring failed: %s", exc)
+
         return len(all_metrics)
 
 
-async def create_metrics_collector() -> MetricsCollector:
+async def create_metrics_collector(
+    anomaly_detector: AnomalyDetector | None = None,
+) -> MetricsCollector:
     """Create a metrics collector with the configured store."""
     store = await get_metrics_store()
-    return MetricsCollector(store)
+    return MetricsCollector(store, anomaly_detector=anomaly_detector)
 
 
 __all__ = [
+    "CounterRateTracker",
     "MetricsCollector",
     "create_metrics_collector",
 ]
@@ -3,96 +3,325 @@
 from __future__ import annotations
 
 import logging
+import math
 import sqlite3
+import time
+from array import array
+from collections.abc import Callable, Sequence
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from threading import RLock
+
+import numpy as np
 
 from portainer_dashboard.config import get_settings
-from portainer_dashboard.core.sqlite_pool import SQLiteConnectionPool
+from portainer_dashboard.core.sqlite_pool import get_pool
+from portainer_dashboard.core.sqlite_writer import SQLiteWriteQueue
 from portainer_dashboard.models.metrics import (
     AnomalyDetection,
     ContainerMetric,
+    DownsampleMethod,
+    FleetAggregate,
+    FleetGroupBy,
     MetricsDashboard,
+    MetricSeries,
     MetricsSummary,
     MetricType,
+    SeriesSelector,
 )
+from portainer_dashboard.services.downsampling import downsample
 
 LOGGER = logging.getLogger(__name__)
 
+# Retention purge limits per scheduler run
+_PURGE_CHUNK_SIZE = 5000
+_PURGE_TIME_BUDGET_SECONDS = 5.0
+
+# Width of the pre-aggregated buckets backing fleet queries
+_ROLLUP_BUCKET_SECONDS = 300
+
+_INSERT_METRIC_SQL = """
+    INSERT OR REPLACE INTO metrics (
+        id, timestamp, endpoint_id, endpoint_name,
+        container_id, container_name, stack_name, image, metric_type, value
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT_ROLLUP_SQL = """
+    INSERT INTO metric_rollups (
+        metric_type, bucket_start, container_id, container_name,
+        endpoint_id, endpoint_name, stack_name, image,
+        value_sum, value_count, value_max
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+    ON CONFLICT (metric_type, bucket_start, container_id) DO UPDATE SET
+        container_name = excluded.container_name,
+        endpoint_id = excluded.endpoint_id,
+        endpoint_name = excluded.endpoint_name,
+        stack_name = excluded.stack_name,
+        image = excluded.image,
+        value_sum = value_sum + excluded.value_sum,
+        value_count = value_count + 1,
+        value_max = MAX(value_max, excluded.value_max)
+"""
+
+_UPSERT_CONTAINER_SQL = """
+    INSERT INTO metric_containers (container_id, endpoint_id, last_seen)
+    VALUES (?, ?, ?)
+    ON CONFLICT (container_id) DO UPDATE SET
+        endpoint_id = excluded.endpoint_id,
+        last_seen = MAX(last_seen, excluded.last_seen)
+"""
+
+# Grouping columns of the fleet aggregate queries: (key, label)
+_FLEET_GROUP_COLUMNS: dict[FleetGroupBy, tuple[str, str]] = {
+    FleetGroupBy.CONTAINER: ("container_id", "container_name"),
+    FleetGroupBy.ENDPOINT: ("endpoint_id", "endpoint_name"),
+    FleetGroupBy.STACK: ("stack_name", "stack_name"),
+    FleetGroupBy.IMAGE: ("image", "image"),
+}
+
+_INSERT_ANOMALY_SQL = """
+    INSERT OR REPLACE INTO anomalies (
+        id, timestamp, endpoint_id, endpoint_name,
+        container_id, container_name, metric_type,
+        current_value, expected_value, zscore, is_anomaly, direction
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class _PercentileAggregate:
+    """SQLite aggregate computing a linearly interpolated percentile.
+
+    Registered as ``percentile_cont(value, fraction)`` with ``fraction``
+    in ``[0, 1]``. Values are buffered in a compact ``array('d')`` and
+    only sorted once when the aggregate is finalised.
+    """
+
+    def __init__(self) -> None:
+        self._values = array("d")
+        self._fraction = 0.5
+
+    def step(self, value: float | None, fraction: float) -> None:
+        if value is None:
+            return
+        self._values.append(value)
+        self._fraction = fraction
+
+    def finalize(self) -> float | None:
+        if not self._values:
+            return None
+        ordered = sorted(self._values)
+        position = (len(ordered) - 1) * min(max(self._fraction, 0.0), 1.0)
+        lower = math.floor(position)
+        upper = math.ceil(position)
+        if lower == upper:
+            return ordered[lower]
+        weight = position - lower
+        return ordered[lower] * (1 - weight) + ordered[upper] * weight
+
+
+class _StdDevAggregate:
+    """SQLite aggregate computing the population standard deviation.
+
+    Registered as ``stddev_pop(value)``. Uses Welford's online algorithm, so
+    large values with a small spread, such as byte counters, do not lose
+    their variance to cancellation as with the sum of squares.
+    """
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def step(self, value: float | None) -> None:
+        if value is None:
+            return
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def finalize(self) -> float | None:
+        if not self._count:
+            return None
+        return math.sqrt(max(self._m2, 0.0) / self._count)
+
+
+def _register_sql_functions(connection: sqlite3.Connection) -> None:
+    """Register custom SQL functions used by the metrics queries."""
+    connection.create_aggregate("percentile_cont", 2, _PercentileAggregate)
+    connection.create_aggregate("stddev_pop", 1, _StdDevAggregate)
+
 
 class SQLiteMetricsStore:
     """SQLite-backed storage for time-series container metrics.
 
     Uses connection pooling for improved performance on repeated operations.
+    All writes go through a single writer thread that groups them into
+    shared transactions; queries use read-only connections and never wait
+    for a Python lock.
     """
 
     def __init__(self, database_path: Path) -> None:
         self._database_path = database_path
-        self._lock = RLock()
-        self._pool = SQLiteConnectionPool(database_path)
+        self._pool = get_pool(database_path, on_connect=_register_sql_functions)
+        self._writer = SQLiteWriteQueue(self._pool, name="metrics-writer")
         self._initialise()
 
-    def _connect(self) -> sqlite3.Connection:
-        """Get a pooled connection. Prefer using _pool.connection() context manager."""
-        return self._pool.get_connection()
-
     def _initialise(self) -> None:
-        with self._lock:
-            self._database_path.parent.mkdir(parents=True, exist_ok=True)
-            with self._pool.transaction() as connection:
-                connection.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS metrics (
-                        id TEXT PRIMARY KEY,
-                        timestamp TEXT NOT NULL,
-                        endpoint_id INTEGER NOT NULL,
-                        endpoint_name TEXT,
-                        container_id TEXT NOT NULL,
-                        container_name TEXT NOT NULL,
-                        metric_type TEXT NOT NULL,
-                        value REAL NOT NULL
-                    )
-                    """
+        self._database_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._pool.transaction() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metrics (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    endpoint_id INTEGER NOT NULL,
+                    endpoint_name TEXT,
+                    container_id TEXT NOT NULL,
+                    container_name TEXT NOT NULL,
+                    stack_name TEXT,
+                    image TEXT,
+                    metric_type TEXT NOT NULL,
+                    value REAL NOT NULL
                 )
-                connection.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_metrics_container_time
-                    ON metrics (container_id, timestamp DESC)
-                    """
+                """
+            )
+            # Databases created before stack/image tracking lack the columns
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(metrics)")}
+            for column in ("stack_name", "image"):
+                if column not in columns:
+                    connection.execute(f"ALTER TABLE metrics ADD COLUMN {column} TEXT")
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_metrics_container_time
+                ON metrics (container_id, timestamp DESC)
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_metrics_timestamp
+                ON metrics (timestamp DESC)
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_metrics_series_time
+                ON metrics (container_id, metric_type, timestamp DESC)
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS anomalies (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    endpoint_id INTEGER NOT NULL,
+                    endpoint_name TEXT,
+                    container_id TEXT NOT NULL,
+                    container_name TEXT NOT NULL,
+                    metric_type TEXT NOT NULL,
+                    current_value REAL NOT NULL,
+                    expected_value REAL NOT NULL,
+                    zscore REAL NOT NULL,
+                    is_anomaly INTEGER NOT NULL,
+                    direction TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_anomalies_timestamp
+                ON anomalies (timestamp DESC)
+                """
+            )
+            rollups_exist = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'metric_rollups'"
+            ).fetchone()
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metric_rollups (
+                    metric_type TEXT NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    container_id TEXT NOT NULL,
+                    container_name TEXT NOT NULL,
+                    endpoint_id INTEGER NOT NULL,
+                    endpoint_name TEXT,
+                    stack_name TEXT,
+                    image TEXT,
+                    value_sum REAL NOT NULL,
+                    value_count INTEGER NOT NULL,
+                    value_max REAL NOT NULL,
+                    PRIMARY KEY (metric_type, bucket_start, container_id)
                 )
+                """
+            )
+            if not rollups_exist:
+                # Build the pre-aggregates for metrics stored before they existed
                 connection.execute(
                     """
-                    CREATE INDEX IF NOT EXISTS idx_metrics_timestamp
-                    ON metrics (timestamp DESC)
-                    """
+                    INSERT INTO metric_rollups
+                    SELECT
+                        metric_type,
+                        CAST(strftime('%s', timestamp) AS INTEGER) / ? * ?,
+                        container_id,
+                        MAX(container_name),
+                        MAX(endpoint_id),
+                        MAX(endpoint_name),
+                        MAX(stack_name),
+                        MAX(image),
+                        SUM(value),
+                        COUNT(*),
+                        MAX(value)
+                    FROM metrics
+                    GROUP BY 1, 2, 3
+                    """,
+                    (_ROLLUP_BUCKET_SECONDS, _ROLLUP_BUCKET_SECONDS),
+                )
+
+            # Dashboard counters, maintained on every insert and purge so
+            # the dashboard never scans the metrics table
+            counters_exist = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'metric_counters'"
+            ).fetchone()
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metric_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
                 )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS metric_containers (
+                    container_id TEXT PRIMARY KEY,
+                    endpoint_id INTEGER NOT NULL,
+                    last_seen TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_metric_containers_last_seen
+                ON metric_containers (last_seen)
+                """
+            )
+            if not counters_exist:
                 connection.execute(
                     """
-                    CREATE TABLE IF NOT EXISTS anomalies (
-                        id TEXT PRIMARY KEY,
-                        timestamp TEXT NOT NULL,
-                        endpoint_id INTEGER NOT NULL,
-                        endpoint_name TEXT,
-                        container_id TEXT NOT NULL,
-                        container_name TEXT NOT NULL,
-                        metric_type TEXT NOT NULL,
-                        current_value REAL NOT NULL,
-                        expected_value REAL NOT NULL,
-                        zscore REAL NOT NULL,
-                        is_anomaly INTEGER NOT NULL,
-                        direction TEXT NOT NULL
-                    )
+                    INSERT INTO metric_counters (name, value)
+                    SELECT 'metrics', COUNT(*) FROM metrics
                     """
                 )
                 connection.execute(
                     """
-                    CREATE INDEX IF NOT EXISTS idx_anomalies_timestamp
-                    ON anomalies (timestamp DESC)
+                    INSERT INTO metric_containers (container_id, endpoint_id, last_seen)
+                    SELECT container_id, MAX(endpoint_id), MAX(timestamp)
+                    FROM metrics
+                    GROUP BY container_id
                     """
                 )
-                connection.commit()
-            LOGGER.info("Metrics store initialized at %s", self._database_path)
+            connection.commit()
+        LOGGER.info("Metrics store initialized at %s", self._database_path)
 
     @staticmethod
     def _encode_datetime(value: datetime) -> str:
@@ -102,55 +331,102 @@ class SQLiteMetricsStore:
     def _decode_datetime(value: str) -> datetime:
         return datetime.fromisoformat(value).astimezone(timezone.utc)
 
-    def store_metric(self, metric: ContainerMetric) -> None:
+    @classmethod
+    def _metric_row(cls, metric: ContainerMetric) -> tuple:
+        return (
+            metric.id,
+            cls._encode_datetime(metric.timestamp),
+            metric.endpoint_id,
+            metric.endpoint_name,
+            metric.container_id,
+            metric.container_name,
+            metric.stack_name,
+            metric.image,
+            metric.metric_type.value,
+            metric.value,
+        )
+
+    @staticmethod
+    def _rollup_row(metric: ContainerMetric) -> tuple:
+        epoch = int(metric.timestamp.timestamp())
+        return (
+            metric.metric_type.value,
+            epoch - epoch % _ROLLUP_BUCKET_SECONDS,
+            metric.container_id,
+            metric.container_name,
+            metric.endpoint_id,
+            metric.endpoint_name,
+            metric.stack_name,
+            metric.image,
+            metric.value,
+            metric.value,
+        )
+
+    @classmethod
+    def _anomaly_row(cls, anomaly: AnomalyDetection) -> tuple:
+        return (
+            anomaly.id,
+            cls._encode_datetime(anomaly.timestamp),
+            anomaly.endpoint_id,
+            anomaly.endpoint_name,
+            anomaly.container_id,
+            anomaly.container_name,
+            anomaly.metric_type.value,
+            anomaly.current_value,
+            anomaly.expected_value,
+            anomaly.zscore,
+            1 if anomaly.is_anomaly else 0,
+            anomaly.direction,
+        )
+
+    def store_metric(self, metric: ContainerMetric, *, wait: bool = True) -> None:
         """Store a single metric data point."""
-        with self._lock, self._pool.transaction() as connection:
-            connection.execute(
-                """
-                INSERT OR REPLACE INTO metrics (
-                    id, timestamp, endpoint_id, endpoint_name,
-                    container_id, container_name, metric_type, value
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    metric.id,
-                    self._encode_datetime(metric.timestamp),
-                    metric.endpoint_id,
-                    metric.endpoint_name,
-                    metric.container_id,
-                    metric.container_name,
-                    metric.metric_type.value,
-                    metric.value,
-                ),
-            )
+        self.store_metrics_batch([metric], wait=wait)
+
+    def store_metrics_batch(self, metrics: list[ContainerMetric], *, wait: bool = True) -> None:
+        """Store multiple metrics efficiently.
+
+        Rows are handed to the store's writer thread, which commits them
+        together with other pending writes in one transaction. The
+        pre-aggregated fleet rollups are updated in the same transaction.
 
-    def store_metrics_batch(self, metrics: list[ContainerMetric]) -> None:
-        """Store multiple metrics efficiently."""
+        Args:
+            metrics: Metrics to store.
+            wait: Block until the rows are committed. Background producers
+                pass False to return as soon as the rows are queued.
+        """
         if not metrics:
             return
-        with self._lock, self._pool.transaction() as connection:
-            connection.executemany(
-                """
-                INSERT OR REPLACE INTO metrics (
-                    id, timestamp, endpoint_id, endpoint_name,
-                    container_id, container_name, metric_type, value
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                [
-                    (
-                        m.id,
-                        self._encode_datetime(m.timestamp),
-                        m.endpoint_id,
-                        m.endpoint_name,
-                        m.container_id,
-                        m.container_name,
-                        m.metric_type.value,
-                        m.value,
-                    )
-                    for m in metrics
-                ],
+        metric_rows = [self._metric_row(m) for m in metrics]
+        rollup_rows = [self._rollup_row(m) for m in metrics]
+        latest: dict[str, tuple[int, str]] = {}
+        for row in metric_rows:
+            container_id, endpoint_id, timestamp = row[4], row[2], row[1]
+            if container_id not in latest or latest[container_id][1] < timestamp:
+                latest[container_id] = (endpoint_id, timestamp)
+        container_rows = [(cid, eid, ts) for cid, (eid, ts) in latest.items()]
+
+        def insert(connection: sqlite3.Connection) -> None:
+            inserted = connection.executemany(_INSERT_METRIC_SQL, metric_rows).rowcount
+            connection.executemany(_UPSERT_ROLLUP_SQL, rollup_rows)
+            connection.executemany(_UPSERT_CONTAINER_SQL, container_rows)
+            connection.execute(
+                "UPDATE metric_counters SET value = value + ? WHERE name = 'metrics'",
+                (inserted,),
             )
-            LOGGER.debug("Stored %d metrics", len(metrics))
+
+        future = self._writer.submit(insert, weight=len(metrics), urgent=wait)
+        if wait:
+            future.result()
+        LOGGER.debug("Queued %d metrics", len(metrics))
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until all queued writes have been committed."""
+        self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Commit queued writes and stop the writer thread."""
+        self._writer.close()
 
     def get_metrics(
         self,
@@ -180,7 +456,7 @@ class SQLiteMetricsStore:
         query += " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
 
-        with self._lock, self._pool.connection() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(query, params)
             rows = cursor.fetchall()
 
@@ -192,6 +468,8 @@ class SQLiteMetricsStore:
                 endpoint_name=row["endpoint_name"],
                 container_id=row["container_id"],
                 container_name=row["container_name"],
+                stack_name=row["stack_name"],
+                image=row["image"],
                 metric_type=MetricType(row["metric_type"]),
                 value=row["value"],
             )
@@ -206,59 +484,78 @@ class SQLiteMetricsStore:
         hours: int = 24,
     ) -> MetricsSummary | None:
         """Get statistical summary for a container's metrics."""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        summaries = self.get_metrics_summaries([container_id], metric_type, hours=hours)
+        return summaries.get(container_id)
 
-        with self._lock, self._pool.connection() as connection:
-            cursor = connection.execute(
-                """
-                SELECT
-                    container_id,
-                    container_name,
-                    endpoint_id,
-                    endpoint_name,
-                    COUNT(*) as count,
-                    MIN(value) as min_value,
-                    MAX(value) as max_value,
-                    AVG(value) as avg_value,
-                    MAX(timestamp) as latest_timestamp
-                FROM metrics
-                WHERE container_id = ? AND metric_type = ? AND timestamp >= ?
-                GROUP BY container_id
-                """,
-                (container_id, metric_type.value, self._encode_datetime(cutoff)),
-            )
-            row = cursor.fetchone()
-
-            if not row or row["count"] == 0:
-                return None
-
-            # Calculate std dev separately
-            cursor = connection.execute(
-                """
-                SELECT value FROM metrics
-                WHERE container_id = ? AND metric_type = ? AND timestamp >= ?
-                """,
-                (container_id, metric_type.value, self._encode_datetime(cutoff)),
-            )
-            values = [r["value"] for r in cursor.fetchall()]
-
-            avg = row["avg_value"]
-            variance = sum((v - avg) ** 2 for v in values) / len(values) if values else 0
-            std_dev = variance**0.5
+    def get_metrics_summaries(
+        self,
+        container_ids: Sequence[str] | None,
+        metric_type: MetricType,
+        *,
+        hours: int = 24,
+    ) -> dict[str, MetricsSummary]:
+        """Get statistical summaries for many containers in a single query.
+
+        Count, min, max, mean, standard deviation (with Welford's algorithm),
+        percentiles and the latest value are all computed inside SQLite in
+        one pass over the window.
+
+        Args:
+            container_ids: Containers to summarise, or None for every
+                container with samples in the window.
+            metric_type: The metric type to summarise.
+            hours: Size of the window in hours.
+
+        Returns:
+            Mapping of container ID to summary. Containers without samples
+            in the window are omitted.
+        """
+        if container_ids is not None and not container_ids:
+            return {}
 
-            # Get latest value
-            cursor = connection.execute(
-                """
-                SELECT value FROM metrics
-                WHERE container_id = ? AND metric_type = ?
-                ORDER BY timestamp DESC LIMIT 1
-                """,
-                (container_id, metric_type.value),
-            )
-            latest_row = cursor.fetchone()
-            latest_value = latest_row["value"] if latest_row else 0.0
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        query = """
+            SELECT
+                m.container_id,
+                m.container_name,
+                m.endpoint_id,
+                m.endpoint_name,
+                COUNT(*) AS count,
+                MIN(m.value) AS min_value,
+                MAX(m.value) AS max_value,
+                AVG(m.value) AS avg_value,
+                stddev_pop(m.value) AS std_dev,
+                percentile_cont(m.value, 0.5) AS p50_value,
+                percentile_cont(m.value, 0.95) AS p95_value,
+                percentile_cont(m.value, 0.99) AS p99_value,
+                MAX(m.timestamp) AS latest_timestamp,
+                (
+                    SELECT latest.value FROM metrics AS latest
+                    WHERE latest.container_id = m.container_id
+                    AND latest.metric_type = m.metric_type
+                    ORDER BY latest.timestamp DESC
+                    LIMIT 1
+                ) AS latest_value
+            FROM metrics AS m
+            WHERE m.metric_type = ? AND m.timestamp >= ?
+        """
+        params: list[str] = [metric_type.value, self._encode_datetime(cutoff)]
+
+        if container_ids is not None:
+            unique_ids = list(dict.fromkeys(container_ids))
+            placeholders = ",".join("?" * len(unique_ids))
+            query += f" AND m.container_id IN ({placeholders})"
+            params.extend(unique_ids)
+
+        query += " GROUP BY m.container_id"
+
+        with self._pool.read_connection() as connection:
+            cursor = connection.execute(query, params)
+            rows = cursor.fetchall()
 
-            return MetricsSummary(
+        summaries: dict[str, MetricsSummary] = {}
+        for row in rows:
+            summaries[row["container_id"]] = MetricsSummary(
                 container_id=row["container_id"],
                 container_name=row["container_name"],
                 endpoint_id=row["endpoint_id"],
@@ -268,11 +565,152 @@ class SQLiteMetricsStore:
                 min_value=row["min_value"],
                 max_value=row["max_value"],
                 avg_value=row["avg_value"],
-                std_dev=std_dev,
-                latest_value=latest_value,
+                std_dev=row["std_dev"],
+                p50_value=row["p50_value"],
+                p95_value=row["p95_value"],
+                p99_value=row["p99_value"],
+                latest_value=row["latest_value"] if row["latest_value"] is not None else 0.0,
                 latest_timestamp=self._decode_datetime(row["latest_timestamp"]),
             )
 
+        return summaries
+
+    def query_series(
+        self,
+        series: Sequence[SeriesSelector],
+        start_time: datetime,
+        end_time: datetime,
+        *,
+        max_points: int = 500,
+        method: DownsampleMethod = DownsampleMethod.LTTB,
+    ) -> list[MetricSeries]:
+        """Fetch several series over a time range, downsampled for charting.
+
+        Timestamps are converted to epoch seconds inside SQLite and loaded
+        straight into numpy arrays, so no per-row model objects are built.
+
+        Args:
+            series: Container/metric type pairs to fetch.
+            start_time: Inclusive range start.
+            end_time: Inclusive range end.
+            max_points: Maximum number of samples returned per series.
+            method: Downsampling algorithm applied to longer series.
+
+        Returns:
+            One entry per requested series, in request order.
+        """
+        query = """
+            SELECT (julianday(timestamp) - 2440587.5) * 86400.0, value
+            FROM metrics
+            WHERE container_id = ? AND metric_type = ?
+            AND timestamp >= ? AND timestamp <= ?
+            ORDER BY timestamp
+        """
+        start = self._encode_datetime(start_time)
+        end = self._encode_datetime(end_time)
+
+        results: list[MetricSeries] = []
+        with self._pool.read_connection() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = None
+            for selector in series:
+                rows = cursor.execute(
+                    query,
+                    (selector.container_id, selector.metric_type.value, start, end),
+                ).fetchall()
+                points = np.array(rows, dtype=np.float64).reshape(-1, 2)
+                seconds, values = downsample(points[:, 0], points[:, 1], max_points, method)
+                results.append(
+                    MetricSeries(
+                        container_id=selector.container_id,
+                        metric_type=selector.metric_type,
+                        timestamps=np.rint(seconds * 1000).astype(np.int64).tolist(),
+                        values=values.tolist(),
+                        raw_count=len(rows),
+                    )
+                )
+        return results
+
+    def get_fleet_aggregates(
+        self,
+        metric_type: MetricType,
+        group_by: FleetGroupBy,
+        *,
+        hours: int = 1,
+        limit: int | None = None,
+    ) -> list[FleetAggregate]:
+        """Aggregate a metric across the fleet, grouped by a dimension.
+
+        Reads the pre-aggregated rollups rather than raw samples, so the cost
+        depends on the number of containers and buckets in the window, not
+        on the collection interval. Each container's average over the window
+        is computed first; groups then report the sum, average and maximum
+        of their containers.
+
+        Args:
+            metric_type: Metric to aggregate.
+            group_by: Dimension to group containers by.
+            hours: Window length ending now, rounded out to whole buckets.
+            limit: Return only the top groups by summed value.
+
+        Returns:
+            Aggregates ordered by summed value, highest first.
+        """
+        key_column, label_column = _FLEET_GROUP_COLUMNS[group_by]
+        now = int(datetime.now(timezone.utc).timestamp())
+        window_start = now - hours * 3600
+        window_start -= window_start % _ROLLUP_BUCKET_SECONDS
+
+        query = f"""
+            WITH per_container AS (
+                SELECT
+                    container_id,
+                    MAX(container_name) AS container_name,
+                    MAX(endpoint_id) AS endpoint_id,
+                    MAX(endpoint_name) AS endpoint_name,
+                    MAX(stack_name) AS stack_name,
+                    MAX(image) AS image,
+                    SUM(value_sum) / SUM(value_count) AS avg_value,
+                    MAX(value_max) AS max_value,
+                    SUM(value_count) AS sample_count
+                FROM metric_rollups
+                WHERE metric_type = ? AND bucket_start >= ?
+                GROUP BY container_id
+            )
+            SELECT
+                {key_column} AS group_key,
+                MAX({label_column}) AS label,
+                COUNT(*) AS container_count,
+                SUM(avg_value) AS sum_value,
+                AVG(avg_value) AS avg_value,
+                MAX(max_value) AS max_value,
+                SUM(sample_count) AS sample_count
+            FROM per_container
+            GROUP BY {key_column}
+            ORDER BY sum_value DESC
+            LIMIT ?
+        """
+
+        with self._pool.read_connection() as connection:
+            rows = connection.execute(
+                query, (metric_type.value, window_start, -1 if limit is None else limit)
+            ).fetchall()
+
+        return [
+            FleetAggregate(
+                group_by=group_by,
+                key=None if row["group_key"] is None else str(row["group_key"]),
+                label=row["label"],
+                metric_type=metric_type,
+                container_count=row["container_count"],
+                sum_value=row["sum_value"],
+                avg_value=row["avg_value"],
+                max_value=row["max_value"],
+                sample_count=row["sample_count"],
+            )
+            for row in rows
+        ]
+
     def get_recent_values(
         self,
         container_id: str,
@@ -281,7 +719,7 @@ class SQLiteMetricsStore:
         count: int = 30,
     ) -> list[float]:
         """Get recent values for anomaly detection."""
-        with self._lock, self._pool.connection() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(
                 """
                 SELECT value FROM metrics
@@ -293,32 +731,89 @@ class SQLiteMetricsStore:
             )
             return [row["value"] for row in cursor.fetchall()]
 
-    def store_anomaly(self, anomaly: AnomalyDetection) -> None:
-        """Store an anomaly detection result."""
-        with self._lock, self._pool.transaction() as connection:
-            connection.execute(
-                """
-                INSERT OR REPLACE INTO anomalies (
-                    id, timestamp, endpoint_id, endpoint_name,
-                    container_id, container_name, metric_type,
-                    current_value, expected_value, zscore, is_anomaly, direction
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    def get_recent_values_by_series(
+        self,
+        metric_types: Sequence[MetricType],
+        *,
+        count: int = 30,
+        start_time: datetime | None = None,
+    ) -> dict[tuple[str, MetricType], list[tuple[datetime, float]]]:
+        """Get the most recent samples for every series in a single query.
+
+        Used to hydrate in-memory anomaly detector state at startup.
+
+        Returns:
+            Mapping of (container_id, metric_type) to (timestamp, value)
+            samples in chronological order (oldest first).
+        """
+        if not metric_types:
+            return {}
+
+        placeholders = ",".join("?" * len(metric_types))
+        params: list[str | int] = [m.value for m in metric_types]
+        time_filter = ""
+        if start_time:
+            time_filter = " AND timestamp >= ?"
+            params.append(self._encode_datetime(start_time))
+        params.append(count)
+
+        with self._pool.read_connection() as connection:
+            cursor = connection.execute(
+                f"""
+                SELECT container_id, metric_type, timestamp, value FROM (
+                    SELECT
+                        container_id,
+                        metric_type,
+                        value,
+                        timestamp,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY container_id, metric_type
+                            ORDER BY timestamp DESC
+                        ) AS position
+                    FROM metrics
+                    WHERE metric_type IN ({placeholders}){time_filter}
+                )
+                WHERE position <= ?
+                ORDER BY container_id, metric_type, timestamp
                 """,
-                (
-                    anomaly.id,
-                    self._encode_datetime(anomaly.timestamp),
-                    anomaly.endpoint_id,
-                    anomaly.endpoint_name,
-                    anomaly.container_id,
-                    anomaly.container_name,
-                    anomaly.metric_type.value,
-                    anomaly.current_value,
-                    anomaly.expected_value,
-                    anomaly.zscore,
-                    1 if anomaly.is_anomaly else 0,
-                    anomaly.direction,
-                ),
+                params,
             )
+            rows = cursor.fetchall()
+
+        series: dict[tuple[str, MetricType], list[tuple[datetime, float]]] = {}
+        for row in rows:
+            key = (row["container_id"], MetricType(row["metric_type"]))
+            series.setdefault(key, []).append(
+                (self._decode_datetime(row["timestamp"]), row["value"])
+            )
+        return series
+
+    def store_anomaly(self, anomaly: AnomalyDetection, *, wait: bool = True) -> None:
+        """Store an anomaly detection result."""
+        self.store_anomalies_batch([anomaly], wait=wait)
+
+    def store_anomalies_batch(
+        self,
+        anomalies: list[AnomalyDetection],
+        *,
+        wait: bool = True,
+    ) -> None:
+        """Store multiple anomaly detection results in one transaction.
+
+        Args:
+            anomalies: Detections to store.
+            wait: Block until the rows are committed.
+        """
+        if not anomalies:
+            return
+        future = self._writer.executemany(
+            _INSERT_ANOMALY_SQL,
+            [self._anomaly_row(a) for a in anomalies],
+            urgent=wait,
+        )
+        if wait:
+            future.result()
+        LOGGER.debug("Queued %d anomalies", len(anomalies))
 
     def get_anomalies(
         self,
@@ -339,7 +834,7 @@ class SQLiteMetricsStore:
         query += " ORDER BY timestamp DESC LIMIT ?"
         params.append(limit)
 
-        with self._lock, self._pool.connection() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(query, params)
             rows = cursor.fetchall()
 
@@ -366,15 +861,16 @@ class SQLiteMetricsStore:
         now = datetime.now(timezone.utc)
         cutoff_24h = now - timedelta(hours=24)
 
-        with self._lock, self._pool.connection() as connection:
-            cursor = connection.execute("SELECT COUNT(*) FROM metrics")
+        with self._pool.read_connection() as connection:
+            cursor = connection.execute(
+                "SELECT value FROM metric_counters WHERE name = 'metrics'"
+            )
             total_metrics = cursor.fetchone()[0]
 
-            cursor = connection.execute("SELECT COUNT(DISTINCT container_id) FROM metrics")
-            containers_tracked = cursor.fetchone()[0]
-
-            cursor = connection.execute("SELECT COUNT(DISTINCT endpoint_id) FROM metrics")
-            endpoints_tracked = cursor.fetchone()[0]
+            cursor = connection.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT endpoint_id) FROM metric_containers"
+            )
+            containers_tracked, endpoints_tracked = cursor.fetchone()
 
             cursor = connection.execute(
                 "SELECT COUNT(*) FROM anomalies WHERE timestamp >= ? AND is_anomaly = 1",
@@ -382,10 +878,12 @@ class SQLiteMetricsStore:
             )
             anomalies_24h = cursor.fetchone()[0]
 
-            cursor = connection.execute("SELECT MIN(timestamp), MAX(timestamp) FROM metrics")
-            row = cursor.fetchone()
-            oldest = self._decode_datetime(row[0]) if row[0] else None
-            newest = self._decode_datetime(row[1]) if row[1] else None
+            # Separate queries, so each is a single lookup on the timestamp
+            # index rather than one full scan computing both
+            oldest_raw = connection.execute("SELECT MIN(timestamp) FROM metrics").fetchone()[0]
+            newest_raw = connection.execute("SELECT MAX(timestamp) FROM metrics").fetchone()[0]
+            oldest = self._decode_datetime(oldest_raw) if oldest_raw else None
+            newest = self._decode_datetime(newest_raw) if newest_raw else None
 
         # Get storage size
         try:
@@ -403,33 +901,87 @@ class SQLiteMetricsStore:
             storage_size_bytes=storage_size,
         )
 
-    def purge_old_metrics(self, retention_hours: int) -> int:
-        """Remove metrics older than retention period."""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
-
-        with self._lock, self._pool.transaction() as connection:
-            cursor = connection.execute(
-                "DELETE FROM metrics WHERE timestamp < ?",
-                (self._encode_datetime(cutoff),),
-            )
-            metrics_deleted = cursor.rowcount
-
-            cursor = connection.execute(
-                "DELETE FROM anomalies WHERE timestamp < ?",
-                (self._encode_datetime(cutoff),),
+    def purge_old_metrics(
+        self,
+        retention_hours: int,
+        *,
+        chunk_size: int = _PURGE_CHUNK_SIZE,
+        time_budget: float = _PURGE_TIME_BUDGET_SECONDS,
+    ) -> int:
+        """Remove metrics and anomalies older than the retention period.
+
+        Rows are deleted in chunks of ``chunk_size``, each in its own
+        transaction. Once ``time_budget`` seconds have passed the purge stops
+        and the remaining backlog is picked up by the next run.
+
+        Returns:
+            Number of metrics deleted.
+        """
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+        cutoff = self._encode_datetime(cutoff_time)
+        deadline = time.monotonic() + time_budget
+
+        def delete_chunk(
+            table: str, column: str, before: str | int
+        ) -> Callable[[sqlite3.Connection], int]:
+            def operation(connection: sqlite3.Connection) -> int:
+                cursor = connection.execute(
+                    f"""
+                    DELETE FROM {table} WHERE rowid IN (
+                        SELECT rowid FROM {table} WHERE {column} < ? LIMIT ?
+                    )
+                    """,
+                    (before, chunk_size),
+                )
+                if table == "metrics":
+                    connection.execute(
+                        "UPDATE metric_counters SET value = value - ? WHERE name = 'metrics'",
+                        (cursor.rowcount,),
+                    )
+                return cursor.rowcount
+
+            return operation
+
+        # Only drop rollup buckets that lie entirely before the cutoff
+        rollup_cutoff = int(cutoff_time.timestamp()) - _ROLLUP_BUCKET_SECONDS + 1
+        deleted: list[int] = []
+        complete = True
+        for table, column, before in (
+            ("metrics", "timestamp", cutoff),
+            ("anomalies", "timestamp", cutoff),
+            ("metric_rollups", "bucket_start", rollup_cutoff),
+            ("metric_containers", "last_seen", cutoff),
+        ):
+            if not complete:
+                break
+            count, complete = self._writer.run_chunked(
+                delete_chunk(table, column, before),
+                chunk_size=chunk_size,
+                time_budget=max(deadline - time.monotonic(), 0.0),
             )
-            anomalies_deleted = cursor.rowcount
+            deleted.append(count)
+        metrics_deleted = deleted[0]
+        anomalies_deleted = deleted[1] if len(deleted) > 1 else 0
 
         if metrics_deleted > 0 or anomalies_deleted > 0:
             LOGGER.info(
-                "Purged %d metrics and %d anomalies older than %d hours",
+                "Purged %d metrics and %d anomalies older than %d hours%s",
                 metrics_deleted,
                 anomalies_deleted,
                 retention_hours,
+                "" if complete else " (time budget reached, continuing next run)",
             )
 
         return metrics_deleted
 
+    def compact(self) -> int:
+        """Release free pages left by purges and truncate the WAL.
+
+        Returns:
+            Number of free pages released.
+        """
+        return self._pool.compact()
+
 
 _metrics_store: SQLiteMetricsStore | None = None
 
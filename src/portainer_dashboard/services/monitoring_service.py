@@ -4,16 +4,21 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Callable
 
 from portainer_dashboard.config import get_settings
 from portainer_dashboard.models.monitoring import (
+    ContainerCapabilities,
+    ContainerLogs,
+    ImageStatus,
     InfrastructureSnapshot,
     InsightSeverity,
+    LogTemplate,
     MonitoringInsight,
     MonitoringReport,
+    SnapshotDiff,
 )
 from portainer_dashboard.services.data_collector import (
     DataCollector,
@@ -26,12 +31,28 @@ from portainer_dashboard.services.llm_client import (
     create_llm_client,
 )
 from portainer_dashboard.services.log_sanitizer import sanitize_logs
+from portainer_dashboard.services.log_templates import format_log_templates, mine_log_templates
 from portainer_dashboard.services.metrics_collector import MetricsCollector, create_metrics_collector
 from portainer_dashboard.services.anomaly_detector import AnomalyDetector, create_anomaly_detector
 from portainer_dashboard.services.remediation_service import RemediationService, get_remediation_service
+from portainer_dashboard.services.snapshot_diff import diff_snapshots
 
 LOGGER = logging.getLogger(__name__)
 
+# Log templates and raw lines included per container in analysis prompts
+_PROMPT_LOG_TEMPLATES = 30
+_PROMPT_RECENT_LOG_LINES = 5
+_PROMPT_LOG_LINE_CHARS = 500
+
+# Log substrings the fallback analysis looks for
+_OOM_LOG_PATTERNS = ("out of memory", "oom", "killed")
+_CONNECTION_LOG_PATTERNS = (
+    "connection refused",
+    "connection reset",
+    "connection timed out",
+    "econnrefused",
+)
+
 MONITORING_SYSTEM_PROMPT = """You are an infrastructure monitoring AI analyzing a Portainer-managed Docker environment.
 
 Analyze the following infrastructure data and generate actionable insights for sysadmins.
@@ -98,26 +119,11 @@ def _build_analysis_prompt(snapshot: InfrastructureSnapshot) -> str:
 
     if snapshot.security_issues:
         parts.append("\n## Security Issues Detected")
-        for issue in snapshot.security_issues:
-            parts.append(f"\n### Container: {issue.container_name}")
-            parts.append(f"Endpoint: {issue.endpoint_name}")
-            parts.append(f"Privileged: {issue.privileged}")
-            if issue.cap_add:
-                parts.append(f"Added Capabilities: {', '.join(issue.cap_add)}")
-            if issue.security_opt:
-                parts.append(f"Security Options: {', '.join(issue.security_opt)}")
-            if issue.elevated_risks:
-                parts.append("Risks:")
-                for risk in issue.elevated_risks:
-                    parts.append(f"  - {risk}")
+        _append_security_issues(parts, snapshot.security_issues)
 
     if snapshot.outdated_images:
         parts.append("\n## Outdated Images")
-        for img in snapshot.outdated_images:
-            parts.append(f"- Stack: {img.stack_name}, Image: {img.image_name}")
-            if img.current_digest and img.latest_digest:
-                parts.append(f"  Current: {img.current_digest[:16]}...")
-                parts.append(f"  Latest: {img.latest_digest[:16]}...")
+        _append_outdated_images(parts, snapshot.outdated_images)
 
     if snapshot.endpoint_details:
         parts.append("\n## Endpoints")
@@ -137,29 +143,145 @@ def _build_analysis_prompt(snapshot: InfrastructureSnapshot) -> str:
         parts.append(
             f"Logs collected from {len(snapshot.container_logs)} problematic container(s):"
         )
-        for log_entry in snapshot.container_logs:
-            parts.append(f"\n### Container: {log_entry.container_name}")
-            parts.append(f"Endpoint: {log_entry.endpoint_name}")
-            parts.append(f"State: {log_entry.state}")
-            if log_entry.exit_code is not None:
-                parts.append(f"Exit Code: {log_entry.exit_code}")
-            parts.append(f"Log lines: {log_entry.log_lines}")
-            if log_entry.truncated:
-                parts.append("(logs truncated)")
-            # Sanitize and limit log content to avoid overwhelming the LLM
-            log_content = sanitize_logs(log_entry.logs)
-            if len(log_content) > 3000:
-                log_content = log_content[-3000:]
-                parts.append("Recent log output (truncated to last 3000 chars):")
-            else:
-                parts.append("Recent log output:")
-            parts.append("```")
-            parts.append(log_content)
-            parts.append("```")
+        _append_container_logs(parts, snapshot.container_logs)
 
     return "\n".join(parts)
 
 
+def _build_diff_prompt(snapshot: InfrastructureSnapshot, diff: SnapshotDiff) -> str:
+    """Build an analysis prompt covering only what changed since the previous cycle."""
+    parts: list[str] = []
+
+    parts.append("## Infrastructure Summary")
+    parts.append(f"Timestamp: {snapshot.timestamp.isoformat()}")
+    parts.append(f"Endpoints: {snapshot.endpoints_online} online, {snapshot.endpoints_offline} offline")
+    parts.append(
+        f"Containers: {snapshot.containers_running} running, "
+        f"{snapshot.containers_stopped} stopped, "
+        f"{snapshot.containers_unhealthy} unhealthy"
+    )
+    parts.append(
+        f"\nOnly changes since the previous analysis at {diff.previous_timestamp.isoformat()} "
+        "are listed below. Report issues introduced or revealed by these changes."
+    )
+
+    if diff.endpoints_changed:
+        parts.append("\n## Endpoint Status Changes")
+        for ep in diff.endpoints_changed:
+            parts.append(
+                f"- {ep.get('endpoint_name')}: {_endpoint_status_label(ep.get('previous_status'))}"
+                f" -> {_endpoint_status_label(ep.get('status'))}"
+            )
+
+    if diff.containers_changed:
+        parts.append("\n## Container State Changes")
+        for change in diff.containers_changed:
+            before = change.get("previous_state")
+            after = change.get("state")
+            if change.get("previous_health") or change.get("health"):
+                before = f"{before} ({change.get('previous_health') or 'no health check'})"
+                after = f"{after} ({change.get('health') or 'no health check'})"
+            parts.append(
+                f"- {change.get('container_name')} on {change.get('endpoint_name')}: "
+                f"{before} -> {after}"
+            )
+
+    if diff.containers_added:
+        parts.append("\n## New Containers")
+        for c in diff.containers_added:
+            parts.append(
+                f"- {c.get('container_name')} on {c.get('endpoint_name')}: "
+                f"{c.get('image')}, {c.get('status') or c.get('state')}"
+            )
+
+    if diff.containers_removed:
+        parts.append("\n## Removed Containers")
+        for c in diff.containers_removed:
+            parts.append(f"- {c.get('container_name')} on {c.get('endpoint_name')}")
+
+    if diff.new_security_issues:
+        parts.append("\n## New Security Issues")
+        _append_security_issues(parts, diff.new_security_issues)
+
+    if diff.resolved_security_issues:
+        parts.append("\n## Resolved Security Issues")
+        for issue in diff.resolved_security_issues:
+            parts.append(f"- {issue.container_name} on {issue.endpoint_name}")
+
+    if diff.new_outdated_images:
+        parts.append("\n## Newly Outdated Images")
+        _append_outdated_images(parts, diff.new_outdated_images)
+
+    if diff.resolved_outdated_images:
+        parts.append("\n## Updated Images")
+        for img in diff.resolved_outdated_images:
+            parts.append(f"- Stack: {img.stack_name}, Image: {img.image_name}")
+
+    if diff.new_container_logs:
+        parts.append("\n## New Container Log Lines")
+        parts.append(
+            f"New log output from {len(diff.new_container_logs)} problematic container(s):"
+        )
+        _append_container_logs(parts, diff.new_container_logs)
+
+    return "\n".join(parts)
+
+
+def _endpoint_status_label(status: object) -> str:
+    if status == "absent":
+        return "absent"
+    return "online" if status == 1 else "offline"
+
+
+def _append_security_issues(parts: list[str], issues: list[ContainerCapabilities]) -> None:
+    for issue in issues:
+        parts.append(f"\n### Container: {issue.container_name}")
+        parts.append(f"Endpoint: {issue.endpoint_name}")
+        parts.append(f"Privileged: {issue.privileged}")
+        if issue.cap_add:
+            parts.append(f"Added Capabilities: {', '.join(issue.cap_add)}")
+        if issue.security_opt:
+            parts.append(f"Security Options: {', '.join(issue.security_opt)}")
+        if issue.elevated_risks:
+            parts.append("Risks:")
+            for risk in issue.elevated_risks:
+                parts.append(f"  - {risk}")
+
+
+def _append_outdated_images(parts: list[str], images: list[ImageStatus]) -> None:
+    for img in images:
+        parts.append(f"- Stack: {img.stack_name}, Image: {img.image_name}")
+        if img.current_digest and img.latest_digest:
+            parts.append(f"  Current: {img.current_digest[:16]}...")
+            parts.append(f"  Latest: {img.latest_digest[:16]}...")
+
+
+def _log_templates(log_entry: ContainerLogs) -> list[LogTemplate]:
+    """Return the templates of an entry, mining its logs if none were collected."""
+    return log_entry.templates or mine_log_templates(log_entry.logs.splitlines())
+
+
+def _append_container_logs(parts: list[str], container_logs: list[ContainerLogs]) -> None:
+    for log_entry in container_logs:
+        parts.append(f"\n### Container: {log_entry.container_name}")
+        parts.append(f"Endpoint: {log_entry.endpoint_name}")
+        parts.append(f"State: {log_entry.state}")
+        if log_entry.exit_code is not None:
+            parts.append(f"Exit Code: {log_entry.exit_code}")
+        parts.append(f"Log lines: {log_entry.log_lines}")
+        if log_entry.truncated:
+            parts.append("(logs truncated)")
+        # Repeated messages are listed once per template to keep the prompt small
+        templates = _log_templates(log_entry)
+        parts.append("Log templates (count and first/last seen; <*> marks variable parts):")
+        parts.extend(format_log_templates(templates, limit=_PROMPT_LOG_TEMPLATES))
+        recent = sanitize_logs(log_entry.logs).splitlines()[-_PROMPT_RECENT_LOG_LINES:]
+        parts.append("Most recent log lines:")
+        parts.append("```")
+        parts.extend(line[:_PROMPT_LOG_LINE_CHARS] for line in recent)
+        parts.append("```")
+
+
 def _parse_llm_insights(response: str) -> list[MonitoringInsight]:
     """Parse LLM response into MonitoringInsight objects."""
     response = response.strip()
@@ -268,6 +390,11 @@ def _deduplicate_insights(insights: list[MonitoringInsight]) -> list[MonitoringI
     return deduplicated
 
 
+def _count_matching_lines(templates: list[tuple[str, int]], patterns: tuple[str, ...]) -> int:
+    """Count the log lines whose lowercased template contains any of the patterns."""
+    return sum(count for text, count in templates if any(pattern in text for pattern in patterns))
+
+
 def _generate_fallback_insights(snapshot: InfrastructureSnapshot) -> list[MonitoringInsight]:
     """Generate insights without LLM based on collected data."""
     insights: list[MonitoringInsight] = []
@@ -330,12 +457,16 @@ def _generate_fallback_insights(snapshot: InfrastructureSnapshot) -> list[Monito
             )
         )
 
-    # Analyze container logs for common error patterns
+    # Analyze container logs for common error patterns, counting matching
+    # lines per template instead of scanning every line
     for log_entry in snapshot.container_logs:
-        logs_lower = log_entry.logs.lower()
+        templates = [
+            (template.template.lower(), template.count) for template in _log_templates(log_entry)
+        ]
 
         # Check for OOM errors
-        if "out of memory" in logs_lower or "oom" in logs_lower or "killed" in logs_lower:
+        oom_lines = _count_matching_lines(templates, _OOM_LOG_PATTERNS)
+        if oom_lines:
             insights.append(
                 MonitoringInsight(
                     severity=InsightSeverity.CRITICAL,
@@ -343,7 +474,7 @@ def _generate_fallback_insights(snapshot: InfrastructureSnapshot) -> list[Monito
                     title=f"Memory issues detected in {log_entry.container_name}",
                     description=(
                         f"Container {log_entry.container_name} on endpoint {log_entry.endpoint_name} "
-                        f"shows signs of memory exhaustion (OOM) in logs."
+                        f"shows signs of memory exhaustion (OOM) in {oom_lines} log line(s)."
                     ),
                     affected_resources=[log_entry.container_name],
                     recommended_action="Increase container memory limits or investigate memory leaks",
@@ -352,10 +483,8 @@ def _generate_fallback_insights(snapshot: InfrastructureSnapshot) -> list[Monito
             continue  # Skip other checks for this container
 
         # Check for connection errors
-        if any(
-            pattern in logs_lower
-            for pattern in ["connection refused", "connection reset", "connection timed out", "econnrefused"]
-        ):
+        connection_lines = _count_matching_lines(templates, _CONNECTION_LOG_PATTERNS)
+        if connection_lines:
             insights.append(
                 MonitoringInsight(
                     severity=InsightSeverity.WARNING,
@@ -363,7 +492,8 @@ def _generate_fallback_insights(snapshot: InfrastructureSnapshot) -> list[Monito
                     title=f"Connection errors in {log_entry.container_name}",
                     description=(
                         f"Container {log_entry.container_name} on endpoint {log_entry.endpoint_name} "
-                        f"shows connection failures in logs. State: {log_entry.state}"
+                        f"shows {connection_lines} connection failure(s) in logs. "
+                        f"State: {log_entry.state}"
                     ),
                     affected_resources=[log_entry.container_name],
                     recommended_action="Check network connectivity and dependent service availability",
@@ -418,23 +548,41 @@ class MonitoringService:
     metrics_collector: MetricsCollector | None = None
     anomaly_detector: AnomalyDetector | None = None
     remediation_service: RemediationService | None = None
+    _previous_snapshot: InfrastructureSnapshot | None = field(default=None, init=False, repr=False)
+    _previous_insights: list[MonitoringInsight] = field(
+        default_factory=list, init=False, repr=False
+    )
 
     async def run_analysis(self) -> MonitoringReport:
-        """Run a complete monitoring analysis cycle."""
+        """Run a complete monitoring analysis cycle.
+
+        After the first cycle, the snapshot is diffed against the last one the
+        LLM analysed: with no changes the LLM is not called and the previous insights
+        are reported again, otherwise only the changes are sent for analysis.
+        """
         LOGGER.info("Starting monitoring analysis")
         start_time = datetime.now(timezone.utc)
 
-        # Collect metrics if enabled
-        metrics_collected = 0
-        if self.metrics_collector:
-            try:
-                metrics_collected = await self.metrics_collector.collect_all_metrics()
-                LOGGER.info("Collected %d metrics", metrics_collected)
-            except Exception as exc:
-                LOGGER.warning("Metrics collection failed: %s", exc)
+        # Metrics are collected in the same endpoint walk as the snapshot
+        metrics_collector = None
+        if self.metrics_collector and self.metrics_collector.enabled:
+            metrics_collector = self.metrics_collector
 
+        metrics_collected = 0
         try:
-            snapshot = await self.data_collector.collect_snapshot()
+            if metrics_collector is None:
+                snapshot = await self.data_collector.collect_snapshot()
+            else:
+                snapshot, metrics, complete = (
+                    await self.data_collector.collect_snapshot_and_metrics(metrics_collector)
+                )
+                try:
+                    metrics_collected = await metrics_collector.record_metrics(
+                        metrics, complete=complete
+                    )
+                    LOGGER.info("Collected %d metrics", metrics_collected)
+                except Exception as exc:
+                    LOGGER.warning("Metrics collection failed: %s", exc)
         except Exception as exc:
             LOGGER.error("Failed to collect infrastructure snapshot: %s", exc)
             report = MonitoringReport(
@@ -444,10 +592,23 @@ class MonitoringService:
             return report
 
         insights: list[MonitoringInsight] = []
-
-        if self.llm_client:
+        diff: SnapshotDiff | None = None
+        if self._previous_snapshot is not None:
+            diff = diff_snapshots(self._previous_snapshot, snapshot)
+        unchanged = self.llm_client is not None and diff is not None and diff.is_empty
+        # Whether the LLM's view is now up to date with this snapshot
+        analysed = unchanged
+
+        if unchanged:
+            # Nothing changed, so the previous cycle's insights still hold
+            LOGGER.info("No changes since the previous snapshot, skipping LLM analysis")
+            insights = list(self._previous_insights)
+        elif self.llm_client:
             try:
-                prompt = _build_analysis_prompt(snapshot)
+                if diff is None:
+                    prompt = _build_analysis_prompt(snapshot)
+                else:
+                    prompt = _build_diff_prompt(snapshot, diff)
                 messages = [
                     {"role": "system", "content": MONITORING_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt},
@@ -461,6 +622,16 @@ class MonitoringService:
 
                 insights = _parse_llm_insights(response)
                 LOGGER.info("LLM generated %d insights", len(insights))
+                analysed = True
+                if diff is not None:
+                    # Insights about resources the diff did not touch carry over;
+                    # the delta analysis re-evaluated the rest
+                    changed = {name.lower() for name in diff.affected_resources}
+                    insights = [
+                        insight
+                        for insight in self._previous_insights
+                        if not any(r.lower() in changed for r in insight.affected_resources)
+                    ] + insights
 
             except LLMClientError as exc:
                 LOGGER.warning("LLM analysis failed, using fallback: %s", exc)
@@ -472,9 +643,16 @@ class MonitoringService:
         # Deduplicate insights to avoid redundant alerts
         insights = _deduplicate_insights(insights)
 
-        # Suggest remediation actions from insights (if enabled)
+        # Later cycles diff against the last snapshot the LLM analysed, so
+        # changes seen while it failed are sent again instead of dropped
+        if analysed:
+            self._previous_snapshot = snapshot
+            self._previous_insights = insights
+
+        # Suggest remediation actions from insights (if enabled); carried-over
+        # insights had theirs suggested when they were first reported
         actions_suggested = 0
-        if self.remediation_service and self.remediation_service.is_enabled:
+        if self.remediation_service and self.remediation_service.is_enabled and not unchanged:
             actions_suggested = await self._suggest_remediation_actions(insights, snapshot)
             LOGGER.info("Suggested %d remediation actions", actions_suggested)
 
@@ -486,6 +664,8 @@ class MonitoringService:
             f"Analyzed {snapshot.endpoints_online + snapshot.endpoints_offline} endpoints "
             f"and {snapshot.containers_running + snapshot.containers_stopped} containers."
         )
+        if unchanged:
+            summary_parts.append("No changes since the previous analysis.")
         if insights:
             summary_parts.append(
                 f"Found {len(insights)} issue(s): {critical_count} critical, {warning_count} warning."
@@ -592,7 +772,7 @@ class MonitoringService:
                     )
                     continue
 
-                action = self.remediation_service.suggest_action_from_insight(
+                action = await self.remediation_service.suggest_action_from_insight(
                     insight=insight,
                     endpoint_id=endpoint_id,
                     endpoint_name=container_info.get("endpoint_name"),
@@ -621,9 +801,9 @@ async def create_monitoring_service(
     remediation_service = None
 
     if settings.metrics.enabled:
-        metrics_collector = await create_metrics_collector()
         if settings.metrics.anomaly_detection_enabled:
             anomaly_detector = await create_anomaly_detector()
+        metrics_collector = await create_metrics_collector(anomaly_detector=anomaly_detector)
 
     if settings.remediation.enabled:
         remediation_service = await get_remediation_service()
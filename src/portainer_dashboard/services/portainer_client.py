@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from typing import Any
 from urllib.parse import urlparse
@@ -14,6 +15,7 @@ import pandas as pd
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from portainer_dashboard.config import PortainerEnvironmentSettings, get_settings
+from portainer_dashboard.services.docker_logs import LogLine, iter_docker_log_lines
 
 LOGGER = logging.getLogger(__name__)
 
@@ -137,65 +139,64 @@ def _first_present(mapping: dict[str, object], *keys: str) -> object:
     return None
 
 
-def _stack_targets_endpoint(stack: dict[str, object], endpoint_id: int) -> bool:
-    """Return True when a stack is assigned to the provided endpoint."""
+def _stack_endpoint_ids(stack: dict[str, object]) -> set[int]:
+    """Return the IDs of the endpoints a stack is assigned to."""
     endpoint_keys = ("EndpointId", "EndpointID", "endpointId", "endpointID")
+    endpoint_ids: set[int] = set()
     for key in endpoint_keys:
-        if key not in stack:
-            continue
         coerced = _coerce_int(stack.get(key))
-        if coerced is None:
-            continue
-        if coerced == endpoint_id:
-            return True
+        if coerced is not None:
+            endpoint_ids.add(coerced)
 
     deployment_info = stack.get("DeploymentInfo") or stack.get("deploymentInfo")
     if isinstance(deployment_info, dict):
-        str_endpoint_id = str(endpoint_id)
-        if str_endpoint_id in {str(key) for key in deployment_info.keys()}:
-            return True
-        for info in deployment_info.values():
+        for raw_key, info in deployment_info.items():
+            coerced = _coerce_int(raw_key)
+            if coerced is not None:
+                endpoint_ids.add(coerced)
             if not isinstance(info, dict):
                 continue
             for key in endpoint_keys:
-                if key not in info:
-                    continue
                 coerced = _coerce_int(info.get(key))
-                if coerced is None:
-                    continue
-                if coerced == endpoint_id:
-                    return True
+                if coerced is not None:
+                    endpoint_ids.add(coerced)
+
+    return endpoint_ids
+
 
-    return False
+def _stack_targets_endpoint(stack: dict[str, object], endpoint_id: int) -> bool:
+    """Return True when a stack is assigned to the provided endpoint."""
+    return endpoint_id in _stack_endpoint_ids(stack)
 
 
 def _stack_has_endpoint_metadata(stack: dict[str, object]) -> bool:
     """Return True when the stack embeds any endpoint assignment metadata."""
-    endpoint_keys = ("EndpointId", "EndpointID", "endpointId", "endpointID")
-    for key in endpoint_keys:
-        if key not in stack:
-            continue
-        coerced = _coerce_int(stack.get(key))
-        if coerced is None:
-            continue
-        return True
+    return bool(_stack_endpoint_ids(stack))
 
-    deployment_info = stack.get("DeploymentInfo") or stack.get("deploymentInfo")
-    if isinstance(deployment_info, dict):
-        if any(_coerce_int(key) is not None for key in deployment_info.keys()):
-            return True
-        for info in deployment_info.values():
-            if not isinstance(info, dict):
-                continue
-            for key in endpoint_keys:
-                if key not in info:
-                    continue
-                coerced = _coerce_int(info.get(key))
-                if coerced is None:
-                    continue
-                return True
 
-    return False
+def group_stacks_by_endpoint(
+    endpoints: list[dict[str, object]],
+    stacks: list[dict[str, object]],
+) -> dict[int, list[dict[str, object]]]:
+    """Bucket stacks fetched once per environment by the endpoints they target.
+
+    Stacks without endpoint metadata (edge stacks) are listed for every
+    endpoint, matching what a per-endpoint listing returns for them.
+    """
+    stacks_by_endpoint: dict[int, list[dict[str, object]]] = {
+        int(_first_present(endpoint, "Id", "id") or 0): [] for endpoint in endpoints
+    }
+    for stack in stacks:
+        endpoint_ids = _stack_endpoint_ids(stack)
+        if not endpoint_ids:
+            for bucket in stacks_by_endpoint.values():
+                bucket.append(stack)
+            continue
+        for endpoint_id in endpoint_ids:
+            bucket = stacks_by_endpoint.get(endpoint_id)
+            if bucket is not None:
+                bucket.append(stack)
+    return stacks_by_endpoint
 
 
 @dataclass
@@ -335,6 +336,31 @@ class AsyncPortainerClient:
             raise PortainerAPIError("Unexpected endpoints payload from Portainer")
         return data
 
+    async def list_all_stacks(self) -> list[dict[str, object]]:
+        """Fetch every regular and edge stack of the environment once."""
+        results: list[dict[str, object]] = []
+        seen_stack_ids: set[int] = set()
+
+        for path in ("/stacks", "/edge/stacks"):
+            try:
+                data = await self._request(path)
+            except PortainerAPIError as exc:
+                LOGGER.debug("Failed fetching %s: %s", path, exc)
+                continue
+            if not isinstance(data, list):
+                continue
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                raw_id = item.get("Id") or item.get("ID") or item.get("id")
+                stack_id = _coerce_int(raw_id)
+                if stack_id is not None and stack_id in seen_stack_ids:
+                    continue
+                if stack_id is not None:
+                    seen_stack_ids.add(stack_id)
+                results.append(item)
+        return results
+
     async def list_stacks_for_endpoint(
         self, endpoint_id: int
     ) -> list[dict[str, object]]:
@@ -397,7 +423,7 @@ class AsyncPortainerClient:
             )
         return data
 
-    async def get_container_logs(
+    async def stream_container_logs(
         self,
         endpoint_id: int,
         container_id: str,
@@ -405,8 +431,12 @@ class AsyncPortainerClient:
         tail: int = 500,
         timestamps: bool = True,
         since: int | None = None,
-    ) -> str:
-        """Fetch container logs from Docker API via Portainer.
+        follow: bool = False,
+    ) -> AsyncIterator[LogLine]:
+        """Stream container log lines from Docker API via Portainer.
+
+        The multiplexed response is decoded while it is received, so lines
+        are yielded without buffering the whole body.
 
         Args:
             endpoint_id: The Portainer endpoint ID.
@@ -414,9 +444,11 @@ class AsyncPortainerClient:
             tail: Number of lines to return from the end of the logs.
             timestamps: Whether to include timestamps in each log line.
             since: Only return logs since this Unix timestamp.
+            follow: Keep the stream open and yield new lines as they are
+                written, until the container stops. No read timeout applies.
 
-        Returns:
-            The container log output as a string.
+        Yields:
+            Each log line tagged with the stream it was written to.
         """
         params = {
             "stdout": "true",
@@ -426,28 +458,51 @@ class AsyncPortainerClient:
         }
         if since is not None:
             params["since"] = str(since)
+        timeout: httpx.Timeout | object = httpx.USE_CLIENT_DEFAULT
+        if follow:
+            params["follow"] = "true"
+            timeout = httpx.Timeout(self.timeout, read=None)
 
         try:
-            response = await self._client.get(
+            async with self._client.stream(
+                "GET",
                 f"/endpoints/{endpoint_id}/docker/containers/{container_id}/logs",
                 params=params,
-            )
-            response.raise_for_status()
+                timeout=timeout,
+            ) as response:
+                response.raise_for_status()
+                async for line in iter_docker_log_lines(response.aiter_bytes()):
+                    yield line
         except httpx.HTTPError as exc:
             raise PortainerAPIError(str(exc)) from exc
 
-        # Docker logs API returns raw text, may include special characters
-        # Strip any Docker stream headers (first 8 bytes per frame)
-        text = response.text
-        # Clean up the output by removing Docker stream header bytes
-        lines = []
-        for line in text.split("\n"):
-            # Docker multiplexed streams have 8-byte headers
-            # Check if line starts with binary header and clean it
-            if len(line) > 8 and line[0] in "\x00\x01\x02":
-                lines.append(line[8:])
-            else:
-                lines.append(line)
+    async def get_container_logs(
+        self,
+        endpoint_id: int,
+        container_id: str,
+        *,
+        tail: int = 500,
+        timestamps: bool = True,
+        since: int | None = None,
+    ) -> str:
+        """Fetch container logs from Docker API via Portainer.
+
+        Args:
+            endpoint_id: The Portainer endpoint ID.
+            container_id: The container ID or name.
+            tail: Number of lines to return from the end of the logs.
+            timestamps: Whether to include timestamps in each log line.
+            since: Only return logs since this Unix timestamp.
+
+        Returns:
+            The stdout and stderr lines joined in the order they were written.
+        """
+        lines = [
+            line.text
+            async for line in self.stream_container_logs(
+                endpoint_id, container_id, tail=tail, timestamps=timestamps, since=since
+            )
+        ]
         return "\n".join(lines)
 
     async def get_container_stats(
@@ -1251,6 +1306,7 @@ __all__ = [
     "_determine_edge_agent_status",
     "create_portainer_client",
     "get_client_pool",
+    "group_stacks_by_endpoint",
     "normalise_endpoint_containers",
     "normalise_endpoint_containers_dict",
     "normalise_endpoint_images",
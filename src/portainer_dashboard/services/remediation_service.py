@@ -12,6 +12,7 @@ import logging
 from datetime import datetime, timezone
 
 from portainer_dashboard.config import PortainerEnvironmentSettings, get_settings
+from portainer_dashboard.core.store_executor import run_read, run_write
 from portainer_dashboard.models.monitoring import MonitoringInsight
 from portainer_dashboard.models.remediation import (
     ActionExecutionResult,
@@ -87,7 +88,7 @@ class RemediationService:
         """Check if auto-suggestion is enabled."""
         return self._settings.remediation.auto_suggest
 
-    def suggest_action_from_insight(
+    async def suggest_action_from_insight(
         self,
         insight: MonitoringInsight,
         endpoint_id: int,
@@ -130,7 +131,9 @@ class RemediationService:
         action_type: ActionType = action_config["action_type"]
 
         # Check if there's already a pending action for this container
-        if self._actions_store.has_pending_action_for_container(container_id, action_type):
+        if await run_read(
+            self._actions_store.has_pending_action_for_container, container_id, action_type
+        ):
             LOGGER.debug(
                 "Pending %s action already exists for %s",
                 action_type.value,
@@ -154,7 +157,7 @@ class RemediationService:
             rationale=action_config["rationale"],
         )
 
-        self._actions_store.create_action(action)
+        await run_write(self._actions_store.create_action, action)
         LOGGER.info(
             "Created pending action suggestion: %s for %s",
             action_type.value,
@@ -163,21 +166,21 @@ class RemediationService:
 
         return action
 
-    def approve_action(self, action_id: str, approved_by: str) -> bool:
+    async def approve_action(self, action_id: str, approved_by: str) -> bool:
         """Approve an action for execution.
 
         This does NOT execute the action - the user must still call execute_action.
         """
-        success = self._actions_store.approve_action(action_id, approved_by)
+        success = await run_write(self._actions_store.approve_action, action_id, approved_by)
         if success:
             LOGGER.info("Action %s approved by %s (not yet executed)", action_id, approved_by)
         return success
 
-    def reject_action(
+    async def reject_action(
         self, action_id: str, rejected_by: str, reason: str | None = None
     ) -> bool:
         """Reject an action."""
-        return self._actions_store.reject_action(action_id, rejected_by, reason)
+        return await run_write(self._actions_store.reject_action, action_id, rejected_by, reason)
 
     async def execute_action(self, action_id: str) -> ActionExecutionResult:
         """Execute an APPROVED action.
@@ -185,7 +188,7 @@ class RemediationService:
         IMPORTANT: Only executes actions that have been explicitly approved.
         Returns an error if the action is not in APPROVED status.
         """
-        action = self._actions_store.get_action(action_id)
+        action = await run_read(self._actions_store.get_action, action_id)
 
         if action is None:
             return ActionExecutionResult(
@@ -204,7 +207,7 @@ class RemediationService:
             )
 
         # Mark as executing
-        if not self._actions_store.mark_executing(action_id):
+        if not await run_write(self._actions_store.mark_executing, action_id):
             return ActionExecutionResult(
                 action_id=action_id,
                 success=False,
@@ -234,7 +237,7 @@ class RemediationService:
 
         if env is None:
             error = f"Endpoint {action.target_endpoint_id} not found"
-            self._actions_store.mark_executed(action_id, "Failed", error)
+            await run_write(self._actions_store.mark_executed, action_id, "Failed", error)
             return ActionExecutionResult(
                 action_id=action_id,
                 success=False,
@@ -265,7 +268,7 @@ class RemediationService:
                     raise ValueError(f"Unknown action type: {action.action_type}")
 
             message = f"Successfully executed {action.action_type.value}"
-            self._actions_store.mark_executed(action_id, message)
+            await run_write(self._actions_store.mark_executed, action_id, message)
 
             LOGGER.info(
                 "Executed action %s: %s on %s",
@@ -282,7 +285,7 @@ class RemediationService:
 
         except PortainerAPIError as exc:
             error = str(exc)
-            self._actions_store.mark_executed(action_id, "Failed", error)
+            await run_write(self._actions_store.mark_executed, action_id, "Failed", error)
 
             LOGGER.error(
                 "Failed to execute action %s: %s",
@@ -297,27 +300,30 @@ class RemediationService:
                 error=error,
             )
 
-    def get_pending_actions(self, limit: int = 100) -> list[RemediationAction]:
+    async def get_pending_actions(self, limit: int = 100) -> list[RemediationAction]:
         """Get all pending actions awaiting approval."""
-        return self._actions_store.get_pending_actions(limit)
+        return await run_read(self._actions_store.get_pending_actions, limit)
 
-    def get_approved_actions(self, limit: int = 100) -> list[RemediationAction]:
+    async def get_approved_actions(self, limit: int = 100) -> list[RemediationAction]:
         """Get approved actions ready for execution."""
-        return self._actions_store.get_approved_actions(limit)
+        return await run_read(self._actions_store.get_approved_actions, limit)
 
-    def get_action(self, action_id: str) -> RemediationAction | None:
+    async def get_action(self, action_id: str) -> RemediationAction | None:
         """Get a specific action by ID."""
-        return self._actions_store.get_action(action_id)
+        return await run_read(self._actions_store.get_action, action_id)
 
-    def get_history(
+    async def get_history(
         self,
         status: ActionStatus | None = None,
         limit: int = 100,
         offset: int = 0,
     ) -> list[RemediationAction]:
         """Get action history."""
-        return self._actions_store.get_actions_history(
-            status=status, limit=limit, offset=offset
+        return await run_read(
+            self._actions_store.get_actions_history,
+            status=status,
+            limit=limit,
+            offset=offset,
         )
 
 
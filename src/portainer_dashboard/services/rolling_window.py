@@ -0,0 +1,173 @@
+"""In-memory rolling windows with running statistics for metric series."""
+
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Iterator
+
+LOGGER = logging.getLogger(__name__)
+
+# Upper bound on tracked series before the least recently updated are evicted
+_DEFAULT_MAX_SERIES = 100_000
+
+# Recompute statistics from the buffer after this many sliding updates to
+# cancel floating point drift accumulated by incremental add/remove steps
+_RESYNC_INTERVAL = 1_000
+
+
+class RollingWindow:
+    """Fixed-capacity ring buffer with Welford running mean and variance.
+
+    Values are kept in a preallocated ``array('d')``. Pushing a value into a
+    full window evicts the oldest sample and updates the statistics in O(1).
+    """
+
+    __slots__ = ("_buffer", "_capacity", "_start", "_count", "_mean", "_m2", "_updates")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("Rolling window capacity must be at least 1")
+        self._buffer = array("d", bytes(8 * capacity))
+        self._capacity = capacity
+        self._start = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of samples retained."""
+        return self._capacity
+
+    @property
+    def count(self) -> int:
+        """Number of samples currently in the window."""
+        return self._count
+
+    @property
+    def mean(self) -> float:
+        """Mean of the samples in the window."""
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the samples in the window."""
+        if self._count < 2:
+            return 0.0
+        return max(self._m2 / self._count, 0.0)
+
+    @property
+    def std_dev(self) -> float:
+        """Population standard deviation of the samples in the window."""
+        return math.sqrt(self.variance)
+
+    def push(self, value: float) -> None:
+        """Append a sample, evicting the oldest one when the window is full."""
+        if self._count < self._capacity:
+            self._buffer[(self._start + self._count) % self._capacity] = value
+            self._count += 1
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+            return
+
+        oldest = self._buffer[self._start]
+        self._buffer[self._start] = value
+        self._start = (self._start + 1) % self._capacity
+
+        # Sliding Welford update: replace ``oldest`` with ``value``
+        old_mean = self._mean
+        self._mean += (value - oldest) / self._count
+        self._m2 += (value - oldest) * (value - self._mean + oldest - old_mean)
+
+        self._updates += 1
+        if self._updates >= _RESYNC_INTERVAL:
+            self._resync()
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Push several samples, oldest first."""
+        for value in values:
+            self.push(value)
+
+    def values(self) -> list[float]:
+        """Return the samples in chronological order."""
+        return [
+            self._buffer[(self._start + offset) % self._capacity]
+            for offset in range(self._count)
+        ]
+
+    def _resync(self) -> None:
+        """Recompute mean and M2 exactly from the buffered samples."""
+        samples = self.values()
+        self._mean = math.fsum(samples) / self._count
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in samples)
+        self._updates = 0
+
+
+class RollingWindowRegistry:
+    """Per-series rolling windows keyed by an arbitrary hashable series key.
+
+    The registry is bounded: once ``max_series`` windows exist the least
+    recently updated series is dropped.
+    """
+
+    def __init__(self, capacity: int, *, max_series: int = _DEFAULT_MAX_SERIES) -> None:
+        self._capacity = capacity
+        self._max_series = max_series
+        self._windows: OrderedDict[Hashable, RollingWindow] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._windows
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._windows)
+
+    @property
+    def capacity(self) -> int:
+        """Capacity of each window."""
+        return self._capacity
+
+    def get(self, key: Hashable) -> RollingWindow | None:
+        """Return the window for a series, if tracked."""
+        return self._windows.get(key)
+
+    def push(self, key: Hashable, value: float) -> RollingWindow:
+        """Append a sample to a series, creating its window if needed."""
+        window = self._windows.get(key)
+        if window is None:
+            window = RollingWindow(self._capacity)
+            self._windows[key] = window
+            if len(self._windows) > self._max_series:
+                evicted, _ = self._windows.popitem(last=False)
+                LOGGER.debug("Evicted rolling window for series %s", evicted)
+        else:
+            self._windows.move_to_end(key)
+        window.push(value)
+        return window
+
+    def hydrate(self, series: dict[Hashable, list[float]]) -> None:
+        """Load historical samples, given per series in chronological order."""
+        for key, values in series.items():
+            window = RollingWindow(self._capacity)
+            window.extend(values[-self._capacity:])
+            self._windows[key] = window
+            self._windows.move_to_end(key)
+        while len(self._windows) > self._max_series:
+            self._windows.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all tracked series."""
+        self._windows.clear()
+
+
+__all__ = [
+    "RollingWindow",
+    "RollingWindowRegistry",
+]
@@ -3,8 +3,14 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
 
 from portainer_dashboard.config import get_settings
 from portainer_dashboard.models.monitoring import ContainerCapabilities
@@ -38,6 +44,126 @@ DEFAULT_ELEVATED_CAPS = frozenset([
     "LINUX_IMMUTABLE",
 ])
 
+# HostConfig fields the scanner evaluates. They are fixed when a container is
+# created, so a cached inspect result stays valid for the container's life.
+_SECURITY_FIELDS = ("Privileged", "CapAdd", "CapDrop", "SecurityOpt")
+
+_INSPECT_CACHE_FILE = "security_inspect_cache.json"
+_INSPECT_CACHE_VERSION = 1
+_DEFAULT_INSPECT_CACHE_SIZE = 5000
+
+
+class InspectResultCache:
+    """LRU cache of the security-relevant inspect fields of containers.
+
+    Entries are keyed by endpoint and container ID and are only returned
+    while the container's creation time matches, so recreated containers are
+    always inspected again. With a ``path``, entries are persisted as JSON so
+    a restart does not re-inspect every container.
+    """
+
+    def __init__(self, path: Path | None = None, max_entries: int = _DEFAULT_INSPECT_CACHE_SIZE):
+        self._path = path
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, str], tuple[Any, dict[str, Any]]] = OrderedDict()
+        self._dirty = False
+        # Serialises writers of the cache file, which may run on worker threads
+        self._save_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path is not None:
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, endpoint_id: int, container_id: str, created: Any) -> dict[str, Any] | None:
+        """Return the cached security fields, or None when not cached."""
+        key = (endpoint_id, container_id)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != created:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self,
+        endpoint_id: int,
+        container_id: str,
+        created: Any,
+        security_fields: dict[str, Any],
+    ) -> None:
+        """Cache the security fields of a container, evicting the least recently used."""
+        key = (endpoint_id, container_id)
+        self._entries[key] = (created, security_fields)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist the cache if entries were added since the last save."""
+        if self._path is None or not self._dirty:
+            return
+        self._dirty = False
+        if not self._write(self._path, list(self._entries.items())):
+            self._dirty = True
+
+    async def save_async(self) -> None:
+        """Persist the cache like :meth:`save`, writing the file on a worker thread.
+
+        The entries are copied on the calling thread, so the cache can be
+        used while the file is written.
+        """
+        if self._path is None or not self._dirty:
+            return
+        self._dirty = False
+        if not await asyncio.to_thread(self._write, self._path, list(self._entries.items())):
+            self._dirty = True
+
+    def _write(
+        self, path: Path, entries: list[tuple[tuple[int, str], tuple[Any, dict[str, Any]]]]
+    ) -> bool:
+        payload = {
+            "version": _INSPECT_CACHE_VERSION,
+            "entries": [
+                [endpoint_id, container_id, created, security_fields]
+                for (endpoint_id, container_id), (created, security_fields) in entries
+            ],
+        }
+        temporary = path.with_suffix(".tmp")
+        try:
+            with self._save_lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temporary.write_text(json.dumps(payload), "utf-8")
+                os.replace(temporary, path)
+        except OSError as exc:
+            LOGGER.warning("Unable to persist security inspect cache %s: %s", path, exc)
+            return False
+        return True
+
+    def _load(self, path: Path) -> None:
+        try:
+            data = json.loads(path.read_text("utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("Ignoring unreadable security inspect cache %s: %s", path, exc)
+            return
+        if not isinstance(data, dict) or data.get("version") != _INSPECT_CACHE_VERSION:
+            return
+        for entry in data.get("entries") or []:
+            try:
+                endpoint_id, container_id, created, security_fields = entry
+            except (TypeError, ValueError):
+                continue
+            if isinstance(security_fields, dict):
+                self._entries[(int(endpoint_id), str(container_id))] = (created, security_fields)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
 
 def _is_excluded_container(container_name: str, excluded_patterns: frozenset[str]) -> bool:
     """Check if a container name matches any exclusion pattern.
@@ -63,6 +189,11 @@ class SecurityScanner:
     )
     excluded_containers: frozenset[str] = field(default_factory=frozenset)
     scan_timeout: float = 10.0
+    inspect_cache: InspectResultCache = field(default_factory=InspectResultCache)
+
+    async def save_cache(self) -> None:
+        """Persist inspect results added since the last save, off the event loop."""
+        await self.inspect_cache.save_async()
 
     async def scan_container(
         self,
@@ -71,39 +202,26 @@ class SecurityScanner:
         endpoint_name: str | None,
         container_id: str,
         container_name: str,
+        created: Any = None,
     ) -> ContainerCapabilities | None:
         """Scan a single container for security configuration.
 
+        The container is only inspected when no cached result exists for
+        its ID and creation time (``Created`` from the container list).
+
         Returns ContainerCapabilities if container has elevated privileges,
         or None if container is running with default/restricted capabilities.
         """
-        try:
-            inspect_data = await asyncio.wait_for(
-                client.inspect_container(endpoint_id, container_id),
-                timeout=self.scan_timeout,
-            )
-        except asyncio.TimeoutError:
-            LOGGER.debug(
-                "Timeout inspecting container %s on endpoint %d",
-                container_id[:12],
-                endpoint_id,
-            )
-            return None
-        except PortainerAPIError as exc:
-            LOGGER.debug(
-                "Failed to inspect container %s: %s",
-                container_id[:12],
-                exc,
-            )
-            return None
-
-        host_config = inspect_data.get("HostConfig", {})
-        if not isinstance(host_config, dict):
-            return None
+        host_config = self.inspect_cache.get(endpoint_id, container_id, created)
+        if host_config is None:
+            host_config = await self._inspect_security_fields(client, endpoint_id, container_id)
+            if host_config is None:
+                return None
+            self.inspect_cache.put(endpoint_id, container_id, created, host_config)
 
         cap_add = host_config.get("CapAdd") or []
         cap_drop = host_config.get("CapDrop") or []
-        privileged = host_config.get("Privileged", False)
+        privileged = host_config.get("Privileged") or False
         security_opt = host_config.get("SecurityOpt") or []
 
         if not isinstance(cap_add, list):
@@ -147,6 +265,38 @@ class SecurityScanner:
             elevated_risks=elevated_risks,
         )
 
+    async def _inspect_security_fields(
+        self,
+        client: AsyncPortainerClient,
+        endpoint_id: int,
+        container_id: str,
+    ) -> dict[str, Any] | None:
+        """Inspect a container and return the HostConfig fields the scan evaluates."""
+        try:
+            inspect_data = await asyncio.wait_for(
+                client.inspect_container(endpoint_id, container_id),
+                timeout=self.scan_timeout,
+            )
+        except asyncio.TimeoutError:
+            LOGGER.debug(
+                "Timeout inspecting container %s on endpoint %d",
+                container_id[:12],
+                endpoint_id,
+            )
+            return None
+        except PortainerAPIError as exc:
+            LOGGER.debug(
+                "Failed to inspect container %s: %s",
+                container_id[:12],
+                exc,
+            )
+            return None
+
+        host_config = inspect_data.get("HostConfig", {})
+        if not isinstance(host_config, dict):
+            return None
+        return {name: host_config.get(name) for name in _SECURITY_FIELDS}
+
     async def scan_endpoint_containers(
         self,
         client: AsyncPortainerClient,
@@ -195,11 +345,20 @@ class SecurityScanner:
                     endpoint_name,
                     container_id,
                     container_name,
+                    container.get("Created"),
                 )
             )
 
         if tasks:
+            misses_before = self.inspect_cache.misses
             scan_results = await asyncio.gather(*tasks, return_exceptions=True)
+            inspected = self.inspect_cache.misses - misses_before
+            LOGGER.debug(
+                "Security scan of endpoint %d: %d containers, %d inspected",
+                endpoint_id,
+                len(tasks),
+                inspected,
+            )
             for result in scan_results:
                 if isinstance(result, ContainerCapabilities):
                     results.append(result)
@@ -210,18 +369,27 @@ class SecurityScanner:
 
 
 def create_security_scanner() -> SecurityScanner:
-    """Create a security scanner with settings from configuration."""
+    """Create a security scanner with settings from configuration.
+
+    Inspect results are persisted in the cache directory unless the
+    persistent cache is disabled.
+    """
     settings = get_settings()
     elevated_caps = frozenset(settings.monitoring.elevated_capabilities)
     excluded = frozenset(settings.monitoring.excluded_containers)
+    cache_path = (
+        settings.cache.directory / _INSPECT_CACHE_FILE if settings.cache.enabled else None
+    )
     return SecurityScanner(
         elevated_capabilities=elevated_caps,
         excluded_containers=excluded,
+        inspect_cache=InspectResultCache(cache_path, settings.monitoring.security_cache_size),
     )
 
 
 __all__ = [
     "DEFAULT_ELEVATED_CAPS",
+    "InspectResultCache",
     "SecurityScanner",
     "_is_excluded_container",
     "create_security_scanner",
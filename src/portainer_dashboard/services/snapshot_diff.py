@@ -0,0 +1,190 @@
+"""Structured diffs between consecutive infrastructure snapshots.
+
+Monitoring cycles run every few minutes against a fleet that mostly does not
+change in between. :func:`diff_snapshots` reduces two snapshots to what
+changed, so an empty diff can skip analysis entirely and a non-empty one can
+be analysed on its own.
+"""
+
+from __future__ import annotations
+
+from portainer_dashboard.models.monitoring import (
+    ContainerCapabilities,
+    ContainerLogs,
+    ImageStatus,
+    InfrastructureSnapshot,
+    SnapshotDiff,
+)
+from portainer_dashboard.services.log_templates import mine_log_templates
+
+
+def _health(status: object) -> str | None:
+    """Return the health check state embedded in a container status string.
+
+    The rest of the status ("Up 5 minutes") changes every cycle and is not
+    compared.
+    """
+    if not isinstance(status, str):
+        return None
+    lowered = status.lower()
+    if "unhealthy" in lowered:
+        return "unhealthy"
+    if "health: starting" in lowered:
+        return "starting"
+    if "healthy" in lowered:
+        return "healthy"
+    return None
+
+
+def _container_key(details: dict) -> tuple[object, object]:
+    return details.get("endpoint_id"), details.get("container_id")
+
+
+def _security_key(issue: ContainerCapabilities) -> tuple[object, ...]:
+    # Keyed by name, so redeploying a container with the same privileges
+    # does not report the issue again
+    return issue.endpoint_id, issue.container_name, tuple(sorted(issue.elevated_risks))
+
+
+def _image_key(image: ImageStatus) -> tuple[object, ...]:
+    return image.stack_id, image.image_name, image.latest_digest
+
+
+def _diff_containers(
+    previous: InfrastructureSnapshot,
+    current: InfrastructureSnapshot,
+    diff: SnapshotDiff,
+) -> None:
+    previous_containers = {_container_key(c): c for c in previous.container_details}
+    current_keys: set[tuple[object, object]] = set()
+
+    for details in current.container_details:
+        key = _container_key(details)
+        current_keys.add(key)
+        before = previous_containers.get(key)
+        if before is None:
+            diff.containers_added.append(details)
+            continue
+        health_before = _health(before.get("status"))
+        health_now = _health(details.get("status"))
+        if before.get("state") != details.get("state") or health_before != health_now:
+            diff.containers_changed.append(
+                {
+                    "container_id": details.get("container_id"),
+                    "container_name": details.get("container_name"),
+                    "endpoint_name": details.get("endpoint_name"),
+                    "previous_state": before.get("state"),
+                    "state": details.get("state"),
+                    "previous_health": health_before,
+                    "health": health_now,
+                }
+            )
+
+    diff.containers_removed.extend(
+        details for key, details in previous_containers.items() if key not in current_keys
+    )
+
+
+def _diff_endpoints(
+    previous: InfrastructureSnapshot,
+    current: InfrastructureSnapshot,
+    diff: SnapshotDiff,
+) -> None:
+    def key(ep: dict) -> tuple[object, object]:
+        return ep.get("environment"), ep.get("endpoint_id")
+
+    previous_status = {key(ep): ep.get("endpoint_status") for ep in previous.endpoint_details}
+    current_keys: set[tuple[object, object]] = set()
+    for ep in current.endpoint_details:
+        current_keys.add(key(ep))
+        before = previous_status.get(key(ep), "absent")
+        if before != ep.get("endpoint_status"):
+            diff.endpoints_changed.append(
+                {
+                    "endpoint_name": ep.get("endpoint_name"),
+                    "previous_status": before,
+                    "status": ep.get("endpoint_status"),
+                }
+            )
+    for ep in previous.endpoint_details:
+        if key(ep) not in current_keys:
+            diff.endpoints_changed.append(
+                {
+                    "endpoint_name": ep.get("endpoint_name"),
+                    "previous_status": ep.get("endpoint_status"),
+                    "status": "absent",
+                }
+            )
+
+
+def _new_log_lines(
+    previous: InfrastructureSnapshot, current: InfrastructureSnapshot
+) -> list[ContainerLogs]:
+    """Return the log lines of each container that the previous snapshot lacked.
+
+    Logs are fetched with timestamps, so a repeated message is still a new
+    line. The templates of each entry are mined from its new lines only,
+    after sanitizing them.
+    """
+    seen_lines = {
+        (entry.endpoint_id, entry.container_id): set(entry.logs.splitlines())
+        for entry in previous.container_logs
+    }
+    new_logs: list[ContainerLogs] = []
+    for entry in current.container_logs:
+        seen = seen_lines.get((entry.endpoint_id, entry.container_id), set())
+        lines = [line for line in entry.logs.splitlines() if line not in seen]
+        if not any(line.strip() for line in lines):
+            continue
+        new_logs.append(
+            entry.model_copy(
+                update={
+                    "logs": "\n".join(lines),
+                    "log_lines": len(lines),
+                    "truncated": False,
+                    "templates": mine_log_templates(lines),
+                }
+            )
+        )
+    return new_logs
+
+
+def diff_snapshots(
+    previous: InfrastructureSnapshot, current: InfrastructureSnapshot
+) -> SnapshotDiff:
+    """Return what changed from ``previous`` to ``current``.
+
+    Containers are matched by endpoint and ID and count as changed when their
+    state or health check result differs. Security issues and outdated images
+    are reported when they appear or disappear; container logs only keep the
+    lines not present in the previous snapshot.
+    """
+    diff = SnapshotDiff(previous_timestamp=previous.timestamp, timestamp=current.timestamp)
+    _diff_containers(previous, current, diff)
+    _diff_endpoints(previous, current, diff)
+
+    previous_issues = {_security_key(issue) for issue in previous.security_issues}
+    current_issues = {_security_key(issue) for issue in current.security_issues}
+    diff.new_security_issues = [
+        issue for issue in current.security_issues if _security_key(issue) not in previous_issues
+    ]
+    diff.resolved_security_issues = [
+        issue for issue in previous.security_issues if _security_key(issue) not in current_issues
+    ]
+
+    previous_images = {_image_key(image) for image in previous.outdated_images}
+    current_images = {_image_key(image) for image in current.outdated_images}
+    diff.new_outdated_images = [
+        image for image in current.outdated_images if _image_key(image) not in previous_images
+    ]
+    diff.resolved_outdated_images = [
+        image for image in previous.outdated_images if _image_key(image) not in current_images
+    ]
+
+    diff.new_container_logs = _new_log_lines(previous, current)
+    return diff
+
+
+__all__ = [
+    "diff_snapshots",
+]
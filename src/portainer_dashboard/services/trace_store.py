@@ -5,12 +5,18 @@ from __future__ import annotations
 import json
 import logging
 import sqlite3
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from threading import RLock
+from typing import TypeVar
 
 from portainer_dashboard.config import get_settings
+from portainer_dashboard.core.sqlite_pool import get_pool
+from portainer_dashboard.core.sqlite_writer import SQLiteWriteQueue
 from portainer_dashboard.models.tracing import (
+    RouteStats,
     ServiceEdge,
     ServiceMap,
     ServiceNode,
@@ -21,96 +27,208 @@ from portainer_dashboard.models.tracing import (
     TraceFilter,
     TracesSummary,
 )
+from portainer_dashboard.services.latency_sketch import LatencySketch
 
 LOGGER = logging.getLogger(__name__)
 
+# Retention purge limits per scheduler run
+_PURGE_CHUNK_SIZE = 500
+_PURGE_TIME_BUDGET_SECONDS = 5.0
+
+# Trace IDs per "IN (...)" lookup, well below SQLite's variable limit
+_LOOKUP_CHUNK_SIZE = 500
+
+# Latency sketches are kept per route and per bucket of this many seconds
+_SKETCH_BUCKET_SECONDS = 300
+
+# Method and route of the per-bucket sketch covering all routes
+_ALL_ROUTES = "*"
+
+# Pending sketch changes: (trace count, error count) and durations per
+# (method, route, bucket_start)
+_SketchDeltas = dict[tuple[str, str, int], tuple[list[int], LatencySketch]]
+
+_T = TypeVar("_T")
+
+_INSERT_SPAN_SQL = """
+    INSERT OR REPLACE INTO spans (
+        trace_id, span_id, parent_span_id, name, kind, status,
+        status_message, start_time, end_time, duration_ms,
+        service_name, attributes
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_TRACE_SQL = """
+    INSERT OR REPLACE INTO traces (
+        trace_id, root_span_name, service_name, start_time, end_time,
+        total_duration_ms, span_count, has_errors, endpoint_id,
+        container_id, http_method, http_route, http_status_code, user_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class SQLiteTraceStore:
-    """SQLite-backed storage for distributed traces."""
+    """SQLite-backed storage for distributed traces.
+
+    Writes go through a single writer thread that groups spans and traces
+    from concurrent exports into shared transactions; queries use pooled
+    read-only connections.
+    """
 
     def __init__(self, database_path: Path) -> None:
         self._database_path = database_path
-        self._lock = RLock()
+        self._pool = get_pool(database_path)
+        self._writer = SQLiteWriteQueue(self._pool, name="trace-writer")
+        # Sketch changes of the current batch's successful operations; only
+        # touched on the writer thread
+        self._sketch_deltas: _SketchDeltas = {}
+        self._writer.add_pre_commit_hook(self._flush_sketch_deltas)
+        self._writer.add_rollback_hook(self._sketch_deltas.clear)
         self._initialise()
 
-    def _connect(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(
-            self._database_path,
-            detect_types=sqlite3.PARSE_DECLTYPES,
-            check_same_thread=False,
-        )
-        connection.row_factory = sqlite3.Row
-        return connection
-
     def _initialise(self) -> None:
-        with self._lock:
-            self._database_path.parent.mkdir(parents=True, exist_ok=True)
-            with self._connect() as connection:
-                connection.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS spans (
-                        trace_id TEXT NOT NULL,
-                        span_id TEXT NOT NULL,
-                        parent_span_id TEXT,
-                        name TEXT NOT NULL,
-                        kind TEXT NOT NULL,
-                        status TEXT NOT NULL,
-                        status_message TEXT,
-                        start_time TEXT NOT NULL,
-                        end_time TEXT,
-                        duration_ms INTEGER,
-                        service_name TEXT NOT NULL,
-                        attributes TEXT,
-                        PRIMARY KEY (trace_id, span_id)
-                    )
-                    """
+        self._database_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._pool.transaction() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS spans (
+                    trace_id TEXT NOT NULL,
+                    span_id TEXT NOT NULL,
+                    parent_span_id TEXT,
+                    name TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    status_message TEXT,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT,
+                    duration_ms INTEGER,
+                    service_name TEXT NOT NULL,
+                    attributes TEXT,
+                    PRIMARY KEY (trace_id, span_id)
                 )
-                connection.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_spans_trace_id
-                    ON spans (trace_id)
-                    """
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_spans_trace_id
+                ON spans (trace_id)
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_spans_start_time
+                ON spans (start_time DESC)
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS traces (
+                    trace_id TEXT PRIMARY KEY,
+                    root_span_name TEXT NOT NULL,
+                    service_name TEXT NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT,
+                    total_duration_ms INTEGER,
+                    span_count INTEGER NOT NULL,
+                    has_errors INTEGER NOT NULL,
+                    endpoint_id INTEGER,
+                    container_id TEXT,
+                    http_method TEXT,
+                    http_route TEXT,
+                    http_status_code INTEGER,
+                    user_id TEXT
                 )
-                connection.execute(
-                    """
-                    CREATE INDEX IF NOT EXISTS idx_spans_start_time
-                    ON spans (start_time DESC)
-                    """
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_traces_start_time
+                ON traces (start_time DESC)
+                """
+            )
+            connection.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_traces_route
+                ON traces (http_route)
+                """
+            )
+
+            # Summary counters, maintained on every insert and purge so the
+            # summary never scans the traces table
+            counters_exist = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trace_counters'"
+            ).fetchone()
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS trace_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
                 )
-                connection.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS traces (
-                        trace_id TEXT PRIMARY KEY,
-                        root_span_name TEXT NOT NULL,
-                        service_name TEXT NOT NULL,
-                        start_time TEXT NOT NULL,
-                        end_time TEXT,
-                        total_duration_ms INTEGER,
-                        span_count INTEGER NOT NULL,
-                        has_errors INTEGER NOT NULL,
-                        endpoint_id INTEGER,
-                        container_id TEXT,
-                        http_method TEXT,
-                        http_route TEXT,
-                        http_status_code INTEGER,
-                        user_id TEXT
-                    )
-                    """
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS trace_routes (
+                    http_route TEXT PRIMARY KEY,
+                    trace_count INTEGER NOT NULL
                 )
+                """
+            )
+            if not counters_exist:
                 connection.execute(
                     """
-                    CREATE INDEX IF NOT EXISTS idx_traces_start_time
-                    ON traces (start_time DESC)
+                    INSERT INTO trace_counters (name, value)
+                    SELECT 'traces', COUNT(*) FROM traces
+                    UNION ALL SELECT 'errors', COALESCE(SUM(has_errors), 0) FROM traces
+                    UNION ALL SELECT 'timed', COUNT(total_duration_ms) FROM traces
+                    UNION ALL SELECT 'duration_ms', COALESCE(SUM(total_duration_ms), 0)
+                        FROM traces
                     """
                 )
                 connection.execute(
                     """
-                    CREATE INDEX IF NOT EXISTS idx_traces_route
-                    ON traces (http_route)
+                    INSERT INTO trace_routes (http_route, trace_count)
+                    SELECT http_route, COUNT(*) FROM traces
+                    WHERE http_route IS NOT NULL
+                    GROUP BY http_route
                     """
                 )
-                connection.commit()
-            LOGGER.info("Trace store initialized at %s", self._database_path)
+
+            # Mergeable duration sketches per route and time bucket, so
+            # percentiles for any window never read raw traces
+            sketches_exist = connection.execute(
+                """
+                SELECT 1 FROM sqlite_master
+                WHERE type = 'table' AND name = 'trace_latency_sketches'
+                """
+            ).fetchone()
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS trace_latency_sketches (
+                    http_method TEXT NOT NULL,
+                    http_route TEXT NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    trace_count INTEGER NOT NULL,
+                    error_count INTEGER NOT NULL,
+                    sketch BLOB NOT NULL,
+                    PRIMARY KEY (http_method, http_route, bucket_start)
+                ) WITHOUT ROWID
+                """
+            )
+            if not sketches_exist:
+                deltas: _SketchDeltas = {}
+                self._add_sketch_deltas(
+                    deltas,
+                    connection.execute(
+                        """
+                        SELECT has_errors, total_duration_ms, http_route, http_method, start_time
+                        FROM traces
+                        """
+                    ).fetchall(),
+                    1,
+                )
+                self._apply_sketch_deltas(connection, deltas)
+        LOGGER.info("Trace store initialized at %s", self._database_path)
 
     @staticmethod
     def _encode_datetime(value: datetime | None) -> str | None:
@@ -124,101 +242,267 @@ class SQLiteTraceStore:
             return None
         return datetime.fromisoformat(value).astimezone(timezone.utc)
 
-    def store_span(self, span: Span) -> None:
+    @classmethod
+    def _span_row(cls, span: Span) -> tuple:
+        return (
+            span.trace_id,
+            span.span_id,
+            span.parent_span_id,
+            span.name,
+            span.kind.value,
+            span.status.value,
+            span.status_message,
+            cls._encode_datetime(span.start_time),
+            cls._encode_datetime(span.end_time),
+            span.duration_ms,
+            span.service_name,
+            json.dumps(span.attributes) if span.attributes else None,
+        )
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until all queued writes have been committed."""
+        self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Commit queued writes and stop the writer thread."""
+        self._writer.close()
+
+    def store_span(self, span: Span, *, wait: bool = True) -> None:
         """Store a single span."""
-        with self._lock, self._connect() as connection:
-            connection.execute(
-                """
-                INSERT OR REPLACE INTO spans (
-                    trace_id, span_id, parent_span_id, name, kind, status,
-                    status_message, start_time, end_time, duration_ms,
-                    service_name, attributes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    span.trace_id,
-                    span.span_id,
-                    span.parent_span_id,
-                    span.name,
-                    span.kind.value,
-                    span.status.value,
-                    span.status_message,
-                    self._encode_datetime(span.start_time),
-                    self._encode_datetime(span.end_time),
-                    span.duration_ms,
-                    span.service_name,
-                    json.dumps(span.attributes) if span.attributes else None,
-                ),
-            )
-            connection.commit()
+        self.store_spans_batch([span], wait=wait)
+
+    def store_spans_batch(self, spans: list[Span], *, wait: bool = True) -> None:
+        """Store multiple spans efficiently.
 
-    def store_spans_batch(self, spans: list[Span]) -> None:
-        """Store multiple spans efficiently."""
+        Args:
+            spans: Spans to store.
+            wait: Block until the rows are committed. The span exporter
+                passes False to return as soon as the rows are queued.
+        """
         if not spans:
             return
-        with self._lock, self._connect() as connection:
-            connection.executemany(
+        future = self._writer.executemany(
+            _INSERT_SPAN_SQL,
+            [self._span_row(s) for s in spans],
+            urgent=wait,
+        )
+        if wait:
+            future.result()
+        LOGGER.debug("Queued %d spans", len(spans))
+
+    @staticmethod
+    def _sketch_bucket(value: datetime | str) -> int:
+        """Return the start (epoch seconds) of the sketch bucket holding ``value``."""
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        timestamp = int(value.timestamp())
+        return timestamp - timestamp % _SKETCH_BUCKET_SECONDS
+
+    @classmethod
+    def _add_sketch_deltas(
+        cls,
+        deltas: _SketchDeltas,
+        traces: Iterable[tuple[int, int | None, str | None, str | None, str]],
+        sign: int,
+    ) -> None:
+        """Accumulate changes to the latency sketches.
+
+        Every trace is recorded in the sketch of its method, route and bucket,
+        and in the bucket's sketch over all routes.
+
+        Args:
+            deltas: Pending changes per (method, route, bucket_start).
+            traces: (has_errors, total_duration_ms, http_route, http_method,
+                start_time) per trace.
+            sign: 1 for stored traces, -1 for replaced or deleted ones.
+        """
+        for has_errors, duration_ms, route, method, start_time in traces:
+            bucket = cls._sketch_bucket(start_time)
+            for key in ((method or "", route or "", bucket), (_ALL_ROUTES, _ALL_ROUTES, bucket)):
+                counts, sketch = deltas.setdefault(key, ([0, 0], LatencySketch()))
+                counts[0] += sign
+                counts[1] += sign * has_errors
+                if duration_ms is not None:
+                    sketch.add(duration_ms, sign)
+
+    @staticmethod
+    def _apply_sketch_deltas(connection: sqlite3.Connection, deltas: _SketchDeltas) -> None:
+        """Merge accumulated changes into the persisted latency sketches."""
+        for key, ((trace_count, error_count), delta) in deltas.items():
+            row = connection.execute(
                 """
-                INSERT OR REPLACE INTO spans (
-                    trace_id, span_id, parent_span_id, name, kind, status,
-                    status_message, start_time, end_time, duration_ms,
-                    service_name, attributes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                SELECT trace_count, error_count, sketch FROM trace_latency_sketches
+                WHERE http_method = ? AND http_route = ? AND bucket_start = ?
                 """,
-                [
-                    (
-                        s.trace_id,
-                        s.span_id,
-                        s.parent_span_id,
-                        s.name,
-                        s.kind.value,
-                        s.status.value,
-                        s.status_message,
-                        self._encode_datetime(s.start_time),
-                        self._encode_datetime(s.end_time),
-                        s.duration_ms,
-                        s.service_name,
-                        json.dumps(s.attributes) if s.attributes else None,
-                    )
-                    for s in spans
-                ],
-            )
-            connection.commit()
-            LOGGER.debug("Stored %d spans", len(spans))
+                key,
+            ).fetchone()
+            if row is not None:
+                trace_count += row[0]
+                error_count += row[1]
+                delta.merge(LatencySketch.from_bytes(row[2]))
+            if trace_count <= 0:
+                connection.execute(
+                    """
+                    DELETE FROM trace_latency_sketches
+                    WHERE http_method = ? AND http_route = ? AND bucket_start = ?
+                    """,
+                    key,
+                )
+            else:
+                connection.execute(
+                    "INSERT OR REPLACE INTO trace_latency_sketches VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, trace_count, error_count, delta.to_bytes()),
+                )
 
-    def store_trace(self, trace: Trace) -> None:
+    def _flush_sketch_deltas(self, connection: sqlite3.Connection) -> None:
+        """Write the sketch changes of a write batch before it commits.
+
+        Re-encoding a sketch costs far more than updating it, so operations
+        only accumulate deltas and each sketch is rewritten once per batch.
+        """
+        if self._sketch_deltas:
+            deltas = dict(self._sketch_deltas)
+            self._sketch_deltas.clear()
+            self._apply_sketch_deltas(connection, deltas)
+
+    def _with_sketch_deltas(
+        self, operation: Callable[[sqlite3.Connection, _SketchDeltas], _T]
+    ) -> Callable[[sqlite3.Connection], _T]:
+        """Wrap a write operation so its sketch changes share its fate.
+
+        The operation accumulates deltas in its own dict, which joins the
+        batch's pending deltas only once it returns. An operation that raises
+        has its savepoint rolled back by the writer, and its deltas are
+        dropped with it.
+        """
+
+        def run(connection: sqlite3.Connection) -> _T:
+            deltas: _SketchDeltas = {}
+            result = operation(connection, deltas)
+            for key, ((trace_count, error_count), sketch) in deltas.items():
+                pending = self._sketch_deltas.get(key)
+                if pending is None:
+                    self._sketch_deltas[key] = ([trace_count, error_count], sketch)
+                else:
+                    pending[0][0] += trace_count
+                    pending[0][1] += error_count
+                    pending[1].merge(sketch)
+            return result
+
+        return run
+
+    def _count_traces(
+        self,
+        connection: sqlite3.Connection,
+        deltas: _SketchDeltas,
+        traces: Iterable[tuple[int, int | None, str | None, str | None, str]],
+        sign: int,
+    ) -> None:
+        """Add (sign=1) or remove (sign=-1) traces from the summary counters.
+
+        Args:
+            connection: Writer connection inside the current transaction.
+            deltas: Sketch changes of the current operation.
+            traces: (has_errors, total_duration_ms, http_route, http_method,
+                start_time) per trace.
+            sign: 1 for stored traces, -1 for replaced or deleted ones.
+        """
+        traces = list(traces)
+        self._add_sketch_deltas(deltas, traces, sign)
+        counts = Counter[str]()
+        routes = Counter[str]()
+        for has_errors, duration_ms, route, _, _ in traces:
+            counts["traces"] += 1
+            counts["errors"] += has_errors
+            if duration_ms is not None:
+                counts["timed"] += 1
+                counts["duration_ms"] += duration_ms
+            if route is not None:
+                routes[route] += 1
+        if not counts:
+            return
+
+        connection.executemany(
+            "UPDATE trace_counters SET value = value + ? WHERE name = ?",
+            [(sign * value, name) for name, value in counts.items()],
+        )
+        connection.executemany(
+            """
+            INSERT INTO trace_routes (http_route, trace_count) VALUES (?, ?)
+            ON CONFLICT (http_route) DO UPDATE
+            SET trace_count = trace_count + excluded.trace_count
+            """,
+            [(route, sign * count) for route, count in routes.items()],
+        )
+        if sign < 0:
+            connection.execute("DELETE FROM trace_routes WHERE trace_count <= 0")
+
+    @classmethod
+    def _trace_row(cls, trace: Trace) -> tuple:
+        return (
+            trace.trace_id,
+            trace.root_span_name,
+            trace.service_name,
+            cls._encode_datetime(trace.start_time),
+            cls._encode_datetime(trace.end_time),
+            trace.total_duration_ms,
+            trace.span_count,
+            1 if trace.has_errors else 0,
+            trace.endpoint_id,
+            trace.container_id,
+            trace.http_method,
+            trace.http_route,
+            trace.http_status_code,
+            trace.user_id,
+        )
+
+    def store_trace(self, trace: Trace, *, wait: bool = True) -> None:
         """Store or update a trace summary."""
-        with self._lock, self._connect() as connection:
-            connection.execute(
-                """
-                INSERT OR REPLACE INTO traces (
-                    trace_id, root_span_name, service_name, start_time, end_time,
-                    total_duration_ms, span_count, has_errors, endpoint_id,
-                    container_id, http_method, http_route, http_status_code, user_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    trace.trace_id,
-                    trace.root_span_name,
-                    trace.service_name,
-                    self._encode_datetime(trace.start_time),
-                    self._encode_datetime(trace.end_time),
-                    trace.total_duration_ms,
-                    trace.span_count,
-                    1 if trace.has_errors else 0,
-                    trace.endpoint_id,
-                    trace.container_id,
-                    trace.http_method,
-                    trace.http_route,
-                    trace.http_status_code,
-                    trace.user_id,
-                ),
+        self.store_traces_batch([trace], wait=wait)
+
+    def store_traces_batch(self, traces: list[Trace], *, wait: bool = True) -> None:
+        """Store or update many trace summaries in one operation.
+
+        Args:
+            traces: Trace summaries to store. When a trace ID occurs more
+                than once, the last summary wins.
+            wait: Block until the rows are committed.
+        """
+        if not traces:
+            return
+        rows = list({trace.trace_id: self._trace_row(trace) for trace in traces}.values())
+
+        def upsert(connection: sqlite3.Connection, deltas: _SketchDeltas) -> None:
+            # Re-stored traces replace their previous rows in the counters
+            trace_ids = [row[0] for row in rows]
+            for start in range(0, len(trace_ids), _LOOKUP_CHUNK_SIZE):
+                chunk = trace_ids[start : start + _LOOKUP_CHUNK_SIZE]
+                previous = connection.execute(
+                    f"""
+                    SELECT has_errors, total_duration_ms, http_route, http_method, start_time
+                    FROM traces WHERE trace_id IN ({",".join("?" * len(chunk))})
+                    """,
+                    chunk,
+                ).fetchall()
+                self._count_traces(connection, deltas, (tuple(p) for p in previous), -1)
+            connection.executemany(_INSERT_TRACE_SQL, rows)
+            self._count_traces(
+                connection,
+                deltas,
+                ((row[7], row[5], row[11], row[10], row[3]) for row in rows),
+                1,
             )
-            connection.commit()
+
+        future = self._writer.submit(
+            self._with_sketch_deltas(upsert), weight=len(rows), urgent=wait
+        )
+        if wait:
+            future.result()
+        LOGGER.debug("Queued %d traces", len(rows))
 
     def get_trace(self, trace_id: str) -> Trace | None:
         """Get a trace with all its spans."""
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(
                 "SELECT * FROM traces WHERE trace_id = ?",
                 (trace_id,),
@@ -316,7 +600,7 @@ class SQLiteTraceStore:
         query += " ORDER BY start_time DESC LIMIT ? OFFSET ?"
         params.extend([filter.limit, filter.offset])
 
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             cursor = connection.execute(query, params)
             rows = cursor.fetchall()
 
@@ -340,14 +624,123 @@ class SQLiteTraceStore:
             for row in rows
         ]
 
+    def _merge_sketches(
+        self,
+        connection: sqlite3.Connection,
+        start: datetime | None,
+        end: datetime | None,
+        http_route: str | None,
+        http_method: str | None,
+    ) -> LatencySketch:
+        if http_route is None and http_method is None:
+            clauses, params = ["http_method = ?"], [_ALL_ROUTES]
+        else:
+            clauses, params = ["http_method != ?"], [_ALL_ROUTES]
+            if http_route is not None:
+                clauses.append("http_route = ?")
+                params.append(http_route)
+            if http_method is not None:
+                clauses.append("http_method = ?")
+                params.append(http_method)
+        if start is not None:
+            clauses.append("bucket_start >= ?")
+            params.append(self._sketch_bucket(start))
+        if end is not None:
+            clauses.append("bucket_start <= ?")
+            params.append(self._sketch_bucket(end))
+
+        merged = LatencySketch()
+        cursor = connection.execute(
+            f"SELECT sketch FROM trace_latency_sketches WHERE {' AND '.join(clauses)}",
+            params,
+        )
+        for (sketch,) in cursor:
+            merged.merge(LatencySketch.from_bytes(sketch))
+        return merged
+
+    def get_latency_sketch(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        *,
+        http_route: str | None = None,
+        http_method: str | None = None,
+    ) -> LatencySketch:
+        """Merge the duration sketches of a time window and route.
+
+        The window is widened to whole sketch buckets (5 minutes).
+
+        Args:
+            start: Earliest trace start time, unbounded if omitted.
+            end: Latest trace start time, unbounded if omitted.
+            http_route: Only include this route; traces without a route are
+                recorded under the empty string.
+            http_method: Only include this HTTP method.
+
+        Returns:
+            Sketch whose quantiles approximate the trace durations within 1%.
+        """
+        with self._pool.read_connection() as connection:
+            return self._merge_sketches(connection, start, end, http_route, http_method)
+
+    def get_route_stats(self, hours: int = 1) -> list[RouteStats]:
+        """Get request counts and latency percentiles per route.
+
+        Args:
+            hours: Window to aggregate, widened to whole sketch buckets.
+
+        Returns:
+            Stats per method and route, busiest first.
+        """
+        cutoff = self._sketch_bucket(datetime.now(timezone.utc) - timedelta(hours=hours))
+        routes: dict[tuple[str, str], tuple[list[int], LatencySketch]] = {}
+
+        with self._pool.read_connection() as connection:
+            cursor = connection.execute(
+                """
+                SELECT http_method, http_route, trace_count, error_count, sketch
+                FROM trace_latency_sketches
+                WHERE http_method != ? AND bucket_start >= ?
+                """,
+                (_ALL_ROUTES, cutoff),
+            )
+            for method, route, trace_count, error_count, sketch in cursor:
+                counts, merged = routes.setdefault((method, route), ([0, 0], LatencySketch()))
+                counts[0] += trace_count
+                counts[1] += error_count
+                merged.merge(LatencySketch.from_bytes(sketch))
+
+        results = [
+            RouteStats(
+                route=route or "unknown",
+                method=method or "?",
+                request_count=request_count,
+                error_count=error_count,
+                error_rate=error_count / request_count * 100 if request_count > 0 else 0.0,
+                avg_duration_ms=sketch.sum / sketch.count if sketch.count > 0 else 0.0,
+                p50_duration_ms=sketch.quantile(0.5),
+                p95_duration_ms=sketch.quantile(0.95),
+                p99_duration_ms=sketch.quantile(0.99),
+            )
+            for (method, route), ((request_count, error_count), sketch) in routes.items()
+        ]
+        results.sort(key=lambda stats: stats.request_count, reverse=True)
+        return results
+
     def get_summary(self) -> TracesSummary:
-        """Get summary statistics for traces."""
+        """Get summary statistics for traces.
+
+        Totals come from counters and percentiles from latency sketches,
+        both maintained at write time; only the last hour of traces is
+        counted from the table.
+        """
         now = datetime.now(timezone.utc)
         cutoff_hour = now - timedelta(hours=1)
 
-        with self._lock, self._connect() as connection:
-            cursor = connection.execute("SELECT COUNT(*) FROM traces")
-            total = cursor.fetchone()[0]
+        with self._pool.read_connection() as connection:
+            counters = dict(
+                connection.execute("SELECT name, value FROM trace_counters").fetchall()
+            )
 
             cursor = connection.execute(
                 "SELECT COUNT(*) FROM traces WHERE start_time >= ?",
@@ -355,33 +748,16 @@ class SQLiteTraceStore:
             )
             last_hour = cursor.fetchone()[0]
 
-            cursor = connection.execute(
-                "SELECT COUNT(*) FROM traces WHERE has_errors = 1"
-            )
-            with_errors = cursor.fetchone()[0]
-
-            cursor = connection.execute("SELECT AVG(total_duration_ms) FROM traces")
-            avg_duration = cursor.fetchone()[0] or 0.0
-
-            # Calculate percentiles
-            cursor = connection.execute(
-                "SELECT total_duration_ms FROM traces ORDER BY total_duration_ms"
-            )
-            durations = [row[0] for row in cursor.fetchall() if row[0] is not None]
-
-            p50 = p95 = p99 = 0.0
-            if durations:
-                n = len(durations)
-                p50 = durations[int(n * 0.5)] if n > 0 else 0
-                p95 = durations[int(n * 0.95)] if n > 0 else 0
-                p99 = durations[int(n * 0.99)] if n > 0 else 0
-
-            cursor = connection.execute(
-                "SELECT COUNT(DISTINCT http_route) FROM traces WHERE http_route IS NOT NULL"
-            )
+            cursor = connection.execute("SELECT COUNT(*) FROM trace_routes")
             unique_routes = cursor.fetchone()[0]
 
+            durations = self._merge_sketches(connection, None, None, None, None)
+
+        total = counters.get("traces", 0)
+        with_errors = counters.get("errors", 0)
+        timed = counters.get("timed", 0)
         error_rate = (with_errors / total * 100) if total > 0 else 0.0
+        avg_duration = counters.get("duration_ms", 0) / timed if timed > 0 else 0.0
 
         try:
             storage_size = self._database_path.stat().st_size
@@ -394,9 +770,9 @@ class SQLiteTraceStore:
             traces_with_errors=with_errors,
             error_rate=error_rate,
             avg_duration_ms=avg_duration,
-            p50_duration_ms=p50,
-            p95_duration_ms=p95,
-            p99_duration_ms=p99,
+            p50_duration_ms=durations.quantile(0.5),
+            p95_duration_ms=durations.quantile(0.95),
+            p99_duration_ms=durations.quantile(0.99),
             unique_routes=unique_routes,
             storage_size_bytes=storage_size,
         )
@@ -405,7 +781,7 @@ class SQLiteTraceStore:
         """Build a service dependency map from recent traces."""
         cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
 
-        with self._lock, self._connect() as connection:
+        with self._pool.read_connection() as connection:
             # Get service stats
             cursor = connection.execute(
                 """
@@ -460,41 +836,93 @@ class SQLiteTraceStore:
 
         return ServiceMap(nodes=nodes, edges=edges)
 
-    def purge_old_traces(self, retention_hours: int) -> int:
-        """Remove traces older than retention period."""
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
-
-        with self._lock, self._connect() as connection:
-            # Get trace IDs to delete
-            cursor = connection.execute(
-                "SELECT trace_id FROM traces WHERE start_time < ?",
-                (self._encode_datetime(cutoff),),
-            )
-            trace_ids = [row[0] for row in cursor.fetchall()]
+    def purge_old_traces(
+        self,
+        retention_hours: int,
+        *,
+        chunk_size: int = _PURGE_CHUNK_SIZE,
+        time_budget: float = _PURGE_TIME_BUDGET_SECONDS,
+    ) -> int:
+        """Remove traces older than the retention period.
+
+        Traces and their spans are deleted in chunks of ``chunk_size`` traces,
+        each in its own transaction, followed by any remaining old spans whose
+        trace was never stored. Once ``time_budget`` seconds have passed the
+        purge stops and the remaining backlog is picked up by the next run.
+
+        Returns:
+            Number of traces deleted.
+        """
+        cutoff = self._encode_datetime(
+            datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+        )
+        deadline = time.monotonic() + time_budget
 
-            if not trace_ids:
+        def delete_traces(connection: sqlite3.Connection, deltas: _SketchDeltas) -> int:
+            rows = connection.execute(
+                """
+                SELECT trace_id, has_errors, total_duration_ms, http_route, http_method,
+                    start_time
+                FROM traces WHERE start_time < ? LIMIT ?
+                """,
+                (cutoff, chunk_size),
+            ).fetchall()
+            if not rows:
                 return 0
-
-            # Delete spans
+            trace_ids = [row[0] for row in rows]
+            self._count_traces(connection, deltas, (tuple(row)[1:] for row in rows), -1)
             placeholders = ",".join("?" * len(trace_ids))
             connection.execute(
                 f"DELETE FROM spans WHERE trace_id IN ({placeholders})",
                 trace_ids,
             )
-
-            # Delete traces
             cursor = connection.execute(
                 f"DELETE FROM traces WHERE trace_id IN ({placeholders})",
                 trace_ids,
             )
-            deleted = cursor.rowcount
-            connection.commit()
+            return cursor.rowcount
+
+        def delete_orphan_spans(connection: sqlite3.Connection) -> int:
+            cursor = connection.execute(
+                """
+                DELETE FROM spans WHERE rowid IN (
+                    SELECT rowid FROM spans WHERE start_time < ? LIMIT ?
+                )
+                """,
+                (cutoff, chunk_size),
+            )
+            return cursor.rowcount
+
+        deleted, complete = self._writer.run_chunked(
+            self._with_sketch_deltas(delete_traces),
+            chunk_size=chunk_size,
+            time_budget=time_budget,
+        )
+        if complete:
+            _, complete = self._writer.run_chunked(
+                delete_orphan_spans,
+                chunk_size=chunk_size,
+                time_budget=max(deadline - time.monotonic(), 0.0),
+            )
 
         if deleted > 0:
-            LOGGER.info("Purged %d traces older than %d hours", deleted, retention_hours)
+            LOGGER.info(
+                "Purged %d traces older than %d hours%s",
+                deleted,
+                retention_hours,
+                "" if complete else " (time budget reached, continuing next run)",
+            )
 
         return deleted
 
+    def compact(self) -> int:
+        """Release free pages left by purges and truncate the WAL.
+
+        Returns:
+            Number of free pages released.
+        """
+        return self._pool.compact()
+
 
 _trace_store: SQLiteTraceStore | None = None
 
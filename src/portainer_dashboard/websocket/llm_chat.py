@@ -15,14 +15,18 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from portainer_dashboard.auth.dependencies import SESSION_COOKIE_NAME
 from portainer_dashboard.config import get_settings
 from portainer_dashboard.core.session import SessionStorage
+from portainer_dashboard.core.store_executor import run_read, run_write
 from portainer_dashboard.dependencies import get_session_storage
 from portainer_dashboard.models.auth import SessionData
+from portainer_dashboard.models.monitoring import LogTemplate
 from portainer_dashboard.services.llm_client import (
     AsyncLLMClient,
     LLMClientError,
     create_llm_client,
 )
+from portainer_dashboard.services.log_cursors import LogCursorStore
 from portainer_dashboard.services.log_sanitizer import sanitize_logs
+from portainer_dashboard.services.log_templates import LogTemplateStore, format_log_templates
 from portainer_dashboard.services.portainer_client import (
     PortainerAPIError,
     create_portainer_client,
@@ -48,7 +52,7 @@ async def _authenticate_websocket(websocket: WebSocket) -> SessionData | None:
         return None
 
     storage: SessionStorage = get_session_storage()
-    record = storage.retrieve(token)
+    record = await run_read(storage.retrieve, token)
     if record is None:
         return None
 
@@ -65,11 +69,12 @@ async def _authenticate_websocket(websocket: WebSocket) -> SessionData | None:
     )
 
     if session_data.is_expired(now):
-        storage.delete(token)
+        await run_write(storage.delete, token)
         return None
 
     # Update last active time
-    storage.touch(
+    await run_write(
+        storage.touch,
         token,
         last_active=now,
         session_timeout=session_data.session_timeout,
@@ -101,6 +106,14 @@ class _ContextCache:
 
 _context_cache = _ContextCache()
 
+# Log cursors and templates of containers whose logs were added to the chat context
+_log_cursors = LogCursorStore()
+_log_templates = LogTemplateStore()
+
+# Log templates and raw lines shown per container in the chat context
+_CONTEXT_LOG_TEMPLATES = 15
+_CONTEXT_RECENT_LOG_LINES = 3
+
 
 async def _get_context_cache_lock() -> asyncio.Lock:
     """Get or create the cache lock (must be created in async context)."""
@@ -177,22 +190,25 @@ async def _fetch_container_stats(
 
 async def _fetch_container_logs(
     client, endpoint_id: int, container_id: str, tail: int = 50
-) -> str | None:
-    """Fetch recent logs for a container, with timeout."""
+) -> tuple[str, list[LogTemplate]] | None:
+    """Fetch recent logs and log templates for a container, with timeout.
+
+    Uses the chat's log cursors, so rebuilding the context only transfers
+    lines written since the container's logs were last fetched, and only
+    those lines are added to the container's templates.
+    """
     try:
-        logs = await asyncio.wait_for(
-            client.get_container_logs(
-                endpoint_id,
-                container_id,
-                tail=tail,
-                timestamps=True,
-            ),
+        log_tail = await asyncio.wait_for(
+            _log_cursors.fetch(client, endpoint_id, container_id, tail=tail),
             timeout=10.0,
         )
-        return logs if logs and logs.strip() else None
     except (PortainerAPIError, asyncio.TimeoutError) as exc:
         LOGGER.debug("Failed to get logs for container %s: %s", container_id, exc)
         return None
+    if not log_tail.lines:
+        return None
+    new_lines = log_tail.lines[max(len(log_tail.lines) - log_tail.new_lines, 0) :]
+    return log_tail.text, _log_templates.add(endpoint_id, container_id, new_lines)
 
 
 async def _build_context_uncached() -> str:
@@ -326,16 +342,16 @@ async def _build_context_uncached() -> str:
                         stopped_container_ids.append((ep_id, cid, name))
 
                 # Fetch logs for stopped/unhealthy/restarting containers (limit to 5 to avoid timeout)
-                container_logs: dict[str, str] = {}
+                container_logs: dict[str, tuple[str, list[LogTemplate]]] = {}
                 if stopped_container_ids:
                     logs_tasks = [
                         _fetch_container_logs(client, ep_id, cid, tail=50)
                         for ep_id, cid, _ in stopped_container_ids[:5]
                     ]
                     logs_results = await asyncio.gather(*logs_tasks)
-                    for (_, cid, _), logs in zip(stopped_container_ids[:5], logs_results):
-                        if logs:
-                            container_logs[cid] = logs
+                    for (_, cid, _), log_result in zip(stopped_container_ids[:5], logs_results):
+                        if log_result:
+                            container_logs[cid] = log_result
 
                 # Add container details
                 if not df_containers.empty:
@@ -373,11 +389,18 @@ async def _build_context_uncached() -> str:
 
                         # Add logs for stopped/unhealthy containers
                         if cid and cid in container_logs:
-                            logs = container_logs[cid]
+                            raw_logs, templates = container_logs[cid]
+                            # Repeated messages are listed once per template
+                            context_parts.append("  - **Log Templates:**")
+                            context_parts.extend(
+                                f"    {line}"
+                                for line in format_log_templates(
+                                    templates, limit=_CONTEXT_LOG_TEMPLATES
+                                )
+                            )
                             # Sanitize logs to remove potential secrets
-                            logs = sanitize_logs(logs)
-                            # Truncate logs to last 20 lines for context
-                            log_lines = logs.strip().split("\n")[-20:]
+                            sanitized = sanitize_logs(raw_logs)
+                            log_lines = sanitized.strip().split("\n")[-_CONTEXT_RECENT_LOG_LINES:]
                             truncated_logs = "\n".join(log_lines)
                             context_parts.append(f"  - **Recent Logs:**")
                             context_parts.append(f"```\n{truncated_logs}\n```")
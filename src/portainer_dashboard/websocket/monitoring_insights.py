@@ -13,6 +13,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from portainer_dashboard.auth.dependencies import SESSION_COOKIE_NAME
 from portainer_dashboard.config import get_settings
 from portainer_dashboard.core.session import SessionStorage
+from portainer_dashboard.core.store_executor import run_read, run_write
 from portainer_dashboard.dependencies import get_session_storage
 from portainer_dashboard.models.auth import SessionData
 from portainer_dashboard.models.monitoring import MonitoringInsight, MonitoringReport
@@ -35,7 +36,7 @@ async def _authenticate_websocket(websocket: WebSocket) -> SessionData | None:
         return None
 
     storage: SessionStorage = get_session_storage()
-    record = storage.retrieve(token)
+    record = await run_read(storage.retrieve, token)
     if record is None:
         return None
 
@@ -52,11 +53,12 @@ async def _authenticate_websocket(websocket: WebSocket) -> SessionData | None:
     )
 
     if session_data.is_expired(now):
-        storage.delete(token)
+        await run_write(storage.delete, token)
         return None
 
     # Update last active time
-    storage.touch(
+    await run_write(
+        storage.touch,
         token,
         last_active=now,
         session_timeout=session_data.session_timeout,
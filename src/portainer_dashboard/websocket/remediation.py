@@ -13,6 +13,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from portainer_dashboard.auth.dependencies import SESSION_COOKIE_NAME
 from portainer_dashboard.config import get_settings
 from portainer_dashboard.core.session import SessionStorage
+from portainer_dashboard.core.store_executor import run_read, run_write
 from portainer_dashboard.dependencies import get_session_storage
 from portainer_dashboard.models.auth import SessionData
 from portainer_dashboard.models.remediation import RemediationAction
@@ -35,7 +36,7 @@ async def _authenticate_websocket(websocket: WebSocket) -> SessionData | None:
         return None
 
     storage: SessionStorage = get_session_storage()
-    record = storage.retrieve(token)
+    record = await run_read(storage.retrieve, token)
     if record is None:
         return None
 
@@ -52,11 +53,12 @@ async def _authenticate_websocket(websocket: WebSocket) -> SessionData | None:
     )
 
     if session_data.is_expired(now):
-        storage.delete(token)
+        await run_write(storage.delete, token)
         return None
 
     # Update last active time
-    storage.touch(
+    await run_write(
+        storage.touch,
         token,
         last_active=now,
         session_timeout=session_data.session_timeout,
@@ -150,7 +152,7 @@ async def _handle_client_message(
         limit = min(limit, 100)
 
         store = await get_actions_store()
-        actions = store.get_pending_actions(limit=limit)
+        actions = await run_read(store.get_pending_actions, limit=limit)
 
         await websocket.send_json({
             "type": "pending_actions",
@@ -165,7 +167,7 @@ async def _handle_client_message(
         limit = min(limit, 100)
 
         store = await get_actions_store()
-        actions = store.get_approved_actions(limit=limit)
+        actions = await run_read(store.get_approved_actions, limit=limit)
 
         await websocket.send_json({
             "type": "approved_actions",
@@ -175,7 +177,7 @@ async def _handle_client_message(
 
     elif msg_type == "get_summary":
         store = await get_actions_store()
-        summary = store.get_history_summary()
+        summary = await run_read(store.get_history_summary)
 
         await websocket.send_json({
             "type": "summary",
@@ -221,7 +223,7 @@ async def remediation_websocket(websocket: WebSocket) -> None:
     try:
         # Send current pending actions on connect
         store = await get_actions_store()
-        pending = store.get_pending_actions(limit=50)
+        pending = await run_read(store.get_pending_actions, limit=50)
         if pending:
             await websocket.send_json({
                 "type": "pending_actions",
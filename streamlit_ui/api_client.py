@@ -10,6 +10,7 @@ from __future__ import annotations
 
 import logging
 import os
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import httpx
@@ -490,6 +491,37 @@ class APIClient:
         result = self.get(f"/api/v1/metrics/containers/{container_id}", params=params)
         return result if isinstance(result, list) else []
 
+    def query_metrics(
+        self,
+        series: list[tuple[str, str]],
+        hours: int = 24,
+        max_points: int = 500,
+        method: str = "lttb",
+    ) -> list[dict]:
+        """Get downsampled metric series as columnar arrays.
+
+        Args:
+            series: (container_id, metric_type) pairs to fetch.
+            hours: Length of the time range ending now.
+            max_points: Maximum number of samples per series.
+            method: Downsampling algorithm ("lttb" or "minmax").
+        """
+        end = datetime.now(timezone.utc)
+        payload = {
+            "series": [
+                {"container_id": container_id, "metric_type": metric_type}
+                for container_id, metric_type in series
+            ],
+            "start": (end - timedelta(hours=hours)).isoformat(),
+            "end": end.isoformat(),
+            "max_points": max_points,
+            "method": method,
+        }
+        result = self.post("/api/v1/metrics/query", json=payload)
+        if isinstance(result, dict):
+            return result.get("series", [])
+        return []
+
     def get_container_metrics_summary(
         self,
         container_id: str,
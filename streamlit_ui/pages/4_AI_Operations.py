@@ -682,60 +682,48 @@ def render_metrics_tab(client) -> None:
     if selected_label and selected_label in container_options:
         container_id = container_options[selected_label]
 
-        metrics = client.get_container_metrics(
-            container_id,
-            metric_type=metric_type,
+        series = client.query_metrics(
+            [(container_id, metric_type)],
             hours=hours,
-            limit=2000,
+            max_points=1000,
         )
+        points = series[0] if series else {}
 
-        if not metrics:
+        if not points.get("timestamps"):
             st.info(f"No {metric_type.replace('_', ' ')} data available for this container.")
         else:
-            df_data = []
-            for m in metrics:
-                timestamp = m.get("timestamp", "")
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                except ValueError:
-                    continue
-
-                df_data.append({
-                    "timestamp": dt,
-                    "value": m.get("value", 0),
-                })
+            df = pd.DataFrame({
+                "timestamp": pd.to_datetime(points["timestamps"], unit="ms", utc=True),
+                "value": points["values"],
+            })
+
+            fig = px.line(
+                df,
+                x="timestamp",
+                y="value",
+                title=f"{metric_type.replace('_', ' ').title()} - {selected_label}",
+            )
 
-            if df_data:
-                df = pd.DataFrame(df_data)
-                df = df.sort_values("timestamp")
-
-                fig = px.line(
-                    df,
-                    x="timestamp",
-                    y="value",
-                    title=f"{metric_type.replace('_', ' ').title()} - {selected_label}",
-                )
-
-                if metric_type == "memory_usage":
-                    fig.update_yaxes(title="Memory (bytes)")
-                elif "percent" in metric_type:
-                    fig.update_yaxes(title="Percentage (%)", range=[0, 100])
-
-                fig.update_layout(xaxis_title="Time", hovermode="x unified", height=400)
-                st.plotly_chart(fig, use_container_width=True)
-
-                summary = client.get_container_metrics_summary(container_id, metric_type, hours)
-                if summary:
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("Current", f"{summary.get('latest_value', 0):.2f}")
-                    with col2:
-                        st.metric("Average", f"{summary.get('avg_value', 0):.2f}")
-                    with col3:
-                        st.metric("Min", f"{summary.get('min_value', 0):.2f}")
-                    with col4:
-                        st.metric("Max", f"{summary.get('max_value', 0):.2f}")
-                    st.caption(f"Std Dev: {summary.get('std_dev', 0):.2f} | Samples: {summary.get('count', 0)}")
+            if metric_type == "memory_usage":
+                fig.update_yaxes(title="Memory (bytes)")
+            elif "percent" in metric_type:
+                fig.update_yaxes(title="Percentage (%)", range=[0, 100])
+
+            fig.update_layout(xaxis_title="Time", hovermode="x unified", height=400)
+            st.plotly_chart(fig, use_container_width=True)
+
+            summary = client.get_container_metrics_summary(container_id, metric_type, hours)
+            if summary:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Current", f"{summary.get('latest_value', 0):.2f}")
+                with col2:
+                    st.metric("Average", f"{summary.get('avg_value', 0):.2f}")
+                with col3:
+                    st.metric("Min", f"{summary.get('min_value', 0):.2f}")
+                with col4:
+                    st.metric("Max", f"{summary.get('max_value', 0):.2f}")
+                st.caption(f"Std Dev: {summary.get('std_dev', 0):.2f} | Samples: {summary.get('count', 0)}")
 
 
 def render_anomalies_tab(client) -> None:
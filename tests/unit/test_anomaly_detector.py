@@ -0,0 +1,316 @@
+"""Tests for rolling windows and the anomaly detector."""
+
+from __future__ import annotations
+
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from portainer_dashboard.models.metrics import ContainerMetric, MetricType
+from portainer_dashboard.services.anomaly_detector import (
+    AnomalyDetector,
+    EWMADetector,
+    RateOfChangeDetector,
+    SeasonalDetector,
+    ZScoreDetector,
+)
+from portainer_dashboard.services.metrics_store import SQLiteMetricsStore
+from portainer_dashboard.services.rolling_window import RollingWindow, RollingWindowRegistry
+
+
+def _metric(
+    value: float,
+    *,
+    container_id: str = "c1",
+    metric_type: MetricType = MetricType.CPU_PERCENT,
+    timestamp: datetime | None = None,
+) -> ContainerMetric:
+    return ContainerMetric(
+        timestamp=timestamp or datetime.now(timezone.utc),
+        endpoint_id=1,
+        endpoint_name="prod",
+        container_id=container_id,
+        container_name=f"{container_id}-name",
+        metric_type=metric_type,
+        value=value,
+    )
+
+
+class TestRollingWindow:
+    """Tests for the ring buffer with running statistics."""
+
+    def test_statistics_match_reference_while_sliding(self) -> None:
+        """Test that running mean/stddev track the last N samples exactly."""
+        rng = random.Random(42)
+        window = RollingWindow(capacity=30)
+        history: list[float] = []
+
+        for _ in range(2_500):
+            value = rng.gauss(50.0, 10.0)
+            window.push(value)
+            history.append(value)
+
+            expected = history[-30:]
+            assert window.count == len(expected)
+            assert window.mean == pytest.approx(statistics.fmean(expected))
+            assert window.std_dev == pytest.approx(statistics.pstdev(expected), abs=1e-9)
+
+        assert window.values() == history[-30:]
+
+    def test_single_sample_has_no_variance(self) -> None:
+        """Test that one sample yields zero variance."""
+        window = RollingWindow(capacity=5)
+        window.push(3.0)
+        assert window.mean == 3.0
+        assert window.std_dev == 0.0
+
+    def test_invalid_capacity(self) -> None:
+        """Test that a zero capacity is rejected."""
+        with pytest.raises(ValueError):
+            RollingWindow(capacity=0)
+
+    def test_registry_evicts_least_recently_updated(self) -> None:
+        """Test that the registry stays bounded."""
+        registry = RollingWindowRegistry(capacity=3, max_series=2)
+        registry.push("a", 1.0)
+        registry.push("b", 1.0)
+        registry.push("a", 2.0)
+        registry.push("c", 1.0)
+
+        assert "a" in registry
+        assert "b" not in registry
+        assert "c" in registry
+
+    def test_registry_hydrate_keeps_latest_values(self) -> None:
+        """Test that hydration truncates to the window capacity."""
+        registry = RollingWindowRegistry(capacity=3)
+        registry.hydrate({"a": [1.0, 2.0, 3.0, 4.0, 5.0]})
+
+        window = registry.get("a")
+        assert window is not None
+        assert window.values() == [3.0, 4.0, 5.0]
+
+
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)  # a Monday
+_KEY = ("c1", MetricType.CPU_PERCENT)
+
+
+class TestStreamingDetectors:
+    """Tests for the pluggable online detectors."""
+
+    def test_ewma_tracks_level_shift(self) -> None:
+        """Test that EWMA flags a spike and then adapts to a new level."""
+        detector = EWMADetector(alpha=0.2, min_samples=5)
+        for i in range(50):
+            assert (detector.update(_KEY, 10.0 + (i % 2), _START) is None) == (i < 5)
+
+        spike = detector.update(_KEY, 40.0, _START)
+        assert spike is not None
+        assert spike.zscore > 3.0
+        assert spike.expected == pytest.approx(10.5, abs=0.2)
+
+        for _ in range(100):
+            detector.update(_KEY, 40.0 + random.random(), _START)
+        settled = detector.update(_KEY, 40.5, _START)
+        assert settled is not None
+        assert abs(settled.zscore) < 3.0
+
+    def test_seasonal_compares_same_hour_of_week(self) -> None:
+        """Test that a busy hour is judged against previous weeks' same hour."""
+        detector = SeasonalDetector(alpha=0.3, min_samples=3, history_size=100)
+        rng = random.Random(1)
+
+        for week in range(4):
+            for hour in range(24):
+                timestamp = _START + timedelta(weeks=week, hours=hour)
+                busy = 9 <= hour < 17
+                detector.update(_KEY, (80.0 if busy else 5.0) + rng.random(), timestamp)
+
+        busy_hour = detector.update(_KEY, 80.5, _START + timedelta(weeks=4, hours=10))
+        assert busy_hour is not None
+        assert abs(busy_hour.zscore) < 3.0
+
+        quiet_hour = detector.update(_KEY, 80.5, _START + timedelta(weeks=4, hours=2))
+        assert quiet_hour is not None
+        assert quiet_hour.zscore > 3.0
+
+        # Tuesday buckets have not been seen yet
+        assert detector.update(_KEY, 80.5, _START + timedelta(weeks=4, days=1)) is None
+
+    def test_rate_detector_scores_throughput(self) -> None:
+        """Test that counters are converted to per-second rates."""
+        key = ("c1", MetricType.NETWORK_RX_BYTES)
+        detector = RateOfChangeDetector(alpha=0.2, min_samples=5)
+        counter = 0.0
+        for i in range(30):
+            counter += 1_000.0 + (i % 2) * 100
+            detector.update(key, counter, _START + timedelta(seconds=10 * i))
+
+        burst = detector.update(key, counter + 100_000.0, _START + timedelta(seconds=300))
+        assert burst is not None
+        assert burst.observed == pytest.approx(10_000.0)
+        assert burst.expected == pytest.approx(105.0, abs=10.0)
+        assert burst.zscore > 3.0
+
+    def test_rate_detector_handles_counter_reset(self) -> None:
+        """Test that a counter going backwards re-baselines instead of scoring."""
+        key = ("c1", MetricType.BLOCK_READ_BYTES)
+        detector = RateOfChangeDetector(alpha=0.2, min_samples=2)
+        for i in range(10):
+            detector.update(key, 1_000.0 * i, _START + timedelta(seconds=i))
+
+        assert detector.update(key, 50.0, _START + timedelta(seconds=10)) is None
+        after = detector.update(key, 1_050.0, _START + timedelta(seconds=11))
+        assert after is not None
+        assert after.observed == pytest.approx(1_000.0)
+        assert abs(after.zscore) < 1.0
+
+    def test_state_is_bounded(self) -> None:
+        """Test that per-series state is evicted beyond max_series."""
+        detector = EWMADetector(alpha=0.1, min_samples=1, max_series=2)
+        for container in ("a", "b", "c"):
+            detector.update((container, MetricType.CPU_PERCENT), 1.0, _START)
+        assert detector.tracked_series == 2
+
+    def test_detector_selected_per_metric_type(
+        self, test_settings: None, tmp_path: Path
+    ) -> None:
+        """Test that metric types dispatch to their configured detector."""
+        store = SQLiteMetricsStore(tmp_path / "metrics.db")
+        detector = AnomalyDetector(
+            store,
+            detectors={
+                MetricType.CPU_PERCENT: ZScoreDetector(window=10, min_samples=3),
+                MetricType.NETWORK_RX_BYTES: RateOfChangeDetector(alpha=0.2, min_samples=3),
+            },
+        )
+        assert detector.analyzed_metric_types == (
+            MetricType.CPU_PERCENT,
+            MetricType.NETWORK_RX_BYTES,
+        )
+
+        for i in range(10):
+            timestamp = _START + timedelta(minutes=i)
+            results = detector.analyze_metrics_batch(
+                [
+                    _metric(float(i % 2), timestamp=timestamp),
+                    _metric(
+                        6_000.0 * i,
+                        metric_type=MetricType.NETWORK_RX_BYTES,
+                        timestamp=timestamp,
+                    ),
+                    _metric(1.0, metric_type=MetricType.MEMORY_PERCENT, timestamp=timestamp),
+                ]
+            )
+            assert all(r.metric_type != MetricType.MEMORY_PERCENT for r in results)
+
+        network = detector.detect_anomaly(
+            _metric(
+                6_000.0 * 10,
+                metric_type=MetricType.NETWORK_RX_BYTES,
+                timestamp=_START + timedelta(minutes=10),
+            )
+        )
+        assert network is not None
+        assert network.current_value == pytest.approx(100.0)
+        assert network.is_anomaly is False
+
+
+class TestAnomalyDetector:
+    """Tests for AnomalyDetector backed by rolling windows."""
+
+    @pytest.fixture
+    def store(self, test_settings: None, tmp_path: Path) -> SQLiteMetricsStore:
+        """Create a metrics store backed by a temporary database."""
+        return SQLiteMetricsStore(tmp_path / "metrics.db")
+
+    def test_requires_minimum_samples(self, store: SQLiteMetricsStore) -> None:
+        """Test that detection waits for enough history."""
+        detector = AnomalyDetector(store)
+
+        results = [detector.detect_anomaly(_metric(10.0)) for _ in range(detector.min_samples)]
+
+        assert results == [None] * detector.min_samples
+        assert detector.detect_anomaly(_metric(10.0)) is not None
+
+    def test_detects_spike(self, store: SQLiteMetricsStore) -> None:
+        """Test that a spike far outside the window is flagged and stored."""
+        detector = AnomalyDetector(store)
+        for i in range(30):
+            detector.detect_anomaly(_metric(10.0 + (i % 3)))
+
+        result = detector.detect_anomaly(_metric(95.0))
+
+        assert result is not None
+        assert result.is_anomaly is True
+        assert result.direction == "high"
+        assert result.expected_value == pytest.approx(11.0, abs=0.1)
+        assert len(store.get_anomalies()) == 1
+
+    def test_hydrate_from_store(self, store: SQLiteMetricsStore) -> None:
+        """Test that history stored in SQLite seeds the rolling windows."""
+        now = datetime.now(timezone.utc)
+        store.store_metrics_batch(
+            [
+                _metric(10.0 + (i % 3), timestamp=now - timedelta(minutes=60 - i))
+                for i in range(40)
+            ]
+            + [
+                _metric(
+                    500.0,
+                    metric_type=MetricType.NETWORK_TX_BYTES,
+                    timestamp=now - timedelta(minutes=5),
+                )
+            ]
+        )
+
+        detector = AnomalyDetector(store)
+        assert detector.hydrate() == 1
+        assert detector.tracked_series == 1
+
+        result = detector.detect_anomaly(_metric(95.0))
+        assert result is not None
+        assert result.is_anomaly is True
+
+    def test_batch_matches_single_scoring(self, store: SQLiteMetricsStore) -> None:
+        """Test that vectorised batch scoring agrees with per-metric scoring."""
+        single = AnomalyDetector(store)
+        batch = AnomalyDetector(store)
+        rng = random.Random(7)
+        containers = [f"c{i}" for i in range(20)]
+
+        for _ in range(15):
+            metrics = [_metric(rng.gauss(40.0, 5.0), container_id=c) for c in containers]
+            expected = [single.detect_anomaly(m) for m in metrics]
+            actual = batch.analyze_metrics_batch(metrics)
+
+            expected_scored = [r for r in expected if r is not None]
+            assert len(actual) == len(expected_scored)
+            for got, want in zip(actual, expected_scored):
+                assert got.container_id == want.container_id
+                assert got.zscore == pytest.approx(want.zscore)
+                assert got.is_anomaly == want.is_anomaly
+
+    def test_batch_persists_only_anomalies(self, store: SQLiteMetricsStore) -> None:
+        """Test that batch scoring writes anomalies in one batch."""
+        detector = AnomalyDetector(store)
+        for i in range(20):
+            detector.analyze_metrics_batch(
+                [
+                    _metric(10.0 + (i % 2), container_id="a"),
+                    _metric(20.0 + (i % 2), container_id="b"),
+                    _metric(1.0, container_id="a", metric_type=MetricType.NETWORK_TX_BYTES),
+                ]
+            )
+
+        results = detector.analyze_metrics_batch(
+            [_metric(90.0, container_id="a"), _metric(20.5, container_id="b")],
+            only_anomalies=True,
+        )
+
+        assert [r.container_id for r in results] == ["a"]
+        stored = store.get_anomalies()
+        assert [a.container_id for a in stored] == ["a"]
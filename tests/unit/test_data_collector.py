@@ -2,12 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from portainer_dashboard.models.monitoring import ContainerCapabilities
-from portainer_dashboard.services.data_collector import DataCollector
+from portainer_dashboard.models.monitoring import ContainerCapabilities, ImageStatus
+from portainer_dashboard.services.data_collector import (
+    DataCollector,
+    ImageStatusCache,
+    StackImageRef,
+)
+from portainer_dashboard.services.metrics_collector import MetricsCollector
+from portainer_dashboard.services.portainer_client import (
+    PortainerAPIError,
+    group_stacks_by_endpoint,
+)
 from portainer_dashboard.services.security_scanner import SecurityScanner
 
 
@@ -138,8 +153,6 @@ class TestDataCollector:
         self, collector: DataCollector
     ) -> None:
         """Test handling errors when fetching container data."""
-        from portainer_dashboard.services.portainer_client import PortainerAPIError
-
         mock_client = MagicMock()
         mock_client.list_containers_for_endpoint = AsyncMock(
             side_effect=PortainerAPIError("Connection refused")
@@ -223,8 +236,6 @@ class TestDataCollectorImageStatus:
         self, mock_scanner: MagicMock
     ) -> None:
         """Test handling errors when fetching image status."""
-        from portainer_dashboard.services.portainer_client import PortainerAPIError
-
         collector = DataCollector(
             security_scanner=mock_scanner,
             include_security_scan=False,
@@ -273,3 +284,386 @@ class TestDataCollectorImageStatus:
         )
 
         assert mock_client.get_stack_image_status.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_collect_image_status_bounds_concurrency(
+        self, mock_scanner: MagicMock
+    ) -> None:
+        """Test that image checks overlap but never exceed the concurrency bound."""
+        collector = DataCollector(
+            security_scanner=mock_scanner,
+            include_security_scan=False,
+            image_check_concurrency=3,
+        )
+        in_flight = 0
+        peak = 0
+
+        async def image_status(stack_id: int) -> dict:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"Status": [{"Image": f"app{stack_id}:latest", "Outdated": True}]}
+
+        mock_client = MagicMock()
+        mock_client.get_stack_image_status = AsyncMock(side_effect=image_status)
+
+        result = await collector.collect_image_status(
+            mock_client,
+            endpoints=[{"Id": 1, "Name": "prod"}],
+            stacks_by_endpoint={1: [{"Id": i, "Name": f"stack{i}"} for i in range(1, 11)]},
+        )
+
+        assert peak == 3
+        assert [image.stack_id for image in result] == list(range(1, 11))
+
+
+class _FakeEnvironmentClient:
+    """Portainer client double recording requests, with a fixed latency.
+
+    Each endpoint runs one container of every stack assigned to it.
+    """
+
+    def __init__(self, endpoints: list[dict], stacks: list[dict]) -> None:
+        self.endpoints = endpoints
+        self.stacks = stacks
+        self.image_ids = {stack["Id"]: f"sha256:{stack['Id']}" for stack in stacks}
+        self.stack_listings = 0
+        self.container_listings = 0
+        self.image_checks = 0
+
+    async def __aenter__(self) -> _FakeEnvironmentClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    async def list_all_endpoints(self) -> list[dict]:
+        await asyncio.sleep(0.05)
+        return self.endpoints
+
+    async def list_all_stacks(self) -> list[dict]:
+        self.stack_listings += 1
+        await asyncio.sleep(0.05)
+        return self.stacks
+
+    async def list_containers_for_endpoint(
+        self, endpoint_id: int, *, include_stopped: bool = False
+    ) -> list[dict]:
+        self.container_listings += 1
+        await asyncio.sleep(0.05)
+        return [
+            {
+                "Id": f"c{stack['Id']}",
+                "Names": [f"/{stack['Name']}-app"],
+                "State": "running",
+                "ImageID": self.image_ids[stack["Id"]],
+                "Labels": {"com.docker.compose.project": stack["Name"]},
+            }
+            for stack in self.stacks
+            if stack["EndpointId"] == endpoint_id
+        ]
+
+    async def get_stack_image_status(self, stack_id: int) -> dict:
+        self.image_checks += 1
+        await asyncio.sleep(0.05)
+        return {"Status": [{"Image": f"img{stack_id}", "Outdated": True}]}
+
+
+class TestCollectSnapshot:
+    """Tests for the end-to-end snapshot pipeline."""
+
+    @pytest.fixture
+    def clients(self) -> dict[str, _FakeEnvironmentClient]:
+        """Create two environments with three stacks between them."""
+        return {
+            "east": _FakeEnvironmentClient(
+                [{"Id": 1, "Name": "e1", "Status": 1}, {"Id": 2, "Name": "e2", "Status": 1}],
+                [
+                    {"Id": 10, "Name": "web", "EndpointId": 1},
+                    {"Id": 11, "Name": "db", "EndpointId": 2},
+                ],
+            ),
+            "west": _FakeEnvironmentClient(
+                [{"Id": 1, "Name": "w1", "Status": 1}],
+                [{"Id": 20, "Name": "cache", "EndpointId": 1}],
+            ),
+        }
+
+    @pytest.fixture
+    def collector(self, clients: dict[str, _FakeEnvironmentClient]) -> Iterator[DataCollector]:
+        """Create a collector wired to the fake environments."""
+        settings = MagicMock()
+        settings.portainer.get_configured_environments.return_value = [
+            SimpleNamespace(name=name) for name in clients
+        ]
+        scanner = MagicMock(spec=SecurityScanner)
+        scanner.scan_endpoint_containers = AsyncMock(return_value=[])
+        with (
+            patch(
+                "portainer_dashboard.services.data_collector.get_settings",
+                return_value=settings,
+            ),
+            patch(
+                "portainer_dashboard.services.data_collector.create_portainer_client",
+                side_effect=lambda env: clients[env.name],
+            ),
+        ):
+            yield DataCollector(security_scanner=scanner, include_log_analysis=False)
+
+    @pytest.mark.asyncio
+    async def test_environments_collected_concurrently(
+        self, collector: DataCollector, clients: dict[str, _FakeEnvironmentClient]
+    ) -> None:
+        """Test that stacks are listed once per environment and checked stacks not rechecked."""
+        await collector.collect_snapshot()
+        started = time.perf_counter()
+        snapshot = await collector.collect_snapshot()
+        elapsed = time.perf_counter() - started
+
+        # endpoints, then containers alongside stacks: two round trips
+        assert elapsed < 0.25
+        assert all(client.stack_listings == 2 for client in clients.values())
+        assert all(client.image_checks == len(client.stacks) for client in clients.values())
+        assert snapshot.endpoints_online == 3
+        assert snapshot.containers_running == 3
+        assert len(snapshot.outdated_images) == 3
+
+    @pytest.mark.asyncio
+    async def test_snapshots_read_refreshed_image_status(
+        self, collector: DataCollector, clients: dict[str, _FakeEnvironmentClient]
+    ) -> None:
+        """Test that the refresh job fills the cache that later snapshots read."""
+        with patch("portainer_dashboard.services.data_collector._MAX_SNAPSHOT_IMAGE_CHECKS", 0):
+            first = await collector.collect_snapshot()
+
+        assert first.outdated_images == []
+        assert await collector.refresh_image_status() == 3
+        assert await collector.refresh_image_status() == 0
+        snapshot = await collector.collect_snapshot()
+
+        assert {(i.stack_id, i.endpoint_name) for i in snapshot.outdated_images} == {
+            (10, "e1"),
+            (11, "e2"),
+            (20, "w1"),
+        }
+        assert sum(client.image_checks for client in clients.values()) == 3
+
+    @pytest.mark.asyncio
+    async def test_first_snapshot_checks_a_bounded_number_of_stacks(
+        self, collector: DataCollector, clients: dict[str, _FakeEnvironmentClient]
+    ) -> None:
+        """Test that never-checked stacks are checked by the snapshot, up to the limit."""
+        with patch("portainer_dashboard.services.data_collector._MAX_SNAPSHOT_IMAGE_CHECKS", 1):
+            snapshot = await collector.collect_snapshot()
+
+        # one stack per environment; the rest is left to the refresh job
+        assert len(snapshot.outdated_images) == 2
+        assert [client.image_checks for client in clients.values()] == [1, 1]
+        assert await collector.refresh_image_status() == 1
+
+    @pytest.mark.asyncio
+    async def test_same_stack_name_on_two_endpoints(self, collector: DataCollector) -> None:
+        """Test that image IDs are attributed per endpoint, not per stack name."""
+        client = _FakeEnvironmentClient(
+            [{"Id": 1, "Name": "e1", "Status": 1}, {"Id": 2, "Name": "e2", "Status": 1}],
+            [
+                {"Id": 10, "Name": "web", "EndpointId": 1},
+                {"Id": 11, "Name": "web", "EndpointId": 2},
+            ],
+        )
+        with patch(
+            "portainer_dashboard.services.data_collector.create_portainer_client",
+            return_value=client,
+        ):
+            await collector.collect_snapshot()
+            client.image_ids[10] = "sha256:pulled"
+            await collector.collect_snapshot()
+
+        assert {ref.stack_id for ref in collector.image_status_cache.due()} == {10}
+
+    @pytest.mark.asyncio
+    async def test_snapshot_saves_image_status_off_the_loop(
+        self, collector: DataCollector, tmp_path: Path
+    ) -> None:
+        """Test that checked stacks are written to the cache file on a worker thread."""
+        path = tmp_path / "image_status_cache.json"
+        collector.image_status_cache = ImageStatusCache(path)
+        write = collector.image_status_cache._write
+        writer_threads: list[int] = []
+
+        def record_write(*args: object) -> bool:
+            writer_threads.append(threading.get_ident())
+            return write(*args)
+
+        with patch.object(collector.image_status_cache, "_write", side_effect=record_write):
+            await collector.collect_snapshot()
+
+        assert len(writer_threads) == 1
+        assert writer_threads[0] != threading.get_ident()
+        assert len(ImageStatusCache(path)) == 3
+
+    @pytest.mark.asyncio
+    async def test_digest_change_triggers_recheck(
+        self, collector: DataCollector, clients: dict[str, _FakeEnvironmentClient]
+    ) -> None:
+        """Test that only a stack running a new image is checked again."""
+        await collector.collect_snapshot()
+        await collector.refresh_image_status()
+
+        clients["east"].image_ids[10] = "sha256:pulled"
+        snapshot = await collector.collect_snapshot()
+
+        assert {i.stack_id for i in snapshot.outdated_images} == {11, 20}
+        assert await collector.refresh_image_status() == 1
+        assert clients["east"].image_checks == 3
+
+
+    @pytest.mark.asyncio
+    async def test_metrics_collected_in_the_same_walk(
+        self, collector: DataCollector, clients: dict[str, _FakeEnvironmentClient]
+    ) -> None:
+        """Test that metrics reuse the snapshot's container listings and overlap with it."""
+        metrics_collector = MagicMock(spec=MetricsCollector)
+
+        async def collect_metrics(
+            client, endpoint_id, endpoint_name, containers
+        ) -> tuple[list[str], bool]:
+            await asyncio.sleep(0.1)
+            return [f"{endpoint_name}/{c['Id']}" for c in containers], True
+
+        metrics_collector.collect_metrics_for_containers = AsyncMock(side_effect=collect_metrics)
+
+        started = time.perf_counter()
+        snapshot, metrics, complete = await collector.collect_snapshot_and_metrics(
+            metrics_collector
+        )
+        elapsed = time.perf_counter() - started
+
+        # endpoints, then containers, then stats alongside the security scan
+        assert elapsed < 0.3
+        assert complete
+        assert sorted(metrics) == ["e1/c10", "e2/c11", "w1/c20"]
+        assert snapshot.containers_running == 3
+        assert all(
+            client.container_listings == len(client.endpoints) for client in clients.values()
+        )
+
+    @pytest.mark.asyncio
+    async def test_endpoints_beyond_limit_only_collect_metrics(
+        self, collector: DataCollector, clients: dict[str, _FakeEnvironmentClient]
+    ) -> None:
+        """Test that the snapshot endpoint limit does not drop metrics."""
+        collector.max_endpoints_per_env = 1
+        metrics_collector = MagicMock(spec=MetricsCollector)
+        metrics_collector.collect_metrics_for_containers = AsyncMock(
+            side_effect=lambda client, endpoint_id, endpoint_name, containers: (
+                [endpoint_name],
+                True,
+            )
+        )
+
+        snapshot, metrics, _ = await collector.collect_snapshot_and_metrics(metrics_collector)
+
+        assert sorted(metrics) == ["e1", "e2", "w1"]
+        assert snapshot.endpoints_online == 2
+        assert snapshot.security_issues == []
+        assert collector.security_scanner.scan_endpoint_containers.await_count == 2
+        collector.security_scanner.save_cache.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_endpoint_failures_mark_metrics_incomplete(
+        self, collector: DataCollector, clients: dict[str, _FakeEnvironmentClient]
+    ) -> None:
+        """Test that a failed container listing or stats fetch is reported."""
+        metrics_collector = MagicMock(spec=MetricsCollector)
+        metrics_collector.collect_metrics_for_containers = AsyncMock(
+            side_effect=lambda client, endpoint_id, endpoint_name, containers: (
+                [endpoint_name],
+                endpoint_name != "w1",
+            )
+        )
+
+        _, metrics, complete = await collector.collect_snapshot_and_metrics(metrics_collector)
+
+        assert sorted(metrics) == ["e1", "e2", "w1"]
+        assert not complete
+
+        metrics_collector.collect_metrics_for_containers.side_effect = (
+            lambda client, endpoint_id, endpoint_name, containers: ([endpoint_name], True)
+        )
+        clients["east"].list_containers_for_endpoint = AsyncMock(
+            side_effect=PortainerAPIError("Connection refused")
+        )
+
+        _, metrics, complete = await collector.collect_snapshot_and_metrics(metrics_collector)
+
+        assert metrics == ["w1"]
+        assert not complete
+
+
+class TestImageStatusCache:
+    """Tests for expiry, stale stacks and persistence of image status results."""
+
+    def _ref(self, stack_id: int = 1, digests: tuple[str, ...] = ("sha256:a",)) -> StackImageRef:
+        return StackImageRef("prod", stack_id, f"stack{stack_id}", 1, "ep1", digests)
+
+    def _image(self, stack_id: int = 1) -> ImageStatus:
+        return ImageStatus(stack_id=stack_id, endpoint_id=1, image_name="nginx", outdated=True)
+
+    def test_results_expire_after_ttl(self) -> None:
+        """Test that an expired result is still served but is due again."""
+        cache = ImageStatusCache(ttl_seconds=60)
+        ref = self._ref()
+        cache.observe("prod", [ref])
+        cache.put(ref, [self._image()], checked_at=1000.0)
+
+        assert cache.due(now=1030.0) == []
+        assert cache.due(now=1060.0) == [ref]
+        assert cache.get(ref) == [self._image()]
+
+    def test_removed_stacks_are_forgotten(self) -> None:
+        """Test that stacks missing from a snapshot are dropped."""
+        cache = ImageStatusCache()
+        first, second = self._ref(1), self._ref(2)
+        cache.observe("prod", [first, second])
+        cache.put(first, [])
+        cache.put(second, [])
+
+        cache.observe("prod", [second])
+
+        assert len(cache) == 1
+        assert cache.due() == []
+
+    def test_persists_across_restarts(self, tmp_path: Path) -> None:
+        """Test that results are reloaded from the cache file."""
+        path = tmp_path / "image_status_cache.json"
+        cache = ImageStatusCache(path)
+        ref = self._ref()
+        cache.put(ref, [self._image()])
+        cache.save()
+
+        restored = ImageStatusCache(path)
+
+        assert restored.get(ref) == [self._image()]
+        assert restored.get(self._ref(digests=("sha256:b",))) is None
+
+
+class TestGroupStacksByEndpoint:
+    """Tests for bucketing an environment's stacks by endpoint."""
+
+    def test_stacks_follow_endpoint_metadata(self) -> None:
+        """Test that assigned stacks go to their endpoints and edge stacks to all."""
+        endpoints = [{"Id": 1}, {"Id": 2}]
+        stacks = [
+            {"Id": 10, "EndpointId": 1},
+            {"Id": 11, "DeploymentInfo": {"2": {"Version": 1}}},
+            {"Id": 12, "EndpointId": 9},
+            {"Id": 13, "Name": "edge"},
+        ]
+
+        grouped = group_stacks_by_endpoint(endpoints, stacks)
+
+        assert [s["Id"] for s in grouped[1]] == [10, 13]
+        assert [s["Id"] for s in grouped[2]] == [11, 13]
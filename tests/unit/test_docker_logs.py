@@ -0,0 +1,173 @@
+"""Tests for the streaming Docker log decoder."""
+
+from __future__ import annotations
+
+import random
+
+import httpx
+import pytest
+
+from portainer_dashboard.services.docker_logs import (
+    STDERR,
+    STDOUT,
+    DockerLogDecoder,
+    LogLine,
+    decode_docker_logs,
+)
+from portainer_dashboard.services.portainer_client import AsyncPortainerClient
+
+
+def _frame(stream: int, payload: bytes) -> bytes:
+    return bytes([stream, 0, 0, 0]) + len(payload).to_bytes(4, "big") + payload
+
+
+def _chunks(data: bytes, rng: random.Random) -> list[bytes]:
+    """Split data at random offsets, including empty chunks."""
+    cuts = sorted(rng.randint(0, len(data)) for _ in range(rng.randint(0, 20)))
+    return [data[start:end] for start, end in zip([0, *cuts], [*cuts, len(data)])]
+
+
+def _random_text(rng: random.Random) -> str:
+    alphabet = "abc xyz 019\té中\U0001f600\x00\x01\x02"
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+
+
+class TestDockerLogDecoder:
+    """Tests for frame parsing, line assembly and raw passthrough."""
+
+    def test_frames_are_tagged_by_stream(self) -> None:
+        """Test that stdout and stderr lines keep their stream."""
+        data = _frame(1, b"started\n") + _frame(2, b"failed\n") + _frame(0, b"input\n")
+
+        assert decode_docker_logs(data) == [
+            LogLine(STDOUT, "started"),
+            LogLine(STDERR, "failed"),
+            LogLine(STDOUT, "input"),
+        ]
+
+    def test_lines_spanning_frames_and_binary_payloads(self) -> None:
+        """Test that a line split across frames is joined per stream."""
+        data = (
+            _frame(1, b"\x01\x02 first ")
+            + _frame(2, b"err\n")
+            + _frame(1, b"half\nsecond")
+            + _frame(1, b"\n")
+        )
+
+        assert decode_docker_logs(data) == [
+            LogLine(STDERR, "err"),
+            LogLine(STDOUT, "\x01\x02 first half"),
+            LogLine(STDOUT, "second"),
+        ]
+
+    def test_multibyte_character_split_across_frames(self) -> None:
+        """Test that UTF-8 sequences cut by a frame boundary decode intact."""
+        encoded = "café 中\n".encode()
+        data = _frame(1, encoded[:4]) + _frame(1, encoded[4:])
+
+        assert decode_docker_logs(data) == [LogLine(STDOUT, "café 中")]
+
+    def test_raw_tty_output_is_stdout(self) -> None:
+        """Test that output without frame headers passes through unchanged."""
+        assert decode_docker_logs([b"plain ", b"tty output\nnext"]) == [
+            LogLine(STDOUT, "plain tty output"),
+            LogLine(STDOUT, "next"),
+        ]
+
+    def test_truncated_frame_is_flushed(self) -> None:
+        """Test that the payload of an incomplete last frame is kept."""
+        data = _frame(1, b"complete\n") + _frame(2, b"cut off here")[:-5]
+
+        assert decode_docker_logs(data) == [
+            LogLine(STDOUT, "complete"),
+            LogLine(STDERR, "cut off"),
+        ]
+
+    def test_lines_are_emitted_incrementally(self) -> None:
+        """Test that complete lines are returned before the stream ends."""
+        decoder = DockerLogDecoder()
+
+        assert decoder.feed(_frame(1, b"one\ntw")[:10]) == []
+        assert decoder.feed(_frame(1, b"one\ntw")[10:]) == [LogLine(STDOUT, "one")]
+        assert decoder.flush() == [LogLine(STDOUT, "tw")]
+
+    @pytest.mark.parametrize("seed", range(200))
+    def test_fuzz_random_frames_and_chunking(self, seed: int) -> None:
+        """Test that any framing and chunking decodes to the written lines."""
+        rng = random.Random(seed)
+        written: dict[str, list[str]] = {STDOUT: [], STDERR: []}
+        data = bytearray()
+        pending = {1: "", 2: ""}
+        for _ in range(rng.randint(1, 40)):
+            stream = rng.choice((1, 2))
+            text = _random_text(rng) + rng.choice(("", "\n", "\n\n"))
+            data += _frame(stream, text.encode())
+            pending[stream] += text
+        for stream, name in ((1, STDOUT), (2, STDERR)):
+            lines = pending[stream].split("\n")
+            written[name] = lines if lines[-1] else lines[:-1]
+
+        decoded = decode_docker_logs(_chunks(bytes(data), rng))
+
+        for name in (STDOUT, STDERR):
+            assert [line.text for line in decoded if line.stream == name] == written[name]
+
+    @pytest.mark.parametrize("seed", range(200))
+    def test_fuzz_garbage_never_raises(self, seed: int) -> None:
+        """Test that arbitrary bytes decode without errors or lost newlines."""
+        rng = random.Random(seed)
+        data = bytes(rng.getrandbits(8) for _ in range(rng.randint(0, 400)))
+        if rng.random() < 0.5:
+            data = _frame(1, b"ok\n") + data
+
+        decoded = decode_docker_logs(_chunks(data, rng))
+
+        assert all(isinstance(line.text, str) for line in decoded)
+        assert len(decoded) <= data.count(b"\n") + 2
+
+
+class TestContainerLogsClient:
+    """Tests for decoding log responses in the Portainer client."""
+
+    @pytest.mark.asyncio
+    async def test_get_container_logs_decodes_frames(self) -> None:
+        """Test that multiplexed responses are decoded into plain lines."""
+        body = _frame(1, b"2024-05-01T10:00:00Z out\n") + _frame(2, b"2024-05-01T10:00:01Z err\n")
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, content=body)
+
+        client = AsyncPortainerClient(base_url="https://portainer.test", api_key="key")
+        client._client = httpx.AsyncClient(
+            base_url=client.base_url, transport=httpx.MockTransport(handler)
+        )
+        async with client._client:
+            logs = await client.get_container_logs(3, "abc", tail=10, since=1714557600)
+            lines = [line async for line in client.stream_container_logs(3, "abc")]
+
+        assert logs == "2024-05-01T10:00:00Z out\n2024-05-01T10:00:01Z err"
+        assert [line.stream for line in lines] == [STDOUT, STDERR]
+        assert requests[0].url.params["since"] == "1714557600"
+        assert requests[0].url.path.endswith("/endpoints/3/docker/containers/abc/logs")
+
+    @pytest.mark.asyncio
+    async def test_follow_requests_a_live_stream(self) -> None:
+        """Test that follow mode asks Docker to keep the stream open."""
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, content=_frame(1, b"live\n"))
+
+        client = AsyncPortainerClient(base_url="https://portainer.test", api_key="key")
+        client._client = httpx.AsyncClient(
+            base_url=client.base_url, transport=httpx.MockTransport(handler)
+        )
+        async with client._client:
+            lines = [line async for line in client.stream_container_logs(3, "abc", follow=True)]
+
+        assert lines == [LogLine(STDOUT, "live")]
+        assert requests[0].url.params["follow"] == "true"
+        assert requests[0].extensions["timeout"]["read"] is None
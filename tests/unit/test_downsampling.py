@@ -0,0 +1,75 @@
+"""Tests for time-series downsampling."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from portainer_dashboard.models.metrics import DownsampleMethod
+from portainer_dashboard.services.downsampling import (
+    downsample,
+    lttb_indices,
+    min_max_indices,
+)
+
+
+@pytest.fixture
+def series() -> tuple[np.ndarray, np.ndarray]:
+    """Create a noisy sine wave with one spike."""
+    rng = np.random.default_rng(7)
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 500) + rng.normal(0, 0.05, len(x))
+    y[4321] = 25.0
+    return x, y
+
+
+class TestDownsampling:
+    """Tests for LTTB and min/max bucket reduction."""
+
+    @pytest.mark.parametrize("reducer", [lttb_indices, min_max_indices])
+    def test_indices_are_sorted_unique_and_bounded(self, reducer, series) -> None:
+        """Test that reducers return an ordered subset of the input."""
+        x, y = series
+
+        indices = reducer(x, y, 200)
+
+        assert len(indices) <= 200
+        assert np.all(np.diff(indices) > 0)
+        assert indices[0] >= 0 and indices[-1] < len(x)
+
+    def test_lttb_keeps_endpoints_and_exact_count(self, series) -> None:
+        """Test that LTTB keeps the first and last sample."""
+        x, y = series
+
+        indices = lttb_indices(x, y, 300)
+
+        assert len(indices) == 300
+        assert indices[0] == 0
+        assert indices[-1] == len(x) - 1
+
+    @pytest.mark.parametrize("reducer", [lttb_indices, min_max_indices])
+    def test_spike_survives(self, reducer, series) -> None:
+        """Test that a single outlier is not averaged away."""
+        x, y = series
+
+        assert 4321 in reducer(x, y, 100)
+
+    def test_min_max_keeps_bucket_extremes(self) -> None:
+        """Test that every bucket contributes its minimum and maximum."""
+        x = np.arange(8, dtype=np.float64)
+        y = np.array([3.0, 1.0, 2.0, 4.0, 9.0, 5.0, 0.0, 7.0])
+
+        indices = min_max_indices(x, y, 4)
+
+        assert indices.tolist() == [1, 3, 4, 6]
+
+    @pytest.mark.parametrize("method", list(DownsampleMethod))
+    def test_short_series_are_returned_unchanged(self, method) -> None:
+        """Test that series within max_points are not reduced."""
+        x = np.arange(5, dtype=np.float64)
+        y = x * 2
+
+        kept_x, kept_y = downsample(x, y, 10, method)
+
+        assert kept_x.tolist() == x.tolist()
+        assert kept_y.tolist() == y.tolist()
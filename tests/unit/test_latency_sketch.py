@@ -0,0 +1,89 @@
+"""Tests for mergeable latency sketches."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from portainer_dashboard.services.latency_sketch import LatencySketch
+
+
+@pytest.fixture
+def durations() -> np.ndarray:
+    """Create long-tailed request durations in milliseconds."""
+    rng = np.random.default_rng(11)
+    return np.round(rng.lognormal(mean=4, sigma=1.2, size=20_000))
+
+
+def _sketch(values) -> LatencySketch:
+    sketch = LatencySketch()
+    for value in values:
+        sketch.add(float(value))
+    return sketch
+
+
+class TestLatencySketch:
+    """Tests for accuracy, merging, removal and serialization."""
+
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99])
+    def test_quantiles_within_relative_accuracy(self, durations, q) -> None:
+        """Test that quantiles are within 1% of the exact order statistic."""
+        sketch = _sketch(durations)
+        exact = np.sort(durations)[int(len(durations) * q)]
+
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+        assert sketch.count == len(durations)
+        assert sketch.sum == pytest.approx(durations.sum())
+
+    def test_merge_equals_single_sketch(self, durations) -> None:
+        """Test that merging partial sketches matches one sketch of all values."""
+        merged = LatencySketch()
+        for part in np.array_split(durations, 7):
+            merged.merge(_sketch(part))
+
+        whole = _sketch(durations)
+        for q in (0.5, 0.95, 0.99):
+            assert merged.quantile(q) == whole.quantile(q)
+
+    def test_negative_count_removes_values(self) -> None:
+        """Test that removing values restores the earlier sketch."""
+        sketch = _sketch([10, 20, 30])
+        sketch.add(5000, 1)
+        sketch.add(5000, -1)
+
+        assert sketch.count == 3
+        assert sketch.quantile(0.99) == pytest.approx(30, rel=0.01)
+
+    def test_zero_durations(self) -> None:
+        """Test that zero durations are counted and reported as zero."""
+        sketch = _sketch([0, 0, 0, 100])
+
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(0.99) == pytest.approx(100, rel=0.01)
+
+    def test_empty_sketch(self) -> None:
+        """Test that an empty sketch reports zero and round-trips."""
+        sketch = LatencySketch.from_bytes(LatencySketch().to_bytes())
+
+        assert sketch.count == 0
+        assert sketch.quantile(0.5) == 0.0
+
+    def test_serialization_round_trip_is_compact(self, durations) -> None:
+        """Test that the serialized sketch is small and loses nothing."""
+        sketch = _sketch(durations)
+        data = sketch.to_bytes()
+        restored = LatencySketch.from_bytes(data)
+
+        assert len(data) < 2048
+        assert restored.count == sketch.count
+        assert restored.sum == sketch.sum
+        for q in (0.5, 0.95, 0.99):
+            assert restored.quantile(q) == sketch.quantile(q)
+
+    def test_unknown_format_is_rejected(self) -> None:
+        """Test that data in an unknown format raises ValueError."""
+        data = bytearray(LatencySketch().to_bytes())
+        data[0] = 99
+
+        with pytest.raises(ValueError):
+            LatencySketch.from_bytes(bytes(data))
@@ -0,0 +1,133 @@
+"""Tests for incremental container log fetching."""
+
+from __future__ import annotations
+
+import pytest
+
+from portainer_dashboard.services.log_cursors import LogCursorStore, _line_timestamp
+from portainer_dashboard.services.portainer_client import PortainerAPIError
+
+
+class _FakeLogClient:
+    """Serves timestamped log lines, honouring ``tail`` and ``since``."""
+
+    def __init__(self) -> None:
+        self.lines: list[tuple[int, str]] = []
+        self.requests: list[int | None] = []
+        self.fail = False
+
+    def write(self, second: int, message: str, nanos: int = 0) -> None:
+        fraction = f".{nanos:09d}".rstrip("0").rstrip(".")
+        stamp = f"2024-05-01T10:{second // 60:02d}:{second % 60:02d}{fraction}Z"
+        self.lines.append((1714557600 + second, f"{stamp} {message}"))
+
+    async def get_container_logs(self, endpoint_id, container_id, *, tail, timestamps, since):
+        self.requests.append(since)
+        if self.fail:
+            raise PortainerAPIError("boom")
+        lines = [line for second, line in self.lines[-tail:] if since is None or second >= since]
+        return "\n".join(lines) + "\n"
+
+
+class TestLineTimestamp:
+    """Tests for Docker timestamp parsing."""
+
+    def test_trimmed_fractions_compare_numerically(self) -> None:
+        """Test that trimmed trailing zeros do not break ordering."""
+        shorter = _line_timestamp("2024-05-01T10:00:00.1Z a")
+        longer = _line_timestamp("2024-05-01T10:00:00.12Z b")
+
+        assert shorter is not None and longer is not None
+        assert shorter < longer
+
+    def test_lines_without_timestamp(self) -> None:
+        """Test that lines without a timestamp prefix are recognised."""
+        assert _line_timestamp("Traceback (most recent call last):") is None
+
+
+class TestLogCursorStore:
+    """Tests for cursors, rolling buffers and eviction."""
+
+    @pytest.mark.asyncio
+    async def test_second_fetch_transfers_only_new_lines(self) -> None:
+        """Test that later fetches pass since and keep the earlier lines as context."""
+        client = _FakeLogClient()
+        store = LogCursorStore()
+        for second in range(5):
+            client.write(second, f"line {second}")
+
+        first = await store.fetch(client, 1, "abc", tail=10)
+        client.write(4, "same second", nanos=500_000_000)
+        client.write(7, "later")
+        second = await store.fetch(client, 1, "abc", tail=10)
+
+        assert client.requests == [None, 1714557604]
+        assert first.new_lines == 5
+        assert second.new_lines == 2
+        assert [line.split(" ", 1)[1] for line in second.lines[-3:]] == [
+            "line 4",
+            "same second",
+            "later",
+        ]
+        assert not second.truncated
+
+    @pytest.mark.asyncio
+    async def test_buffer_is_bounded_by_tail(self) -> None:
+        """Test that the rolling buffer keeps only the latest tail lines."""
+        client = _FakeLogClient()
+        store = LogCursorStore()
+        client.write(0, "old")
+        await store.fetch(client, 1, "abc", tail=3)
+
+        for second in range(1, 6):
+            client.write(second, f"new {second}")
+        result = await store.fetch(client, 1, "abc", tail=3)
+
+        assert [line.split(" ", 1)[1] for line in result.lines] == ["new 3", "new 4", "new 5"]
+        assert result.truncated
+
+    @pytest.mark.asyncio
+    async def test_unchanged_logs_add_nothing(self) -> None:
+        """Test that refetching quiet logs reports no new lines."""
+        client = _FakeLogClient()
+        store = LogCursorStore()
+        client.write(0, "only line")
+
+        await store.fetch(client, 1, "abc", tail=10)
+        result = await store.fetch(client, 1, "abc", tail=10)
+
+        assert result.new_lines == 0
+        assert len(result.lines) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_keeps_cursor(self) -> None:
+        """Test that an API error leaves the cursor for the next fetch."""
+        client = _FakeLogClient()
+        store = LogCursorStore()
+        client.write(0, "first")
+        await store.fetch(client, 1, "abc", tail=10)
+
+        client.fail = True
+        with pytest.raises(PortainerAPIError):
+            await store.fetch(client, 1, "abc", tail=10)
+        client.fail = False
+        client.write(3, "second")
+        result = await store.fetch(client, 1, "abc", tail=10)
+
+        assert client.requests[-1] == 1714557600
+        assert result.new_lines == 1
+
+    @pytest.mark.asyncio
+    async def test_forgotten_and_evicted_cursors_start_over(self) -> None:
+        """Test that forget and the cursor bound reset to a full tail fetch."""
+        client = _FakeLogClient()
+        store = LogCursorStore(max_cursors=2)
+        client.write(0, "line")
+
+        for container_id in ("a", "b", "c"):
+            await store.fetch(client, 1, container_id, tail=10)
+        store.forget(1, "c")
+        await store.fetch(client, 1, "a", tail=10)
+
+        assert len(store) == 2
+        assert client.requests[-1] is None
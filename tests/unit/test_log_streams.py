@@ -0,0 +1,158 @@
+"""Tests for shared live log streams."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from portainer_dashboard.api.v1.containers import _follow_log_events
+from portainer_dashboard.services.docker_logs import STDERR, STDOUT, LogLine
+from portainer_dashboard.services.log_streams import LogStreamHub
+
+
+class _FakeUpstream:
+    """Upstream log stream fed by the test, counting how often it is opened."""
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[LogLine | None] = asyncio.Queue()
+        self.opened: list[int] = []
+        self.closed = 0
+
+    async def open(self, tail: int):
+        self.opened.append(tail)
+        try:
+            while (line := await self.queue.get()) is not None:
+                yield line
+        finally:
+            self.closed += 1
+
+    def write(self, *texts: str, stream: str = STDOUT) -> None:
+        for text in texts:
+            self.queue.put_nowait(LogLine(stream, text))
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _drain(subscriber) -> list[str | None]:
+    texts: list[str | None] = []
+    while not subscriber._queue.empty():
+        line = subscriber._queue.get_nowait()
+        texts.append(line.text if line is not None else None)
+    return texts
+
+
+class TestLogStreamHub:
+    """Tests for upstream sharing, replay, backpressure and shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_viewers_share_one_upstream(self) -> None:
+        """Test that concurrent viewers of a container use one upstream stream."""
+        hub = LogStreamHub()
+        upstream = _FakeUpstream()
+
+        async with hub.subscribe("c1", upstream.open, 10) as first:
+            async with hub.subscribe("c1", upstream.open, 10) as second:
+                upstream.write("a", "b")
+                await _settle()
+
+                assert hub.upstream_count == 1
+                assert hub.viewer_count("c1") == 2
+                assert _drain(first) == ["a", "b"]
+                assert _drain(second) == ["a", "b"]
+
+        await _settle()
+        assert upstream.opened == [10]
+        assert upstream.closed == 1
+        assert hub.upstream_count == 0
+
+    @pytest.mark.asyncio
+    async def test_late_viewer_is_replayed_recent_lines(self) -> None:
+        """Test that a viewer joining a running stream gets the history tail."""
+        hub = LogStreamHub(history_lines=3)
+        upstream = _FakeUpstream()
+
+        async with hub.subscribe("c1", upstream.open, 100):
+            upstream.write("1", "2", "3", "4")
+            await _settle()
+            async with hub.subscribe("c1", upstream.open, 2) as late:
+                upstream.write("5", stream=STDERR)
+                await _settle()
+
+                assert _drain(late) == ["3", "4", "5"]
+
+        assert upstream.opened == [3]
+
+    @pytest.mark.asyncio
+    async def test_slow_viewer_drops_oldest_lines(self) -> None:
+        """Test that a full viewer queue drops old lines without blocking others."""
+        hub = LogStreamHub(queue_size=2)
+        upstream = _FakeUpstream()
+
+        async with hub.subscribe("c1", upstream.open, 0) as slow:
+            upstream.write("a", "b", "c", "d", "e")
+            await _settle()
+
+            assert slow.take_dropped() == 3
+            assert _drain(slow) == ["d", "e"]
+            assert slow.take_dropped() == 0
+
+    @pytest.mark.asyncio
+    async def test_upstream_end_closes_viewers(self) -> None:
+        """Test that viewers are told when the container's stream ends."""
+        hub = LogStreamHub()
+        upstream = _FakeUpstream()
+
+        async with hub.subscribe("c1", upstream.open, 0) as viewer:
+            upstream.write("last")
+            upstream.queue.put_nowait(None)
+
+            assert (await viewer.get()) == LogLine(STDOUT, "last")
+            assert await viewer.get() is None
+            assert hub.upstream_count == 0
+
+    @pytest.mark.asyncio
+    async def test_close_stops_upstreams(self) -> None:
+        """Test that closing the hub stops every upstream reader."""
+        hub = LogStreamHub()
+        upstream = _FakeUpstream()
+
+        async with hub.subscribe("c1", upstream.open, 0) as viewer:
+            await _settle()
+            await hub.close()
+
+            assert await viewer.get() is None
+            assert upstream.closed == 1
+
+
+class _FakeRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+class TestFollowLogEvents:
+    """Tests for the server-sent event stream of followed logs."""
+
+    @pytest.mark.asyncio
+    async def test_lines_and_end_are_sent_as_events(self, monkeypatch) -> None:
+        """Test that lines, dropped counts and the end are formatted as events."""
+        hub = LogStreamHub(queue_size=2)
+        monkeypatch.setattr(
+            "portainer_dashboard.api.v1.containers.get_log_stream_hub", lambda: hub
+        )
+        upstream = _FakeUpstream()
+        upstream.write("a", "b", "c")
+        upstream.queue.put_nowait(None)
+
+        events = [
+            event
+            async for event in _follow_log_events(_FakeRequest(), "c1", upstream.open, 10)
+        ]
+
+        assert events[0] == "event: dropped\ndata: " + json.dumps({"count": 2}) + "\n\n"
+        assert json.loads(events[1].removeprefix("data: ")) == {"stream": STDOUT, "text": "c"}
+        assert events[-1].startswith("event: end")
@@ -0,0 +1,158 @@
+"""Tests for the metrics collector."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from portainer_dashboard.models.metrics import MetricType
+from portainer_dashboard.services.metrics_collector import CounterRateTracker, MetricsCollector
+from portainer_dashboard.services.metrics_store import SQLiteMetricsStore
+from portainer_dashboard.services.portainer_client import PortainerAPIError
+
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _stats(rx: int, tx: int, read: int, write: int) -> dict:
+    return {
+        "networks": {"eth0": {"rx_bytes": rx, "tx_bytes": tx}},
+        "blkio_stats": {
+            "io_service_bytes_recursive": [
+                {"op": "Read", "value": read},
+                {"op": "Write", "value": write},
+            ]
+        },
+    }
+
+
+class TestCounterRateTracker:
+    """Tests for counter-to-rate conversion."""
+
+    def test_first_sample_has_no_rate(self) -> None:
+        """Test that a rate needs a previous sample."""
+        tracker = CounterRateTracker()
+        assert tracker.rate("c1", MetricType.NETWORK_RX_BYTES, 100.0, _START) is None
+
+    def test_rate_per_second(self) -> None:
+        """Test that the counter delta is divided by elapsed seconds."""
+        tracker = CounterRateTracker()
+        tracker.rate("c1", MetricType.NETWORK_RX_BYTES, 1_000.0, _START)
+
+        rate = tracker.rate(
+            "c1", MetricType.NETWORK_RX_BYTES, 7_000.0, _START + timedelta(seconds=60)
+        )
+
+        assert rate == pytest.approx(100.0)
+
+    def test_counter_reset_rebaselines(self) -> None:
+        """Test that a counter going backwards yields no rate."""
+        tracker = CounterRateTracker()
+        tracker.rate("c1", MetricType.BLOCK_READ_BYTES, 5_000.0, _START)
+
+        after_restart = _START + timedelta(seconds=60)
+        assert tracker.rate("c1", MetricType.BLOCK_READ_BYTES, 200.0, after_restart) is None
+        rate = tracker.rate(
+            "c1",
+            MetricType.BLOCK_READ_BYTES,
+            800.0,
+            after_restart + timedelta(seconds=60),
+        )
+        assert rate == pytest.approx(10.0)
+
+    def test_retain_forgets_removed_containers(self) -> None:
+        """Test that counters of vanished containers are dropped."""
+        tracker = CounterRateTracker()
+        tracker.rate("c1", MetricType.NETWORK_RX_BYTES, 1.0, _START)
+        tracker.rate("c2", MetricType.NETWORK_RX_BYTES, 1.0, _START)
+
+        tracker.retain({"c2"})
+
+        assert len(tracker) == 1
+
+
+class TestMetricsCollector:
+    """Tests for per-container metric collection."""
+
+    @pytest.mark.asyncio
+    async def test_collects_rates_from_second_sample(
+        self, test_settings: None, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that rate metrics accompany counters once a baseline exists."""
+        clock = MagicMock()
+        clock.now.side_effect = [_START, _START + timedelta(seconds=10)]
+        monkeypatch.setattr(
+            "portainer_dashboard.services.metrics_collector.datetime", clock
+        )
+        collector = MetricsCollector(SQLiteMetricsStore(tmp_path / "metrics.db"))
+        client = MagicMock()
+        client.get_container_stats = AsyncMock(
+            side_effect=[_stats(100, 200, 300, 400), _stats(200, 400, 300, 500)]
+        )
+
+        first = await collector.collect_metrics_for_container(client, 1, "prod", "c1", "web")
+        second = await collector.collect_metrics_for_container(client, 1, "prod", "c1", "web")
+
+        first_types = {m.metric_type for m in first}
+        assert MetricType.NETWORK_RX_BYTES in first_types
+        assert MetricType.NETWORK_RX_RATE not in first_types
+
+        values = {m.metric_type: m.value for m in second}
+        assert values[MetricType.NETWORK_TX_BYTES] == 400.0
+        assert values[MetricType.NETWORK_RX_RATE] == pytest.approx(10.0)
+        assert values[MetricType.NETWORK_TX_RATE] == pytest.approx(20.0)
+        assert values[MetricType.BLOCK_READ_RATE] == 0.0
+        assert values[MetricType.BLOCK_WRITE_RATE] == pytest.approx(10.0)
+
+    @pytest.mark.asyncio
+    async def test_collects_running_containers_of_a_listing(
+        self, test_settings: None, tmp_path: Path
+    ) -> None:
+        """Test that stats are fetched for running containers only."""
+        collector = MetricsCollector(SQLiteMetricsStore(tmp_path / "metrics.db"))
+        client = MagicMock()
+        client.get_container_stats = AsyncMock(return_value=_stats(1, 2, 3, 4))
+        containers = [
+            {"Id": "c1", "Names": ["/web"], "State": "running"},
+            {"Id": "c2", "Names": ["/job"], "State": "exited"},
+            {"Id": "c3", "Names": ["/db"], "State": "running"},
+        ]
+
+        metrics, complete = await collector.collect_metrics_for_containers(
+            client, 1, "prod", containers
+        )
+
+        assert complete
+        assert {m.container_name for m in metrics} == {"web", "db"}
+        assert client.get_container_stats.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_stats_fetch_marks_round_incomplete(
+        self, test_settings: None, tmp_path: Path
+    ) -> None:
+        """Test that a failed stats fetch keeps the counter baselines of the round."""
+        collector = MetricsCollector(SQLiteMetricsStore(tmp_path / "metrics.db"))
+        client = MagicMock()
+        client.get_container_stats = AsyncMock(return_value=_stats(1, 2, 3, 4))
+        containers = [
+            {"Id": "c1", "Names": ["/web"], "State": "running"},
+            {"Id": "c2", "Names": ["/db"], "State": "running"},
+        ]
+        metrics, _ = await collector.collect_metrics_for_containers(
+            client, 1, "prod", containers
+        )
+        await collector.record_metrics(metrics)
+
+        client.get_container_stats = AsyncMock(
+            side_effect=[_stats(5, 6, 7, 8), PortainerAPIError("timed out")]
+        )
+        metrics, complete = await collector.collect_metrics_for_containers(
+            client, 1, "prod", containers
+        )
+        await collector.record_metrics(metrics, complete=complete)
+
+        assert not complete
+        assert {m.container_name for m in metrics} == {"web"}
+        assert len(collector._counter_rates) == 8
@@ -0,0 +1,337 @@
+"""Tests for the SQLite metrics store."""
+
+from __future__ import annotations
+
+import sqlite3
+import statistics
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from portainer_dashboard.models.metrics import (
+    ContainerMetric,
+    FleetGroupBy,
+    MetricType,
+    SeriesSelector,
+)
+from portainer_dashboard.services.metrics_store import SQLiteMetricsStore
+
+
+def _metric(
+    container_id: str,
+    value: float,
+    *,
+    minutes_ago: int,
+    metric_type: MetricType = MetricType.CPU_PERCENT,
+    endpoint_id: int = 1,
+    stack_name: str | None = None,
+) -> ContainerMetric:
+    return ContainerMetric(
+        timestamp=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        endpoint_id=endpoint_id,
+        endpoint_name=f"env-{endpoint_id}",
+        container_id=container_id,
+        container_name=f"{container_id}-name",
+        stack_name=stack_name,
+        image=f"{container_id}:latest",
+        metric_type=metric_type,
+        value=value,
+    )
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SQLiteMetricsStore:
+    """Create a metrics store backed by a temporary database."""
+    return SQLiteMetricsStore(tmp_path / "metrics.db")
+
+
+class TestMetricsSummaries:
+    """Tests for single-query statistical summaries."""
+
+    def test_summary_matches_python_statistics(self, store: SQLiteMetricsStore) -> None:
+        """Test that SQL aggregates agree with a reference computation."""
+        values = [10.0, 12.5, 11.0, 50.0, 9.5, 10.5, 13.0, 11.5, 12.0, 10.0]
+        store.store_metrics_batch(
+            [_metric("c1", v, minutes_ago=len(values) - i) for i, v in enumerate(values)]
+        )
+
+        summary = store.get_metrics_summary("c1", MetricType.CPU_PERCENT)
+
+        assert summary is not None
+        assert summary.count == len(values)
+        assert summary.min_value == min(values)
+        assert summary.max_value == max(values)
+        assert summary.avg_value == pytest.approx(statistics.fmean(values))
+        assert summary.std_dev == pytest.approx(statistics.pstdev(values))
+        assert summary.p50_value == pytest.approx(statistics.median(values))
+        assert summary.latest_value == values[-1]
+        assert summary.container_name == "c1-name"
+
+    def test_std_dev_of_large_values(self, store: SQLiteMetricsStore) -> None:
+        """Test that a small spread around a large value is not lost to cancellation."""
+        values = [4e10 + (2.0 if i % 2 else -2.0) for i in range(1000)]
+        store.store_metrics_batch(
+            [
+                _metric("c1", v, minutes_ago=len(values) - i, metric_type=MetricType.MEMORY_USAGE)
+                for i, v in enumerate(values)
+            ]
+        )
+
+        summary = store.get_metrics_summary("c1", MetricType.MEMORY_USAGE)
+
+        assert summary is not None
+        assert summary.std_dev == pytest.approx(statistics.pstdev(values))
+        assert summary.std_dev == pytest.approx(2.0)
+
+    def test_percentiles_interpolate(self, store: SQLiteMetricsStore) -> None:
+        """Test that percentiles use linear interpolation."""
+        store.store_metrics_batch(
+            [_metric("c1", float(v), minutes_ago=v) for v in range(1, 101)]
+        )
+
+        summary = store.get_metrics_summary("c1", MetricType.CPU_PERCENT)
+
+        assert summary is not None
+        assert summary.p50_value == pytest.approx(50.5)
+        assert summary.p95_value == pytest.approx(95.05)
+        assert summary.p99_value == pytest.approx(99.01)
+
+    def test_summary_respects_window_and_type(self, store: SQLiteMetricsStore) -> None:
+        """Test that old samples and other metric types are excluded."""
+        store.store_metrics_batch(
+            [
+                _metric("c1", 5.0, minutes_ago=10),
+                _metric("c1", 500.0, minutes_ago=60 * 48),
+                _metric("c1", 99.0, minutes_ago=5, metric_type=MetricType.MEMORY_PERCENT),
+            ]
+        )
+
+        summary = store.get_metrics_summary("c1", MetricType.CPU_PERCENT, hours=24)
+
+        assert summary is not None
+        assert summary.count == 1
+        assert summary.max_value == 5.0
+        assert summary.std_dev == 0.0
+
+    def test_summary_missing_container(self, store: SQLiteMetricsStore) -> None:
+        """Test that unknown containers return None."""
+        assert store.get_metrics_summary("missing", MetricType.CPU_PERCENT) is None
+
+    def test_batch_summaries(self, store: SQLiteMetricsStore) -> None:
+        """Test summarising many containers in one call."""
+        store.store_metrics_batch(
+            [
+                _metric("c1", 1.0, minutes_ago=3),
+                _metric("c1", 3.0, minutes_ago=2),
+                _metric("c2", 7.0, minutes_ago=1),
+                _metric("c3", 9.0, minutes_ago=1),
+            ]
+        )
+
+        summaries = store.get_metrics_summaries(["c1", "c2", "missing"], MetricType.CPU_PERCENT)
+
+        assert set(summaries) == {"c1", "c2"}
+        assert summaries["c1"].avg_value == pytest.approx(2.0)
+        assert summaries["c1"].latest_value == 3.0
+        assert summaries["c2"].count == 1
+
+        everything = store.get_metrics_summaries(None, MetricType.CPU_PERCENT)
+        assert set(everything) == {"c1", "c2", "c3"}
+
+        assert store.get_metrics_summaries([], MetricType.CPU_PERCENT) == {}
+
+
+class TestRetentionPurge:
+    """Tests for chunked, time-bounded retention purges."""
+
+    def test_purge_deletes_in_chunks(self, store: SQLiteMetricsStore) -> None:
+        """Test that only rows past retention are removed, across chunks."""
+        store.store_metrics_batch(
+            [_metric("c1", float(i), minutes_ago=180 + i) for i in range(25)]
+            + [_metric("c1", 1.0, minutes_ago=5)]
+        )
+
+        deleted = store.purge_old_metrics(retention_hours=2, chunk_size=10)
+
+        assert deleted == 25
+        assert len(store.get_metrics("c1", MetricType.CPU_PERCENT)) == 1
+
+    def test_purge_stops_at_time_budget(self, store: SQLiteMetricsStore) -> None:
+        """Test that an exhausted time budget leaves the rest for the next run."""
+        store.store_metrics_batch(
+            [_metric("c1", float(i), minutes_ago=180 + i) for i in range(25)]
+        )
+
+        first = store.purge_old_metrics(retention_hours=2, chunk_size=10, time_budget=0)
+        rest = store.purge_old_metrics(retention_hours=2, chunk_size=10)
+
+        assert first == 10
+        assert rest == 15
+
+    def test_compact_truncates_wal(self, store: SQLiteMetricsStore, tmp_path: Path) -> None:
+        """Test that compaction releases free pages and empties the WAL."""
+        store.store_metrics_batch(
+            [_metric(f"c{i}", float(i), minutes_ago=180) for i in range(2000)]
+        )
+        store.purge_old_metrics(retention_hours=2)
+
+        freed = store.compact()
+
+        assert freed > 0
+        assert (tmp_path / "metrics.db-wal").stat().st_size == 0
+
+
+class TestQuerySeries:
+    """Tests for columnar, downsampled range queries."""
+
+    def test_series_are_columnar_and_downsampled(self, store: SQLiteMetricsStore) -> None:
+        """Test that each requested series is reduced to max_points."""
+        store.store_metrics_batch(
+            [_metric("c1", float(i), minutes_ago=i) for i in range(100)]
+            + [
+                _metric("c1", 50.0, minutes_ago=i, metric_type=MetricType.MEMORY_PERCENT)
+                for i in range(10)
+            ]
+        )
+        now = datetime.now(timezone.utc)
+
+        cpu, memory, missing = store.query_series(
+            [
+                SeriesSelector(container_id="c1", metric_type=MetricType.CPU_PERCENT),
+                SeriesSelector(container_id="c1", metric_type=MetricType.MEMORY_PERCENT),
+                SeriesSelector(container_id="c2", metric_type=MetricType.CPU_PERCENT),
+            ],
+            now - timedelta(hours=3),
+            now,
+            max_points=20,
+        )
+
+        assert cpu.raw_count == 100
+        assert len(cpu.timestamps) == len(cpu.values) == 20
+        assert cpu.timestamps == sorted(cpu.timestamps)
+        assert cpu.values[0] == 99.0 and cpu.values[-1] == 0.0
+        assert memory.raw_count == 10 and memory.values == [50.0] * 10
+        assert missing.raw_count == 0 and missing.timestamps == []
+
+    def test_timestamps_are_epoch_milliseconds(self, store: SQLiteMetricsStore) -> None:
+        """Test that timestamps survive the conversion inside SQLite."""
+        metric = _metric("c1", 1.0, minutes_ago=5)
+        store.store_metric(metric)
+
+        (result,) = store.query_series(
+            [SeriesSelector(container_id="c1", metric_type=MetricType.CPU_PERCENT)],
+            metric.timestamp - timedelta(minutes=1),
+            metric.timestamp + timedelta(minutes=1),
+        )
+
+        assert result.timestamps == [round(metric.timestamp.timestamp() * 1000)]
+
+
+class TestFleetAggregates:
+    """Tests for rollup-backed fleet aggregation."""
+
+    @pytest.fixture
+    def fleet(self, store: SQLiteMetricsStore) -> SQLiteMetricsStore:
+        """Store samples for three containers in two stacks on two endpoints."""
+        store.store_metrics_batch(
+            [_metric("a", v, minutes_ago=m, stack_name="web") for v, m in ((10, 1), (30, 2))]
+            + [_metric("b", 5.0, minutes_ago=1, stack_name="web", endpoint_id=2)]
+            + [_metric("c", 50.0, minutes_ago=1, endpoint_id=2)]
+            + [_metric("c", 99.0, minutes_ago=600, endpoint_id=2)]
+        )
+        return store
+
+    def test_top_containers(self, fleet: SQLiteMetricsStore) -> None:
+        """Test that containers are ranked by their average in the window."""
+        top = fleet.get_fleet_aggregates(
+            MetricType.CPU_PERCENT, FleetGroupBy.CONTAINER, hours=1, limit=2
+        )
+
+        assert [(a.key, a.avg_value, a.max_value) for a in top] == [
+            ("c", 50.0, 50.0),
+            ("a", 20.0, 30.0),
+        ]
+        assert top[1].label == "a-name"
+
+    def test_group_by_stack_and_endpoint(self, fleet: SQLiteMetricsStore) -> None:
+        """Test sums and averages of per-container averages per group."""
+        stacks = fleet.get_fleet_aggregates(MetricType.CPU_PERCENT, FleetGroupBy.STACK)
+        endpoints = fleet.get_fleet_aggregates(MetricType.CPU_PERCENT, FleetGroupBy.ENDPOINT)
+
+        assert [(a.key, a.container_count, a.sum_value) for a in stacks] == [
+            (None, 1, 50.0),
+            ("web", 2, 25.0),
+        ]
+        assert stacks[1].avg_value == 12.5
+        assert [(a.key, a.label, a.sum_value) for a in endpoints] == [
+            ("2", "env-2", 55.0),
+            ("1", "env-1", 20.0),
+        ]
+
+    def test_rollups_are_backfilled_for_existing_databases(self, tmp_path: Path) -> None:
+        """Test that a database from before rollups is migrated."""
+        path = tmp_path / "legacy.db"
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE metrics (
+                    id TEXT PRIMARY KEY, timestamp TEXT NOT NULL,
+                    endpoint_id INTEGER NOT NULL, endpoint_name TEXT,
+                    container_id TEXT NOT NULL, container_name TEXT NOT NULL,
+                    metric_type TEXT NOT NULL, value REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "INSERT INTO metrics VALUES ('1', ?, 1, 'prod', 'c1', 'web', 'cpu_percent', 7)",
+                (datetime.now(timezone.utc).isoformat(),),
+            )
+
+        store = SQLiteMetricsStore(path)
+
+        (aggregate,) = store.get_fleet_aggregates(
+            MetricType.CPU_PERCENT, FleetGroupBy.IMAGE
+        )
+        assert aggregate.key is None
+        assert aggregate.sum_value == 7.0
+        assert store.get_metrics("c1")[0].stack_name is None
+
+
+class TestDashboardData:
+    """Tests for the write-time maintained dashboard counters."""
+
+    def test_counters_follow_inserts_and_purges(self, store: SQLiteMetricsStore) -> None:
+        """Test that totals and tracked containers reflect purges."""
+        store.store_metrics_batch(
+            [_metric("a", 1.0, minutes_ago=1), _metric("a", 2.0, minutes_ago=2)]
+            + [_metric("b", 1.0, minutes_ago=600, endpoint_id=2)]
+        )
+
+        before = store.get_dashboard_data()
+        store.purge_old_metrics(retention_hours=2)
+        after = store.get_dashboard_data()
+
+        assert (before.total_metrics, before.containers_tracked, before.endpoints_tracked) == (
+            3,
+            2,
+            2,
+        )
+        assert (after.total_metrics, after.containers_tracked, after.endpoints_tracked) == (
+            2,
+            1,
+            1,
+        )
+        assert after.oldest_metric < after.newest_metric
+
+    def test_counters_are_seeded_for_existing_databases(self, tmp_path: Path) -> None:
+        """Test that reopening a store does not reset or double the counters."""
+        path = tmp_path / "metrics.db"
+        SQLiteMetricsStore(path).store_metrics_batch(
+            [_metric("a", 1.0, minutes_ago=1), _metric("b", 1.0, minutes_ago=1)]
+        )
+
+        dashboard = SQLiteMetricsStore(path).get_dashboard_data()
+
+        assert dashboard.total_metrics == 2
+        assert dashboard.containers_tracked == 2
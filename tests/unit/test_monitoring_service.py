@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -9,13 +10,16 @@ import pytest
 
 from portainer_dashboard.models.monitoring import (
     ContainerCapabilities,
+    ContainerLogs,
     ImageStatus,
     InfrastructureSnapshot,
     InsightSeverity,
     MonitoringInsight,
     MonitoringReport,
 )
+from portainer_dashboard.services.llm_client import LLMClientError
 from portainer_dashboard.services.monitoring_service import (
+    MonitoringService,
     _build_analysis_prompt,
     _generate_fallback_insights,
     _parse_llm_insights,
@@ -92,6 +96,34 @@ class TestBuildAnalysisPrompt:
         assert "my-stack" in prompt
         assert "nginx:latest" in prompt
 
+    def test_prompt_lists_repeated_log_lines_once(self) -> None:
+        """Test that repeated log messages are collapsed into counted templates."""
+        lines = [
+            f"2024-05-01T10:00:{second:02d}Z connection to db:5432 refused (attempt {second})"
+            for second in range(40)
+        ]
+        snapshot = InfrastructureSnapshot(
+            container_logs=[
+                ContainerLogs(
+                    endpoint_id=1,
+                    container_id="abc",
+                    container_name="api",
+                    state="restarting",
+                    logs="\n".join(lines),
+                    log_lines=len(lines),
+                )
+            ],
+        )
+
+        prompt = _build_analysis_prompt(snapshot)
+
+        assert (
+            "- 40x [2024-05-01T10:00:00Z to 2024-05-01T10:00:39Z] "
+            "connection to db:<*> refused (attempt <*>)"
+        ) in prompt
+        assert "attempt 39)" in prompt
+        assert "attempt 30)" not in prompt
+
 
 class TestParseLLMInsights:
     """Tests for parsing LLM responses."""
@@ -276,6 +308,28 @@ class TestGenerateFallbackInsights:
         insights = _generate_fallback_insights(snapshot)
         assert len(insights) == 0
 
+    def test_log_patterns_are_counted_per_template(self) -> None:
+        """Test that log-based insights count matching lines from the templates."""
+        snapshot = InfrastructureSnapshot(
+            container_logs=[
+                ContainerLogs(
+                    endpoint_id=1,
+                    container_id="abc",
+                    container_name="api",
+                    state="exited_error",
+                    exit_code=1,
+                    logs="starting\n" + "\n".join(
+                        f"dial tcp 10.0.0.{n}:5432: connection refused" for n in range(12)
+                    ),
+                )
+            ],
+        )
+
+        insights = _generate_fallback_insights(snapshot)
+
+        assert [i.title for i in insights] == ["Connection errors in api"]
+        assert "12 connection failure(s)" in insights[0].description
+
 
 class TestMonitoringInsight:
     """Tests for MonitoringInsight model."""
@@ -320,3 +374,135 @@ class TestMonitoringReport:
         assert report.containers_analyzed == 0
         assert report.security_issues_found == 0
         assert report.outdated_images_found == 0
+
+
+class TestIncrementalAnalysis:
+    """Tests for skipping or narrowing LLM analysis using snapshot diffs."""
+
+    def _service(self, snapshots: list[InfrastructureSnapshot], responses: list[str]):
+        data_collector = MagicMock()
+        data_collector.collect_snapshot = AsyncMock(side_effect=snapshots)
+        llm_client = MagicMock()
+        llm_client.chat = AsyncMock(side_effect=responses)
+        insights_store = MagicMock()
+        insights_store.add_report = AsyncMock()
+        service = MonitoringService(
+            data_collector=data_collector,
+            insights_store=insights_store,
+            llm_client=llm_client,
+        )
+        return service, llm_client
+
+    def _snapshot(self, *containers: tuple[str, str]) -> InfrastructureSnapshot:
+        return InfrastructureSnapshot(
+            containers_running=len(containers),
+            container_details=[
+                {
+                    "container_id": name,
+                    "container_name": name,
+                    "state": "running",
+                    "status": status,
+                    "endpoint_id": 1,
+                    "endpoint_name": "prod",
+                }
+                for name, status in containers
+            ],
+        )
+
+    def _insight(self, title: str, resource: str) -> dict:
+        return {
+            "severity": "warning",
+            "category": "availability",
+            "title": title,
+            "description": "",
+            "affected_resources": [resource],
+        }
+
+    @pytest.mark.asyncio
+    async def test_unchanged_snapshot_skips_llm(self) -> None:
+        """Test that an empty diff reuses the previous insights."""
+        snapshot = self._snapshot(("web", "Up (unhealthy)"))
+        response = json.dumps([self._insight("web unhealthy", "web")])
+        service, llm_client = self._service([snapshot, snapshot.model_copy()], [response])
+
+        first = await service.run_analysis()
+        second = await service.run_analysis()
+
+        assert llm_client.chat.await_count == 1
+        assert [i.title for i in second.insights] == [i.title for i in first.insights]
+        assert "No changes since the previous analysis" in second.summary
+
+    @pytest.mark.asyncio
+    async def test_changes_send_only_the_delta(self) -> None:
+        """Test that a changed snapshot sends a diff prompt and merges insights."""
+        first = self._snapshot(("web", "Up (unhealthy)"), ("db", "Up"))
+        second = self._snapshot(("web", "Up (unhealthy)"), ("db", "Up (unhealthy)"))
+        service, llm_client = self._service(
+            [first, second],
+            [
+                json.dumps([self._insight("web unhealthy", "web")]),
+                json.dumps([self._insight("db unhealthy", "db")]),
+            ],
+        )
+
+        await service.run_analysis()
+        report = await service.run_analysis()
+
+        prompt = llm_client.chat.await_args.args[0][1]["content"]
+        assert "Container State Changes" in prompt
+        assert "db on prod" in prompt
+        assert "web" not in prompt
+        assert sorted(i.title for i in report.insights) == ["db unhealthy", "web unhealthy"]
+
+    @pytest.mark.asyncio
+    async def test_failed_analysis_keeps_the_baseline(self) -> None:
+        """Test that changes seen while the LLM fails are analysed on the next cycle."""
+        first = self._snapshot(("web", "Up"))
+        second = self._snapshot(("web", "Up (unhealthy)"))
+        service, llm_client = self._service(
+            [first, second, second.model_copy()],
+            [
+                "[]",
+                LLMClientError("LLM unavailable"),
+                json.dumps([self._insight("web unhealthy", "web")]),
+            ],
+        )
+
+        await service.run_analysis()
+        await service.run_analysis()
+        report = await service.run_analysis()
+
+        assert llm_client.chat.await_count == 3
+        prompt = llm_client.chat.await_args.args[0][1]["content"]
+        assert "web on prod" in prompt
+        assert [i.title for i in report.insights] == ["web unhealthy"]
+
+
+class TestCollectionPhase:
+    """Tests for collecting metrics within the snapshot walk."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_recorded_from_snapshot_walk(self) -> None:
+        """Test that metrics come from the snapshot walk, not a separate pass."""
+        snapshot = InfrastructureSnapshot()
+        data_collector = MagicMock()
+        data_collector.collect_snapshot_and_metrics = AsyncMock(
+            return_value=(snapshot, ["metric"], False)
+        )
+        metrics_collector = MagicMock()
+        metrics_collector.enabled = True
+        metrics_collector.record_metrics = AsyncMock(return_value=1)
+        insights_store = MagicMock()
+        insights_store.add_report = AsyncMock()
+        service = MonitoringService(
+            data_collector=data_collector,
+            insights_store=insights_store,
+            metrics_collector=metrics_collector,
+        )
+
+        report = await service.run_analysis()
+
+        data_collector.collect_snapshot_and_metrics.assert_awaited_once_with(metrics_collector)
+        metrics_collector.record_metrics.assert_awaited_once_with(["metric"], complete=False)
+        metrics_collector.collect_all_metrics.assert_not_called()
+        assert "Collected 1 metrics" in report.summary
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from portainer_dashboard.services.security_scanner import (
     DEFAULT_ELEVATED_CAPS,
+    InspectResultCache,
     SecurityScanner,
 )
 
@@ -229,6 +231,96 @@ class TestSecurityScanner:
         assert results[0].privileged is True
 
 
+def _privileged_client() -> MagicMock:
+    client = MagicMock()
+    client.inspect_container = AsyncMock(
+        return_value={"HostConfig": {"Privileged": True, "CapAdd": ["NET_ADMIN"]}}
+    )
+    return client
+
+
+class TestInspectResultCache:
+    """Tests for reusing inspect results of unchanged containers."""
+
+    CONTAINERS = [
+        {"Id": "a1", "Names": ["/app"], "State": "running", "Created": 1700000000},
+        {"Id": "b2", "Names": ["/db"], "State": "running", "Created": 1700000100},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_unchanged_containers_are_inspected_once(self) -> None:
+        """Test that a second scan cycle makes no inspect calls."""
+        scanner = SecurityScanner()
+        client = _privileged_client()
+
+        first = await scanner.scan_endpoint_containers(client, 1, "prod", self.CONTAINERS)
+        second = await scanner.scan_endpoint_containers(client, 1, "prod", self.CONTAINERS)
+
+        assert client.inspect_container.await_count == 2
+        assert [r.container_name for r in second] == [r.container_name for r in first]
+        assert second[0].elevated_risks == first[0].elevated_risks
+
+    @pytest.mark.asyncio
+    async def test_recreated_container_is_inspected_again(self) -> None:
+        """Test that a new creation time invalidates the cached result."""
+        scanner = SecurityScanner()
+        client = _privileged_client()
+        await scanner.scan_endpoint_containers(client, 1, "prod", self.CONTAINERS)
+
+        recreated = [{**self.CONTAINERS[0], "Created": 1700009999}]
+        await scanner.scan_endpoint_containers(client, 1, "prod", recreated)
+
+        assert client.inspect_container.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_inspections_are_not_cached(self) -> None:
+        """Test that errors are retried on the next cycle."""
+        scanner = SecurityScanner()
+        client = MagicMock()
+        client.inspect_container = AsyncMock(side_effect=TimeoutError)
+
+        await scanner.scan_endpoint_containers(client, 1, "prod", self.CONTAINERS[:1])
+        await scanner.scan_endpoint_containers(client, 1, "prod", self.CONTAINERS[:1])
+
+        assert client.inspect_container.await_count == 2
+        assert len(scanner.inspect_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_persists_across_restarts(self, tmp_path: Path) -> None:
+        """Test that a new scanner loads results saved by the previous one."""
+        path = tmp_path / "inspect.json"
+        client = _privileged_client()
+        scanner = SecurityScanner(inspect_cache=InspectResultCache(path))
+        await scanner.scan_endpoint_containers(client, 1, "prod", self.CONTAINERS)
+        assert not path.exists()
+        await scanner.save_cache()
+
+        restarted = SecurityScanner(inspect_cache=InspectResultCache(path))
+        results = await restarted.scan_endpoint_containers(client, 1, "prod", self.CONTAINERS)
+
+        assert client.inspect_container.await_count == 2
+        assert len(results) == 2
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        """Test that the cache stays within max_entries."""
+        cache = InspectResultCache(max_entries=2)
+        cache.put(1, "a", 1, {})
+        cache.put(1, "b", 1, {})
+        cache.get(1, "a", 1)
+        cache.put(1, "c", 1, {})
+
+        assert cache.get(1, "a", 1) == {}
+        assert cache.get(1, "b", 1) is None
+        assert len(cache) == 2
+
+    def test_unreadable_cache_file_is_ignored(self, tmp_path: Path) -> None:
+        """Test that a corrupt cache file starts an empty cache."""
+        path = tmp_path / "inspect.json"
+        path.write_text("{not json", "utf-8")
+
+        assert len(InspectResultCache(path)) == 0
+
+
 class TestDefaultElevatedCaps:
     """Tests for default elevated capabilities."""
 
@@ -0,0 +1,136 @@
+"""Tests for diffing consecutive infrastructure snapshots."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from portainer_dashboard.models.monitoring import (
+    ContainerCapabilities,
+    ContainerLogs,
+    ImageStatus,
+    InfrastructureSnapshot,
+)
+from portainer_dashboard.services.snapshot_diff import diff_snapshots
+
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _container(container_id: str, state: str = "running", status: str = "Up 5 minutes") -> dict:
+    return {
+        "container_id": container_id,
+        "container_name": f"app-{container_id}",
+        "image": "nginx:latest",
+        "state": state,
+        "status": status,
+        "endpoint_id": 1,
+        "endpoint_name": "prod",
+    }
+
+
+def _logs(lines: list[str]) -> ContainerLogs:
+    return ContainerLogs(
+        endpoint_id=1,
+        container_id="b",
+        container_name="app-b",
+        state="restarting",
+        logs="\n".join(lines),
+        log_lines=len(lines),
+    )
+
+
+def _snapshot(minutes: int = 0, **kwargs) -> InfrastructureSnapshot:
+    kwargs.setdefault(
+        "endpoint_details",
+        [{"endpoint_id": 1, "endpoint_name": "prod", "endpoint_status": 1, "environment": "p"}],
+    )
+    return InfrastructureSnapshot(timestamp=_START + timedelta(minutes=minutes), **kwargs)
+
+
+class TestDiffSnapshots:
+    """Tests for container, security, image and log changes."""
+
+    def test_stable_fleet_has_empty_diff(self) -> None:
+        """Test that uptime text changes alone do not count as a change."""
+        issue = ContainerCapabilities(
+            endpoint_id=1, container_id="a", container_name="app-a", elevated_risks=["x"]
+        )
+        image = ImageStatus(stack_id=1, endpoint_id=1, image_name="nginx", outdated=True)
+        previous = _snapshot(
+            container_details=[_container("a", status="Up 5 minutes (healthy)")],
+            security_issues=[issue],
+            outdated_images=[image],
+            container_logs=[_logs(["2024-01-01T00:00:00Z boom"])],
+        )
+        current = _snapshot(
+            5,
+            container_details=[_container("a", status="Up 10 minutes (healthy)")],
+            security_issues=[issue],
+            outdated_images=[image],
+            container_logs=[_logs(["2024-01-01T00:00:00Z boom"])],
+        )
+
+        diff = diff_snapshots(previous, current)
+
+        assert diff.is_empty
+        assert diff.affected_resources == set()
+
+    def test_container_changes(self) -> None:
+        """Test that added, removed and changed containers are reported."""
+        previous = _snapshot(container_details=[_container("a"), _container("b")])
+        current = _snapshot(
+            5,
+            container_details=[
+                _container("a", status="Up 10 minutes (unhealthy)"),
+                _container("c"),
+            ],
+        )
+
+        diff = diff_snapshots(previous, current)
+
+        assert [c["container_name"] for c in diff.containers_added] == ["app-c"]
+        assert [c["container_name"] for c in diff.containers_removed] == ["app-b"]
+        assert diff.containers_changed[0]["health"] == "unhealthy"
+        assert diff.containers_changed[0]["previous_health"] is None
+        assert diff.affected_resources == {"app-a", "app-b", "app-c"}
+
+    def test_endpoint_status_change(self) -> None:
+        """Test that an endpoint going offline is reported."""
+        offline = [
+            {"endpoint_id": 1, "endpoint_name": "prod", "endpoint_status": 2, "environment": "p"}
+        ]
+
+        diff = diff_snapshots(_snapshot(), _snapshot(5, endpoint_details=offline))
+
+        assert diff.endpoints_changed == [
+            {"endpoint_name": "prod", "previous_status": 1, "status": 2}
+        ]
+
+    def test_security_issues_and_images_appear_and_resolve(self) -> None:
+        """Test that new and resolved issues are both reported."""
+        old_issue = ContainerCapabilities(
+            endpoint_id=1, container_id="a", container_name="app-a", elevated_risks=["x"]
+        )
+        new_issue = old_issue.model_copy(update={"container_name": "app-b"})
+        image = ImageStatus(stack_id=1, stack_name="web", endpoint_id=1, image_name="nginx")
+
+        diff = diff_snapshots(
+            _snapshot(security_issues=[old_issue]),
+            _snapshot(5, security_issues=[new_issue], outdated_images=[image]),
+        )
+
+        assert diff.new_security_issues == [new_issue]
+        assert diff.resolved_security_issues == [old_issue]
+        assert diff.new_outdated_images == [image]
+        assert diff.affected_resources == {"app-a", "app-b", "web"}
+
+    def test_only_new_log_lines_are_kept(self) -> None:
+        """Test that log lines already seen are dropped from the diff."""
+        previous = _snapshot(container_logs=[_logs(["t1 error", "t2 retry"])])
+        current = _snapshot(5, container_logs=[_logs(["t2 retry", "t3 error", "t4 retry"])])
+
+        diff = diff_snapshots(previous, current)
+
+        assert len(diff.new_container_logs) == 1
+        assert diff.new_container_logs[0].logs == "t3 error\nt4 retry"
+        assert diff.new_container_logs[0].log_lines == 2
+        assert sum(t.count for t in diff.new_container_logs[0].templates) == 2
@@ -0,0 +1,120 @@
+"""Tests for the bounded SQLite connection pool."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from portainer_dashboard.core.sqlite_pool import SQLiteConnectionPool, get_pool
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> Iterator[SQLiteConnectionPool]:
+    """Create a small pool for a database with a single table."""
+    connection_pool = SQLiteConnectionPool(tmp_path / "pool.db", pool_size=2, timeout=0.2)
+    with connection_pool.transaction() as connection:
+        connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+    yield connection_pool
+    connection_pool.close_all()
+
+
+class TestSQLiteConnectionPool:
+    """Tests for checkout/return, bounds, reaping and metrics."""
+
+    def test_readers_are_reused(self, pool: SQLiteConnectionPool) -> None:
+        """Test that a returned reader is handed out again."""
+        with pool.read_connection() as first:
+            pass
+        with pool.read_connection() as second:
+            pass
+
+        assert first is second
+        assert pool.stats().readers_open == 1
+
+    def test_reader_checkout_is_bounded(self, pool: SQLiteConnectionPool) -> None:
+        """Test that checkouts beyond pool_size time out."""
+        with pool.read_connection(), pool.read_connection():
+            with pytest.raises(sqlite3.OperationalError), pool.read_connection():
+                pass
+
+        stats = pool.stats()
+        assert stats.readers_open == 2
+        assert stats.timeouts == 1
+
+    def test_waiting_checkout_gets_returned_connection(self, tmp_path: Path) -> None:
+        """Test that a blocked checkout proceeds once a connection is returned."""
+        connection_pool = SQLiteConnectionPool(tmp_path / "wait.db", pool_size=1, timeout=5)
+        acquired: list[sqlite3.Connection] = []
+
+        def wait_for_reader() -> None:
+            with connection_pool.read_connection() as connection:
+                acquired.append(connection)
+
+        with connection_pool.read_connection() as held:
+            waiter = threading.Thread(target=wait_for_reader)
+            waiter.start()
+            time.sleep(0.05)
+        waiter.join(timeout=5)
+
+        assert acquired == [held]
+        assert connection_pool.stats().waits == 1
+        connection_pool.close_all()
+
+    def test_uncommitted_writes_are_rolled_back_on_return(
+        self, pool: SQLiteConnectionPool
+    ) -> None:
+        """Test that a returned writer never carries an open transaction."""
+        with pool.connection() as connection:
+            connection.execute("INSERT INTO items (value) VALUES ('lost')")
+
+        with pool.read_connection() as connection:
+            assert connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+    def test_transaction_commits(self, pool: SQLiteConnectionPool) -> None:
+        """Test that transaction() commits on success."""
+        with pool.transaction() as connection:
+            connection.execute("INSERT INTO items (value) VALUES ('kept')")
+
+        with pool.read_connection() as connection:
+            assert connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+    def test_readers_reject_writes(self, pool: SQLiteConnectionPool) -> None:
+        """Test that reader connections are opened read-only."""
+        with pool.read_connection() as connection, pytest.raises(sqlite3.OperationalError):
+            connection.execute("INSERT INTO items (value) VALUES ('x')")
+
+    def test_idle_connections_are_reaped(self, tmp_path: Path) -> None:
+        """Test that idle connections are closed after max_idle_seconds."""
+        connection_pool = SQLiteConnectionPool(tmp_path / "reap.db", max_idle_seconds=0)
+        with connection_pool.read_connection():
+            pass
+
+        assert connection_pool.reap_idle() == 1
+        stats = connection_pool.stats()
+        assert stats.readers_open == 0
+        assert stats.reaped == 1
+        connection_pool.close_all()
+
+    def test_connect_hook_runs_for_new_connections(self, pool: SQLiteConnectionPool) -> None:
+        """Test that hooks added later apply to every connection handed out."""
+        with pool.read_connection():
+            pass
+
+        pool.add_connect_hook(
+            lambda connection: connection.create_function("answer", 0, lambda: 42)
+        )
+
+        with pool.read_connection() as connection:
+            assert connection.execute("SELECT answer()").fetchone()[0] == 42
+
+    def test_get_pool_shares_pools_per_path(self, tmp_path: Path) -> None:
+        """Test that stores for the same database share one pool."""
+        path = tmp_path / "shared.db"
+
+        assert get_pool(path) is get_pool(str(path))
+        assert get_pool(path) is not get_pool(tmp_path / "other.db")
@@ -0,0 +1,150 @@
+"""Tests for the SQLite single-writer batching queue."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from portainer_dashboard.core.sqlite_pool import SQLiteConnectionPool
+from portainer_dashboard.core.sqlite_writer import SQLiteWriteQueue
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> SQLiteConnectionPool:
+    """Create a pool for a database with a single table."""
+    connection_pool = SQLiteConnectionPool(tmp_path / "writer.db")
+    with connection_pool.transaction() as connection:
+        connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)")
+    return connection_pool
+
+
+@pytest.fixture
+def writer(pool: SQLiteConnectionPool) -> Iterator[SQLiteWriteQueue]:
+    """Create a write queue and stop it after the test."""
+    write_queue = SQLiteWriteQueue(pool, max_batch_size=100, max_delay=0.05)
+    yield write_queue
+    write_queue.close()
+
+
+def _count(pool: SQLiteConnectionPool) -> int:
+    with pool.read_connection() as connection:
+        return connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+
+class TestSQLiteWriteQueue:
+    """Tests for grouped commits from a single writer thread."""
+
+    def test_urgent_write_is_visible_after_result(
+        self, pool: SQLiteConnectionPool, writer: SQLiteWriteQueue
+    ) -> None:
+        """Test read-your-writes for callers waiting on the future."""
+        rowcount = writer.execute(
+            "INSERT INTO items (value) VALUES (?)", ("a",), urgent=True
+        ).result(timeout=5)
+
+        assert rowcount == 1
+        assert _count(pool) == 1
+
+    def test_background_writes_are_grouped(
+        self, pool: SQLiteConnectionPool, writer: SQLiteWriteQueue
+    ) -> None:
+        """Test that concurrent producers share transactions."""
+
+        def produce() -> None:
+            for i in range(50):
+                writer.execute("INSERT INTO items (value) VALUES (?)", (str(i),))
+
+        producers = [threading.Thread(target=produce) for _ in range(4)]
+        for thread in producers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+        writer.flush(timeout=5)
+
+        assert _count(pool) == 200
+        assert writer.stats.operations_committed >= 200
+        assert writer.stats.batches_committed < 200
+
+    def test_failed_operation_does_not_poison_batch(
+        self, pool: SQLiteConnectionPool, writer: SQLiteWriteQueue
+    ) -> None:
+        """Test that one failing write only fails its own future."""
+        good = writer.executemany("INSERT INTO items (value) VALUES (?)", [("a",), ("b",)])
+        bad = writer.execute("INSERT INTO missing_table VALUES (1)")
+        writer.flush(timeout=5)
+
+        assert good.result() == 2
+        with pytest.raises(sqlite3.OperationalError):
+            bad.result()
+        assert _count(pool) == 2
+        assert writer.stats.operations_failed == 1
+
+    def test_close_commits_pending_writes(self, pool: SQLiteConnectionPool) -> None:
+        """Test that closing drains the queue."""
+        write_queue = SQLiteWriteQueue(pool, max_delay=10.0)
+        write_queue.execute("INSERT INTO items (value) VALUES (?)", ("a",))
+
+        write_queue.close(timeout=5)
+
+        assert _count(pool) == 1
+        with pytest.raises(RuntimeError):
+            write_queue.execute("INSERT INTO items (value) VALUES (?)", ("b",))
+
+    def test_submit_racing_close_is_committed(self, pool: SQLiteConnectionPool) -> None:
+        """Test that a write submitted while the queue closes is not stranded."""
+        writer = SQLiteWriteQueue(pool)
+        writer.execute("INSERT INTO items (value) VALUES ('early')", urgent=True).result(5)
+        entered = threading.Event()
+        release = threading.Event()
+        start = writer._ensure_started
+
+        def slow_start() -> None:
+            entered.set()
+            release.wait(5)
+            start()
+
+        writer._ensure_started = slow_start  # type: ignore[method-assign]
+        futures = []
+        submitter = threading.Thread(
+            target=lambda: futures.append(
+                writer.execute("INSERT INTO items (value) VALUES ('late')", urgent=True)
+            )
+        )
+        submitter.start()
+        entered.wait(5)
+        closer = threading.Thread(target=writer.close)
+        closer.start()
+        closer.join(0.1)
+        release.set()
+        submitter.join(5)
+        closer.join(5)
+
+        assert futures[0].result(timeout=1) == 1
+        assert _count(pool) == 2
+
+    def test_rollback_hooks_run_when_a_batch_fails(
+        self, pool: SQLiteConnectionPool, writer: SQLiteWriteQueue
+    ) -> None:
+        """Test that a failing pre-commit hook rolls back the batch and runs rollback hooks."""
+        rolled_back: list[bool] = []
+
+        def fail(connection: sqlite3.Connection) -> None:
+            raise RuntimeError("commit failed")
+
+        writer.add_pre_commit_hook(fail)
+        writer.add_rollback_hook(lambda: rolled_back.append(True))
+        future = writer.execute("INSERT INTO items (value) VALUES (?)", ("a",), urgent=True)
+
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+        assert rolled_back == [True]
+        assert _count(pool) == 0
+
+    def test_read_connection_is_read_only(self, pool: SQLiteConnectionPool) -> None:
+        """Test that reader connections reject writes."""
+        with pool.read_connection() as connection, pytest.raises(sqlite3.OperationalError):
+            connection.execute("INSERT INTO items (value) VALUES ('x')")
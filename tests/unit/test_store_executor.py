@@ -0,0 +1,96 @@
+"""Tests for the async store executor."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from portainer_dashboard.core.store_executor import StoreExecutor
+
+
+@pytest.fixture
+def executor() -> Iterator[StoreExecutor]:
+    """Create a store executor and shut it down after the test."""
+    store_executor = StoreExecutor(max_readers=2)
+    yield store_executor
+    store_executor.shutdown()
+
+
+class TestStoreExecutor:
+    """Tests for running blocking store calls off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_read_runs_off_event_loop_thread(self, executor: StoreExecutor) -> None:
+        """Test that reads execute on a worker thread."""
+        loop_thread = threading.get_ident()
+
+        worker_thread = await executor.read(threading.get_ident)
+
+        assert worker_thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_writes_apply_in_submission_order(self, executor: StoreExecutor) -> None:
+        """Test that queued writes run sequentially on one thread."""
+        applied: list[int] = []
+        threads: set[int] = set()
+
+        def write(value: int) -> None:
+            threads.add(threading.get_ident())
+            time.sleep(0.001 * (5 - value))
+            applied.append(value)
+
+        await asyncio.gather(*(executor.write(write, i) for i in range(5)))
+
+        assert applied == [0, 1, 2, 3, 4]
+        assert len(threads) == 1
+
+    @pytest.mark.asyncio
+    async def test_stores_have_separate_writers(self, executor: StoreExecutor) -> None:
+        """Test that a slow write to one store does not hold up another store."""
+
+        class _Store:
+            def write(self, delay: float) -> int:
+                time.sleep(delay)
+                return threading.get_ident()
+
+        slow_store, fast_store = _Store(), _Store()
+        slow = asyncio.create_task(executor.write(slow_store.write, 0.5))
+        await asyncio.sleep(0.01)
+
+        started = time.monotonic()
+        fast_thread = await executor.write(fast_store.write, 0)
+
+        assert time.monotonic() - started < 0.25
+        assert fast_thread != await slow
+        assert await executor.write(slow_store.write, 0) == await slow
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_does_not_stall_loop(self, executor: StoreExecutor) -> None:
+        """Test that the event loop keeps running during a slow query."""
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await executor.write(time.sleep, 0.1)
+        task.cancel()
+
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self, executor: StoreExecutor) -> None:
+        """Test that store errors reach the awaiting coroutine."""
+
+        def fail() -> None:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await executor.read(fail)
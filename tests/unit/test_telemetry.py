@@ -0,0 +1,209 @@
+"""Tests for the SQLite span export pipeline."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode
+
+from portainer_dashboard.core import telemetry
+from portainer_dashboard.core.telemetry import SamplingSQLiteExporter, SQLiteSpanExporter
+from portainer_dashboard.services.trace_store import SQLiteTraceStore
+
+
+def _request_spans(
+    children: int = 1,
+    *,
+    duration_ms: int = 5,
+    error: bool = False,
+) -> tuple[list[ReadableSpan], ReadableSpan]:
+    """Record one HTTP request trace and return its child spans and root span."""
+    memory = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(memory))
+    tracer = provider.get_tracer(__name__)
+    start = time.time_ns()
+    end = start + duration_ms * 1_000_000
+    attributes = {"http.method": "GET", "http.route": "/api/v1/stacks", "http.status_code": 200}
+    root = tracer.start_span("GET /api/v1/stacks", attributes=attributes, start_time=start)
+    for i in range(children):
+        child = tracer.start_span(
+            f"portainer call {i}", context=trace.set_span_in_context(root), start_time=start
+        )
+        if error:
+            child.set_status(Status(StatusCode.ERROR))
+        child.end(end_time=end)
+    root.end(end_time=end)
+    *child_spans, root_span = memory.get_finished_spans()
+    return child_spans, root_span
+
+
+def _trace_id(span: ReadableSpan) -> str:
+    return format(span.context.trace_id, "032x")
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SQLiteTraceStore:
+    """Create a trace store backed by a temporary database."""
+    return SQLiteTraceStore(tmp_path / "traces.db")
+
+
+@pytest.fixture
+def exporter(store: SQLiteTraceStore) -> Iterator[SQLiteSpanExporter]:
+    """Create an exporter writing to the temporary store."""
+    span_exporter = SQLiteSpanExporter(store, "test-service")
+    yield span_exporter
+    span_exporter.shutdown()
+
+
+class TestSQLiteSpanExporter:
+    """Tests for queueing, trace assembly, eviction and counters."""
+
+    def test_trace_summary_includes_earlier_exported_children(
+        self, exporter: SQLiteSpanExporter, store: SQLiteTraceStore
+    ) -> None:
+        """Test that children exported before their root are counted."""
+        children, root = _request_spans(children=2)
+
+        assert exporter.export(children) == SpanExportResult.SUCCESS
+        assert exporter.export([root]) == SpanExportResult.SUCCESS
+        assert exporter.force_flush()
+
+        stored = store.get_trace(_trace_id(root))
+        assert stored is not None
+        assert stored.span_count == 3
+        assert len(stored.spans) == 3
+        assert stored.http_route == "/api/v1/stacks"
+        assert stored.http_status_code == 200
+        assert exporter.stats.spans_exported == 3
+        assert exporter.stats.traces_exported == 1
+        assert exporter.stats.pending_traces == 0
+
+    def test_full_queue_drops_spans(self, store: SQLiteTraceStore) -> None:
+        """Test that spans beyond the queue bound are dropped and counted."""
+        children, root = _request_spans(children=2)
+        exporter = SQLiteSpanExporter(store, "test-service", max_queue_size=2)
+
+        assert exporter.export([*children, root]) == SpanExportResult.FAILURE
+        assert exporter.export(children) == SpanExportResult.SUCCESS
+        exporter.shutdown()
+
+        assert exporter.stats.spans_dropped == 3
+        assert exporter.stats.spans_exported == 2
+        assert exporter.stats.spans_queued == 0
+
+    def test_traces_without_root_are_evicted(self, store: SQLiteTraceStore) -> None:
+        """Test that traces whose root never arrives expire after the TTL."""
+        children, _ = _request_spans()
+        exporter = SQLiteSpanExporter(store, "test-service", pending_trace_ttl=0)
+
+        exporter.export(children)
+        exporter.force_flush()
+        exporter.shutdown()
+
+        assert exporter.stats.traces_evicted == 1
+        assert exporter.stats.pending_traces == 0
+        assert store.get_summary().total_traces == 0
+
+    def test_idle_traces_are_evicted(self, store: SQLiteTraceStore) -> None:
+        """Test that expired traces are evicted without further exports."""
+        children, _ = _request_spans()
+        exporter = SQLiteSpanExporter(store, "test-service", pending_trace_ttl=0.1)
+
+        exporter.export(children)
+        deadline = time.monotonic() + 5
+        while exporter.stats.traces_evicted == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        exporter.force_flush()
+
+        assert exporter.stats.traces_evicted == 1
+        assert exporter.stats.pending_traces == 0
+        assert exporter.stats.spans_exported == 1
+        exporter.shutdown()
+
+    def test_shutdown_stores_queued_spans(self, store: SQLiteTraceStore) -> None:
+        """Test that shutdown drains the queue before stopping."""
+        children, root = _request_spans()
+        exporter = SQLiteSpanExporter(store, "test-service")
+
+        exporter.export([*children, root])
+        exporter.shutdown()
+
+        assert store.get_summary().total_traces == 1
+        assert exporter.export(children) == SpanExportResult.FAILURE
+
+    def test_buffer_is_bounded(self, store: SQLiteTraceStore) -> None:
+        """Test that the oldest traces are evicted once the buffer is full."""
+        exporter = SQLiteSpanExporter(store, "test-service", max_buffered_spans=2)
+
+        for _ in range(3):
+            children, _ = _request_spans()
+            exporter.export(children)
+        exporter.force_flush()
+
+        assert exporter.stats.traces_evicted == 1
+        assert exporter.stats.spans_buffered == 2
+        exporter.shutdown()
+        assert exporter.stats.traces_evicted == 3
+        assert exporter.stats.spans_exported == 3
+
+
+class TestTailSampling:
+    """Tests for keeping error and slow traces while sampling the rest."""
+
+    def _export(self, exporter: SQLiteSpanExporter, **kwargs) -> str:
+        children, root = _request_spans(**kwargs)
+        exporter.export([*children, root])
+        return _trace_id(root)
+
+    def test_errors_and_slow_traces_are_always_kept(self, store: SQLiteTraceStore) -> None:
+        """Test that a zero sample rate still keeps error and slow traces."""
+        exporter = SamplingSQLiteExporter(store, "test-service", 0.0, slow_trace_ms=100)
+
+        fast = self._export(exporter, duration_ms=5)
+        failed = self._export(exporter, duration_ms=5, error=True)
+        slow = self._export(exporter, duration_ms=500)
+        exporter.shutdown()
+
+        assert store.get_trace(fast) is None
+        assert store.get_trace(failed) is not None
+        assert store.get_trace(slow) is not None
+        assert exporter.stats.traces_sampled_out == 1
+        assert exporter.stats.spans_exported == 4
+
+    def test_full_sample_rate_keeps_everything(self, store: SQLiteTraceStore) -> None:
+        """Test that a sample rate of 1 keeps fast traces too."""
+        exporter = SamplingSQLiteExporter(store, "test-service", 1.0)
+
+        fast = self._export(exporter, duration_ms=5)
+        exporter.shutdown()
+
+        assert store.get_trace(fast) is not None
+
+    def test_threshold_follows_route_latency(
+        self, store: SQLiteTraceStore, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the route's recent p95 replaces the fallback threshold."""
+        monkeypatch.setattr(telemetry, "_LATENCY_WINDOW_SECONDS", 0.0)
+        monkeypatch.setattr(telemetry, "_MIN_ROUTE_SAMPLES", 1)
+        exporter = SamplingSQLiteExporter(store, "test-service", 0.0, slow_trace_ms=1000)
+
+        baseline = self._export(exporter, duration_ms=10)
+        slower = self._export(exporter, duration_ms=50)
+        faster = self._export(exporter, duration_ms=20)
+        exporter.shutdown()
+
+        # 50 ms is below the fallback but above the previous window's 10 ms
+        assert store.get_trace(baseline) is None
+        assert store.get_trace(slower) is not None
+        assert store.get_trace(faster) is None
@@ -0,0 +1,188 @@
+"""Tests for the SQLite trace store."""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from portainer_dashboard.models.tracing import Trace
+from portainer_dashboard.services.trace_store import SQLiteTraceStore
+
+
+def _trace(
+    trace_id: str,
+    duration_ms: int | None,
+    *,
+    route: str | None = "/api/v1/containers",
+    method: str | None = "GET",
+    has_errors: bool = False,
+    hours_ago: float = 0,
+) -> Trace:
+    return Trace(
+        trace_id=trace_id,
+        root_span_name=f"GET {route}",
+        start_time=datetime.now(timezone.utc) - timedelta(hours=hours_ago),
+        total_duration_ms=duration_ms,
+        has_errors=has_errors,
+        http_method=method,
+        http_route=route,
+    )
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SQLiteTraceStore:
+    """Create a trace store backed by a temporary database."""
+    return SQLiteTraceStore(tmp_path / "traces.db")
+
+
+class TestTracesSummary:
+    """Tests for the write-time maintained summary counters."""
+
+    def test_summary_counts_stored_traces(self, store: SQLiteTraceStore) -> None:
+        """Test totals, error rate, average duration and routes."""
+        store.store_trace(_trace("t1", 10))
+        store.store_trace(_trace("t2", 30, has_errors=True))
+        store.store_trace(_trace("t3", None, route="/health"))
+        store.store_trace(_trace("t4", 20, hours_ago=2))
+
+        summary = store.get_summary()
+
+        assert summary.total_traces == 4
+        assert summary.traces_last_hour == 3
+        assert summary.traces_with_errors == 1
+        assert summary.error_rate == 25.0
+        assert summary.avg_duration_ms == 20.0
+        assert summary.unique_routes == 2
+        assert summary.p50_duration_ms == pytest.approx(20, rel=0.01)
+
+    def test_restored_trace_is_counted_once(self, store: SQLiteTraceStore) -> None:
+        """Test that replacing a trace updates rather than adds to counters."""
+        store.store_trace(_trace("t1", 10, route="/a"))
+        store.store_trace(_trace("t1", 50, route="/b", has_errors=True))
+
+        summary = store.get_summary()
+
+        assert summary.total_traces == 1
+        assert summary.traces_with_errors == 1
+        assert summary.avg_duration_ms == 50.0
+        assert summary.unique_routes == 1
+
+    def test_purge_updates_counters(self, store: SQLiteTraceStore) -> None:
+        """Test that purged traces are removed from the counters."""
+        store.store_trace(_trace("old", 100, route="/old", has_errors=True, hours_ago=48))
+        store.store_trace(_trace("new", 10))
+
+        assert store.purge_old_traces(retention_hours=24) == 1
+        summary = store.get_summary()
+
+        assert summary.total_traces == 1
+        assert summary.traces_with_errors == 0
+        assert summary.avg_duration_ms == 10.0
+        assert summary.unique_routes == 1
+
+
+class TestLatencySketches:
+    """Tests for the per-route, per-bucket latency sketches."""
+
+    def test_route_stats_come_from_sketches(self, store: SQLiteTraceStore) -> None:
+        """Test per-route counts, error rate and percentiles."""
+        for i in range(100):
+            store.store_trace(_trace(f"a{i}", i + 1, route="/a", has_errors=i < 10))
+        store.store_trace(_trace("b1", 500, route="/b", method="POST"))
+        store.store_trace(_trace("old", 9000, route="/a", hours_ago=3))
+
+        stats = store.get_route_stats(hours=1)
+
+        assert [(s.method, s.route) for s in stats] == [("GET", "/a"), ("POST", "/b")]
+        route_a = stats[0]
+        assert route_a.request_count == 100
+        assert route_a.error_count == 10
+        assert route_a.error_rate == 10.0
+        assert route_a.avg_duration_ms == pytest.approx(50.5)
+        assert route_a.p50_duration_ms == pytest.approx(51, rel=0.01)
+        assert route_a.p99_duration_ms == pytest.approx(100, rel=0.01)
+
+    def test_sketch_windows_and_route_filters(self, store: SQLiteTraceStore) -> None:
+        """Test that sketches can be merged for any window and route."""
+        store.store_trace(_trace("recent", 10, route="/a"))
+        store.store_trace(_trace("older", 1000, route="/a", hours_ago=2))
+        store.store_trace(_trace("other", 100, route=None))
+        now = datetime.now(timezone.utc)
+
+        assert store.get_latency_sketch().count == 3
+        assert store.get_latency_sketch(now - timedelta(hours=1)).count == 2
+        assert store.get_latency_sketch(end=now - timedelta(hours=1)).count == 1
+        assert store.get_latency_sketch(http_route="/a").count == 2
+        assert store.get_latency_sketch(http_route="").quantile(0.5) == pytest.approx(
+            100, rel=0.01
+        )
+
+    def test_restore_and_purge_keep_sketches_exact(self, store: SQLiteTraceStore) -> None:
+        """Test that replaced and purged traces are removed from sketches."""
+        store.store_trace(_trace("t1", 10, route="/a"))
+        store.store_trace(_trace("t1", 40, route="/b"))
+        store.store_trace(_trace("old", 5000, route="/b", hours_ago=48))
+
+        store.purge_old_traces(retention_hours=24)
+
+        stats = store.get_route_stats(hours=24)
+        assert [(s.route, s.request_count) for s in stats] == [("/b", 1)]
+        assert stats[0].p99_duration_ms == pytest.approx(40, rel=0.01)
+        assert store.get_summary().p99_duration_ms == pytest.approx(40, rel=0.01)
+
+    def test_failed_operation_leaves_sketches_untouched(self, store: SQLiteTraceStore) -> None:
+        """Test that a rolled back operation drops its sketch changes with its rows."""
+        store.store_trace(_trace("t1", 10))
+        store._writer.execute(
+            """
+            CREATE TRIGGER reject_t1 BEFORE INSERT ON traces WHEN NEW.trace_id = 't1'
+            BEGIN SELECT RAISE(ABORT, 'rejected'); END
+            """,
+            urgent=True,
+        ).result()
+
+        # The replacement removes t1's old row from the sketches, then fails to insert
+        store.store_traces_batch([_trace("t2", 20)], wait=False)
+        with pytest.raises(sqlite3.IntegrityError):
+            store.store_trace(_trace("t1", 5000))
+        store.flush()
+
+        assert store.get_summary().total_traces == 2
+        assert store.get_latency_sketch().count == 2
+        assert store.get_latency_sketch().quantile(1.0) == pytest.approx(20, rel=0.01)
+
+    def test_failed_batch_discards_pending_sketch_changes(
+        self, store: SQLiteTraceStore
+    ) -> None:
+        """Test that a batch rolled back as a whole does not leak into the next one."""
+        failures = [RuntimeError("commit failed")]
+
+        def fail_once(connection: sqlite3.Connection) -> None:
+            if failures:
+                raise failures.pop()
+
+        store._writer._pre_commit_hooks.insert(0, fail_once)
+        with pytest.raises(RuntimeError):
+            store.store_trace(_trace("lost", 10))
+        store.store_trace(_trace("kept", 20))
+
+        assert store.get_summary().total_traces == 1
+        assert store.get_latency_sketch().count == 1
+
+    def test_existing_traces_are_backfilled(self, tmp_path: Path) -> None:
+        """Test that sketches are built for traces stored before they existed."""
+        path = tmp_path / "legacy.db"
+        store = SQLiteTraceStore(path)
+        store.store_trace(_trace("t1", 10))
+        store.store_trace(_trace("t2", 30))
+        store.close()
+        with sqlite3.connect(path) as connection:
+            connection.execute("DROP TABLE trace_latency_sketches")
+
+        reopened = SQLiteTraceStore(path)
+
+        assert reopened.get_latency_sketch().count == 2
+        assert reopened.get_summary().p99_duration_ms == pytest.approx(30, rel=0.01)